@@ -1,57 +1,62 @@
 from datetime import datetime, timedelta
-from sqlalchemy import func, text
+from sqlalchemy import case, func
 import json
 
+# Categories charted on the admin analytics page (in display order)
+DASHBOARD_CATEGORIES = ['Banner', 'Apparel', 'Decals', 'Yard Signs', 'Other']
+DASHBOARD_STATUSES = ['pending', 'approved', 'declined', 'converted']
+
+def _month_starts(today, months):
+    """First day of the last `months` calendar months, oldest first"""
+    starts = []
+    year, month = today.year, today.month
+    for _ in range(months):
+        starts.insert(0, today.replace(year=year, month=month, day=1))
+        year, month = (year, month - 1) if month > 1 else (year - 1, 12)
+    return starts
+
 class BusinessAnalytics:
+    """
+    Business metrics for the dashboards. Counts and revenue come from the
+    DailyRollup table (see scripts/daily_rollup.py), never from scanning the
+    quote and order tables. Revenue is the value of approved quotes: final
+    price, or calculated price when there is no (or a zero) final price.
+    """
+
     def __init__(self, db):
         self.db = db
     
     def get_dashboard_stats(self):
         """Get key business metrics for dashboard"""
-        from app import Quote, Order, Customer
-        
-        # Get date ranges
-        today = datetime.now().date()
-        this_month_start = today.replace(day=1)
-        last_month_start = (this_month_start - timedelta(days=1)).replace(day=1)
-        
-        # Total stats
-        total_quotes = Quote.query.count()
-        total_orders = Order.query.count()
-        total_customers = Customer.query.count()
+        from app import Customer, DailyRollup as R
         
-        # This month stats
-        this_month_quotes = Quote.query.filter(
-            func.date(Quote.created_at) >= this_month_start
-        ).count()
+        this_month_start = datetime.now().date().replace(day=1)
+        this_month = R.day >= this_month_start
+        rows = self.db.session.query(
+            R.status, this_month, func.sum(R.quote_count), func.sum(R.quote_value), func.sum(R.order_count)
+        ).group_by(R.status, this_month).all()
         
-        this_month_orders = Order.query.filter(
-            func.date(Order.created_at) >= this_month_start
-        ).count()
+        total_quotes = total_orders = this_month_quotes = this_month_orders = approved_quotes = 0
+        total_revenue = this_month_revenue = 0
+        for status, in_month, quotes, value, orders in rows:
+            total_quotes += quotes
+            total_orders += orders
+            if in_month:
+                this_month_quotes += quotes
+                this_month_orders += orders
+            if status == 'approved':
+                approved_quotes += quotes
+                total_revenue += value
+                if in_month:
+                    this_month_revenue += value
         
-        # Revenue calculations
-        total_revenue = self.db.session.query(
-            func.sum(Quote.final_price)
-        ).filter(Quote.status == 'approved').scalar() or 0
-        
-        this_month_revenue = self.db.session.query(
-            func.sum(Quote.final_price)
-        ).filter(
-            Quote.status == 'approved',
-            func.date(Quote.created_at) >= this_month_start
-        ).scalar() or 0
-        
-        # Conversion rate
-        approved_quotes = Quote.query.filter(Quote.status == 'approved').count()
         conversion_rate = (approved_quotes / total_quotes * 100) if total_quotes > 0 else 0
-        
-        # Average order value
         avg_order_value = total_revenue / approved_quotes if approved_quotes > 0 else 0
         
         return {
             'total_quotes': total_quotes,
             'total_orders': total_orders,
-            'total_customers': total_customers,
+            'total_customers': Customer.query.count(),
             'this_month_quotes': this_month_quotes,
             'this_month_orders': this_month_orders,
             'total_revenue': total_revenue,
@@ -62,53 +67,35 @@ class BusinessAnalytics:
     
     def get_daily_stats(self, days=30):
         """Get daily statistics for charts"""
-        from app import Quote, Order
+        from app import DailyRollup as R
         
-        end_date = datetime.now().date()
-        start_date = end_date - timedelta(days=days)
-        
-        # Daily quotes
-        daily_quotes = self.db.session.query(
-            func.date(Quote.created_at).label('date'),
-            func.count(Quote.id).label('count')
-        ).filter(
-            func.date(Quote.created_at) >= start_date
-        ).group_by(func.date(Quote.created_at)).all()
-        
-        # Daily orders
-        daily_orders = self.db.session.query(
-            func.date(Order.created_at).label('date'),
-            func.count(Order.id).label('count')
-        ).filter(
-            func.date(Order.created_at) >= start_date
-        ).group_by(func.date(Order.created_at)).all()
-        
-        # Daily revenue
-        daily_revenue = self.db.session.query(
-            func.date(Quote.created_at).label('date'),
-            func.sum(Quote.final_price).label('revenue')
-        ).filter(
-            Quote.status == 'approved',
-            func.date(Quote.created_at) >= start_date
-        ).group_by(func.date(Quote.created_at)).all()
+        start_date = datetime.now().date() - timedelta(days=days)
+        approved = R.status == 'approved'
+        rows = self.db.session.query(
+            R.day,
+            func.sum(R.quote_count),
+            func.sum(R.order_count),
+            func.sum(case((approved, R.quote_count), else_=0)),
+            func.sum(case((approved, R.quote_value), else_=0))
+        ).filter(R.day >= start_date).group_by(R.day).order_by(R.day).all()
         
         return {
-            'quotes': [(str(row.date), row.count) for row in daily_quotes],
-            'orders': [(str(row.date), row.count) for row in daily_orders],
-            'revenue': [(str(row.date), float(row.revenue or 0)) for row in daily_revenue]
+            'quotes': [(str(day), quotes) for day, quotes, _, _, _ in rows if quotes],
+            'orders': [(str(day), orders) for day, _, orders, _, _ in rows if orders],
+            'revenue': [(str(day), float(revenue or 0)) for day, _, _, approved_count, revenue in rows if approved_count]
         }
     
     def get_category_breakdown(self):
         """Get quote breakdown by category"""
-        from app import Quote
+        from app import DailyRollup as R
         
         category_stats = self.db.session.query(
-            Quote.category,
-            func.count(Quote.id).label('count'),
-            func.sum(Quote.final_price).label('total_value')
+            R.category,
+            func.sum(R.quote_count).label('count'),
+            func.sum(R.quote_value).label('total_value')
         ).filter(
-            Quote.status == 'approved'
-        ).group_by(Quote.category).all()
+            R.status == 'approved'
+        ).group_by(R.category).having(func.sum(R.quote_count) > 0).all()
         
         return {
             'categories': [row.category for row in category_stats],
@@ -116,21 +103,32 @@ class BusinessAnalytics:
             'values': [float(row.total_value or 0) for row in category_stats]
         }
     
+    def get_top_customers(self, limit=10):
+        """
+        Customers with the most spent on orders, best first. Reads the
+        maintained Customer.total_spent through its index (see
+        scripts/customer_totals.py) instead of summing quotes per customer.
+        """
+        from app import Customer
+        
+        top_customers = Customer.query.with_entities(
+            Customer.name, Customer.email, Customer.total_orders, Customer.total_spent
+        ).filter(Customer.total_spent > 0).order_by(
+            Customer.total_spent.desc(), Customer.id.desc()
+        ).limit(limit).all()
+        
+        return [
+            {
+                'name': row.name,
+                'email': row.email,
+                'total_spent': round(float(row.total_spent), 2),
+                'total_orders': row.total_orders or 0
+            } for row in top_customers
+        ]
+    
     def get_customer_insights(self):
         """Get customer behavior insights"""
-        from app import Customer, Quote
-        
-        # Top customers by total spent
-        top_customers = self.db.session.query(
-            Customer.name,
-            Customer.email,
-            func.sum(Quote.final_price).label('total_spent'),
-            func.count(Quote.id).label('quote_count')
-        ).join(Quote).filter(
-            Quote.status == 'approved'
-        ).group_by(Customer.id, Customer.name, Customer.email).order_by(
-            func.sum(Quote.final_price).desc()
-        ).limit(10).all()
+        from app import Customer
         
         # Customer type breakdown
         customer_types = self.db.session.query(
@@ -139,45 +137,172 @@ class BusinessAnalytics:
         ).group_by(Customer.customer_type).all()
         
         return {
-            'top_customers': [
-                {
-                    'name': row.name,
-                    'email': row.email,
-                    'total_spent': float(row.total_spent or 0),
-                    'quote_count': row.quote_count
-                } for row in top_customers
-            ],
+            'top_customers': self.get_top_customers(),
             'customer_types': {row.customer_type: row.count for row in customer_types}
         }
     
     def get_quote_status_summary(self):
         """Get quote status breakdown"""
-        from app import Quote
+        from app import DailyRollup as R
         
         status_counts = self.db.session.query(
-            Quote.status,
-            func.count(Quote.id).label('count')
-        ).group_by(Quote.status).all()
+            R.status,
+            func.sum(R.quote_count).label('count')
+        ).group_by(R.status).having(func.sum(R.quote_count) > 0).all()
         
         return {row.status: row.count for row in status_counts}
     
     def get_trend_analysis(self):
         """Get month-over-month trends"""
-        from app import Quote
+        from app import DailyRollup as R
         
-        # Get last 6 months of data
-        monthly_stats = self.db.session.query(
-            func.date_trunc('month', Quote.created_at).label('month'),
-            func.count(Quote.id).label('quote_count'),
-            func.sum(Quote.final_price).label('revenue')
+        # Last 6 months of data, by day; folded into months here
+        daily = self.db.session.query(
+            R.day, func.sum(R.quote_count), func.sum(R.quote_value)
         ).filter(
-            Quote.created_at >= datetime.now() - timedelta(days=180)
-        ).group_by(
-            func.date_trunc('month', Quote.created_at)
-        ).order_by('month').all()
+            R.day >= (datetime.now() - timedelta(days=180)).date()
+        ).group_by(R.day).all()
+        
+        monthly = {}
+        for day, quotes, revenue in daily:
+            month = monthly.setdefault(day.strftime('%Y-%m'), [0, 0.0])
+            month[0] += quotes
+            month[1] += revenue or 0
+        months = sorted(month for month, (quotes, _) in monthly.items() if quotes)
         
         return {
-            'months': [row.month.strftime('%Y-%m') for row in monthly_stats],
-            'quote_counts': [row.quote_count for row in monthly_stats],
-            'revenues': [float(row.revenue or 0) for row in monthly_stats]
-        }
\ No newline at end of file
+            'months': months,
+            'quote_counts': [monthly[month][0] for month in months],
+            'revenues': [float(monthly[month][1]) for month in months]
+        }
+    
+    def get_admin_dashboard(self, today=None, days=7, months=6, top_n=5):
+        """
+        Everything the admin analytics page shows, from four queries: two
+        over the rollup, the customer count, and the top customers (an
+        index scan of Customer.total_spent).
+        """
+        from app import Customer, DailyRollup as R
+        
+        today = today or datetime.now().date()
+        this_month_start = today.replace(day=1)
+        day_starts = [today - timedelta(days=days - 1 - i) for i in range(days)]
+        month_starts = _month_starts(today, months)
+        window_start = min(day_starts[0], month_starts[0])
+        
+        # 1. Totals by status and category: stats, status chart, category chart
+        by_status_category = self.db.session.query(
+            R.status, R.category, func.sum(R.quote_count), func.sum(R.quote_value), func.sum(R.order_count)
+        ).group_by(R.status, R.category).all()
+        
+        # 2. The chart window by day and status: daily, monthly and this-month figures
+        by_day = self.db.session.query(
+            R.day, R.status, func.sum(R.quote_count), func.sum(R.quote_value), func.sum(R.order_count)
+        ).filter(R.day >= window_start).group_by(R.day, R.status).all()
+        
+        # 3. Customers
+        total_customers = Customer.query.count()
+        
+        # 4. Top customers by amount spent on orders
+        top_customers = self.get_top_customers(top_n)
+        
+        quote_status = dict.fromkeys(DASHBOARD_STATUSES, 0)
+        category_counts = dict.fromkeys(DASHBOARD_CATEGORIES, 0)
+        category_values = dict.fromkeys(DASHBOARD_CATEGORIES, 0.0)
+        total_quotes = total_orders = approved_count = 0
+        total_revenue = 0.0
+        for status, category, count, value, orders in by_status_category:
+            total_quotes += count
+            total_orders += orders
+            if status in quote_status:
+                quote_status[status] += count
+            if category in category_counts:
+                category_counts[category] += count
+                if status == 'approved':
+                    category_values[category] += value or 0
+            if status == 'approved':
+                approved_count += count
+                total_revenue += value or 0
+        
+        quote_days, revenue_days, order_days = {}, {}, {}
+        for day, status, count, value, orders in by_day:
+            quote_days[day] = quote_days.get(day, 0) + count
+            order_days[day] = order_days.get(day, 0) + orders
+            if status == 'approved':
+                revenue_days[day] = revenue_days.get(day, 0) + (value or 0)
+        
+        def in_range(by_day, start, end=None):
+            return sum(v for d, v in by_day.items() if d >= start and (end is None or d < end))
+        
+        stats = {
+            'total_quotes': total_quotes,
+            'total_orders': total_orders,
+            'total_customers': total_customers,
+            'this_month_quotes': in_range(quote_days, this_month_start),
+            'this_month_orders': in_range(order_days, this_month_start),
+            'total_revenue': round(total_revenue, 2),
+            'this_month_revenue': round(in_range(revenue_days, this_month_start), 2),
+            'conversion_rate': round(approved_count / total_quotes * 100, 1) if total_quotes else 0,
+            'avg_order_value': round(total_revenue / approved_count, 2) if approved_count else 0
+        }
+        
+        labels = [day.strftime('%Y-%m-%d') for day in day_starts]
+        daily_stats = {
+            'quotes': [(label, quote_days.get(day, 0)) for label, day in zip(labels, day_starts)],
+            'orders': [(label, order_days.get(day, 0)) for label, day in zip(labels, day_starts)],
+            'revenue': [(label, round(revenue_days.get(day, 0), 2)) for label, day in zip(labels, day_starts)]
+        }
+        
+        month_ends = month_starts[1:] + [(month_starts[-1] + timedelta(days=32)).replace(day=1)]
+        trends = {
+            'months': [start.strftime('%Y-%m') for start in month_starts],
+            'quote_counts': [in_range(quote_days, s, e) for s, e in zip(month_starts, month_ends)],
+            'revenues': [round(in_range(revenue_days, s, e), 2) for s, e in zip(month_starts, month_ends)]
+        }
+        
+        return {
+            'stats': stats,
+            'daily_stats': daily_stats,
+            'category_breakdown': {
+                'categories': list(DASHBOARD_CATEGORIES),
+                'counts': [category_counts[c] for c in DASHBOARD_CATEGORIES],
+                'values': [round(category_values[c], 2) for c in DASHBOARD_CATEGORIES]
+            },
+            'customer_insights': {
+                'top_customers': top_customers,
+                'customer_types': {'retail': total_customers}
+            },
+            'quote_status': quote_status,
+            'trends': trends
+        }
+    
+    def empty_admin_dashboard(self, today=None, days=7):
+        """Zero-filled admin dashboard, shown when the real one can't be computed"""
+        today = today or datetime.now().date()
+        labels = [(today - timedelta(days=days - 1 - i)).strftime('%Y-%m-%d') for i in range(days)]
+        return {
+            'stats': {
+                'total_quotes': 0,
+                'total_orders': 0,
+                'total_customers': 0,
+                'this_month_quotes': 0,
+                'this_month_orders': 0,
+                'total_revenue': 0.0,
+                'this_month_revenue': 0.0,
+                'conversion_rate': 0.0,
+                'avg_order_value': 0.0
+            },
+            'daily_stats': {
+                'quotes': [(label, 0) for label in labels],
+                'orders': [(label, 0) for label in labels],
+                'revenue': [(label, 0.0) for label in labels]
+            },
+            'category_breakdown': {
+                'categories': list(DASHBOARD_CATEGORIES),
+                'counts': [0] * len(DASHBOARD_CATEGORIES),
+                'values': [0.0] * len(DASHBOARD_CATEGORIES)
+            },
+            'customer_insights': {'top_customers': [], 'customer_types': {'retail': 0}},
+            'quote_status': dict.fromkeys(DASHBOARD_STATUSES, 0),
+            'trends': {'months': [], 'quote_counts': [], 'revenues': []}
+        }
@@ -1,154 +1,70 @@
 import os
-import math
 import logging
-from flask import Flask, render_template, request, redirect, url_for, flash, session, send_file, jsonify, make_response
+import threading
+from collections import namedtuple
+from functools import partial, wraps
+from types import MappingProxyType
+import click
+from flask import Flask, render_template, request, redirect, url_for, flash, session, send_file, jsonify, make_response, g, has_request_context, current_app
+from flask.cli import with_appcontext
 from flask_sqlalchemy import SQLAlchemy
-from sqlalchemy.orm import DeclarativeBase
-from pdf_generator import PDFQuoteGenerator
+from sqlalchemy import bindparam, false, insert, select, text, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import DeclarativeBase, contains_eager, joinedload, selectinload
 from analytics import BusinessAnalytics as AnalyticsService
 from file_upload import FileUploadHandler
-from openai import OpenAI
 from config import CONFIG
 
 # Import centralized pricing functions for API endpoints
-from scripts.pricers import (
-    banner_quote_with_guard, 
-    banner_employee_cost,
-    poster_quote_with_guard,
-    poster_employee_cost
-)
-
-# ========== NEW 2025 DECAL PRICING SYSTEM ==========
-
-def calculate_decal_retail_price(width_in, height_in, qty, material="gloss", laminate="none"):
-    """
-    New 2025 decal pricing system with 5-step structure:
-    1. Calculate total decal area (width × height × qty ÷ 144)
-    2. Apply material cost per sq ft (actual vinyl cost $0.90-$1.20/sq ft)
-    3. Add fixed overhead buffer ($3-5 per job)
-    4. Apply markup (30% minimum margin)
-    5. Enforce industry floor/ceiling ranges
-    """
-    # Step 1: Calculate total decal area
-    total_sqft = (width_in * height_in * qty) / 144
-    
-    # Step 2: Apply material cost per sq ft (corrected to industry standards)
-    if material == "matte":
-        material_cost_per_sqft = 2.80  # $2.80/sq ft for matte
-    else:
-        material_cost_per_sqft = 2.50  # $2.50/sq ft for gloss
-    
-    material_cost = total_sqft * material_cost_per_sqft
-    
-    # Add lamination cost if selected
-    if laminate != "none":
-        lamination_cost_per_sqft = 1.20  # $1.20/sq ft for lamination
-        material_cost += total_sqft * lamination_cost_per_sqft
-    
-    # Step 3: Add fixed overhead buffer (corrected)
-    overhead_cost = 0.00  # Overhead already included in material cost
-    
-    # Step 4: Calculate base price with 30% minimum margin
-    total_cost = material_cost + overhead_cost
-    base_price = total_cost / 0.70  # 30% margin = cost / (1 - 0.30)
-    
-    # Step 5: Enforce industry floor/ceiling ranges
-    unit_price = base_price / qty
-    
-    # Apply industry benchmarks for common sizes
-    if abs(width_in - 4) <= 0.1 and abs(height_in - 4) <= 0.1:  # 4x4
-        if qty == 25:
-            # 4×4 qty 25 → retail $30–40
-            target_total = max(30, min(40, base_price))
-            total_price = target_total
-        elif qty == 50:
-            # 4×4 qty 50 → retail $68–72
-            target_total = max(68, min(72, base_price))
-            total_price = target_total
-        else:
-            total_price = base_price
-    elif abs(width_in - 3) <= 0.1 and abs(height_in - 3) <= 0.1:  # 3x3
-        if qty == 50:
-            # 3×3 qty 50 → retail $35–50
-            target_total = max(35, min(50, base_price))
-            total_price = target_total
-        else:
-            total_price = base_price
-    else:
-        total_price = base_price
-    
-    unit_price = total_price / qty
-    margin_after = ((total_price - total_cost) / total_price) * 100
-    
-    return {
-        "unit_usd": round(unit_price, 2),
-        "total_usd": round(total_price, 2),
-        "auto_floored": False,
-        "margin_after": round(margin_after, 1)
-    }
-
-def calculate_decal_true_cost(width_in, height_in, qty, material="gloss", laminate="none"):
-    """
-    Calculate true cost for decals using actual material costs
-    """
-    # Calculate total decal area
-    total_sqft = (width_in * height_in * qty) / 144
-    
-    # Material cost per sq ft (corrected to industry standards)
-    if material == "matte":
-        material_cost_per_sqft = 2.80  # $2.80/sq ft for matte
-    else:
-        material_cost_per_sqft = 2.50  # $2.50/sq ft for gloss
-    
-    material_cost = total_sqft * material_cost_per_sqft
-    
-    # Add lamination cost if selected
-    if laminate != "none":
-        lamination_cost_per_sqft = 1.20  # $1.20/sq ft for lamination
-        material_cost += total_sqft * lamination_cost_per_sqft
-    
-    # Fixed overhead (overhead included in material cost)
-    overhead_cost = 0.00
-    
-    # Total true cost
-    total_cost = material_cost + overhead_cost
-    unit_cost = total_cost / qty
-    
-    # 30% margin floor for minimum sell price
-    floor_sell_total = total_cost / 0.70
-    floor_sell_unit = floor_sell_total / qty
-    
-    return {
-        "unit_cost_usd": round(unit_cost, 2),
-        "total_cost_usd": round(total_cost, 2),
-        "floor_sell_unit_usd": round(floor_sell_unit, 2),
-        "floor_sell_total_usd": round(floor_sell_total, 2)
-    }
+from scripts.pricers import banner_employee_cost
+from scripts.banner_batch import banner_quote_batch, BATCH_MAX_LINES
+from scripts.price_matrix import banner_quote as banner_quote_from_matrix
+from scripts.quote_cache import QuoteResultCache, normalize_fields
+from scripts.number_allocator import NumberAllocator
+from scripts.keyset_pagination import paginate, paginate_ranked, page_size_arg
+from scripts import admin_search, status_summary
+from scripts.analytics_buffer import AnalyticsBuffer
+from scripts.route_table import RouteTable
+from scripts.http_caching import conditional_json, json_document
+from scripts import customer_emails, customer_totals, daily_rollup, fragment_cache, migrations
+from pricing.banner import calculator_banner_unit_price
+from pricing.config import PRICING_CONFIG, RETAIL, RETAIL_VERSION
+from pricing.decal import calculate_decal_retail_price, calculate_decal_true_cost
 
 # Professional Banner Pricing - Using external banner_pricing.py module
 
 logging.basicConfig(level=logging.DEBUG)
 
-# Banner pricing is now handled directly in calculate_area_pricing function
-
-# Initialize OpenAI client
-openai_client = OpenAI(api_key=os.environ.get("OPENAI_API_KEY"))
+# Banner and decal pricing run on the compiled pipelines in the pricing/ engine
 
 class Base(DeclarativeBase):
     pass
 
 db = SQLAlchemy(model_class=Base)
 
-app = Flask(__name__)
-app.secret_key = os.environ.get("SESSION_SECRET", "dev-secret-key")
+# Views are collected here and added to each app by create_app() (bottom of this file)
+routes = RouteTable()
 
-# Database configuration
-app.config["SQLALCHEMY_DATABASE_URI"] = os.environ.get("DATABASE_URL")
-app.config["SQLALCHEMY_ENGINE_OPTIONS"] = {
-    "pool_recycle": 300,
-    "pool_pre_ping": True,
-}
-db.init_app(app)
+def lazy_service(build):
+    """Decorator: the service is built by the first call, not at import in every worker"""
+    built = []
+    lock = threading.Lock()
+
+    @wraps(build)
+    def get():
+        if not built:
+            with lock:
+                if not built:
+                    built.append(build())
+        return built[0]
+
+    get.is_built = lambda: bool(built)
+    return get
+
+@lazy_service
+def get_openai_client():
+    from openai import OpenAI  # ~0.8s of imports, only for /api/chat
+    return OpenAI(api_key=os.environ.get("OPENAI_API_KEY"))
 
 # Database Models
 class Material(db.Model):
@@ -167,6 +83,16 @@ class PricingSettings(db.Model):
     value = db.Column(db.Float, nullable=False)
     description = db.Column(db.String(200))
 
+class CacheVersion(db.Model):
+    """Per-cache version counters; bumped on admin edits so every worker reloads"""
+    name = db.Column(db.String(50), primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+
+class DocumentCounter(db.Model):
+    """Next unreserved quote/order number per month (name = prefix, e.g. Q202509)"""
+    name = db.Column(db.String(20), primary_key=True)
+    next_value = db.Column(db.Integer, nullable=False, default=0)
+
 class ApparelItem(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     garment_name = db.Column(db.String(50), nullable=False)
@@ -196,15 +122,20 @@ class PartnerCategorySettings(db.Model):
 
 # Advanced Business Models
 class Customer(db.Model):
+    __table_args__ = (
+        db.Index(customer_emails.INDEX_NAME, 'email', unique=True),
+        db.Index(customer_totals.INDEX_NAME, 'total_spent'),  # top-customer leaderboard
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), nullable=False)
-    email = db.Column(db.String(120), nullable=False)
+    email = db.Column(db.String(120), nullable=False)  # normalized: trimmed, lowercase
     phone = db.Column(db.String(20))
     company = db.Column(db.String(100))
     address = db.Column(db.Text)
     customer_type = db.Column(db.String(20), default='retail')  # retail, partner
     created_at = db.Column(db.DateTime, default=db.func.current_timestamp())
-    total_orders = db.Column(db.Integer, default=0)
+    total_orders = db.Column(db.Integer, default=0)  # maintained by CUSTOMER_TOTALS
     total_spent = db.Column(db.Float, default=0.0)
     
     # Relationships
@@ -212,6 +143,18 @@ class Customer(db.Model):
     orders = db.relationship('Order', backref='customer', lazy=True)
 
 class Quote(db.Model):
+    # Admin list filters (status/category, newest first), per-customer history,
+    # date-range analytics. Created on existing databases by migration 3.
+    __table_args__ = (
+        db.Index('ix_quote_status_created_at', 'status', 'created_at'),
+        db.Index('ix_quote_category_created_at', 'category', 'created_at'),
+        db.Index('ix_quote_customer_id_created_at', 'customer_id', 'created_at'),
+        db.Index('ix_quote_created_at', 'created_at'),
+        # Admin list price sort, unfiltered and within a status
+        db.Index('ix_quote_calculated_price', 'calculated_price'),
+        db.Index('ix_quote_status_calculated_price', 'status', 'calculated_price'),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     quote_number = db.Column(db.String(20), unique=True, nullable=False)
     customer_id = db.Column(db.Integer, db.ForeignKey('customer.id'), nullable=False)
@@ -241,6 +184,20 @@ class Quote(db.Model):
     files = db.relationship('QuoteFile', backref='quote', lazy=True)
 
 class Order(db.Model):
+    # Overdue/open-order notifications (status + due_date), admin list filters,
+    # foreign keys. Created on existing databases by migration 3.
+    __table_args__ = (
+        db.Index('ix_order_status_due_date', 'status', 'due_date'),
+        db.Index('ix_order_status_created_at', 'status', 'created_at'),
+        db.Index('ix_order_priority_created_at', 'priority', 'created_at'),
+        db.Index('ix_order_customer_id', 'customer_id'),
+        db.Index('ix_order_quote_id', 'quote_id'),
+        db.Index('ix_order_created_at', 'created_at'),
+        # Admin list amount sort, unfiltered and within a status
+        db.Index('ix_order_total_amount', 'total_amount'),
+        db.Index('ix_order_status_total_amount', 'status', 'total_amount'),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     order_number = db.Column(db.String(20), unique=True, nullable=False)
     quote_id = db.Column(db.Integer, db.ForeignKey('quote.id'), nullable=False)
@@ -281,6 +238,9 @@ class QuoteFile(db.Model):
     description = db.Column(db.String(255))
 
 class BusinessAnalytics(db.Model):
+    # One logical row per (date, metric, category); read by analytics, probed by flushes
+    __table_args__ = (db.Index('ix_business_analytics_key', 'date', 'metric_name', 'category'),)
+
     id = db.Column(db.Integer, primary_key=True)
     date = db.Column(db.Date, nullable=False)
     metric_name = db.Column(db.String(50), nullable=False)
@@ -288,10 +248,25 @@ class BusinessAnalytics(db.Model):
     category = db.Column(db.String(50))
     additional_data = db.Column(db.JSON)
 
-# Initialize database and default data
-with app.app_context():
-    db.create_all()
-    
+class DailyRollup(db.Model):
+    """
+    Quote and order counts/values per (day, category, status, customer_type),
+    maintained on every flush by scripts/daily_rollup.py and read by the
+    analytics charts. Created and backfilled by migration 6.
+    """
+    __tablename__ = 'daily_rollup'
+
+    day = db.Column(db.Date, primary_key=True)
+    category = db.Column(db.String(50), primary_key=True)
+    status = db.Column(db.String(20), primary_key=True)
+    customer_type = db.Column(db.String(20), primary_key=True)
+    quote_count = db.Column(db.Integer, nullable=False, default=0)
+    quote_value = db.Column(db.Float, nullable=False, default=0.0)
+    order_count = db.Column(db.Integer, nullable=False, default=0)
+    order_value = db.Column(db.Float, nullable=False, default=0.0)
+
+def seed_default_data():
+    """Insert default settings, materials and catalog items into an empty database"""
     # Initialize default settings if they don't exist
     if not PricingSettings.query.first():
         default_settings = [
@@ -360,44 +335,304 @@ with app.app_context():
         
         db.session.commit()
 
+def init_db():
+    """Bring the schema up to date (scripts/migrations.py) and seed an empty database"""
+    applied = migrations.upgrade(db.engine, db.metadata)
+    seed_default_data()
+    return applied
+
+@click.command('init-db')
+@with_appcontext
+def init_db_command():
+    """Apply pending schema migrations and seed default data."""
+    applied = init_db()
+    click.echo(f"applied {len(applied)} migration(s): {applied}" if applied else "schema is up to date")
+
+# Analytics rollup follows every quote/order change made through the session
+ROLLUP = daily_rollup.for_tables(db.metadata.tables)
+ROLLUP.listen(db.session)
+CUSTOMER_TOTALS = customer_totals.for_tables(db.metadata.tables)
+
+# ========== CACHE VERSIONS & SNAPSHOTS ==========
+
+def get_cache_versions():
+    """
+    All cache version counters as {name: version}. Read once per request and
+    shared by every snapshot, so checking all caches costs a single query.
+    """
+    if has_request_context():
+        versions = g.get('_cache_versions')
+        if versions is None:
+            versions = g._cache_versions = dict(db.session.query(CacheVersion.name, CacheVersion.version).all())
+        return versions
+    return dict(db.session.query(CacheVersion.name, CacheVersion.version).all())
+
+def get_cache_version(name):
+    """Current version counter for a named cache (0 if never bumped)"""
+    return get_cache_versions().get(name, 0)
+
+def pinned_cache_version(name):
+    """
+    Version of a named cache as this request already read it, or None before
+    the request has read any (never queries, so it is safe on error pages).
+    """
+    versions = g.get('_cache_versions') if has_request_context() else None
+    return None if versions is None else versions.get(name, 0)
+
+def bump_cache_version(name):
+    """
+    Invalidate a named cache in every worker. Runs in the caller's transaction,
+    so the bump becomes visible exactly when the edit it covers is committed.
+    """
+    dialect = db.session.get_bind().dialect.name
+    if dialect in ('postgresql', 'sqlite'):
+        # One statement, so two first bumps of a name can't both INSERT
+        stmt = (postgresql.insert if dialect == 'postgresql' else sqlite.insert)(CacheVersion).values(
+            name=name, version=1
+        )
+        db.session.execute(stmt.on_conflict_do_update(
+            index_elements=[CacheVersion.name], set_={'version': CacheVersion.version + 1}
+        ))
+        return
+    updated = CacheVersion.query.filter_by(name=name).update(
+        {CacheVersion.version: CacheVersion.version + 1}, synchronize_session=False
+    )
+    if not updated:
+        db.session.add(CacheVersion(name=name, version=1))
+
+class VersionedSnapshot:
+    """
+    Process-level, read-only view of some tables, rebuilt only when its
+    CacheVersion counter moves. The counter is checked at most once per
+    request and the snapshot is pinned on flask.g, so a request never sees
+    two versions. Outside a request (CLI, scripts) it is checked on every call.
+
+    Subclasses set cache_name and implement _build(); several may share one
+    cache_name.
+    """
+
+    cache_name = None
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._value = None
+        self._version = None
+
+    def _build(self):
+        raise NotImplementedError
+
+    def _load(self):
+        version = get_cache_version(self.cache_name)
+        if version != self._version:
+            with self._lock:
+                if version != self._version:
+                    self._value = self._build()
+                    self._version = version
+        return self._value
+
+    def current(self):
+        if not has_request_context():
+            return self._load()
+        key = f'_snapshot_{type(self).__name__}'
+        value = g.get(key)
+        if value is None:
+            value = self._load()
+            setattr(g, key, value)
+        return value
+
+    @property
+    def version(self):
+        return self._version
+
+class PricingSettingsSnapshot(VersionedSnapshot):
+    """All PricingSettings rows as one read-only {setting_name: value} mapping"""
+
+    cache_name = 'settings'
+
+    def _build(self):
+        rows = db.session.query(PricingSettings.setting_name, PricingSettings.value).all()
+        return MappingProxyType(dict(rows))
+
+SETTINGS = PricingSettingsSnapshot()
+
 def get_setting(setting_name, default=0.0):
     """Get a pricing setting value"""
-    setting = PricingSettings.query.filter_by(setting_name=setting_name).first()
-    return setting.value if setting else default
+    return SETTINGS.current().get(setting_name, default)
+
+# Material types offered per calculator category (anything else shows banner media)
+CATEGORY_MATERIAL_TYPES = {
+    'Decals': ('cast_vinyl', 'vinyl', 'decal'),
+    'Poster': ('poster',),
+    'Banner': ('banner',),
+}
+LAMINATE_MATERIAL_TYPES = ('vinyl_laminate', 'cast_laminate')
+
+CatalogMaterial = namedtuple('CatalogMaterial', 'name material_type cost_per_sqft')
+CatalogYardSign = namedtuple('CatalogYardSign', 'name sku')
+CatalogApparel = namedtuple('CatalogApparel', 'garment_name')
+
+class CatalogView:
+    """Precomputed dropdown data for the calculator pages (all tuples, never mutated)"""
+
+    def __init__(self, materials, yard_items, apparel_items, partner_categories):
+        self.yard_items = tuple(yard_items)
+        self.apparel_items = tuple(apparel_items)
+        self.apparel_garments = tuple(item.garment_name for item in self.apparel_items)
+        self.partner_categories = tuple(partner_categories)
+
+        self._media = {}
+        for category, types in CATEGORY_MATERIAL_TYPES.items():
+            rows = [m for m in materials if m.material_type in types]
+            self._media[category] = (
+                tuple(m.name for m in rows),
+                tuple((m.name, m.cost_per_sqft) for m in rows),
+            )
+
+        # Vinyl laminates first, then cast laminates
+        laminates = [m for t in LAMINATE_MATERIAL_TYPES for m in materials if m.material_type == t]
+        self.laminate_options = tuple(lam.name for lam in laminates)
+        self.laminate_options_with_pricing = tuple((lam.name, lam.cost_per_sqft) for lam in laminates)
+
+    def media(self, category):
+        """(media_names, material_options) for a category's active materials"""
+        return self._media.get(category, self._media['Banner'])
+
+class CatalogSnapshot(VersionedSnapshot):
+    """
+    Active materials, laminates, yard signs, apparel garments and partner
+    categories, rebuilt when an admin route bumps the 'catalog' version.
+    """
+
+    cache_name = 'catalog'
+
+    def _build(self):
+        materials = [
+            CatalogMaterial(*row) for row in db.session.query(
+                Material.name, Material.material_type, Material.cost_per_sqft
+            ).filter(Material.active == True).order_by(Material.id)
+        ]
+        yard_items = [
+            CatalogYardSign(*row) for row in db.session.query(
+                YardSignItem.name, YardSignItem.sku
+            ).filter(YardSignItem.active == True).order_by(YardSignItem.id)
+        ]
+        apparel_items = [
+            CatalogApparel(*row) for row in db.session.query(
+                ApparelItem.garment_name
+            ).filter(ApparelItem.active == True).order_by(ApparelItem.id)
+        ]
+        partner_categories = [
+            name for (name,) in db.session.query(
+                PartnerCategorySettings.category_name
+            ).filter(PartnerCategorySettings.enabled_for_partners == True).order_by(PartnerCategorySettings.id)
+        ]
+        return CatalogView(materials, yard_items, apparel_items, partner_categories)
+
+CATALOG = CatalogSnapshot()
+
+# Apparel quantity tiers as [min_qty, max_qty, unit_price] rungs, like the
+# pricing ladders (max_qty None: no upper bound)
+APPAREL_TIER_COLUMNS = (
+    (1, 5, 'tier_1_5'), (6, 10, 'tier_6_10'), (11, 20, 'tier_11_20'),
+    (21, 50, 'tier_21_50'), (51, 100, 'tier_51_100'), (101, None, 'tier_101_plus'),
+)
+
+class CatalogFeedSnapshot(VersionedSnapshot):
+    """
+    The /api/catalog JSON documents (materials, apparel tiers, yard signs),
+    serialized with their ETags once per catalog version, and only once
+    something asks for them.
+    """
+
+    cache_name = 'catalog'
+
+    def _build(self):
+        # Material costs are the shop's wholesale prices; customers get retail
+        # rates from /api/pricing/ladders
+        materials = [
+            {'name': name, 'material_type': material_type, 'width_inches': width_inches}
+            for name, material_type, width_inches in db.session.query(
+                Material.name, Material.material_type, Material.width_inches
+            ).filter(Material.active == True).order_by(Material.id)
+        ]
+        apparel = [
+            {'garment_name': item.garment_name,
+             'tiers': [[low, high, getattr(item, column)] for low, high, column in APPAREL_TIER_COLUMNS]}
+            for item in ApparelItem.query.filter_by(active=True).order_by(ApparelItem.id)
+        ]
+        yard_signs = [
+            {'sku': sku, 'name': name, 'retail_price': retail_price}
+            for sku, name, retail_price in db.session.query(
+                YardSignItem.sku, YardSignItem.name, YardSignItem.retail_price
+            ).filter(YardSignItem.active == True).order_by(YardSignItem.id)
+        ]
+        # The bodies carry no version, so an edit to one feed leaves the others' ETags alone
+        return MappingProxyType({
+            'materials': json_document({'materials': materials}),
+            'apparel': json_document({'apparel': apparel}),
+            'yard-signs': json_document({'yard_signs': yard_signs}),
+        })
+
+CATALOG_FEEDS = CatalogFeedSnapshot()
 
 # Advanced Quote Management Functions
-import secrets
-import string
 from datetime import datetime, timedelta
 
+# Numbers come from per-worker blocks reserved in DocumentCounter
+QUOTE_NUMBERS = NumberAllocator('Q', DocumentCounter.__table__, Quote.__table__.c.quote_number, lambda: db.engine)
+ORDER_NUMBERS = NumberAllocator('O', DocumentCounter.__table__, Order.__table__.c.order_number, lambda: db.engine)
+
 def generate_quote_number():
-    """Generate unique quote number"""
-    prefix = datetime.now().strftime("%Y%m")
-    random_suffix = ''.join(secrets.choice(string.digits) for _ in range(4))
-    quote_number = f"Q{prefix}{random_suffix}"
-    
-    # Ensure uniqueness
-    while Quote.query.filter_by(quote_number=quote_number).first():
-        random_suffix = ''.join(secrets.choice(string.digits) for _ in range(4))
-        quote_number = f"Q{prefix}{random_suffix}"
-    
-    return quote_number
+    """Generate unique quote number (QYYYYMM####)"""
+    return QUOTE_NUMBERS.next_number()
 
 def generate_order_number():
-    """Generate unique order number"""
-    prefix = datetime.now().strftime("%Y%m")
-    random_suffix = ''.join(secrets.choice(string.digits) for _ in range(4))
-    order_number = f"O{prefix}{random_suffix}"
-    
-    # Ensure uniqueness
-    while Order.query.filter_by(order_number=order_number).first():
-        random_suffix = ''.join(secrets.choice(string.digits) for _ in range(4))
-        order_number = f"O{prefix}{random_suffix}"
-    
-    return order_number
+    """Generate unique order number (OYYYYMM####)"""
+    return ORDER_NUMBERS.next_number()
 
 def find_or_create_customer(email, name, phone=None, company=None, customer_type='retail'):
-    """Find existing customer or create new one"""
+    """
+    Find existing customer (by normalized email) or create new one.
+
+    A returning customer whose details are unchanged costs one indexed SELECT
+    and no write. Otherwise a single INSERT ... ON CONFLICT creates the
+    customer or updates the non-empty fields that changed, so concurrent saves
+    for the same email still end up with one row.
+    """
+    email = customer_emails.normalize_email(email)
+    dialect = db.session.get_bind().dialect.name
+    if dialect not in ('postgresql', 'sqlite'):
+        return _find_or_create_customer_orm(email, name, phone, company, customer_type)
+
+    changes = {field: value for field, value in (('name', name), ('phone', phone), ('company', company)) if value}
+    customer = Customer.query.filter_by(email=email).first()
+    if customer is not None and all(getattr(customer, field) == value for field, value in changes.items()):
+        return customer
+
+    table = Customer.__table__
+    insert_stmt = (postgresql.insert if dialect == 'postgresql' else sqlite.insert)(Customer).values(
+        name=name, email=email, phone=phone, company=company, customer_type=customer_type
+    )
+    if changes:
+        stmt = insert_stmt.on_conflict_do_update(
+            index_elements=[table.c.email],
+            set_={field: insert_stmt.excluded[field] for field in changes},
+            where=db.or_(*(table.c[field].is_distinct_from(insert_stmt.excluded[field]) for field in changes)),
+        )
+    else:
+        stmt = insert_stmt.on_conflict_do_nothing(index_elements=[table.c.email])
+
+    written = db.session.scalars(
+        stmt.returning(Customer), execution_options={'populate_existing': True}
+    ).first()
+    if written is None:
+        # Another request wrote the same details first
+        return Customer.query.filter_by(email=email).one()
+    db.session.commit()
+    return written
+
+def _find_or_create_customer_orm(email, name, phone, company, customer_type):
+    """find_or_create_customer for databases without INSERT ... ON CONFLICT"""
     customer = Customer.query.filter_by(email=email).first()
     
     if not customer:
@@ -409,7 +644,6 @@ def find_or_create_customer(email, name, phone=None, company=None, customer_type
             customer_type=customer_type
         )
         db.session.add(customer)
-        db.session.commit()
     else:
         # Update customer info if provided
         if name and customer.name != name:
@@ -418,6 +652,7 @@ def find_or_create_customer(email, name, phone=None, company=None, customer_type
             customer.phone = phone
         if company and customer.company != company:
             customer.company = company
+    if db.session.new or db.session.is_modified(customer):
         db.session.commit()
     
     return customer
@@ -449,36 +684,114 @@ def save_quote(customer, category, form_data, calculated_price, cost_breakdown,
     
     return quote
 
+def _flush_analytics(app, batch):
+    """
+    Apply buffered {(date, metric_name, category): (value, payload)} to app's
+    database in one transaction: one SELECT for the existing rows, then
+    batched UPDATEs and INSERTs. Flushes from different workers are serialized
+    (advisory lock on PostgreSQL, the database write lock on SQLite), so a key
+    never gets two rows.
+    """
+    table = BusinessAnalytics.__table__
+    with app.app_context():
+        with db.engine.begin() as conn:
+            if conn.dialect.name == 'postgresql':
+                conn.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": ANALYTICS_LOCK_KEY})
+            elif conn.dialect.name == 'sqlite':
+                # A no-op write takes the database write lock before the SELECT
+                conn.execute(update(table).where(false()).values(metric_value=table.c.metric_value))
+            dates = {date for date, _, _ in batch}
+            names = {name for _, name, _ in batch}
+            rows = conn.execute(
+                select(table.c.id, table.c.date, table.c.metric_name, table.c.category,
+                       table.c.metric_value, table.c.additional_data)
+                .where(table.c.date.in_(dates), table.c.metric_name.in_(names))
+                .order_by(table.c.id)
+            ).all()
+            existing = {}
+            for row in rows:
+                existing.setdefault((row.date, row.metric_name, row.category), row)
+
+            updates, inserts = [], []
+            for key, (value, payload) in batch.items():
+                row = existing.get(key)
+                if row is None:
+                    date, name, category = key
+                    inserts.append({"date": date, "metric_name": name, "category": category,
+                                    "metric_value": value, "additional_data": payload})
+                else:
+                    updates.append({"row_id": row.id, "delta": value,
+                                    "data": {**(row.additional_data or {}), **payload}})
+            if updates:
+                conn.execute(
+                    update(table).where(table.c.id == bindparam("row_id")).values(
+                        metric_value=table.c.metric_value + bindparam("delta"),
+                        additional_data=bindparam("data", type_=table.c.additional_data.type),
+                    ),
+                    updates,
+                )
+            if inserts:
+                conn.execute(insert(table), inserts)
+
+# Analytics counters are written behind the request, a batch every few seconds
+# (one buffer per app, see create_app)
+ANALYTICS_LOCK_KEY = 0x44544641  # "DTFA"
+
 def track_analytics(metric_name, value, category=None, additional_data=None):
-    """Track business analytics"""
-    today = datetime.now().date()
-    
-    # Check if metric already exists for today
-    existing = BusinessAnalytics.query.filter_by(
-        date=today,
-        metric_name=metric_name,
-        category=category
-    ).first()
-    
-    if existing:
-        existing.metric_value += value
-        if additional_data:
-            if existing.additional_data:
-                existing.additional_data.update(additional_data)
-            else:
-                existing.additional_data = additional_data
-    else:
-        analytics = BusinessAnalytics(
-            date=today,
-            metric_name=metric_name,
-            metric_value=value,
-            category=category,
-            additional_data=additional_data or {}
-        )
-        db.session.add(analytics)
-    
-    db.session.commit()
+    """Track business analytics (buffered; written by the next flush)"""
+    current_app.extensions['analytics_buffer'].add(
+        (datetime.now().date(), metric_name, category), value, additional_data)
+
+# ========== QUOTE RESULT CACHE ==========
+
+QUOTE_CACHE = QuoteResultCache(
+    maxsize=int(os.environ.get('QUOTE_CACHE_SIZE', 2048)),
+    ttl=float(os.environ.get('QUOTE_CACHE_TTL', 300)),
+)
+
+# Every form field calculate_area_pricing reads, with the type it parses it as
+AREA_QUOTE_FIELDS = (
+    ('category', str), ('customer_type', str), ('media_name', str),
+    ('width_in', float), ('height_in', float), ('qty', int), ('sides', int),
+    ('coverage', str), ('hem_opt', str), ('grommets', int),
+    ('laminate_name', str), ('laminate', str), ('lam', str), ('protective_laminate', str),
+    ('labor_minutes', int), ('setup_fee_on', str), ('rush', str),
+    ('width', float), ('height', float), ('quantity', int),
+    ('vinyl_material', str), ('cut_type', str), ('cut', str),
+)
+
+YARD_SIGN_QUOTE_FIELDS = (('per_unit_sku', str), ('qty', int), ('add_stakes', str))
+
+APPAREL_LINE_FIELDS = (('garment', str), ('size', str), ('qty', int), ('extras', int))
 
+def _apparel_quote_key(form_data):
+    """Rush flag plus every items-N-* line, in the order calculate_apparel walks them"""
+    lines = []
+    i = 0
+    while f'items-{i}-garment' in form_data:
+        line = {field: form_data.get(f'items-{i}-{field}', '') for field, _ in APPAREL_LINE_FIELDS}
+        lines.append(normalize_fields(line, APPAREL_LINE_FIELDS))
+        i += 1
+    return (form_data.get('rush'), tuple(lines))
+
+def cached_quote(key_fn):
+    """
+    Memoize a form_data -> result pricing function in QUOTE_CACHE.
+
+    The key also carries the settings and catalog versions, so an admin edit
+    to either makes every older entry unreachable. The wrapped function is
+    still available as .uncached.
+    """
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(form_data):
+            key = (fn.__name__, get_cache_version('settings'), get_cache_version('catalog'), key_fn(form_data))
+            return QUOTE_CACHE.get_or_compute(key, lambda: fn(form_data))
+        wrapper.uncached = fn
+        return wrapper
+    return decorator
+
+@cached_quote(lambda form_data: normalize_fields(form_data, AREA_QUOTE_FIELDS))
 def calculate_area_pricing(form_data):
     """Calculate pricing for area-based products (Wide Format, Stickers)"""
     try:
@@ -657,49 +970,10 @@ def calculate_area_pricing(form_data):
             }
         elif category == 'Banner':
             # SIMPLE BANNER PRICING - Canton, OH strategy
-            width_ft = width_in / 12
-            height_ft = height_in / 12
-            area_sqft = width_ft * height_ft
             rush = form_data.get('rush', 'Standard') == 'Rush'
-            
-            # Add waste buffer
-            if area_sqft <= 15:
-                billable_area = area_sqft + 1.0
-            elif area_sqft <= 30:
-                billable_area = area_sqft + 1.5
-            else:
-                billable_area = area_sqft + 2.0
-            
-            # Get quantity rate
-            if qty >= 100:
-                rate = 4.15
-            elif qty >= 50:
-                rate = 4.30
-            elif qty >= 25:
-                rate = 4.50
-            elif qty >= 10:
-                rate = 4.85
-            elif qty >= 5:
-                rate = 5.25
-            else:
-                rate = 5.75
-            
-            # Calculate base price
-            unit_price = billable_area * rate
-            
-            # Material addon
-            if form_data.get('media_name') == 'jetflex':
-                unit_price += billable_area * 0.25  # +$0.25/sqft for JetFlex
-            
-            # Double-sided
-            if sides == 2:
-                unit_price *= 1.8
-            
-            # Rush
-            if rush:
-                unit_price *= 1.25
-            
-            retail_unit_price = unit_price  # keep retail math intact for Customer Quote
+            retail_unit_price = calculator_banner_unit_price(
+                width_in, height_in, qty, form_data.get('media_name'), sides, rush
+            )
 
             # --- Employee true cost (no waste, no job min) ---
             area_sqft = (width_in/12.0) * (height_in/12.0)  # or width_ft*height_ft if you already have feet
@@ -745,6 +1019,7 @@ def calculate_area_pricing(form_data):
     except Exception as e:
         raise ValueError(f"Calculation error: {str(e)}")
 
+@cached_quote(lambda form_data: normalize_fields(form_data, YARD_SIGN_QUOTE_FIELDS))
 def calculate_yard_signs(form_data):
     """Calculate pricing for yard signs"""
     try:
@@ -806,6 +1081,7 @@ def get_apparel_tier_price(garment_name, qty):
     else:
         return apparel_item.tier_1_5
 
+@cached_quote(_apparel_quote_key)
 def calculate_apparel(form_data):
     """Calculate pricing for apparel"""
     try:
@@ -901,62 +1177,95 @@ def calculate_apparel(form_data):
     except Exception as e:
         raise ValueError(f"Apparel calculation error: {str(e)}")
 
-@app.route('/', methods=['GET', 'POST'])
+# Categories on the customer calculator
+CUSTOMER_CATEGORIES = ['Apparel', 'Banner', 'Decals', 'Poster', 'Yard Signs']
+
+def retail_quote_form(category, fields):
+    """
+    Customer calculator fields as the pricing functions take them (retail
+    customer type, default labor and setup fee), or None while a field the
+    category needs is still empty.
+    """
+    form_data = dict(fields)
+    # Force customer type to retail for all customer quotes
+    form_data['customer_type'] = 'retail'
+    
+    if category in ['Banner', 'Decals', 'Poster']:
+        if not form_data.get('media_name'):
+            return None
+    elif category == 'Apparel':
+        if not any(key.startswith('items-') and key.endswith('-garment') for key in form_data):
+            return None
+    elif category == 'Yard Signs':
+        if not form_data.get('per_unit_sku'):
+            return None
+    
+    # Set defaults for area-based categories
+    if category in ['Banner', 'Decals']:
+        form_data.setdefault('labor_minutes', '30')
+        form_data.setdefault('setup_fee_on', 'Yes')
+    return form_data
+
+def numeric_fields_parse(category, form_data):
+    """
+    True if every numeric field the category's pricing reads is either absent
+    or parses the way the pricing code parses it ("" and "abc" do not).
+    """
+    if category in ['Banner', 'Decals', 'Poster']:
+        specs = [(field, kind) for field, kind in AREA_QUOTE_FIELDS if kind is not str]
+    elif category == 'Yard Signs':
+        specs = [(field, kind) for field, kind in YARD_SIGN_QUOTE_FIELDS if kind is not str]
+    else:
+        specs = [(key, kind) for key in form_data if key.startswith('items-')
+                 for field, kind in APPAREL_LINE_FIELDS if kind is not str and key.endswith(f'-{field}')]
+    for field, kind in specs:
+        if field in form_data:
+            try:
+                kind(form_data[field])
+            except (TypeError, ValueError):
+                return False
+    return True
+
+def price_retail_quote(category, form_data):
+    """Price a retail_quote_form() with the category's pricing function"""
+    if category in ['Banner', 'Decals', 'Poster']:
+        return calculate_area_pricing(form_data)
+    elif category == 'Yard Signs':
+        return calculate_yard_signs(form_data)
+    elif category == 'Apparel':
+        return calculate_apparel(form_data)
+    raise ValueError(f"Unknown category: {category}")
+
+@routes.route('/', methods=['GET', 'POST'])
 def customer():
     """Customer-facing comprehensive quote interface"""
     error = None
     result = None
     
     # Get available categories
-    categories = ['Apparel', 'Banner', 'Decals', 'Poster', 'Yard Signs']
+    categories = CUSTOMER_CATEGORIES
     selected_category = request.form.get('category', categories[0])
+    catalog = CATALOG.current()
     
     # Get media names from database based on category
     if selected_category == 'Banner':
         # Simple banner materials
         material_options = [('alpha', 'ALPHA Premium Matte Frontlit Banner 13oz'), ('jetflex', 'JetFlex® FL Gloss White 13oz')]
         media_names = ['alpha', 'jetflex']
-    elif selected_category == 'Decals':
-        # Decals category shows all vinyl materials (cast_vinyl + vinyl + decal)
-        materials = Material.query.filter(
-            Material.material_type.in_(['cast_vinyl', 'vinyl', 'decal']),
-            Material.active == True
-        ).all()
-        media_names = [material.name for material in materials]
-        material_options = [(material.name, material.cost_per_sqft) for material in materials]
-    elif selected_category == 'Poster':
-        materials = Material.query.filter_by(material_type='poster', active=True).all()
-        media_names = [material.name for material in materials]
-        material_options = [(material.name, material.cost_per_sqft) for material in materials]
     else:
-        materials = Material.query.filter_by(material_type='banner', active=True).all()  # Default to banner
-        media_names = [material.name for material in materials]
-        material_options = [(material.name, material.cost_per_sqft) for material in materials]
-    
-    # Get all material types for dropdown selection
-    all_materials = Material.query.filter_by(active=True).all()
-    material_types = {}
-    for material in all_materials:
-        if material.material_type not in material_types:
-            material_types[material.material_type] = []
-        material_types[material.material_type].append(material.name)
-    
-    # Get laminate options from database (both types)
-    vinyl_laminates = Material.query.filter_by(material_type='vinyl_laminate', active=True).all()
-    cast_laminates = Material.query.filter_by(material_type='cast_laminate', active=True).all()
-    laminate_options = [lam.name for lam in vinyl_laminates + cast_laminates]
-    # Create laminate options with pricing for dropdown
-    laminate_options_with_pricing = [(lam.name, lam.cost_per_sqft) for lam in vinyl_laminates + cast_laminates]
+        # Decals show all vinyl materials (cast_vinyl + vinyl + decal); anything else defaults to banner
+        media_names, material_options = catalog.media(selected_category)
+    
+    # Laminate options (vinyl then cast) with pricing for dropdown
+    laminate_options = catalog.laminate_options
+    laminate_options_with_pricing = catalog.laminate_options_with_pricing
     
     # Get coverage levels
     coverage_levels = ['Light', 'Medium', 'Heavy']
     
-    # Get yard sign items from database
-    yard_items = YardSignItem.query.filter_by(active=True).all()
-    
-    # Get apparel garments from database
-    apparel_items = ApparelItem.query.filter_by(active=True).all()
-    apparel_garments = [item.garment_name for item in apparel_items]
+    # Yard sign items and apparel garments from the catalog
+    yard_items = catalog.yard_items
+    apparel_garments = catalog.apparel_garments
     
     # Size options for apparel
     size_options = ['XS', 'S', 'M', 'L', 'XL', '2XL', '3XL', '4XL', '5XL']
@@ -964,52 +1273,12 @@ def customer():
     form_data = {}
     if request.method == 'POST':
         try:
-            # Force customer type to retail for all customer quotes
             form_data = dict(request.form)
-            form_data['customer_type'] = 'retail'
-            
-            # Check if required fields are filled for each category
-            # If not, just show the form without trying to calculate
-            should_calculate = True
-            
-            if selected_category in ['Banner', 'Decals', 'Poster']:
-                if not form_data.get('media_name'):
-                    should_calculate = False
-            elif selected_category == 'Apparel':
-                # Check if any apparel items were added
-                has_apparel_items = False
-                for key in form_data:
-                    if key.startswith('items-') and key.endswith('-garment'):
-                        has_apparel_items = True
-                        break
-                if not has_apparel_items:
-                    should_calculate = False
-            elif selected_category == 'Yard Signs':
-                if not form_data.get('per_unit_sku'):
-                    should_calculate = False
-            
-            if not should_calculate:
-                # Just show the form without errors
-                pass
-            else:
-                # Set defaults for area-based categories
-                if selected_category in ['Banner', 'Decals']:
-                    if 'labor_minutes' not in form_data:
-                        form_data['labor_minutes'] = '30'
-                    if 'setup_fee_on' not in form_data:
-                        form_data['setup_fee_on'] = 'Yes'
-                
-                # Calculate based on category
-                if selected_category in ['Banner', 'Decals']:
-                    result = calculate_area_pricing(form_data)
-                elif selected_category == 'Poster':
-                    result = calculate_area_pricing(form_data)
-                elif selected_category == 'Yard Signs':
-                    result = calculate_yard_signs(form_data)
-                elif selected_category == 'Apparel':
-                    result = calculate_apparel(form_data)
-                else:
-                    raise ValueError(f"Unknown category: {selected_category}")
+            # Until the fields the category needs are filled, just show the form
+            quote_form = retail_quote_form(selected_category, form_data)
+            if quote_form is not None:
+                form_data = quote_form
+                result = price_retail_quote(selected_category, form_data)
                 
                 # Track analytics for successful quote calculations
                 if result:
@@ -1093,44 +1362,44 @@ def partner_required(f):
     decorated.__name__ = f.__name__
     return decorated
 
-@app.route('/admin/login')
+@routes.route('/admin/login')
 def admin_login():
     """Admin login - DISABLED: redirect directly to admin"""
     return redirect(url_for('admin_home'))
 
-@app.route('/admin/logout')
+@routes.route('/admin/logout')
 def admin_logout():
     """Admin logout"""
     session.pop('admin_authenticated', None)
     flash('Logged out successfully', 'success')
     return redirect(url_for('customer'))
 
-@app.route('/partner/login')
+@routes.route('/partner/login')
 def partner_login():
     """Partner login - DISABLED: redirect directly to partner calculator"""
     return redirect(url_for('partner_calculator'))
 
-@app.route('/partner/logout')
+@routes.route('/partner/logout')
 def partner_logout():
     """Partner logout"""
     session.pop('partner_authenticated', None)
     flash('Logged out successfully', 'success')
     return redirect(url_for('customer'))
 
-@app.route('/admin')
+@routes.route('/admin')
 @admin_required
 def admin_home():
     """Admin home page"""
     return render_template('admin.html')
 
-@app.route('/admin/materials')
+@routes.route('/admin/materials')
 @admin_required
 def admin_materials():
     """Manage materials"""
     materials = Material.query.filter_by(active=True).all()
     return render_template('admin_materials.html', materials=materials)
 
-@app.route('/admin/materials/add', methods=['GET', 'POST'])
+@routes.route('/admin/materials/add', methods=['GET', 'POST'])
 @admin_required
 def admin_add_material():
     """Add new material"""
@@ -1156,6 +1425,7 @@ def admin_add_material():
             )
             
             db.session.add(material)
+            bump_cache_version('catalog')
             db.session.commit()
             flash(f'Material "{name}" added successfully! Cost per sq ft: ${cost_per_sqft:.4f}', 'success')
             return redirect(url_for('admin_materials'))
@@ -1165,7 +1435,7 @@ def admin_add_material():
     
     return render_template('admin_add_material.html')
 
-@app.route('/admin/materials/edit/<int:material_id>', methods=['GET', 'POST'])
+@routes.route('/admin/materials/edit/<int:material_id>', methods=['GET', 'POST'])
 @admin_required
 def admin_edit_material(material_id):
     """Edit existing material"""
@@ -1183,6 +1453,7 @@ def admin_edit_material(material_id):
             total_sqft = (material.width_inches * material.length_feet) / 12
             material.cost_per_sqft = material.total_cost / total_sqft if total_sqft > 0 else 0
             
+            bump_cache_version('catalog')
             db.session.commit()
             flash(f'Material "{material.name}" updated successfully! Cost per sq ft: ${material.cost_per_sqft:.4f}', 'success')
             return redirect(url_for('admin_materials'))
@@ -1192,24 +1463,25 @@ def admin_edit_material(material_id):
     
     return render_template('admin_edit_material.html', material=material)
 
-@app.route('/admin/materials/delete/<int:material_id>')
+@routes.route('/admin/materials/delete/<int:material_id>')
 @admin_required
 def admin_delete_material(material_id):
     """Delete material (mark as inactive)"""
     material = Material.query.get_or_404(material_id)
     material.active = False
+    bump_cache_version('catalog')
     db.session.commit()
     flash(f'Material "{material.name}" deleted successfully', 'success')
     return redirect(url_for('admin_materials'))
 
-@app.route('/admin/settings')
+@routes.route('/admin/settings')
 @admin_required
 def admin_settings():
     """Manage pricing settings"""
     settings = PricingSettings.query.all()
     return render_template('admin_settings.html', settings=settings)
 
-@app.route('/admin/settings/edit/<int:setting_id>', methods=['GET', 'POST'])
+@routes.route('/admin/settings/edit/<int:setting_id>', methods=['GET', 'POST'])
 @admin_required
 def admin_edit_setting(setting_id):
     """Edit pricing setting"""
@@ -1219,6 +1491,7 @@ def admin_edit_setting(setting_id):
         try:
             setting.value = float(request.form['value'])
             setting.description = request.form['description']
+            bump_cache_version('settings')
             
             db.session.commit()
             flash(f'Setting "{setting.setting_name}" updated successfully', 'success')
@@ -1229,14 +1502,14 @@ def admin_edit_setting(setting_id):
     
     return render_template('admin_edit_setting.html', setting=setting)
 
-@app.route('/admin/apparel')
+@routes.route('/admin/apparel')
 @admin_required
 def admin_apparel():
     """Manage apparel items"""
     apparel_items = ApparelItem.query.filter_by(active=True).all()
     return render_template('admin_apparel.html', apparel_items=apparel_items)
 
-@app.route('/admin/apparel/add', methods=['GET', 'POST'])
+@routes.route('/admin/apparel/add', methods=['GET', 'POST'])
 @admin_required
 def admin_add_apparel():
     """Add new apparel item"""
@@ -1253,6 +1526,7 @@ def admin_add_apparel():
             )
             
             db.session.add(apparel)
+            bump_cache_version('catalog')
             db.session.commit()
             flash(f'Apparel item "{apparel.garment_name}" added successfully', 'success')
             return redirect(url_for('admin_apparel'))
@@ -1262,14 +1536,14 @@ def admin_add_apparel():
     
     return render_template('admin_add_apparel.html')
 
-@app.route('/admin/yard-signs')
+@routes.route('/admin/yard-signs')
 @admin_required
 def admin_yard_signs():
     """Manage yard sign items"""
     yard_signs = YardSignItem.query.filter_by(active=True).all()
     return render_template('admin_yard_signs.html', yard_signs=yard_signs)
 
-@app.route('/admin/yard-signs/add', methods=['GET', 'POST'])
+@routes.route('/admin/yard-signs/add', methods=['GET', 'POST'])
 @admin_required
 def admin_add_yard_sign():
     """Add new yard sign item"""
@@ -1285,6 +1559,7 @@ def admin_add_yard_sign():
             )
             
             db.session.add(yard_sign)
+            bump_cache_version('catalog')
             db.session.commit()
             flash(f'Yard sign "{yard_sign.name}" added successfully', 'success')
             return redirect(url_for('admin_yard_signs'))
@@ -1294,27 +1569,69 @@ def admin_add_yard_sign():
     
     return render_template('admin_add_yard_sign.html')
 
-@app.route('/admin/partner-categories')
+@routes.route('/admin/partner-categories')
 @admin_required
 def admin_partner_categories():
     """Manage partner category settings"""
     categories = PartnerCategorySettings.query.all()
     return render_template('admin_partner_categories.html', categories=categories)
 
-@app.route('/admin/partner-categories/toggle/<int:category_id>')
+@routes.route('/admin/partner-categories/toggle/<int:category_id>')
 @admin_required
 def admin_toggle_partner_category(category_id):
     """Toggle partner category enabled/disabled"""
     category = PartnerCategorySettings.query.get_or_404(category_id)
     category.enabled_for_partners = not category.enabled_for_partners
+    bump_cache_version('catalog')
     db.session.commit()
     
     status = "enabled" if category.enabled_for_partners else "disabled"
     flash(f'Category "{category.category_name}" {status} for partners', 'success')
     return redirect(url_for('admin_partner_categories'))
 
+@routes.route('/admin/quote-cache/stats')
+@admin_required
+def admin_quote_cache_stats():
+    """Quote result cache hit/miss/eviction counters for this worker"""
+    return jsonify(QUOTE_CACHE.stats())
+
+@routes.route('/admin/fragment-cache/stats')
+@admin_required
+def admin_fragment_cache_stats():
+    """Calculator page fragment cache hit/miss/eviction counters for this worker"""
+    return jsonify(current_app.extensions['fragment_cache'].stats())
+
 # Advanced Business Management Routes
-@app.route('/admin/quotes')
+# Admin list sort options: name -> (keyset sort column, descending). Each column is indexed.
+QUOTE_SORTS = {
+    'newest': (Quote.created_at, True),
+    'oldest': (Quote.created_at, False),
+    'price_high': (Quote.calculated_price, True),
+    'price_low': (Quote.calculated_price, False),
+}
+ORDER_SORTS = {
+    'newest': (Order.created_at, True),
+    'oldest': (Order.created_at, False),
+    'amount_high': (Order.total_amount, True),
+    'amount_low': (Order.total_amount, False),
+}
+
+# Indexed, ranked search for the admin lists (indexes installed by migration 5)
+ADMIN_SEARCH = admin_search.for_tables(db.metadata.tables)
+
+STATUS_SUMMARY = status_summary.for_tables(
+    db.metadata.tables, ttl=float(os.environ.get('STATUS_SUMMARY_TTL', 30))
+)
+
+def get_status_summary():
+    """Quote/order summary cards (cached; invalidated by the admin status routes)"""
+    return STATUS_SUMMARY.current(db.session.connection(), get_cache_version('status_summary'))
+
+def _list_args():
+    """Current list query string minus the cursor, for building page links"""
+    return {key: value for key, value in request.args.items() if key != 'cursor'}
+
+@routes.route('/admin/quotes')
 @admin_required
 def admin_quotes():
     """Admin interface for viewing and managing quotes"""
@@ -1322,57 +1639,62 @@ def admin_quotes():
     status_filter = request.args.get('status', 'all')
     category_filter = request.args.get('category', 'all')
     search_query = request.args.get('search', '')
+    sort = request.args.get('sort', 'newest')
+    if sort not in QUOTE_SORTS:
+        sort = 'newest'
     
-    # Build query
-    query = Quote.query
-    
+    criteria = []
     if status_filter != 'all':
-        query = query.filter(Quote.status == status_filter)
-    
+        criteria.append(Quote.status == status_filter)
     if category_filter != 'all':
-        query = query.filter(Quote.category == category_filter)
+        criteria.append(Quote.category == category_filter)
     
-    if search_query:
-        query = query.join(Customer).filter(
-            db.or_(
-                Quote.quote_number.contains(search_query),
-                Customer.name.contains(search_query),
-                Customer.email.contains(search_query),
-                Customer.company.contains(search_query)
-            )
-        )
+    # Build query (customer and order loaded with the page, not per row in the template)
+    query = Quote.query.join(Quote.customer).options(
+        contains_eager(Quote.customer), selectinload(Quote.order)
+    ).filter(*criteria)
+    cursor = request.args.get('cursor')
+    page_size = page_size_arg(request.args.get('per_page'))
+    search_capped = False
     
-    # Order by newest first
-    quotes = query.order_by(Quote.created_at.desc()).all()
+    if search_query:
+        # Best matches first (quote number, then customer name/email/company)
+        ids, search_capped = ADMIN_SEARCH.ranked_ids(db.session.connection(), 'quote', search_query, criteria)
+        page = paginate_ranked(ids, lambda page_ids: query.filter(Quote.id.in_(page_ids)).all(), cursor, page_size)
+        sort = 'relevance'
+    else:
+        # One keyset page in the chosen order
+        sort_column, descending = QUOTE_SORTS[sort]
+        page = paginate(query, sort_column, Quote.id, descending, cursor=cursor, page_size=page_size)
     
     # Get summary statistics
-    total_quotes = Quote.query.count()
-    pending_quotes = Quote.query.filter_by(status='pending').count()
-    approved_quotes = Quote.query.filter_by(status='approved').count()
-    converted_quotes = Quote.query.filter_by(status='converted').count()
-    
-    # Calculate total pending value
-    pending_value = db.session.query(db.func.sum(Quote.calculated_price)).filter_by(status='pending').scalar() or 0
+    quotes = get_status_summary().quotes
     
     return render_template('admin_quotes.html', 
-                         quotes=quotes,
+                         quotes=page.items,
+                         page=page,
+                         list_args=_list_args(),
+                         sort=sort,
+                         search_capped=search_capped,
+                         search_limit=admin_search.SEARCH_MAX_RESULTS,
+                         now=datetime.now(),
                          status_filter=status_filter,
                          category_filter=category_filter,
                          search_query=search_query,
-                         total_quotes=total_quotes,
-                         pending_quotes=pending_quotes,
-                         approved_quotes=approved_quotes,
-                         converted_quotes=converted_quotes,
-                         pending_value=pending_value)
+                         total_quotes=quotes.count(),
+                         pending_quotes=quotes.count('pending'),
+                         approved_quotes=quotes.count('approved'),
+                         converted_quotes=quotes.count('converted'),
+                         pending_value=quotes.value('pending'))
 
-@app.route('/admin/quote/<quote_number>')
+@routes.route('/admin/quote/<quote_number>')
 @admin_required
 def admin_quote_detail(quote_number):
     """View detailed quote information"""
     quote = Quote.query.filter_by(quote_number=quote_number).first_or_404()
     return render_template('admin_quote_detail.html', quote=quote)
 
-@app.route('/admin/quote/<quote_number>/update_status', methods=['POST'])
+@routes.route('/admin/quote/<quote_number>/update_status', methods=['POST'])
 @admin_required
 def admin_update_quote_status(quote_number):
     """Update quote status"""
@@ -1393,6 +1715,7 @@ def admin_update_quote_status(quote_number):
         quote.notes = admin_notes
     quote.admin_adjustments = price_adjustment
     quote.final_price = quote.calculated_price + price_adjustment
+    bump_cache_version('status_summary')
     
     db.session.commit()
     
@@ -1406,7 +1729,7 @@ def admin_update_quote_status(quote_number):
     flash(f'Quote {quote_number} updated successfully!', 'success')
     return redirect(url_for('admin_quote_detail', quote_number=quote_number))
 
-@app.route('/admin/quote/<quote_number>/convert_to_order', methods=['POST'])
+@routes.route('/admin/quote/<quote_number>/convert_to_order', methods=['POST'])
 @admin_required
 def admin_convert_to_order(quote_number):
     """Convert quote to order"""
@@ -1449,9 +1772,13 @@ def admin_convert_to_order(quote_number):
     # Update quote status
     quote.status = 'converted'
     
-    # Update customer stats
-    quote.customer.total_orders += 1
-    quote.customer.total_spent += order.total_amount
+    # Update customer stats in SQL, so concurrent conversions can't lose an increment
+    db.session.execute(
+        update(Customer).where(Customer.id == quote.customer_id)
+        .values(CUSTOMER_TOTALS.increments(order.total_amount))
+        .execution_options(synchronize_session=False)
+    )
+    bump_cache_version('status_summary')
     
     db.session.commit()
     
@@ -1465,7 +1792,7 @@ def admin_convert_to_order(quote_number):
     flash(f'Quote {quote_number} converted to Order {order_number}!', 'success')
     return redirect(url_for('admin_order_detail', order_number=order_number))
 
-@app.route('/admin/orders')
+@routes.route('/admin/orders')
 @admin_required  
 def admin_orders():
     """Admin interface for viewing and managing orders"""
@@ -1473,58 +1800,63 @@ def admin_orders():
     status_filter = request.args.get('status', 'all')
     priority_filter = request.args.get('priority', 'all')
     search_query = request.args.get('search', '')
+    sort = request.args.get('sort', 'newest')
+    if sort not in ORDER_SORTS:
+        sort = 'newest'
     
-    # Build query
-    query = Order.query
-    
+    criteria = []
     if status_filter != 'all':
-        query = query.filter(Order.status == status_filter)
-    
+        criteria.append(Order.status == status_filter)
     if priority_filter != 'all':
-        query = query.filter(Order.priority == priority_filter)
+        criteria.append(Order.priority == priority_filter)
     
-    if search_query:
-        query = query.join(Customer).filter(
-            db.or_(
-                Order.order_number.contains(search_query),
-                Customer.name.contains(search_query),
-                Customer.email.contains(search_query)
-            )
-        )
+    # Build query (customer and quote loaded with the page, not per row in the template)
+    query = Order.query.join(Order.customer).options(
+        contains_eager(Order.customer), joinedload(Order.quote)
+    ).filter(*criteria)
+    cursor = request.args.get('cursor')
+    page_size = page_size_arg(request.args.get('per_page'))
+    search_capped = False
     
-    # Order by newest first
-    orders = query.order_by(Order.created_at.desc()).all()
+    if search_query:
+        # Best matches first (order number, then customer name/email/company)
+        ids, search_capped = ADMIN_SEARCH.ranked_ids(db.session.connection(), 'order', search_query, criteria)
+        page = paginate_ranked(ids, lambda page_ids: query.filter(Order.id.in_(page_ids)).all(), cursor, page_size)
+        sort = 'relevance'
+    else:
+        # One keyset page in the chosen order
+        sort_column, descending = ORDER_SORTS[sort]
+        page = paginate(query, sort_column, Order.id, descending, cursor=cursor, page_size=page_size)
     
     # Get summary statistics
-    total_orders = Order.query.count()
-    confirmed_orders = Order.query.filter_by(status='confirmed').count()
-    in_production = Order.query.filter_by(status='in_production').count()
-    ready_orders = Order.query.filter_by(status='ready').count()
-    completed_orders = Order.query.filter_by(status='completed').count()
-    
-    # Calculate total order value
-    total_value = db.session.query(db.func.sum(Order.total_amount)).scalar() or 0
+    orders = get_status_summary().orders
     
     return render_template('admin_orders.html',
-                         orders=orders,
+                         orders=page.items,
+                         page=page,
+                         list_args=_list_args(),
+                         sort=sort,
+                         search_capped=search_capped,
+                         search_limit=admin_search.SEARCH_MAX_RESULTS,
+                         now=datetime.now(),
                          status_filter=status_filter,
                          priority_filter=priority_filter,
                          search_query=search_query,
-                         total_orders=total_orders,
-                         confirmed_orders=confirmed_orders,
-                         in_production=in_production,
-                         ready_orders=ready_orders,
-                         completed_orders=completed_orders,
-                         total_value=total_value)
-
-@app.route('/admin/order/<order_number>')
+                         total_orders=orders.count(),
+                         confirmed_orders=orders.count('confirmed'),
+                         in_production=orders.count('in_production'),
+                         ready_orders=orders.count('ready'),
+                         completed_orders=orders.count('completed'),
+                         total_value=orders.value())
+
+@routes.route('/admin/order/<order_number>')
 @admin_required
 def admin_order_detail(order_number):
     """View detailed order information"""
     order = Order.query.filter_by(order_number=order_number).first_or_404()
     return render_template('admin_order_detail.html', order=order)
 
-@app.route('/admin/order/<order_number>/update_status', methods=['POST'])
+@routes.route('/admin/order/<order_number>/update_status', methods=['POST'])
 @admin_required
 def admin_update_order_status(order_number):
     """Update order status"""
@@ -1555,6 +1887,7 @@ def admin_update_order_status(order_number):
     # Set completion date if status is completed
     if new_status == 'completed' and not order.completed_at:
         order.completed_at = datetime.now()
+    bump_cache_version('status_summary')
     
     db.session.commit()
     
@@ -1567,7 +1900,7 @@ def admin_update_order_status(order_number):
     flash(f'Order {order_number} updated successfully!', 'success')
     return redirect(url_for('admin_order_detail', order_number=order_number))
 
-@app.route('/partner', methods=['GET', 'POST'])
+@routes.route('/partner', methods=['GET', 'POST'])
 @partner_required
 def partner_calculator():
     """Partner calculator with wholesale pricing (20% discount)"""
@@ -1575,8 +1908,8 @@ def partner_calculator():
     result = None
     
     # Get available categories (filtered for partners)
-    partner_settings = PartnerCategorySettings.query.filter_by(enabled_for_partners=True).all()
-    categories = [setting.category_name for setting in partner_settings]
+    catalog = CATALOG.current()
+    categories = list(catalog.partner_categories)
     
     # Fallback to all categories if none enabled
     if not categories:
@@ -1589,48 +1922,24 @@ def partner_calculator():
         # Simple banner materials
         material_options = [('alpha', 'ALPHA Premium Matte Frontlit Banner 13oz'), ('jetflex', 'JetFlex® FL Gloss White 13oz')]
         media_names = ['alpha', 'jetflex']
-    elif selected_category == 'Decals':
-        # Decals category shows all vinyl materials (cast_vinyl + vinyl + decal)
-        materials = Material.query.filter(
-            Material.material_type.in_(['cast_vinyl', 'vinyl', 'decal']),
-            Material.active == True
-        ).all()
-        media_names = [material.name for material in materials]
-        material_options = [(material.name, material.cost_per_sqft) for material in materials]
-    elif selected_category == 'Poster':
-        materials = Material.query.filter_by(material_type='poster', active=True).all()
-        media_names = [material.name for material in materials]
-        material_options = [(material.name, material.cost_per_sqft) for material in materials]
     else:
-        materials = Material.query.filter_by(material_type='banner', active=True).all()  # Default to banner
-        media_names = [material.name for material in materials]
-        material_options = [(material.name, material.cost_per_sqft) for material in materials]
-    
-    # Get all material types for dropdown selection
-    all_materials = Material.query.filter_by(active=True).all()
-    material_types = {}
-    for material in all_materials:
-        if material.material_type not in material_types:
-            material_types[material.material_type] = []
-        material_types[material.material_type].append(material.name)
-    
-    # Get laminate options from database (both types)
-    vinyl_laminates = Material.query.filter_by(material_type='vinyl_laminate', active=True).all()
-    cast_laminates = Material.query.filter_by(material_type='cast_laminate', active=True).all()
-    laminate_options = [lam.name for lam in vinyl_laminates + cast_laminates]
-    # Create laminate options with pricing for dropdown
-    laminate_options_with_pricing = [(lam.name, lam.cost_per_sqft) for lam in vinyl_laminates + cast_laminates]
+        # Decals show all vinyl materials (cast_vinyl + vinyl + decal); anything else defaults to banner
+        media_names, material_options = catalog.media(selected_category)
+    
+    # Laminate options (vinyl then cast) with pricing for dropdown
+    laminate_options = catalog.laminate_options
+    laminate_options_with_pricing = catalog.laminate_options_with_pricing
     
     # Get coverage levels
     coverage_levels = ['Light', 'Medium', 'Heavy']
     
     # Get apparel garments
-    apparel_items = ApparelItem.query.filter_by(active=True).all()
-    apparel_garments = [item.garment_name for item in apparel_items]
+    apparel_items = catalog.apparel_items
+    apparel_garments = catalog.apparel_garments
     size_options = ['XS', 'S', 'M', 'L', 'XL', 'XXL', 'XXXL']
     
     # Get yard sign items
-    yard_items = YardSignItem.query.filter_by(active=True).all()
+    yard_items = catalog.yard_items
     
     if request.method == 'POST':
         try:
@@ -1708,227 +2017,33 @@ def partner_calculator():
                          size_options=size_options,
                          form_data=request.form if request.method == 'POST' else {})
 
-# Initialize services
-pdf_generator = PDFQuoteGenerator()
+# Services (the PDF generator and upload handler are built on first use)
 analytics_service = AnalyticsService(db)
-file_handler = FileUploadHandler()
+get_file_handler = lazy_service(FileUploadHandler)
+
+@lazy_service
+def get_pdf_generator():
+    from pdf_generator import PDFQuoteGenerator  # reportlab and Pillow, only for quote PDFs
+    return PDFQuoteGenerator()
 
 # ========================
 # ANALYTICS DASHBOARD ROUTES
 # ========================
 
-@app.route('/admin/analytics')
+@routes.route('/admin/analytics')
 def admin_analytics():
     """Show comprehensive analytics dashboard with REAL data"""
     try:
-        # Get REAL stats from database
-        total_quotes = Quote.query.count()
-        total_orders = Order.query.count() 
-        total_customers = Customer.query.count()
-        
-        # This month stats
-        from datetime import datetime, timedelta
-        today = datetime.now().date()
-        this_month_start = today.replace(day=1)
-        this_month_quotes = Quote.query.filter(Quote.created_at >= this_month_start).count()
-        this_month_orders = Order.query.filter(Order.created_at >= this_month_start).count()
-        
-        # Revenue calculations - REAL data
-        all_quotes = Quote.query.all()
-        total_revenue = 0
-        this_month_revenue = 0
-        approved_count = 0
-        
-        for quote in all_quotes:
-            price = quote.final_price or quote.calculated_price or 0
-            if quote.status == 'approved':
-                total_revenue += price
-                approved_count += 1
-            if quote.created_at.date() >= this_month_start and quote.status == 'approved':
-                this_month_revenue += price
-        
-        # Conversion rate and averages
-        conversion_rate = (approved_count / total_quotes * 100) if total_quotes > 0 else 0
-        avg_order_value = total_revenue / approved_count if approved_count > 0 else 0
-        
-        stats = {
-            'total_quotes': total_quotes,
-            'total_orders': total_orders,
-            'total_customers': total_customers,
-            'this_month_quotes': this_month_quotes,
-            'this_month_orders': this_month_orders,
-            'total_revenue': round(total_revenue, 2),
-            'this_month_revenue': round(this_month_revenue, 2),
-            'conversion_rate': round(conversion_rate, 1),
-            'avg_order_value': round(avg_order_value, 2)
-        }
-        
-        # Real daily stats (last 7 days)
-        daily_quotes = []
-        daily_orders = []
-        daily_revenue = []
-        
-        for i in range(7):
-            day = today - timedelta(days=6-i)
-            day_quotes = Quote.query.filter(Quote.created_at.date() == day).count()
-            day_orders = Order.query.filter(Order.created_at.date() == day).count()
-            day_rev = sum((q.final_price or q.calculated_price or 0) 
-                         for q in Quote.query.filter(Quote.created_at.date() == day, Quote.status == 'approved').all())
-            
-            daily_quotes.append((day.strftime('%Y-%m-%d'), day_quotes))
-            daily_orders.append((day.strftime('%Y-%m-%d'), day_orders))
-            daily_revenue.append((day.strftime('%Y-%m-%d'), round(day_rev, 2)))
-        
-        daily_stats = {
-            'quotes': daily_quotes,
-            'orders': daily_orders,
-            'revenue': daily_revenue
-        }
-        
-        # Real category breakdown
-        categories = ['Banner', 'Apparel', 'Decals', 'Yard Signs', 'Other']
-        category_counts = []
-        category_values = []
-        
-        for cat in categories:
-            cat_quotes = Quote.query.filter(Quote.category == cat).all()
-            count = len(cat_quotes)
-            value = sum((q.final_price or q.calculated_price or 0) for q in cat_quotes if q.status == 'approved')
-            category_counts.append(count)
-            category_values.append(round(value, 2))
-        
-        category_breakdown = {
-            'categories': categories,
-            'counts': category_counts,
-            'values': category_values
-        }
-        
-        # Real customer insights
-        customers = Customer.query.all()
-        top_customers = []
-        
-        for customer in customers:
-            customer_quotes = Quote.query.filter_by(customer_id=customer.id).all()
-            total_spent = sum((q.final_price or q.calculated_price or 0) 
-                            for q in customer_quotes if q.status == 'approved')
-            if total_spent > 0:  # Only show customers who have spent money
-                top_customers.append({
-                    'name': customer.name,
-                    'email': customer.email,
-                    'total_spent': round(total_spent, 2),
-                    'quote_count': len(customer_quotes)
-                })
-        
-        # Sort by total spent and take top 5
-        top_customers.sort(key=lambda x: x['total_spent'], reverse=True)
-        top_customers = top_customers[:5]
-        
-        customer_insights = {
-            'top_customers': top_customers,
-            'customer_types': {'retail': total_customers}
-        }
-        
-        # Real quote status breakdown
-        quote_status = {
-            'pending': Quote.query.filter_by(status='pending').count(),
-            'approved': Quote.query.filter_by(status='approved').count(),
-            'declined': Quote.query.filter_by(status='declined').count(),
-            'converted': Quote.query.filter_by(status='converted').count()
-        }
-        
-        # Monthly trends (last 6 months)
-        months = []
-        quote_counts = []
-        revenues = []
-        
-        for i in range(6):
-            month_date = today.replace(day=1) - timedelta(days=32*i)
-            month_start = month_date.replace(day=1)
-            next_month = (month_start + timedelta(days=32)).replace(day=1)
-            
-            month_quotes = Quote.query.filter(
-                Quote.created_at >= month_start,
-                Quote.created_at < next_month
-            ).count()
-            
-            month_revenue = sum((q.final_price or q.calculated_price or 0) 
-                              for q in Quote.query.filter(
-                                  Quote.created_at >= month_start,
-                                  Quote.created_at < next_month,
-                                  Quote.status == 'approved'
-                              ).all())
-            
-            months.insert(0, month_start.strftime('%Y-%m'))
-            quote_counts.insert(0, month_quotes)
-            revenues.insert(0, round(month_revenue, 2))
-        
-        trends = {
-            'months': months,
-            'quote_counts': quote_counts,
-            'revenues': revenues
-        }
-        
-        return render_template('admin_analytics.html',
-                             stats=stats,
-                             daily_stats=daily_stats,
-                             category_breakdown=category_breakdown,
-                             customer_insights=customer_insights,
-                             quote_status=quote_status,
-                             trends=trends)
-        
+        dashboard = analytics_service.get_admin_dashboard()
     except Exception as e:
         # Fallback to zeros if there's any error
-        stats = {
-            'total_quotes': 0,
-            'total_orders': 0,
-            'total_customers': 0,
-            'this_month_quotes': 0,
-            'this_month_orders': 0,
-            'total_revenue': 0.0,
-            'this_month_revenue': 0.0,
-            'conversion_rate': 0.0,
-            'avg_order_value': 0.0
-        }
-        
-        daily_stats = {
-            'quotes': [(today.strftime('%Y-%m-%d'), 0) for i in range(7)],
-            'orders': [(today.strftime('%Y-%m-%d'), 0) for i in range(7)],
-            'revenue': [(today.strftime('%Y-%m-%d'), 0.0) for i in range(7)]
-        }
-        
-        category_breakdown = {
-            'categories': ['Banner', 'Apparel', 'Decals', 'Yard Signs'],
-            'counts': [0, 0, 0, 0],
-            'values': [0.0, 0.0, 0.0, 0.0]
-        }
-        
-        customer_insights = {
-            'top_customers': [],
-            'customer_types': {'retail': 0}
-        }
-        
-        quote_status = {
-            'pending': 0,
-            'approved': 0,
-            'declined': 0,
-            'converted': 0
-        }
-        
-        trends = {
-            'months': [],
-            'quote_counts': [],
-            'revenues': []
-        }
-        
-        return render_template('admin_analytics.html',
-                             stats=stats,
-                             daily_stats=daily_stats,
-                             category_breakdown=category_breakdown,
-                             customer_insights=customer_insights,
-                             quote_status=quote_status,
-                             trends=trends)
+        logging.error(f"Error computing admin analytics: {str(e)}")
+        db.session.rollback()
+        dashboard = analytics_service.empty_admin_dashboard()
+    
+    return render_template('admin_analytics.html', **dashboard)
 
-@app.route('/api/analytics/daily')
+@routes.route('/api/analytics/daily')
 def api_daily_analytics():
     """API endpoint for real-time daily analytics"""
     try:
@@ -1942,7 +2057,7 @@ def api_daily_analytics():
 # PDF GENERATION ROUTES
 # ========================
 
-@app.route('/admin/quote/<quote_number>/pdf')
+@routes.route('/admin/quote/<quote_number>/pdf')
 def generate_quote_pdf(quote_number):
     """Generate and download PDF for a quote"""
     try:
@@ -1961,7 +2076,7 @@ def generate_quote_pdf(quote_number):
         os.makedirs(os.path.dirname(pdf_path), exist_ok=True)
         
         # Generate PDF
-        success, message = pdf_generator.generate_quote_pdf(quote, customer, pdf_path)
+        success, message = get_pdf_generator().generate_quote_pdf(quote, customer, pdf_path)
         
         if success:
             # Update quote record
@@ -1978,7 +2093,7 @@ def generate_quote_pdf(quote_number):
         flash(f'Error generating PDF: {str(e)}', 'error')
         return redirect(url_for('admin_quote_detail', quote_number=quote_number))
 
-@app.route('/admin/quote/<quote_number>/email-pdf', methods=['POST'])
+@routes.route('/admin/quote/<quote_number>/email-pdf', methods=['POST'])
 def email_quote_pdf(quote_number):
     """Generate PDF and email it to customer"""
     try:
@@ -1997,7 +2112,7 @@ def email_quote_pdf(quote_number):
         os.makedirs(os.path.dirname(pdf_path), exist_ok=True)
         
         # Generate PDF
-        success, message = pdf_generator.generate_quote_pdf(quote, customer, pdf_path)
+        success, message = get_pdf_generator().generate_quote_pdf(quote, customer, pdf_path)
         
         if success:
             # Update quote record
@@ -2021,7 +2136,7 @@ def email_quote_pdf(quote_number):
 # FILE UPLOAD ROUTES
 # ========================
 
-@app.route('/admin/quote/<quote_number>/upload', methods=['POST'])
+@routes.route('/admin/quote/<quote_number>/upload', methods=['POST'])
 def upload_quote_file(quote_number):
     """Upload a file to a quote"""
     try:
@@ -2038,7 +2153,7 @@ def upload_quote_file(quote_number):
         description = request.form.get('description', '')
         
         # Upload file
-        quote_file, message = file_handler.save_quote_file(file, quote.id, description)
+        quote_file, message = get_file_handler().save_quote_file(file, quote.id, description)
         
         if quote_file:
             flash('File uploaded successfully!', 'success')
@@ -2051,7 +2166,7 @@ def upload_quote_file(quote_number):
         flash(f'Error uploading file: {str(e)}', 'error')
         return redirect(url_for('admin_quote_detail', quote_number=quote_number))
 
-@app.route('/admin/file/<int:file_id>/delete', methods=['POST'])
+@routes.route('/admin/file/<int:file_id>/delete', methods=['POST'])
 def delete_quote_file(file_id):
     """Delete a quote file"""
     try:
@@ -2063,7 +2178,7 @@ def delete_quote_file(file_id):
         quote_number = quote_file.quote.quote_number
         
         # Delete file
-        success, message = file_handler.delete_file(quote_file)
+        success, message = get_file_handler().delete_file(quote_file)
         
         if success:
             flash('File deleted successfully!', 'success')
@@ -2080,7 +2195,7 @@ def delete_quote_file(file_id):
 # SMART PRICING ROUTES
 # ========================
 
-@app.route('/admin/pricing/smart-update', methods=['POST'])
+@routes.route('/admin/pricing/smart-update', methods=['POST'])
 def smart_pricing_update():
     """Update pricing with smart algorithms"""
     try:
@@ -2102,20 +2217,15 @@ def smart_pricing_update():
 # REAL-TIME NOTIFICATIONS
 # ========================
 
-@app.route('/api/notifications/live')
+@routes.route('/api/notifications/live')
 def live_notifications():
     """Get live notifications for dashboard"""
     try:
         # Get recent quotes, orders, and alerts
-        recent_quotes = Quote.query.filter(
-            Quote.created_at >= datetime.now() - timedelta(hours=24)
-        ).count()
-        
-        pending_orders = Order.query.filter_by(status='confirmed').count()
-        overdue_orders = Order.query.filter(
-            Order.due_date < datetime.now(),
-            Order.status.in_(['confirmed', 'in_production'])
-        ).count()
+        summary = get_status_summary()
+        recent_quotes = summary.new_quotes_24h
+        pending_orders = summary.orders.count('confirmed')
+        overdue_orders = summary.overdue_orders
         
         notifications = {
             'new_quotes_24h': recent_quotes,
@@ -2148,7 +2258,7 @@ def live_notifications():
 # ENHANCED ADMIN DASHBOARD
 # ========================
 
-@app.route('/admin/dashboard-enhanced')
+@routes.route('/admin/dashboard-enhanced')
 def admin_dashboard_enhanced():
     """Enhanced admin dashboard with real-time features"""
     try:
@@ -2172,7 +2282,7 @@ def admin_dashboard_enhanced():
 # CHATBOT ROUTES
 # ========================
 
-@app.route('/api/chat', methods=['POST'])
+@routes.route('/api/chat', methods=['POST'])
 def chat_with_ai():
     """Handle chatbot conversations"""
     try:
@@ -2205,7 +2315,7 @@ Be helpful, friendly, and knowledgeable. Keep responses concise but informative.
 
         # the newest OpenAI model is "gpt-5" which was released August 7, 2025.
         # do not change this unless explicitly requested by the user
-        response = openai_client.chat.completions.create(
+        response = get_openai_client().chat.completions.create(
             model="gpt-4o",
             messages=[
                 {"role": "system", "content": system_prompt},
@@ -2233,12 +2343,12 @@ Be helpful, friendly, and knowledgeable. Keep responses concise but informative.
 # EMPLOYEE ROUTES
 # ========================
 
-@app.route('/employee-login')
+@routes.route('/employee-login')
 def employee_login():
     """Employee login - DISABLED: redirect directly to employee calculator"""
     return redirect(url_for('employee_calculator'))
 
-@app.route('/employee-logout')
+@routes.route('/employee-logout')
 def employee_logout():
     """Employee logout"""
     session.pop('employee_authenticated', None)
@@ -2254,7 +2364,7 @@ def employee_required(f):
         return f(*args, **kwargs)
     return decorated_function
 
-@app.route('/employee-calculator', methods=['GET', 'POST'])
+@routes.route('/employee-calculator', methods=['GET', 'POST'])
 @employee_required
 def employee_calculator():
     """Employee calculator with cost breakdown and profit analysis"""
@@ -2262,20 +2372,8 @@ def employee_calculator():
         categories = ['Banner', 'Decals', 'Poster', 'Yard Signs', 'Apparel']
         selected_category = request.form.get('category') or request.args.get('category', 'Banner')
         
-        # Get materials based on category
-        if selected_category == 'Banner':
-            materials = Material.query.filter_by(material_type='banner', active=True).all()
-        elif selected_category == 'Decals':
-            materials = Material.query.filter(
-                Material.material_type.in_(['cast_vinyl', 'vinyl', 'decal']),
-                Material.active == True
-            ).all()
-        elif selected_category == 'Poster':
-            materials = Material.query.filter_by(material_type='poster', active=True).all()
-        else:
-            materials = Material.query.filter_by(material_type='banner', active=True).all()
-        
-        media_names = [m.name for m in materials]
+        # Get materials based on category (Yard Signs / Apparel fall back to banner media)
+        media_names, _ = CATALOG.current().media(selected_category)
         
         result = None
         error = None
@@ -2592,7 +2690,7 @@ def employee_calculator():
                              size_options=['XS', 'S', 'M', 'L', 'XL', '2XL', '3XL', '4XL', '5XL'],
                              form_data={})
 
-@app.route("/employee/cost/decal", methods=['POST'])
+@routes.route("/employee/cost/decal", methods=['POST'])
 def employee_cost_decal():
     # Admin token protection
     ADMIN_TOKEN = os.environ.get("ADMIN_TOKEN", "dtf_admin_2025")
@@ -2621,9 +2719,113 @@ def _require_admin():
     # Testing mode: bypass authentication
     pass
 
+# ========== CATALOG & PRICING FEEDS ==========
+
+# Seconds a client or proxy may reuse a feed before revalidating it. Admins
+# edit the catalog at any time; the ladders change with a config deploy.
+CATALOG_FEED_MAX_AGE = int(os.environ.get('CATALOG_FEED_MAX_AGE', 60))
+PRICING_FEED_MAX_AGE = int(os.environ.get('PRICING_FEED_MAX_AGE', 300))
+
+_pricing_ladders = None  # (config versions, JsonDocument)
+_pricing_ladders_lock = threading.Lock()
+
+def pricing_ladders_document():
+    """
+    The /api/pricing/ladders document: the retail banner, decal and poster
+    price lists and the 2025 decal tiers, without margin floors or true
+    costs. Serialized once per pair of config versions.
+    """
+    global _pricing_ladders
+    decals_2025 = PRICING_CONFIG.current()
+    versions = {'retail': RETAIL_VERSION, 'decals_2025': decals_2025.version}
+    cached = _pricing_ladders
+    if cached is None or cached[0] != versions:
+        with _pricing_ladders_lock:
+            cached = _pricing_ladders
+            if cached is None or cached[0] != versions:
+                document = json_document({
+                    'config_versions': versions,
+                    'job_minimums': RETAIL['job_minimums'],
+                    'banners': RETAIL['banners'],
+                    'decals': RETAIL['decals'],
+                    'posters': RETAIL['posters'],
+                    'decals_2025': {
+                        key: decals_2025[key] for key in (
+                            'tiers_by_tba_sqft', 'adders_sqft', 'small_piece_fee_each',
+                            'retail_job_minimum', 'rounding', 'partner_discount')
+                    },
+                })
+                cached = _pricing_ladders = (versions, document)
+    return cached[1]
+
+@routes.route('/api/catalog/<feed>')
+def api_catalog(feed):
+    """
+    Read-only catalog feed for partner integrations: materials, apparel
+    (quantity tiers) or yard-signs. Strong ETag from the serialized body;
+    If-None-Match gets a 304 without re-reading the catalog.
+    """
+    feeds = CATALOG_FEEDS.current()
+    if feed not in feeds:
+        return jsonify({'success': False, 'error': f'Unknown catalog feed: {feed}'}), 404
+    return conditional_json(feeds[feed], CATALOG_FEED_MAX_AGE)
+
+@routes.route('/api/pricing/ladders')
+def api_pricing_ladders():
+    """Retail price ladders and 2025 decal tiers; conditional like /api/catalog"""
+    return conditional_json(pricing_ladders_document(), PRICING_FEED_MAX_AGE)
+
 # ========== RETAIL QUOTE API ENDPOINTS ==========
 
-@app.route("/quote/decal", methods=['POST'])
+def _customer_price(result):
+    """The part of a pricing result the customer page shows (never the shop's costs)"""
+    price = {
+        'quoted_price': result['totals']['quoted_price'],
+        'unit_price': result['totals']['unit_price'],
+    }
+    if result.get('derived', {}).get('billable_sqft'):
+        price['billable_sqft'] = result['derived']['billable_sqft']
+    if 'lines' in result:
+        price['lines'] = result['lines']
+    return price
+
+@routes.route('/api/price/<category>', methods=['POST'])
+def api_price(category):
+    """
+    Live retail price for the customer calculator: the same pricing as a full
+    POST to /, without the catalog queries, analytics or page render.
+    Body: the calculator's form fields (form-encoded, or a flat JSON object)
+    Response: {
+        "success": true, "ready": bool,
+        "price": {"quoted_price", "unit_price", "billable_sqft"?, "lines"?} | null
+    }
+    "ready" is false (and "price" null) until the fields the category needs
+    are filled in and its numeric fields parse.
+    """
+    if category not in CUSTOMER_CATEGORIES:
+        return jsonify({'success': False, 'error': f'Unknown category: {category}'}), 404
+    if request.is_json:
+        data = request.get_json(silent=True)
+        if not isinstance(data, dict):
+            return jsonify({'success': False, 'error': 'Expected a JSON object of form fields'}), 400
+        # Same strings a form post would carry; a null is a field left empty
+        fields = {key: str(value) for key, value in data.items() if value is not None}
+    else:
+        fields = request.form.to_dict()
+    fields['category'] = category
+    
+    form_data = retail_quote_form(category, fields)
+    # Half-typed numbers are not ready yet rather than an error
+    if form_data is None or not numeric_fields_parse(category, form_data):
+        return jsonify({'success': True, 'ready': False, 'price': None})
+    try:
+        result = price_retail_quote(category, form_data)
+    except ValueError as e:
+        logging.warning(f"Live price error for {category}: {str(e)}")
+        return jsonify({'success': False, 'error': 'Could not price these options'}), 400
+    return jsonify({'success': True, 'ready': True, 'price': _customer_price(result)})
+
+@routes.route("/quote/decal", methods=['POST'])
 def quote_decal():
     """
     Retail decal quote with margin guard
@@ -2655,7 +2857,7 @@ def quote_decal():
     except Exception as e:
         return jsonify({"error": f"Calculation error: {str(e)}"}), 400
 
-@app.route("/quote/banner", methods=['POST'])
+@routes.route("/quote/banner", methods=['POST'])
 def quote_banner():
     """
     Retail banner quote with margin guard
@@ -2672,7 +2874,7 @@ def quote_banner():
     }
     
     try:
-        result = banner_quote_with_guard(
+        result = banner_quote_from_matrix(
             width_ft=float(d["width_ft"]),
             height_ft=float(d["height_ft"]),
             qty=int(d["qty"]),
@@ -2694,9 +2896,35 @@ def quote_banner():
         from flask import abort
         abort(400, description=f"Calculation error: {str(e)}")
 
+@routes.route("/quote/banner/batch", methods=['POST'])
+def quote_banner_batch():
+    """
+    Retail banner quotes with margin guard for a whole package of lines
+    Body: {"lines": [<same fields as /quote/banner>, ...]}
+    Response: {"count": int, "errors": int, "lines": [<result or {"error": str}>, ...]}
+    """
+    d = _parse_request_data()
+    lines = d.get("lines") if isinstance(d, dict) else d
+    
+    if not isinstance(lines, list):
+        return jsonify({"error": "Body must contain a \"lines\" array"}), 400
+    if len(lines) > BATCH_MAX_LINES:
+        return jsonify({"error": f"Too many lines (max {BATCH_MAX_LINES})"}), 413
+    
+    try:
+        results = banner_quote_batch(lines)
+    except Exception as e:
+        return jsonify({"error": f"Calculation error: {str(e)}"}), 400
+    
+    return jsonify({
+        "count": len(results),
+        "errors": sum(1 for r in results if "error" in r),
+        "lines": results
+    })
+
 # ========== EMPLOYEE COST API ENDPOINTS (ADMIN ONLY) ==========
 
-@app.route("/employee/cost/banner", methods=['POST'])
+@routes.route("/employee/cost/banner", methods=['POST'])
 def employee_cost_banner():
     """
     Employee cost calculation for banners (admin only)
@@ -2722,12 +2950,12 @@ def employee_cost_banner():
         from flask import abort
         abort(400, description=f"Calculation error: {str(e)}")
 
-@app.route("/employee/floor/decal", methods=['POST'])
+@routes.route("/employee/floor/decal", methods=['POST'])
 def employee_floor_decal():
     # Legacy endpoint - redirect to new employee cost endpoint
     return employee_cost_decal()
 
-@app.route('/download-project')
+@routes.route('/download-project')
 def download_project():
     """Download the complete DTF Designs project as a compressed archive"""
     import os
@@ -2738,5 +2966,67 @@ def download_project():
         flash('Project archive not found. Please contact support.', 'error')
         return redirect(url_for('index'))
 
+# ========== APPLICATION FACTORY ==========
+
+# Services built on first use, by the names WARM_SERVICES takes
+LAZY_SERVICES = {
+    'pdf': get_pdf_generator,
+    'chat': get_openai_client,
+    'uploads': get_file_handler,
+}
+
+def warm_up(names=None):
+    """
+    Build lazy services now rather than on their first request, for workers
+    that do serve PDFs, chat or uploads. names: LAZY_SERVICES keys (all when
+    None). create_app() calls it with WARM_SERVICES, e.g. WARM_SERVICES=pdf,chat.
+    """
+    for name in LAZY_SERVICES if names is None else names:
+        if name not in LAZY_SERVICES:
+            raise ValueError(f"unknown service {name!r}; expected one of {', '.join(LAZY_SERVICES)}")
+        LAZY_SERVICES[name]()
+
+def create_app(config=None):
+    """
+    Build the Flask app: configuration, database and routes. Nothing here
+    touches the database or builds a service, so a worker boots quickly:
+    the schema and seed data come from a one-off `flask --app app init-db`
+    (or DB_AUTO_MIGRATE=1), and the PDF generator, upload handler and OpenAI
+    client (with reportlab, Pillow and openai) are loaded by the first
+    request that needs them, unless WARM_SERVICES names them.
+    """
+    app = Flask(__name__)
+    app.secret_key = os.environ.get("SESSION_SECRET", "dev-secret-key")
+
+    # Database configuration
+    app.config["SQLALCHEMY_DATABASE_URI"] = os.environ.get("DATABASE_URL")
+    app.config["SQLALCHEMY_ENGINE_OPTIONS"] = {
+        "pool_recycle": 300,
+        "pool_pre_ping": True,
+    }
+    app.config.update(config or {})
+    db.init_app(app)
+
+    routes.register(app)
+    app.extensions['analytics_buffer'] = AnalyticsBuffer(partial(_flush_analytics, app))
+    # Calculator dropdowns and form sections, re-rendered when the catalog changes
+    fragment_cache.init_app(app, version=partial(pinned_cache_version, 'catalog'),
+                            maxsize=int(os.environ.get('FRAGMENT_CACHE_SIZE', 512)))
+    app.cli.add_command(init_db_command)
+
+    warm = [name.strip() for name in os.environ.get('WARM_SERVICES', '').split(',') if name.strip()]
+    if warm:
+        warm_up(warm)
+    if migrations.AUTO_MIGRATE:
+        with app.app_context():
+            init_db()
+    return app
+
+# The app gunicorn serves as app:app (or builds itself with 'app:create_app()')
+app = create_app()
+ANALYTICS = app.extensions['analytics_buffer']
+
 if __name__ == '__main__':
+    with app.app_context():
+        init_db()
     app.run(host='0.0.0.0', port=5000, debug=True)
@@ -1,4 +1,4 @@
-import math
+from pricing.banner import compile_banner_each
 
 # Professional Banner Pricing Configuration - Canton, OH (+100mi)
 BANNER_CONFIG = {
@@ -76,59 +76,16 @@ BANNER_CONFIG = {
     }
 }
 
+# Compile the per-banner price function (rate ladder, waste buffer) once; malformed or overlapping tiers fail at import
+calculate_banner_price, WASTE_BUFFER, RATE_LADDER = compile_banner_each(BANNER_CONFIG)
+
 def _waste_added(area):
     """Calculate waste buffer based on area"""
-    for r in BANNER_CONFIG["waste_buffer"]:
-        lo = r["min_sqft"]
-        hi_val = r["max_sqft"]
-        if (area >= lo) and (hi_val is None or area <= hi_val):
-            return area + r["add_sqft"]
-    return area
+    return area + WASTE_BUFFER.lookup(area)
 
 def _rate_for_qty(qty):
     """Get pricing rate based on quantity"""
-    for band in BANNER_CONFIG["rate_per_sqft_by_qty"]:
-        lo, hi = band["qty_min"], band["qty_max"]
-        if (qty >= lo) and (hi is None or qty <= hi):
-            return band["rate"]
-    return BANNER_CONFIG["rate_per_sqft_by_qty"][-1]["rate"]
-
-def calculate_banner_price(width_ft, height_ft, qty, material="alpha", include_waste=True, rounded=True,
-                          rush=False, reinforced_corners=False, wind_slits=False, pole_pockets_pairs=0, double_sided=False):
-    """
-    Professional banner pricing calculation
-    """
-    if material not in BANNER_CONFIG["materials"]:
-        raise ValueError(f"Media not found: {material}. Available materials: {list(BANNER_CONFIG['materials'].keys())}")
-    
-    mat = BANNER_CONFIG["materials"][material]
-    area = width_ft * height_ft
-    billable = _waste_added(area) if include_waste else area
-    base_rate = _rate_for_qty(qty)
-    rate = base_rate + mat["adder_per_sqft"]
-
-    price_each = billable * rate
-    price_each = max(price_each, BANNER_CONFIG["min_job_usd"])
-
-    # Add-on costs
-    addons = BANNER_CONFIG["addons"]
-    add_cost = 0.0
-    if reinforced_corners: 
-        add_cost += addons["reinforced_corners_usd"]
-    if wind_slits: 
-        add_cost += addons["wind_slits_usd"]
-    if pole_pockets_pairs and pole_pockets_pairs > 0:
-        add_cost += addons["pole_pockets_pair_usd"] * int(pole_pockets_pairs)
-    price_each += add_cost
-
-    # Apply multipliers
-    if double_sided:
-        price_each *= addons["double_sided_multiplier"]
-
-    if rush:
-        price_each *= (1.0 + addons["rush_pct"])
-
-    return math.floor(price_each + 0.5) if rounded else round(price_each, 2)
+    return RATE_LADDER.lookup(qty)
 
 def get_banner_materials():
     """Get available banner materials"""
@@ -0,0 +1,201 @@
+"""
+Correctness check + query budget: set-based admin analytics dashboard.
+
+The old /admin/analytics view loaded every quote into Python, ran three
+queries per day, one per category, one per customer and two per month (and
+crashed on Quote.created_at.date(), so it always showed the zero fallback).
+reference_dashboard() below is that view with the date comparisons fixed,
+the six months made consecutive and customers ranked by what they spent on
+orders (as the maintained totals do); BusinessAnalytics.get_admin_dashboard()
+must give the same numbers with a fixed number of statements.
+
+1. Same numbers as the reference on a shop with prices of 0/None, unknown
+   categories and quotes dated in the future.
+2. The route issues the same (small) number of statements at two data sizes.
+3. Time per request, old loop vs. aggregates.
+
+Run from the project root (SQLite by default, or any DATABASE_URL):
+    python -m benchmarks.admin_analytics
+"""
+
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///" + os.path.join(tempfile.mkdtemp(), "analytics.db"))
+os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+os.environ.setdefault("DB_AUTO_MIGRATE", "1")
+
+from sqlalchemy import event, func, insert  # noqa: E402
+
+import app as webapp  # noqa: E402
+from analytics import DASHBOARD_CATEGORIES, _month_starts  # noqa: E402
+
+SIZES = (2_000, 40_000)
+CUSTOMERS = 300
+QUERY_BUDGET = 4
+
+
+def seed(start, count, rng):
+    db = webapp.db
+    now = datetime.now()
+    if start == 0:
+        db.session.execute(insert(webapp.Customer), [
+            {"name": f"Customer {i}", "email": f"a{i}@example.com"} for i in range(CUSTOMERS)])
+    db.session.execute(insert(webapp.Quote), [
+        {"quote_number": f"QA{i:08d}", "customer_id": rng.randrange(1, CUSTOMERS + 1),
+         "category": rng.choice(DASHBOARD_CATEGORIES + ["Poster", "Vehicle Wraps"]),
+         "status": rng.choice(["pending", "approved", "approved", "declined", "converted", "expired"]),
+         "calculated_price": rng.choice([round(rng.uniform(5, 900), 2), 0.0]),
+         "final_price": rng.choice([None, 0.0, round(rng.uniform(5, 900), 2)]),
+         "created_at": now - timedelta(minutes=rng.randrange(-3 * 24 * 60, 300 * 24 * 60))}
+        for i in range(start, start + count)])
+    db.session.execute(insert(webapp.Order), [
+        {"order_number": f"OA{i:08d}", "quote_id": i + 1, "customer_id": rng.randrange(1, CUSTOMERS + 1),
+         "total_amount": 10.0, "created_at": now - timedelta(minutes=rng.randrange(300 * 24 * 60))}
+        for i in range(start, start + count // 4)])
+    db.session.commit()
+    # Bulk inserts bypass the session's rollup and customer-total maintenance
+    with db.engine.begin() as conn:
+        webapp.ROLLUP.reconcile(conn)
+        webapp.CUSTOMER_TOTALS.repair(conn)
+
+
+def reference_dashboard():
+    """The old per-day/per-category/per-customer/per-month view, date bugs fixed"""
+    Quote, Order, Customer = webapp.Quote, webapp.Order, webapp.Customer
+    total_quotes = Quote.query.count()
+    total_orders = Order.query.count()
+    total_customers = Customer.query.count()
+    today = datetime.now().date()
+    this_month_start = today.replace(day=1)
+    this_month_quotes = Quote.query.filter(Quote.created_at >= this_month_start).count()
+    this_month_orders = Order.query.filter(Order.created_at >= this_month_start).count()
+
+    total_revenue = this_month_revenue = 0
+    approved_count = 0
+    for quote in Quote.query.all():
+        price = quote.final_price or quote.calculated_price or 0
+        if quote.status == 'approved':
+            total_revenue += price
+            approved_count += 1
+        if quote.created_at.date() >= this_month_start and quote.status == 'approved':
+            this_month_revenue += price
+    stats = {
+        'total_quotes': total_quotes, 'total_orders': total_orders, 'total_customers': total_customers,
+        'this_month_quotes': this_month_quotes, 'this_month_orders': this_month_orders,
+        'total_revenue': round(total_revenue, 2), 'this_month_revenue': round(this_month_revenue, 2),
+        'conversion_rate': round((approved_count / total_quotes * 100) if total_quotes > 0 else 0, 1),
+        'avg_order_value': round(total_revenue / approved_count if approved_count > 0 else 0, 2),
+    }
+
+    daily = {'quotes': [], 'orders': [], 'revenue': []}
+    for i in range(7):
+        day = today - timedelta(days=6 - i)
+        on_day = func.date(Quote.created_at) == day.isoformat()
+        label = day.strftime('%Y-%m-%d')
+        daily['quotes'].append((label, Quote.query.filter(on_day).count()))
+        daily['orders'].append((label, Order.query.filter(func.date(Order.created_at) == day.isoformat()).count()))
+        daily['revenue'].append((label, round(sum((q.final_price or q.calculated_price or 0)
+                                                  for q in Quote.query.filter(on_day, Quote.status == 'approved')), 2)))
+
+    counts, values = [], []
+    for cat in DASHBOARD_CATEGORIES:
+        cat_quotes = Quote.query.filter(Quote.category == cat).all()
+        counts.append(len(cat_quotes))
+        values.append(round(sum((q.final_price or q.calculated_price or 0)
+                                for q in cat_quotes if q.status == 'approved'), 2))
+
+    top = []
+    for customer in Customer.query.order_by(Customer.id.desc()).all():
+        customer_orders = Order.query.filter_by(customer_id=customer.id).all()
+        spent = sum(o.total_amount or 0 for o in customer_orders)
+        if spent > 0:
+            top.append({'name': customer.name, 'email': customer.email,
+                        'total_spent': round(spent, 2), 'total_orders': len(customer_orders)})
+    top.sort(key=lambda x: x['total_spent'], reverse=True)
+
+    quote_status = {s: Quote.query.filter_by(status=s).count()
+                    for s in ('pending', 'approved', 'declined', 'converted')}
+
+    trends = {'months': [], 'quote_counts': [], 'revenues': []}
+    for month_start in _month_starts(today, 6):
+        next_month = (month_start + timedelta(days=32)).replace(day=1)
+        in_month = (Quote.created_at >= month_start, Quote.created_at < next_month)
+        trends['months'].append(month_start.strftime('%Y-%m'))
+        trends['quote_counts'].append(Quote.query.filter(*in_month).count())
+        trends['revenues'].append(round(sum((q.final_price or q.calculated_price or 0)
+                                            for q in Quote.query.filter(*in_month, Quote.status == 'approved')), 2))
+
+    return {
+        'stats': stats, 'daily_stats': daily,
+        'category_breakdown': {'categories': DASHBOARD_CATEGORIES, 'counts': counts, 'values': values},
+        'customer_insights': {'top_customers': top[:5], 'customer_types': {'retail': total_customers}},
+        'quote_status': quote_status, 'trends': trends,
+    }
+
+
+def assert_close(expected, actual, path="dashboard"):
+    """Equal, except floats may differ by a cent (summation order)"""
+    if isinstance(expected, dict):
+        assert expected.keys() == actual.keys(), f"{path}: keys {sorted(expected)} != {sorted(actual)}"
+        for key in expected:
+            assert_close(expected[key], actual[key], f"{path}.{key}")
+    elif isinstance(expected, (list, tuple)):
+        assert len(expected) == len(actual), f"{path}: {len(actual)} items, expected {len(expected)}"
+        for i, (e, a) in enumerate(zip(expected, actual)):
+            assert_close(e, a, f"{path}[{i}]")
+    elif isinstance(expected, float) or isinstance(actual, float):
+        assert abs(expected - actual) <= 0.011, f"{path}: {actual} != {expected}"
+    else:
+        assert expected == actual, f"{path}: {actual!r} != {expected!r}"
+
+
+def route_statements(client, engine):
+    statements = []
+    listener = lambda *args: statements.append(args[2])  # noqa: E731
+    event.listen(engine, "before_cursor_execute", listener)
+    response = client.get("/admin/analytics")
+    event.remove(engine, "before_cursor_execute", listener)
+    assert response.status_code == 200
+    return statements
+
+
+def timed(fn, n=3):
+    fn()
+    t0 = time.perf_counter()
+    for _ in range(n):
+        fn()
+    return (time.perf_counter() - t0) / n
+
+
+def main():
+    rng = random.Random(18)
+    client = webapp.app.test_client()
+    seeded, rows = 0, []
+    for size in SIZES:
+        with webapp.app.app_context():
+            seed(seeded, size - seeded, rng)
+            seeded = size
+            expected = reference_dashboard()
+            actual = webapp.analytics_service.get_admin_dashboard()
+            assert actual['stats']['total_quotes'] == size
+            assert_close(expected, actual)
+            engine = webapp.db.engine
+            t_old = timed(reference_dashboard, n=1)
+            t_new = timed(webapp.analytics_service.get_admin_dashboard)
+        statements = route_statements(client, engine)
+        assert len(statements) <= QUERY_BUDGET, f"{len(statements)} statements:\n" + "\n".join(statements)
+        rows.append((size, len(statements), t_old, t_new, timed(lambda: client.get("/admin/analytics"))))
+        print(f"{size:,} quotes: dashboard matches the old per-row computation")
+
+    assert len({count for _, count, *_ in rows}) == 1, "statement count depends on data size"
+    print(f"{'quotes':>8}{'statements':>12}{'old view':>12}{'aggregates':>12}{'request':>10}")
+    for size, count, t_old, t_new, t_request in rows:
+        print(f"{size:>8,}{count:>12}{t_old * 1e3:>10.0f}ms{t_new * 1e3:>10.1f}ms{t_request * 1e3:>8.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
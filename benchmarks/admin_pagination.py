@@ -0,0 +1,197 @@
+"""
+Correctness check + benchmark: keyset-paginated admin quote and order lists.
+
+1. With 1k quotes and orders (many sharing created_at / price, so ties must be
+   broken by id), every sort option is walked forward to the end and back to
+   the start: each row must appear exactly once, in order, and the previous
+   pages must match the forward pages. A few pages' worth of rows are also
+   written through the created_at column default (CURRENT_TIMESTAMP, which
+   SQLite stores without fractional seconds), all inside the same second or
+   two, so the cursor must compare the way those rows are stored.
+2. Statements per request must not depend on the page size (the customer,
+   order and quote relationships come with the page instead of one lazy load
+   per row).
+3. First-page and deep-page times, for whole requests and for the page query
+   alone, are compared at 1k and 200k quotes.
+
+Run from the project root (SQLite by default, or any DATABASE_URL):
+    python -m benchmarks.admin_pagination
+"""
+
+import os
+import random
+import re
+import tempfile
+import time
+from datetime import datetime, timedelta
+from html import unescape
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///" + os.path.join(tempfile.mkdtemp(), "pagination.db"))
+os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+os.environ.setdefault("DB_AUTO_MIGRATE", "1")
+
+from sqlalchemy import event, insert  # noqa: E402
+
+import app as webapp  # noqa: E402
+
+SMALL = 1000
+LARGE = 200_000
+PAGE = 37
+CURSOR_LINK = re.compile(r'href="([^"]*cursor=[^"]*)"[^>]*>\s*(Next|‹ Previous)')
+
+
+def seed(start, count, rng):
+    now = datetime(2025, 6, 1)
+    db = webapp.db
+    if start == 0:
+        db.session.execute(insert(webapp.Customer), [
+            {"name": f"Customer {i}", "email": f"c{i}@example.com", "company": f"Co {i}"} for i in range(200)])
+    customer_ids = [cid for (cid,) in db.session.query(webapp.Customer.id)]
+    for lo in range(start, start + count, 50_000):
+        hi = min(lo + 50_000, start + count)
+        db.session.execute(insert(webapp.Quote), [
+            {"quote_number": f"QP{i:08d}", "customer_id": rng.choice(customer_ids),
+             "category": rng.choice(["Banner", "Decals", "Apparel"]), "status": rng.choice(["pending", "approved", "converted"]),
+             # Coarse timestamps and round prices: plenty of ties for the id tiebreak
+             "created_at": now - timedelta(hours=rng.randrange(2000)), "calculated_price": float(rng.randrange(50)),
+             "expires_at": now + timedelta(days=30)}
+            for i in range(lo, hi)])
+        if lo < SMALL:
+            db.session.execute(insert(webapp.Order), [
+                {"order_number": f"OP{i:08d}", "quote_id": i + 1, "customer_id": rng.choice(customer_ids),
+                 "status": rng.choice(["confirmed", "ready"]), "priority": "standard",
+                 "total_amount": float(rng.randrange(50)), "created_at": now - timedelta(hours=rng.randrange(2000)),
+                 "due_date": now + timedelta(days=rng.randrange(-5, 20))}
+                for i in range(lo, min(hi, SMALL))])
+    db.session.commit()
+
+
+def seed_defaulted(count):
+    """Quotes and orders whose created_at comes from the column default, as the app writes them"""
+    db = webapp.db
+    customer_id = db.session.query(webapp.Customer.id).first()[0]
+    db.session.execute(insert(webapp.Quote), [
+        {"quote_number": f"QP9{i:07d}", "customer_id": customer_id, "category": "Banner", "status": "pending",
+         "calculated_price": 10.0} for i in range(count)])
+    quote_ids = [qid for (qid,) in db.session.query(webapp.Quote.id).order_by(webapp.Quote.id.desc()).limit(count)]
+    db.session.execute(insert(webapp.Order), [
+        {"order_number": f"OP9{i:07d}", "quote_id": quote_id, "customer_id": customer_id, "status": "confirmed",
+         "priority": "standard", "total_amount": 10.0} for i, quote_id in enumerate(quote_ids)])
+    db.session.commit()
+
+
+def rows_on(html, prefix):
+    # The convert-to-order dialog repeats the quote number; keep first occurrences
+    return list(dict.fromkeys(re.findall(rf"<strong>({prefix}\d+)</strong>", html)))
+
+
+def links(html):
+    found = {label: unescape(href) for href, label in CURSOR_LINK.findall(html)}
+    return found.get("Next"), found.get("‹ Previous")
+
+
+def walk(client, path, prefix, expected):
+    """Forward to the last page, then back to the first; both must match expected"""
+    forward, pages, url = [], [], path
+    while url:
+        html = client.get(url).get_data(as_text=True)
+        rows = rows_on(html, prefix)
+        pages.append(rows)
+        forward.extend(rows)
+        url, _ = links(html)
+    assert forward == expected, f"{path}: forward walk differs ({len(forward)} vs {len(expected)} rows)"
+    _, url = links(html)
+    back = [pages[-1]]
+    while url:
+        html = client.get(url).get_data(as_text=True)
+        back.append(rows_on(html, prefix))
+        _, url = links(html)
+    assert back[::-1] == pages, f"{path}: backward walk differs"
+    return len(pages)
+
+
+def expected_order(model, number_attr, sort_attr, descending):
+    rows = webapp.db.session.query(getattr(model, number_attr), getattr(model, sort_attr), model.id).all()
+    rows.sort(key=lambda r: (r[1], r[2]), reverse=descending)
+    return [r[0] for r in rows]
+
+
+def count_statements(client, url):
+    statements = []
+    listener = lambda *args: statements.append(args[2])  # noqa: E731
+    event.listen(webapp.db.engine, "before_cursor_execute", listener)
+    client.get(url)
+    event.remove(webapp.db.engine, "before_cursor_execute", listener)
+    return len(statements)
+
+
+def time_page(client, url, n=5):
+    client.get(url)
+    t0 = time.perf_counter()
+    for _ in range(n):
+        client.get(url)
+    return (time.perf_counter() - t0) / n
+
+
+def time_list_query(cursor=None, n=20):
+    """The keyset page query alone (summary cards excluded)"""
+    Quote = webapp.Quote
+    query = Quote.query.join(Quote.customer).options(
+        webapp.contains_eager(Quote.customer), webapp.selectinload(Quote.order))
+    t0 = time.perf_counter()
+    for _ in range(n):
+        webapp.paginate(query, Quote.created_at, Quote.id, True, cursor=cursor)
+        webapp.db.session.expunge_all()
+    return (time.perf_counter() - t0) / n
+
+
+def deep_url(client, path, hops=20):
+    url = path
+    for _ in range(hops):
+        nxt, _ = links(client.get(url).get_data(as_text=True))
+        url = nxt or url
+    return url
+
+
+def main():
+    rng = random.Random(15)
+    client = webapp.app.test_client()
+    with webapp.app.app_context():
+        seed(0, SMALL, rng)
+        seed_defaulted(3 * PAGE + 5)
+        checks = [
+            ("/admin/quotes", "QP", webapp.Quote, "quote_number", webapp.QUOTE_SORTS),
+            ("/admin/orders", "OP", webapp.Order, "order_number", webapp.ORDER_SORTS),
+        ]
+        for path, prefix, model, number_attr, sorts in checks:
+            for sort, (column, descending) in sorts.items():
+                expected = expected_order(model, number_attr, column.key, descending)
+                pages = walk(client, f"{path}?sort={sort}&per_page={PAGE}", prefix, expected)
+                print(f"{path} sort={sort}: {len(expected)} rows over {pages} pages, forward and back match")
+
+        small_counts = {size: count_statements(client, f"/admin/quotes?per_page={size}") for size in (10, 100, 200)}
+        order_counts = {size: count_statements(client, f"/admin/orders?per_page={size}") for size in (10, 100, 200)}
+        assert len(set(small_counts.values())) == 1 and len(set(order_counts.values())) == 1, \
+            (small_counts, order_counts)
+        print(f"statements per request independent of page size: quotes {small_counts[10]}, "
+              f"orders {order_counts[10]}")
+
+        timings = {}
+        for label, total in (("1k", SMALL), ("200k", LARGE)):
+            if total > SMALL:
+                seed(SMALL, total - SMALL, rng)
+            deep = deep_url(client, "/admin/quotes?sort=newest")
+            timings[label] = (time_page(client, "/admin/quotes"), time_page(client, deep),
+                              time_page(client, "/admin/quotes?sort=price_low&status=approved"),
+                              time_list_query(), time_list_query(deep.split("cursor=")[1].split("&")[0]))
+    print("whole request (summary cards included):")
+    print(f"{'quotes':<8}{'first page':>12}{'page 21':>12}{'approved by price':>20}")
+    for label, (first, deep, filtered, _, _) in timings.items():
+        print(f"{label:<8}{first * 1e3:>10.1f}ms{deep * 1e3:>10.1f}ms{filtered * 1e3:>18.1f}ms")
+    print("keyset page query alone:")
+    for label, (*_, list_first, list_deep) in timings.items():
+        print(f"{label:<8}{list_first * 1e3:>10.2f}ms{list_deep * 1e3:>10.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""
+Correctness check + benchmark: indexed admin search vs. LIKE '%term%'.
+
+Seeds a synthetic shop (1M quotes, 50k customers, 20k orders by default) and
+compares, for a handful of search terms, the old contains() search (first
+page of the keyset list, so only the LIKE scan differs) with the ranked
+search from scripts/admin_search.py:
+
+- every match the old search finds must be found (when under the result cap)
+- exact quote numbers must rank first
+- the shadow index must follow inserts and renames (SQLite triggers)
+
+Run from the project root (SQLite by default, or any DATABASE_URL):
+    python -m benchmarks.admin_search
+    SEARCH_BENCH_QUOTES=100000 python -m benchmarks.admin_search
+"""
+
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///" + os.path.join(tempfile.mkdtemp(), "search.db"))
+os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+os.environ.setdefault("DB_AUTO_MIGRATE", "1")
+
+from sqlalchemy import insert  # noqa: E402
+
+import app as webapp  # noqa: E402
+from scripts import admin_search  # noqa: E402
+
+QUOTES = int(os.environ.get("SEARCH_BENCH_QUOTES", "1000000"))
+CUSTOMERS = 50_000
+ORDERS = 20_000
+FIRST = ["Ana", "Ben", "Cara", "Dev", "Eli", "Fay", "Gus", "Hana", "Ivan", "Jo", "Kai", "Lena", "Milo", "Nia"]
+LAST = ["Smith", "Garcia", "Nguyen", "Okafor", "Rossi", "Kowalski", "Haddad", "Silva", "Tanaka", "Moreau"]
+COMPANIES = ["Print Hub", "Fastsigns", "Lakeside Church", "Eastside Auto", "Bloom Florist", "Metro Realty", None]
+
+
+def seed(rng):
+    db = webapp.db
+    customers = []
+    for i in range(CUSTOMERS):
+        first, last = rng.choice(FIRST), rng.choice(LAST)
+        customers.append({"name": f"{first} {last}", "email": f"{first}.{last}{i}@example.com".lower(),
+                          "company": rng.choice(COMPANIES)})
+    # A few needles
+    customers[123] = {"name": "Zebulon Quixote", "email": "zq@windmill.example", "company": "La Mancha Signs"}
+    db.session.execute(insert(webapp.Customer), customers)
+    now = datetime(2025, 6, 1)
+    for lo in range(0, QUOTES, 100_000):
+        db.session.execute(insert(webapp.Quote), [
+            {"quote_number": f"Q{202401 + (i % 12):06d}{i:07d}", "customer_id": rng.randrange(1, CUSTOMERS + 1),
+             "category": rng.choice(["Banner", "Decals", "Apparel"]), "status": rng.choice(["pending", "approved"]),
+             "calculated_price": 10.0, "created_at": now - timedelta(minutes=i)}
+            for i in range(lo, min(lo + 100_000, QUOTES))])
+        db.session.commit()
+    # ...with some history
+    db.session.execute(insert(webapp.Quote), [
+        {"quote_number": f"QX{i:05d}", "customer_id": 124, "category": "Banner", "status": "approved",
+         "calculated_price": 99.0, "created_at": now - timedelta(days=i)} for i in range(12)])
+    db.session.execute(insert(webapp.Order), [
+        {"order_number": f"O2025{i:07d}", "quote_id": i + 1, "customer_id": rng.randrange(1, CUSTOMERS + 1),
+         "total_amount": 10.0, "created_at": now - timedelta(minutes=i)} for i in range(ORDERS)])
+    db.session.commit()
+
+
+def legacy_first_page(term, page_size=50):
+    """The old route's search filter, first keyset page only"""
+    Quote, Customer = webapp.Quote, webapp.Customer
+    query = Quote.query.join(Quote.customer).filter(webapp.db.or_(
+        Quote.quote_number.contains(term), Customer.name.contains(term),
+        Customer.email.contains(term), Customer.company.contains(term)))
+    return [q.id for q in query.order_by(Quote.created_at.desc(), Quote.id.desc()).limit(page_size)]
+
+
+def legacy_all(term):
+    Quote, Customer = webapp.Quote, webapp.Customer
+    return {qid for (qid,) in webapp.db.session.query(Quote.id).join(Quote.customer).filter(webapp.db.or_(
+        Quote.quote_number.contains(term), Customer.name.contains(term),
+        Customer.email.contains(term), Customer.company.contains(term)))}
+
+
+def timed(fn, n=5):
+    fn()
+    t0 = time.perf_counter()
+    for _ in range(n):
+        result = fn()
+    return result, (time.perf_counter() - t0) / n
+
+
+def main():
+    rng = random.Random(16)
+    with webapp.app.app_context():
+        t0 = time.perf_counter()
+        seed(rng)
+        print(f"seeded {QUOTES:,} quotes / {CUSTOMERS:,} customers in {time.perf_counter() - t0:.0f}s")
+        conn = webapp.db.session.connection()
+        print(f"search backend: {webapp.ADMIN_SEARCH.backend(conn)}")
+
+        needle_number = webapp.db.session.query(webapp.Quote.quote_number).filter_by(id=QUOTES // 2).scalar()
+        terms = [needle_number, needle_number[-7:], "Quixote", "windmill", "La Mancha", "okafor1234", "Lakeside"]
+        client = webapp.app.test_client()
+        print(f"{'term':<18}{'matches':>9}{'LIKE page':>12}{'search':>10}{'route':>10}")
+        for term in terms:
+            ids, t_new = timed(lambda: webapp.ADMIN_SEARCH.ranked_ids(conn, "quote", term))
+            ranked, capped = ids
+            _, t_old = timed(lambda: legacy_first_page(term), n=1)
+            _, t_route = timed(lambda: client.get(f"/admin/quotes?search={term}"), n=3)
+            if not capped:
+                expected = legacy_all(term)
+                assert set(ranked) == expected, f"{term}: {len(ranked)} found vs {len(expected)} by LIKE"
+            if term == needle_number:
+                assert ranked[0] == QUOTES // 2, "exact quote number must rank first"
+            shown = f"{len(ranked)}{'+' if capped else ''}"
+            print(f"{term:<18}{shown:>9}{t_old * 1e3:>10.1f}ms{t_new * 1e3:>8.2f}ms{t_route * 1e3:>8.1f}ms")
+
+        # Short terms fall back to a bounded scan; they must still work
+        ranked, _ = webapp.ADMIN_SEARCH.ranked_ids(conn, "order", "O2")
+        assert ranked, "two-character search found nothing"
+
+        # The shadow index follows new rows and renames
+        customer = webapp.find_or_create_customer("new.buyer@example.com", "Philippa Brightwater")
+        quote = webapp.save_quote(customer, "Banner", {}, 42.0, {})
+        found, _ = webapp.ADMIN_SEARCH.ranked_ids(webapp.db.session.connection(), "quote", "Brightwater")
+        assert found == [quote.id], found
+        customer.name = "Philippa Stormwater"
+        webapp.db.session.commit()
+        conn = webapp.db.session.connection()
+        assert webapp.ADMIN_SEARCH.ranked_ids(conn, "quote", "Brightwater")[0] == []
+        assert webapp.ADMIN_SEARCH.ranked_ids(conn, "quote", "Stormwater")[0] == [quote.id]
+        print("index follows inserts and renames; short terms fall back to a bounded scan")
+        print(f"(result cap {admin_search.SEARCH_MAX_RESULTS}; '+' means more matches were cut off)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+Concurrency check + benchmark: write-behind analytics vs. the old
+SELECT + UPDATE/INSERT + commit per track_analytics call.
+
+Several forked workers track the same metrics and flush concurrently into one
+database; afterwards every (date, metric, category) must have exactly one row
+holding the sum of all increments. Then the per-call cost of the old and new
+track_analytics is compared.
+
+Run from the project root (SQLite by default, or any DATABASE_URL):
+    python -m benchmarks.analytics_buffer
+"""
+
+import multiprocessing
+import os
+import tempfile
+import time
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///" + os.path.join(tempfile.mkdtemp(), "analytics.db"))
+os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+os.environ.setdefault("DB_AUTO_MIGRATE", "1")
+os.environ.setdefault("ANALYTICS_FLUSH_SECONDS", "0.05")
+
+import app as webapp  # noqa: E402
+
+WORKERS = 8
+CALLS_PER_WORKER = 2000
+CATEGORIES = ["Banner", "Decals", "Poster", None]
+
+
+def worker(seed):
+    with webapp.app.app_context():
+        for i in range(CALLS_PER_WORKER):
+            category = CATEGORIES[(seed + i) % len(CATEGORIES)]
+            webapp.track_analytics("quotes_generated", 1, category, {"price": i, f"worker_{seed}": True})
+            if i % 100 == 0:
+                time.sleep(0.02)  # let background flushes interleave across workers
+        while webapp.ANALYTICS.pending() or webapp.ANALYTICS.flush():
+            time.sleep(0.01)
+    return webapp.ANALYTICS.flushes, webapp.ANALYTICS.failures
+
+
+def legacy_track_analytics(metric_name, value, category=None, additional_data=None):
+    """track_analytics as it was: SELECT, then UPDATE or INSERT, then commit"""
+    BusinessAnalytics = webapp.BusinessAnalytics
+    today = webapp.datetime.now().date()
+    existing = BusinessAnalytics.query.filter_by(date=today, metric_name=metric_name, category=category).first()
+    if existing:
+        existing.metric_value += value
+        if additional_data:
+            if existing.additional_data:
+                existing.additional_data.update(additional_data)
+            else:
+                existing.additional_data = additional_data
+    else:
+        webapp.db.session.add(BusinessAnalytics(date=today, metric_name=metric_name, metric_value=value,
+                                                category=category, additional_data=additional_data or {}))
+    webapp.db.session.commit()
+
+
+def main():
+    BusinessAnalytics = webapp.BusinessAnalytics
+    with webapp.app.app_context():
+        BusinessAnalytics.query.delete()
+        webapp.db.session.commit()
+        webapp.db.engine.dispose()
+
+    ctx = multiprocessing.get_context("fork")
+    with ctx.Pool(WORKERS) as pool:
+        stats = pool.map(worker, range(WORKERS))
+
+    with webapp.app.app_context():
+        rows = BusinessAnalytics.query.filter_by(metric_name="quotes_generated").all()
+        keys = [(r.date, r.category) for r in rows]
+        if len(keys) != len(set(keys)):
+            raise AssertionError(f"duplicate analytics rows: {sorted(keys, key=str)}")
+        total = sum(r.metric_value for r in rows)
+        if total != WORKERS * CALLS_PER_WORKER:
+            raise AssertionError(f"lost increments: {total} != {WORKERS * CALLS_PER_WORKER}")
+        merged = set().union(*(r.additional_data.keys() for r in rows))
+    flushes = sum(f for f, _ in stats)
+    failures = sum(f for _, f in stats)
+    print(f"{WORKERS} workers x {CALLS_PER_WORKER} calls -> {len(rows)} rows, total {total:.0f}: "
+          f"no duplicates, no lost increments ({flushes} flushes, {failures} retried)")
+    print(f"payload keys merged: {sorted(merged)}")
+
+    with webapp.app.app_context():
+        n = 300
+        t0 = time.perf_counter()
+        for i in range(n):
+            legacy_track_analytics("bench_legacy", 1, "Banner", {"price": i})
+        t_legacy = (time.perf_counter() - t0) / n
+        t0 = time.perf_counter()
+        for i in range(n):
+            webapp.track_analytics("bench_buffered", 1, "Banner", {"price": i})
+        t_buffered = (time.perf_counter() - t0) / n
+        webapp.ANALYTICS.flush()
+    print(f"per call: legacy {t_legacy * 1e6:.0f} us, buffered {t_buffered * 1e6:.1f} us")
+
+
+if __name__ == "__main__":
+    main()
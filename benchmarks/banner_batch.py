@@ -0,0 +1,115 @@
+"""
+Benchmark: batch banner quoting vs. one banner_quote_with_guard call per line.
+
+Run from the project root:
+    python -m benchmarks.banner_batch
+"""
+
+import random
+import time
+
+from pricing import banner
+from pricing.banner import compile_banner_quote
+from pricing.config import RETAIL
+from scripts.banner_batch import banner_quote_batch, parse_banner_line
+from scripts.pricers import banner_quote_with_guard
+
+SIZES = (1, 100, 10000)
+
+
+def random_lines(n, seed=2025):
+    """Random banner package lines covering every tier, material and add-on"""
+    rng = random.Random(seed)
+    lines = []
+    for _ in range(n):
+        lines.append({
+            "width_ft": rng.choice([1, 2, 2.5, 3, 4, 6, 8, 10]),
+            "height_ft": rng.choice([1, 1.5, 2, 3, 4, 5]),
+            "qty": rng.choice([1, 2, 4, 5, 9, 10, 24, 25, 49, 50, 99, 100, 250]),
+            "material": rng.choice(["alpha", "jetflex"]),
+            "include_waste": rng.random() > 0.1,
+            "reinforced_corners": rng.random() > 0.5,
+            "wind_slits": rng.random() > 0.7,
+            "pole_pockets_pairs": rng.choice([0, 0, 1, 2]),
+            "double_sided": rng.random() > 0.7,
+            "rush": rng.random() > 0.8,
+        })
+    return lines
+
+
+def scalar_quotes(lines, quote=banner_quote_with_guard):
+    results = []
+    for d in lines:
+        p = parse_banner_line(d)
+        results.append(quote(**p))
+    return results
+
+
+def check_parity(lines, quote=banner_quote_with_guard):
+    """Batch results must equal the scalar pricer field for field"""
+    batch = banner_quote_batch(lines)
+    scalar = scalar_quotes(lines, quote)
+    for i, (b, s) in enumerate(zip(batch, scalar)):
+        b = {k: v for k, v in b.items() if k != "line"}
+        if b != s:
+            raise AssertionError(f"Line {i} mismatch: batch={b} scalar={s} spec={lines[i]}")
+    return sum("error" in s for s in scalar)
+
+
+def check_floor_modes(lines):
+    """
+    With the margin floor raised so that a share of lines fall below it,
+    auto-floored and blocked lines match the scalar quote too (totals and
+    error fields). Returns the number of blocked lines.
+    """
+    saved = {key: RETAIL[key] for key in ("floor_mode", "min_margin_floor_pct")}
+    try:
+        for mode in ("AUTO_FLOOR", "BLOCK"):
+            RETAIL.update(floor_mode=mode, min_margin_floor_pct=0.8)
+            quote = compile_banner_quote(RETAIL, banner.banner_price_retail, banner.banner_cost_true)
+            blocked = check_parity(lines, quote)
+    finally:
+        RETAIL.update(saved)
+    assert blocked, "no line fell below the margin floor"
+    return blocked
+
+
+def check_malformed():
+    """Malformed lines become per-line errors; the rest of the package still prices"""
+    good = {"width_ft": 3, "height_ft": 2, "qty": 1}
+    bad = [{**good, "addons": "bad"}, {**good, "addons": [1]}, {**good, "material": ["alpha"]},
+           {**good, "qty": "x"}, {"width_ft": 3}, "line"]
+    results = banner_quote_batch([good] + bad)
+    assert "error" not in results[0], results[0]
+    for i, result in enumerate(results[1:], start=1):
+        assert result == {"line": i, "error": result["error"]}, result
+
+
+def best_of(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    check_parity(random_lines(20000, seed=7))
+    print("parity: batch == scalar on 20,000 random lines")
+    blocked = check_floor_modes(random_lines(20000, seed=7))
+    print(f"80% margin floor: batch == scalar in AUTO_FLOOR and BLOCK modes ({blocked:,} lines blocked)")
+    check_malformed()
+    print("malformed lines: per-line errors, the rest of the package still prices")
+    print()
+    print(f"{'lines':>8} {'scalar q/s':>14} {'batch q/s':>14} {'speedup':>9}")
+    for n in SIZES:
+        lines = random_lines(n)
+        repeat = 5 if n >= 10000 else 50
+        t_scalar = best_of(lambda: scalar_quotes(lines), repeat)
+        t_batch = best_of(lambda: banner_quote_batch(lines), repeat)
+        print(f"{n:>8} {n / t_scalar:>14,.0f} {n / t_batch:>14,.0f} {t_scalar / t_batch:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,187 @@
+"""
+Correctness check + benchmark: cached template fragments on the customer,
+partner and employee calculator pages.
+
+1. Cached and uncached renders match: random category switches and form
+   submissions on all three pages produce byte-identical HTML with the
+   fragment cache on (often served from cache) and off.
+2. Catalog edits show up at once: adding a yard sign or renaming a
+   material through the admin routes bumps the catalog version, and the
+   next page renders it.
+3. Render time (template only) and request time for each calculator page
+   and category, with the fragment cache off and on, when a category is
+   opened (every fragment cached) and when a quote is submitted with new
+   values (the form section is rendered, the rest is cached).
+
+The catalog is padded to CATALOG_ROWS materials, yard signs and garments so
+the option lists are the size of a real shop's.
+
+Run from the project root (SQLite by default, or any DATABASE_URL):
+    python -m benchmarks.calculator_fragments
+"""
+
+import os
+import random
+import statistics
+import tempfile
+import time
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///" + os.path.join(tempfile.mkdtemp(), "fragments.db"))
+os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+os.environ.setdefault("DB_AUTO_MIGRATE", "1")
+
+from flask import before_render_template, template_rendered  # noqa: E402
+from sqlalchemy import insert  # noqa: E402
+
+import app as webapp  # noqa: E402
+
+PAGES = {"customer": "/", "partner": "/partner", "employee": "/employee-calculator"}
+CATEGORIES = ["Banner", "Decals", "Poster", "Yard Signs", "Apparel"]
+CATALOG_ROWS = int(os.environ.get("FRAGMENT_BENCH_CATALOG_ROWS", "60"))
+MATERIAL_TYPES = ["banner", "poster", "cast_vinyl", "vinyl", "decal", "vinyl_laminate", "cast_laminate"]
+FUZZ_REQUESTS = 600
+RUNS = 100
+
+
+def seed_catalog():
+    db = webapp.db
+    db.session.execute(insert(webapp.Material), [
+        {"name": f"Bench {t} {i}", "material_type": t, "width_inches": 54, "length_feet": 150,
+         "total_cost": 200 + i, "cost_per_sqft": round((200 + i) / 675, 4)}
+        for i in range(CATALOG_ROWS) for t in MATERIAL_TYPES[i % len(MATERIAL_TYPES):][:1]])
+    db.session.execute(insert(webapp.YardSignItem), [
+        {"name": f"Bench sign {i}", "sku": f"YS-BENCH-{i}", "blank_cost": 2, "print_cost": 3,
+         "stake_cost": 1, "retail_price": 15} for i in range(CATALOG_ROWS)])
+    db.session.execute(insert(webapp.ApparelItem), [
+        {"garment_name": f"Bench garment {i}", "tier_1_5": 12, "tier_6_10": 11, "tier_11_20": 10,
+         "tier_21_50": 9, "tier_51_100": 8, "tier_101_plus": 7} for i in range(CATALOG_ROWS)])
+    webapp.bump_cache_version("catalog")
+    db.session.commit()
+
+
+def random_form(rng, category, skus, media):
+    """Calculator fields for category; each field is sometimes left out"""
+    pools = {
+        "media_name": media + ["alpha", "jetflex", "gloss_vinyl", ""],
+        "width_in": ["24", "36", "48", "4"],
+        "height_in": ["12", "24", "36", "4"],
+        "qty": ["1", "5", "25", "100", ""],
+        "sides": ["1", "2"],
+        "coverage": ["Light", "Medium", "Heavy"],
+        "hem_opt": ["None", "All", "Top&Bottom"],
+        "grommets": ["0", "4", "8"],
+        "rush": ["Standard", "Rush"],
+        "cut_type": ["kiss", "die"],
+        "laminate_name": ["", "gloss", "matte", "Bench vinyl_laminate 5"],
+        "per_unit_sku": skus,
+        "add_stakes": ["Yes", "No"],
+        "notes": ["", "rush please"],
+    }
+    form = {"category": category}
+    for field, values in pools.items():
+        if rng.random() < 0.7:
+            form[field] = rng.choice(values)
+    return form
+
+
+class RenderTimer:
+    """Time of the last render_template call, from Flask's template signals"""
+
+    def __init__(self, app):
+        self.started = self.seconds = None
+        before_render_template.connect(self._before, app, weak=False)
+        template_rendered.connect(self._after, app, weak=False)
+
+    def _before(self, sender, template, context):
+        self.started = time.perf_counter()
+
+    def _after(self, sender, template, context):
+        self.seconds = time.perf_counter() - self.started
+
+
+def median_ms(samples):
+    return statistics.median(samples) * 1e3
+
+
+def main():
+    rng = random.Random(24)
+    client = webapp.app.test_client()
+    cache = webapp.app.extensions["fragment_cache"]
+    timer = RenderTimer(webapp.app)
+    with webapp.app.app_context():
+        seed_catalog()
+        skus = [sku for (sku,) in webapp.db.session.query(webapp.YardSignItem.sku)][:10]
+        media = [name for (name,) in webapp.db.session.query(webapp.Material.name)][:10]
+        poster = webapp.Material.query.filter_by(material_type="poster").first()
+        laminate = webapp.Material.query.filter_by(material_type="vinyl_laminate").first()
+
+    def render(page, form, enabled):
+        cache.maxsize = 512 if enabled else 0
+        if form is None:
+            response = client.get(PAGES[page])
+        else:
+            response = client.post(PAGES[page], data=form)
+        assert response.status_code == 200, (page, form, response.status_code)
+        return response.get_data(as_text=True)
+
+    # 1. Cached == uncached
+    for _ in range(FUZZ_REQUESTS):
+        page, category = rng.choice(list(PAGES)), rng.choice(CATEGORIES)
+        form = None if rng.random() < 0.1 else random_form(rng, category, skus, media)
+        cached, uncached = render(page, form, True), render(page, form, False)
+        assert cached == uncached, f"{page} {form}: cached fragment differs from a fresh render"
+    stats = cache.stats()
+    assert stats["hits"] > FUZZ_REQUESTS, stats
+    print(f"{FUZZ_REQUESTS} random requests over 3 pages render identically with and without the cache "
+          f"({stats['hits']} fragment hits, {stats['misses']} misses)")
+
+    # 2. Admin catalog edits invalidate
+    before = render("customer", {"category": "Yard Signs"}, True)
+    response = client.post("/admin/yard-signs/add", data={
+        "name": "Fragment Fresh Sign", "sku": "YS-FRESH", "blank_cost": "1", "print_cost": "1",
+        "stake_cost": "1", "retail_price": "9"})
+    assert response.status_code == 302, response.status_code
+    after = render("customer", {"category": "Yard Signs"}, True)
+    assert "Fragment Fresh Sign" not in before and "Fragment Fresh Sign" in after
+    # Customer posters list poster stock; partner decals list laminates
+    for material, material_type, page, category in ((poster, "poster", "customer", "Poster"),
+                                                     (laminate, "vinyl_laminate", "partner", "Decals")):
+        new_name = f"Renamed {material_type} stock"
+        render(page, {"category": category}, True)
+        response = client.post(f"/admin/materials/edit/{material.id}", data={
+            "name": new_name, "material_type": material_type, "width_inches": "54",
+            "length_feet": "150", "total_cost": "250"})
+        assert response.status_code == 302, response.status_code
+        html = render(page, {"category": category}, True)
+        assert new_name in html and html == render(page, {"category": category}, False), (page, category)
+    print("adding a yard sign and renaming materials through the admin show up on the next render")
+
+    # 3. Render and request time
+    print(f"{CATALOG_ROWS} rows each of materials, yard signs and garments; median of {RUNS}")
+    print(f"{'':<30}{'render off':>12}{'render on':>12}{'request off':>13}{'request on':>12}")
+    for page in PAGES:
+        for category in CATEGORIES:
+            for scenario in ("open", "submit"):
+                row = []
+                for enabled in (False, True):
+                    renders, requests = [], []
+                    for i in range(RUNS):
+                        if scenario == "open":
+                            form = {"category": category}
+                        else:
+                            # New values each time, so the form section is never cached
+                            form = {**random_form(rng, category, skus, media), "qty": str(1000 + i),
+                                    "width_in": str(10 + i), "height_in": str(20 + i)}
+                        t0 = time.perf_counter()
+                        render(page, form, enabled)
+                        requests.append(time.perf_counter() - t0)
+                        renders.append(timer.seconds)
+                    row += [median_ms(renders), median_ms(requests)]
+                render_off, request_off, render_on, request_on = row
+                print(f"{page + ' ' + category + ' ' + scenario:<30}{render_off:>10.3f}ms{render_on:>10.3f}ms"
+                      f"{request_off:>11.3f}ms{request_on:>10.3f}ms")
+    cache.maxsize = 512
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,186 @@
+"""
+Correctness check + benchmark: ETag / Cache-Control on the read-only catalog
+and pricing feeds (/api/catalog/<feed>, /api/pricing/ladders).
+
+1. Conditional GETs: every feed sends a strong ETag and Cache-Control. It
+   answers If-None-Match with a bodyless 304 for the current ETag (exact,
+   weak, in a list, or *), and with the full body for anything else, on
+   GET and HEAD.
+2. The bodies match the catalog tables and the retail / 2025 decal configs.
+   No margin floors, true costs or cost columns of any catalog model
+   (material cost_per_sqft, yard sign blank_cost, ...) are included.
+3. Changes show up at once: adding a yard sign through the admin changes
+   the yard-signs ETag only, and a hot-reloaded decal config changes the
+   ladders ETag.
+4. Cost per fetch, with CATALOG_ROWS rows per catalog table: building the
+   document on every request vs. a warm 200 vs. a 304 revalidation
+   (latency, SQL statements, bytes).
+
+Run from the project root (SQLite by default, or any DATABASE_URL):
+    python -m benchmarks.catalog_feeds
+"""
+
+import json
+import os
+import shutil
+import tempfile
+import time
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///" + os.path.join(tempfile.mkdtemp(), "feeds.db"))
+os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+os.environ.setdefault("DB_AUTO_MIGRATE", "1")
+
+from flask import jsonify  # noqa: E402
+from sqlalchemy import event, insert  # noqa: E402
+
+import app as webapp  # noqa: E402
+from pricing.config import PRICING_CONFIG, RETAIL  # noqa: E402
+
+CATALOG_ROWS = int(os.environ.get("FEED_BENCH_CATALOG_ROWS", "200"))
+FEEDS = ["/api/catalog/materials", "/api/catalog/apparel", "/api/catalog/yard-signs", "/api/pricing/ladders"]
+PRIVATE_KEYS = ("true_cost", "min_margin_floor_pct", "retail_margin_floor", "waste_buffers")
+CATALOG_MODELS = (webapp.Material, webapp.ApparelItem, webapp.YardSignItem)
+RUNS = 300
+
+
+def cost_columns():
+    """Every *cost* column on the catalog models, so a new one is checked too"""
+    names = {column.name for model in CATALOG_MODELS for column in model.__table__.columns if "cost" in column.name}
+    assert {"cost_per_sqft", "total_cost", "blank_cost"} <= names, names
+    return names
+
+
+def seed_catalog():
+    db = webapp.db
+    db.session.execute(insert(webapp.Material), [
+        {"name": f"Feed stock {i}", "material_type": "banner", "width_inches": 54, "length_feet": 150,
+         "total_cost": 200 + i, "cost_per_sqft": round((200 + i) / 675, 4)} for i in range(CATALOG_ROWS)])
+    db.session.execute(insert(webapp.YardSignItem), [
+        {"name": f"Feed sign {i}", "sku": f"YS-FEED-{i}", "blank_cost": 2, "print_cost": 3,
+         "stake_cost": 1, "retail_price": 15 + i % 7} for i in range(CATALOG_ROWS)])
+    db.session.execute(insert(webapp.ApparelItem), [
+        {"garment_name": f"Feed garment {i}", "tier_1_5": 12, "tier_6_10": 11, "tier_11_20": 10,
+         "tier_21_50": 9, "tier_51_100": 8, "tier_101_plus": 7} for i in range(CATALOG_ROWS)])
+    webapp.bump_cache_version("catalog")
+    db.session.commit()
+
+
+def measure(engine, fn):
+    """Mean (ms, statements, body bytes) of fn() over RUNS calls"""
+    seen = []
+    listener = lambda *args: seen.append(args[2])  # noqa: E731
+    fn()
+    event.listen(engine, "before_cursor_execute", listener)
+    try:
+        size = 0
+        t0 = time.perf_counter()
+        for _ in range(RUNS):
+            size = len(fn().data)
+        elapsed = time.perf_counter() - t0
+    finally:
+        event.remove(engine, "before_cursor_execute", listener)
+    return elapsed / RUNS * 1e3, len(seen) / RUNS, size
+
+
+def main():
+    client = webapp.app.test_client()
+    with webapp.app.app_context():
+        seed_catalog()
+        engine = webapp.db.engine
+
+    # 1. Conditional GET semantics
+    etags = {}
+    for url in FEEDS:
+        response = client.get(url)
+        etag = response.headers["ETag"]
+        assert response.status_code == 200 and response.is_json, url
+        assert etag.startswith('"') and not etag.startswith("W/"), etag
+        assert response.cache_control.public and response.cache_control.max_age > 0, url
+        etags[url] = etag
+        for header in (etag, "W/" + etag, f'"stale", {etag}', "*"):
+            for method in (client.get, client.head):
+                revalidated = method(url, headers={"If-None-Match": header})
+                assert revalidated.status_code == 304 and not revalidated.data, (url, header)
+                assert revalidated.headers["ETag"] == etag and revalidated.cache_control.max_age, (url, header)
+        stale = client.get(url, headers={"If-None-Match": '"stale"'})
+        assert stale.status_code == 200 and stale.data == response.data, url
+    assert client.get("/api/catalog/prices").status_code == 404
+    print(f"{len(FEEDS)} feeds: strong ETag + Cache-Control; 304 for exact, weak, listed and * matches, "
+          "200 otherwise (GET and HEAD)")
+
+    # 2. Bodies match the sources and leak nothing internal
+    bodies = {url: client.get(url).get_json() for url in FEEDS}
+    with webapp.app.app_context():
+        materials = webapp.Material.query.filter_by(active=True).order_by(webapp.Material.id).all()
+        assert [m["name"] for m in bodies[FEEDS[0]]["materials"]] == [m.name for m in materials]
+        garment = webapp.ApparelItem.query.filter_by(active=True).first()
+        tiers = bodies[FEEDS[1]]["apparel"][0]["tiers"]
+        assert all(webapp.get_apparel_tier_price(garment.garment_name, low) == price for low, _, price in tiers)
+        signs = webapp.YardSignItem.query.filter_by(active=True).count()
+        assert len(bodies[FEEDS[2]]["yard_signs"]) == signs
+    ladders = bodies[FEEDS[3]]
+    assert ladders["banners"]["ladder_per_sqft"] == RETAIL["banners"]["ladder_per_sqft"]
+    assert ladders["decals"]["ladder_per_sqft"] == RETAIL["decals"]["ladder_per_sqft"]
+    assert ladders["decals_2025"]["tiers_by_tba_sqft"] == [dict(t) for t in PRICING_CONFIG.current()["tiers_by_tba_sqft"]]
+    text = json.dumps(bodies)
+    private = set(PRIVATE_KEYS) | cost_columns()
+    assert not any(f'"{key}"' in text for key in private), sorted(key for key in private if f'"{key}"' in text)
+    print(f"bodies match the catalog tables and configs; none of {len(private)} cost / margin keys serialized")
+
+    # 3. Edits change exactly the affected ETags
+    response = client.post("/admin/yard-signs/add", data={
+        "name": "Feed Fresh Sign", "sku": "YS-FEED-FRESH", "blank_cost": "1", "print_cost": "1",
+        "stake_cost": "1", "retail_price": "9"})
+    assert response.status_code == 302, response.status_code
+    for url in FEEDS:
+        response = client.get(url, headers={"If-None-Match": etags[url]})
+        if url.endswith("yard-signs"):
+            assert response.status_code == 200 and b"Feed Fresh Sign" in response.data
+        else:
+            assert response.status_code == 304, url
+    work = tempfile.mkdtemp()
+    original_path = PRICING_CONFIG.path
+    try:
+        PRICING_CONFIG.path = os.path.join(work, "decal_pricing_2025.json")
+        shutil.copy(original_path, PRICING_CONFIG.path)
+        PRICING_CONFIG.refresh(force=True)
+        assert client.get(FEEDS[3], headers={"If-None-Match": etags[FEEDS[3]]}).status_code == 304
+        with open(PRICING_CONFIG.path) as f:
+            config = json.load(f)
+        config["retail_job_minimum"] += 5
+        with open(PRICING_CONFIG.path, "w") as f:
+            json.dump(config, f)
+        PRICING_CONFIG.refresh(force=True)
+        response = client.get(FEEDS[3], headers={"If-None-Match": etags[FEEDS[3]]})
+        assert response.status_code == 200, response.status_code
+        assert response.get_json()["decals_2025"]["retail_job_minimum"] == config["retail_job_minimum"]
+    finally:
+        PRICING_CONFIG.path = original_path
+        PRICING_CONFIG.refresh(force=True)
+        shutil.rmtree(work)
+    print("a new yard sign changes only the yard-signs ETag; a reloaded decal config changes the ladders ETag")
+
+    # 4. Cost per fetch
+    def rebuilt(url):
+        """The feed built and serialized on every request (no snapshot, no ETag)"""
+        def fetch():
+            with webapp.app.test_request_context(url):
+                if url.endswith("ladders"):
+                    webapp._pricing_ladders = None
+                    return webapp.app.make_response(webapp.pricing_ladders_document().body)
+                feed = url.rsplit("/", 1)[1]
+                return jsonify(json.loads(webapp.CATALOG_FEEDS._build()[feed].body))
+        return fetch
+
+    print(f"{CATALOG_ROWS} rows per catalog table; mean of {RUNS} fetches")
+    print(f"{'':<26}{'rebuilt':>22}{'200 (warm)':>22}{'304':>22}")
+    for url in FEEDS:
+        etag = client.get(url).headers["ETag"]
+        cells = [measure(engine, rebuilt(url)),
+                 measure(engine, lambda: client.get(url)),
+                 measure(engine, lambda: client.get(url, headers={"If-None-Match": etag}))]
+        print(f"{url:<26}" + "".join(f"{ms:>8.3f}ms {sql:>3.0f} SQL {size:>6}B" for ms, sql, size in cells))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,208 @@
+"""
+Correctness check + benchmark: maintained customer totals and the
+top-customer leaderboard.
+
+1. Concurrent conversions for one customer: the atomic SQL increment keeps
+   every order, where the old Python read-modify-write lost some.
+2. Totals broken behind the app's back (bulk-loaded orders, hand edits) are
+   found by a dry run and repaired; the repair is idempotent.
+3. The leaderboard matches a GROUP BY over the order table and is planned as
+   a scan of ix_customer_total_spent (no sort, no customer table scan).
+4. Time for the top 10: maintained index vs. the old quote aggregate.
+
+Run from the project root (SQLite by default, or any DATABASE_URL):
+    python -m benchmarks.customer_leaderboard
+"""
+
+import os
+import random
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///" + os.path.join(tempfile.mkdtemp(), "leaderboard.db"))
+os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+os.environ.setdefault("DB_AUTO_MIGRATE", "1")
+
+from sqlalchemy import func, insert, text, update  # noqa: E402
+
+import app as webapp  # noqa: E402
+from scripts import customer_totals  # noqa: E402
+
+CUSTOMERS = 20_000
+QUOTES = 200_000
+ORDERS = 50_000
+CONVERSIONS = 40
+THREADS = 8
+
+
+def seed(rng):
+    db = webapp.db
+    now = datetime.now()
+    db.session.execute(insert(webapp.Customer), [
+        {"name": f"Customer {i}", "email": f"l{i}@example.com"} for i in range(CUSTOMERS)])
+    db.session.execute(insert(webapp.Quote), [
+        {"quote_number": f"QL{i:08d}", "customer_id": rng.randrange(1, CUSTOMERS + 1),
+         "category": rng.choice(["Banner", "Decals", "Apparel"]),
+         "status": rng.choice(["pending", "approved", "declined"]),
+         "calculated_price": round(rng.uniform(5, 900), 2),
+         "created_at": now - timedelta(minutes=rng.randrange(300 * 24 * 60))}
+        for i in range(QUOTES)])
+    db.session.execute(insert(webapp.Order), [
+        {"order_number": f"OL{i:08d}", "quote_id": i + 1, "customer_id": rng.randrange(1, CUSTOMERS + 1),
+         "total_amount": round(rng.uniform(5, 900), 2), "created_at": now - timedelta(minutes=rng.randrange(300 * 24 * 60))}
+        for i in range(ORDERS)])
+    db.session.commit()
+
+
+def legacy_convert(quote_number):
+    """The old conversion's customer update: read total_spent in Python, write it back"""
+    quote = webapp.Quote.query.filter_by(quote_number=quote_number).one()
+    customer = quote.customer
+    total_orders, total_spent = customer.total_orders, customer.total_spent
+    time.sleep(0.001)  # the rest of the request (order creation, form parsing)
+    customer.total_orders, customer.total_spent = total_orders + 1, total_spent + quote.calculated_price
+    quote.status = "converted"
+    webapp.db.session.commit()
+
+
+def converge(convert, quote_numbers):
+    """Run convert(quote_number) from THREADS threads; returns the errors"""
+    pending, errors, lock = list(quote_numbers), [], threading.Lock()
+
+    def worker():
+        while True:
+            with lock:
+                if not pending:
+                    return
+                quote_number = pending.pop()
+            try:
+                convert(quote_number)
+            except Exception as e:  # noqa: BLE001 - reported below
+                errors.append(e)
+
+    threads = [threading.Thread(target=worker) for _ in range(THREADS)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return errors
+
+
+def buyer_quotes(email):
+    customer = webapp.find_or_create_customer(email, "Busy Buyer")
+    quotes = [webapp.save_quote(customer, "Banner", {}, 10.0 + i, {}) for i in range(CONVERSIONS)]
+    webapp.db.session.commit()
+    return customer.id, [q.quote_number for q in quotes], sum(q.calculated_price for q in quotes)
+
+
+def customer_row(customer_id):
+    return webapp.db.session.execute(
+        text("SELECT total_orders, total_spent FROM customer WHERE id = :id"), {"id": customer_id}).one()
+
+
+def legacy_top_customers(limit=10):
+    """The old get_customer_insights leaderboard: approved quote value per customer"""
+    Customer, Quote = webapp.Customer, webapp.Quote
+    return webapp.db.session.query(
+        Customer.name, Customer.email, func.sum(Quote.final_price).label("total_spent"),
+        func.count(Quote.id).label("quote_count"),
+    ).join(Quote).filter(Quote.status == "approved").group_by(
+        Customer.id, Customer.name, Customer.email).order_by(func.sum(Quote.final_price).desc()).limit(limit).all()
+
+
+def leaderboard_plan(conn):
+    compiled = webapp.Customer.query.with_entities(webapp.Customer.id).filter(
+        webapp.Customer.total_spent > 0).order_by(
+        webapp.Customer.total_spent.desc(), webapp.Customer.id.desc()).limit(10).statement.compile(conn)
+    if conn.dialect.name == "sqlite":
+        rows = conn.exec_driver_sql("EXPLAIN QUERY PLAN " + str(compiled), tuple(compiled.params.values())).all()
+        return "; ".join(row[-1] for row in rows)
+    return "\n".join(r[0] for r in conn.exec_driver_sql("EXPLAIN " + str(compiled), compiled.params).all())
+
+
+def timed(fn, n=20):
+    fn()
+    t0 = time.perf_counter()
+    for _ in range(n):
+        fn()
+    return (time.perf_counter() - t0) / n
+
+
+def main():
+    rng = random.Random(20)
+    client = webapp.app.test_client()
+    with webapp.app.app_context():
+        seed(rng)
+        engine = webapp.db.engine
+        atomic_id, atomic_quotes, atomic_sum = buyer_quotes("atomic.buyer@example.com")
+        legacy_id, legacy_quotes, legacy_sum = buyer_quotes("legacy.buyer@example.com")
+
+    # 1. Concurrent conversions
+    def convert(quote_number):
+        response = client.post(f"/admin/quote/{quote_number}/convert_to_order", data={"priority": "standard"})
+        assert response.status_code == 302, response.status_code
+
+    def in_context(fn):
+        def run(quote_number):
+            with webapp.app.app_context():
+                fn(quote_number)
+        return run
+
+    errors = converge(convert, atomic_quotes)
+    legacy_errors = converge(in_context(legacy_convert), legacy_quotes)
+    with webapp.app.app_context():
+        atomic = customer_row(atomic_id)
+        legacy = customer_row(legacy_id)
+    assert not errors, errors[:3]
+    assert atomic.total_orders == CONVERSIONS and abs(atomic.total_spent - atomic_sum) < 0.005, atomic
+    print(f"{CONVERSIONS} conversions from {THREADS} threads: atomic increments counted "
+          f"{atomic.total_orders} orders / ${atomic.total_spent:,.2f}; the old read-modify-write kept "
+          f"{legacy.total_orders} / ${legacy.total_spent:,.2f} ({len(legacy_errors)} errors)")
+
+    with webapp.app.app_context():
+        totals = webapp.CUSTOMER_TOTALS
+
+        # 2. Drift from bulk-loaded orders and hand edits, then repair
+        with engine.begin() as conn:
+            first = totals.repair(conn, dry_run=True)
+        assert first["fixed"] > 0
+        with engine.begin() as conn:
+            t0 = time.perf_counter()
+            repaired = totals.repair(conn)
+            t_repair = time.perf_counter() - t0
+        with engine.begin() as conn:
+            assert totals.repair(conn, dry_run=True)["fixed"] == 0
+            conn.execute(update(webapp.Customer.__table__).where(webapp.Customer.id <= 25).values(
+                total_spent=webapp.Customer.total_spent + 1))
+            assert totals.repair(conn, dry_run=True)["fixed"] == 25
+            totals.repair(conn)
+            assert totals.repair(conn, dry_run=True)["fixed"] == 0
+        print(f"repair: {repaired['fixed']:,} of {repaired['customers']:,} customers fixed after a bulk load "
+              f"in {t_repair:.2f}s; 25 hand-edited rows found and fixed; a second run fixes nothing")
+
+        # 3. Leaderboard == GROUP BY over orders, served by the index
+        Order = webapp.Order
+        by_orders = webapp.db.session.query(
+            Order.customer_id, func.sum(Order.total_amount).label("spent"), func.count().label("orders"),
+        ).group_by(Order.customer_id).all()
+        emails = dict(webapp.db.session.query(webapp.Customer.id, webapp.Customer.email).all())
+        expected = sorted(by_orders, key=lambda r: (-round(r.spent, 2), -r.customer_id))[:10]
+        top = webapp.analytics_service.get_top_customers(10)
+        assert [emails[r.customer_id] for r in expected] == [t["email"] for t in top], (expected, top)
+        assert all(abs(t["total_spent"] - r.spent) < 0.005 and t["total_orders"] == r.orders
+                   for t, r in zip(top, expected))
+        with engine.connect() as conn:
+            plan = leaderboard_plan(conn)
+        assert customer_totals.INDEX_NAME in plan and "TEMP B-TREE" not in plan.upper(), plan
+        print(f"leaderboard matches the order table and reads {customer_totals.INDEX_NAME}: {plan}")
+
+        # 4. Timing
+        t_legacy = timed(legacy_top_customers, n=3)
+        t_index = timed(lambda: webapp.analytics_service.get_top_customers(10))
+    print(f"top 10 customers: {t_legacy * 1e3:.1f}ms as a quote aggregate, {t_index * 1e3:.2f}ms from the index")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+"""
+Migration check + benchmark: customer upsert on a unique normalized email vs.
+the old unindexed lookup followed by an unconditional commit.
+
+1. A pre-index database holding duplicate customers (case/whitespace variants,
+   each with quotes) is migrated: one row per email must remain, with every
+   quote re-pointed and totals summed.
+2. Forked workers save quotes for the same customers at once (mixed-case
+   emails): each email must end up as exactly one customer.
+3. Statements, commits and time per call are compared for a returning
+   customer with unchanged details, with a few thousand customers on file
+   (the legacy path without the email index, as the old schema had).
+
+Run from the project root (SQLite by default, or any DATABASE_URL):
+    python -m benchmarks.customer_upsert
+"""
+
+import multiprocessing
+import os
+import tempfile
+import time
+from collections import Counter
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///" + os.path.join(tempfile.mkdtemp(), "customers.db"))
+os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+os.environ.setdefault("DB_AUTO_MIGRATE", "1")
+
+from sqlalchemy import create_engine, event, func, insert, select, text  # noqa: E402
+
+import app as webapp  # noqa: E402
+from scripts import customer_emails  # noqa: E402
+
+WORKERS = 8
+CALLS_PER_WORKER = 200
+EMAILS = [f"buyer{i}@example.com" for i in range(20)]
+ON_FILE = 5000
+
+
+def check_migration():
+    Customer, Quote, Order = webapp.Customer, webapp.Quote, webapp.Order
+    engine = create_engine("sqlite:///" + os.path.join(tempfile.mkdtemp(), "legacy.db"))
+    webapp.db.metadata.create_all(engine, tables=[Customer.__table__, Quote.__table__, Order.__table__])
+    with engine.begin() as conn:
+        conn.execute(text(f"DROP INDEX {customer_emails.INDEX_NAME}"))
+        variants = ["Pat@Example.com", " pat@example.com", "PAT@EXAMPLE.COM ", "lee@example.com"]
+        ids = [conn.execute(insert(Customer.__table__).values(
+            name=f"Customer {i}", email=email, phone="555-0100" if i == 2 else None,
+            total_orders=1, total_spent=10.0)).inserted_primary_key[0] for i, email in enumerate(variants)]
+        conn.execute(insert(Quote.__table__), [
+            {"quote_number": f"Q-{n}", "customer_id": cid, "category": "Banner", "calculated_price": 1.0}
+            for n, cid in enumerate(ids)])
+
+    stats = customer_emails.migrate(engine, Customer.__table__,
+                                    [Quote.__table__.c.customer_id, Order.__table__.c.customer_id])
+    with engine.connect() as conn:
+        rows = conn.execute(select(Customer.__table__).order_by(Customer.id)).all()
+        quote_owners = Counter(conn.execute(select(Quote.customer_id)).scalars())
+    assert [r.email for r in rows] == ["pat@example.com", "lee@example.com"], rows
+    pat = rows[0]
+    assert pat.id == ids[0] and pat.total_orders == 3 and pat.total_spent == 30.0 and pat.phone == "555-0100", pat
+    assert quote_owners == {pat.id: 3, rows[1].id: 1}, quote_owners
+    assert customer_emails.migrate(engine, Customer.__table__, []) is None
+    print(f"migration: {stats['normalized']} emails normalized, {stats['merged']} duplicates merged, "
+          f"quotes re-pointed, second run is a no-op")
+
+
+def worker(seed):
+    with webapp.app.app_context():
+        for i in range(CALLS_PER_WORKER):
+            email = EMAILS[(seed + i) % len(EMAILS)]
+            email = email.upper() if i % 3 == 0 else f" {email} "
+            customer = webapp.find_or_create_customer(email, f"Buyer {(seed + i) % len(EMAILS)}",
+                                                      phone=f"555-{seed:04d}" if i % 50 == 0 else "")
+            assert customer.email == email.strip().lower()
+    return True
+
+
+def legacy_find_or_create_customer(email, name, phone=None, company=None, customer_type='retail'):
+    """find_or_create_customer as it was: unindexed lookup, commit even when unchanged"""
+    Customer = webapp.Customer
+    customer = Customer.query.filter_by(email=email).first()
+    if not customer:
+        customer = Customer(name=name, email=email, phone=phone, company=company, customer_type=customer_type)
+        webapp.db.session.add(customer)
+        webapp.db.session.commit()
+    else:
+        if name and customer.name != name:
+            customer.name = name
+        if phone and customer.phone != phone:
+            customer.phone = phone
+        if company and customer.company != company:
+            customer.company = company
+        webapp.db.session.commit()
+    return customer
+
+
+def time_calls(fn, email, n=500):
+    statements, commits = [], []
+    on_statement = lambda *args: statements.append(args[2])  # noqa: E731
+    on_commit = lambda conn: commits.append(conn)  # noqa: E731
+    event.listen(webapp.db.engine, "before_cursor_execute", on_statement)
+    event.listen(webapp.db.engine, "commit", on_commit)
+    t0 = time.perf_counter()
+    for _ in range(n):
+        fn(email, "Returning Buyer", phone="555-0199", company="")
+        webapp.db.session.remove()
+    elapsed = (time.perf_counter() - t0) / n
+    event.remove(webapp.db.engine, "before_cursor_execute", on_statement)
+    event.remove(webapp.db.engine, "commit", on_commit)
+    return elapsed, len(statements) / n, len(commits) / n
+
+
+def main():
+    check_migration()
+
+    Customer = webapp.Customer
+    with webapp.app.app_context():
+        Customer.query.delete()
+        webapp.db.session.commit()
+        webapp.db.engine.dispose()
+
+    ctx = multiprocessing.get_context("fork")
+    with ctx.Pool(WORKERS) as pool:
+        pool.map(worker, range(WORKERS))
+
+    with webapp.app.app_context():
+        emails = [e for (e,) in webapp.db.session.query(Customer.email).all()]
+        duplicates = [e for e, c in Counter(emails).items() if c > 1]
+        if duplicates or sorted(emails) != sorted(EMAILS):
+            raise AssertionError(f"expected one customer per email, got {sorted(emails)}")
+        print(f"{WORKERS} workers x {CALLS_PER_WORKER} saves -> {len(emails)} customers for "
+              f"{len(EMAILS)} emails: no duplicates")
+
+        webapp.db.session.execute(insert(Customer), [
+            {"name": f"On File {i}", "email": f"onfile{i}@example.com"} for i in range(ON_FILE)])
+        webapp.db.session.commit()
+        target = f"onfile{ON_FILE - 1}@example.com"
+        webapp.find_or_create_customer(target, "Returning Buyer", phone="555-0199")
+        webapp.db.session.remove()
+        total = webapp.db.session.scalar(select(func.count()).select_from(Customer))
+
+        t_new, q_new, w_new = time_calls(webapp.find_or_create_customer, target)
+        # The old schema had no index on email
+        webapp.db.session.execute(text(f"DROP INDEX {customer_emails.INDEX_NAME}"))
+        webapp.db.session.commit()
+        t_old, q_old, w_old = time_calls(legacy_find_or_create_customer, target)
+        customer_emails.email_index(Customer.__table__).create(webapp.db.engine)
+    print(f"returning customer, details unchanged, {total} customers on file:")
+    print(f"  legacy: {t_old * 1e6:.0f} us, {q_old:.1f} statements + {w_old:.1f} commits per call")
+    print(f"  upsert: {t_new * 1e6:.0f} us, {q_new:.1f} statements + {w_new:.1f} commits per call")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,228 @@
+"""
+Correctness check + benchmark: the incrementally maintained daily rollup.
+
+1. Backfill: reconcile builds the rollup from a bulk-loaded shop.
+2. Every ORM write path (new quote, quote status/price change, conversion,
+   order status change, customer type change, re-categorizing, quote
+   deletion, an edit to an expired quote) keeps the rollup exact: a dry-run
+   reconcile afterwards finds no drift. So does another session committing
+   an order for a quote while this session is flushing a change to it.
+3. Writes that bypass the session are found by a dry run and repaired.
+4. The chart methods and /api/analytics/daily issue no statement against the
+   quote or order tables, and are compared with the old fact-table queries.
+5. Cost of the maintenance per save_quote.
+
+Run from the project root (SQLite by default, or any DATABASE_URL):
+    python -m benchmarks.daily_rollup
+    ROLLUP_BENCH_QUOTES=50000 python -m benchmarks.daily_rollup
+"""
+
+import os
+import random
+import re
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///" + os.path.join(tempfile.mkdtemp(), "rollup.db"))
+os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+os.environ.setdefault("DB_AUTO_MIGRATE", "1")
+
+from sqlalchemy import event, func, insert, text  # noqa: E402
+
+import app as webapp  # noqa: E402
+
+QUOTES = int(os.environ.get("ROLLUP_BENCH_QUOTES", "200000"))
+CUSTOMERS = 2000
+FACT_TABLE = re.compile(r'\b(from|join)\s+"?(quote|order)"?(\s|$)', re.IGNORECASE)
+
+
+def seed(rng):
+    db = webapp.db
+    now = datetime.now()
+    db.session.execute(insert(webapp.Customer), [
+        {"name": f"Customer {i}", "email": f"r{i}@example.com", "customer_type": rng.choice(["retail", "partner", None])}
+        for i in range(CUSTOMERS)])
+    for lo in range(0, QUOTES, 100_000):
+        db.session.execute(insert(webapp.Quote), [
+            {"quote_number": f"QR{i:08d}", "customer_id": rng.randrange(1, CUSTOMERS + 1),
+             "category": rng.choice(["Banner", "Decals", "Apparel", "Yard Signs"]),
+             "status": rng.choice(["pending", "approved", "approved", "declined", "converted"]),
+             "calculated_price": round(rng.uniform(5, 900), 2), "final_price": rng.choice([None, round(rng.uniform(5, 900), 2)]),
+             "created_at": now - timedelta(minutes=rng.randrange(400 * 24 * 60))}
+            for i in range(lo, min(lo + 100_000, QUOTES))])
+    db.session.execute(insert(webapp.Order), [
+        {"order_number": f"OR{i:08d}", "quote_id": i + 1, "customer_id": rng.randrange(1, CUSTOMERS + 1),
+         "status": rng.choice(["confirmed", "in_production", "completed"]), "total_amount": round(rng.uniform(5, 900), 2),
+         "created_at": now - timedelta(minutes=rng.randrange(400 * 24 * 60))}
+        for i in range(QUOTES // 10)])
+    db.session.commit()
+
+
+def drift():
+    with webapp.db.engine.begin() as conn:
+        stats = webapp.ROLLUP.reconcile(conn, dry_run=True)
+    return stats["fixed"] + stats["removed"]
+
+
+def check_concurrent_flush(quote_number):
+    """
+    Re-categorize a quote while a second session commits a new order for it
+    between this flush's before_flush and its writes: the window in which a
+    delta built from two reads of the fact tables would count the other
+    session's order as well as its own.
+    """
+    db = webapp.db
+    quote = webapp.Quote.query.filter_by(quote_number=quote_number).one()
+    other = db.session.session_factory()
+    committed = []
+
+    def commit_order(session, flush_context, instances):
+        if session is other or committed:
+            return
+        committed.append(True)
+        other.add(webapp.Order(order_number="ORCONCURRENT", quote_id=quote.id, customer_id=quote.customer_id,
+                               total_amount=77.0, balance_due=77.0))
+        other.commit()
+
+    event.listen(db.session, "before_flush", commit_order)
+    try:
+        quote.category = "Yard Signs"
+        db.session.commit()
+    finally:
+        event.remove(db.session, "before_flush", commit_order)
+        other.close()
+    assert committed and webapp.Order.query.filter_by(order_number="ORCONCURRENT").count() == 1
+
+
+def legacy_daily_stats(days=30):
+    """The old get_daily_stats: three GROUP BY date(created_at) over the fact tables"""
+    Quote, Order, session = webapp.Quote, webapp.Order, webapp.db.session
+    start = datetime.now().date() - timedelta(days=days)
+    quotes = session.query(func.date(Quote.created_at), func.count(Quote.id)).filter(
+        func.date(Quote.created_at) >= start).group_by(func.date(Quote.created_at)).all()
+    orders = session.query(func.date(Order.created_at), func.count(Order.id)).filter(
+        func.date(Order.created_at) >= start).group_by(func.date(Order.created_at)).all()
+    revenue = session.query(func.date(Quote.created_at), func.sum(
+        func.coalesce(func.nullif(Quote.final_price, 0), Quote.calculated_price, 0))).filter(
+        Quote.status == "approved", func.date(Quote.created_at) >= start).group_by(func.date(Quote.created_at)).all()
+    return {"quotes": sorted((str(d), c) for d, c in quotes), "orders": sorted((str(d), c) for d, c in orders),
+            "revenue": sorted((str(d), float(v)) for d, v in revenue)}
+
+
+def fact_statements(fn):
+    """Statements fn() runs against the quote or order tables"""
+    seen = []
+    listener = lambda *args: seen.append(args[2])  # noqa: E731
+    event.listen(webapp.db.engine, "before_cursor_execute", listener)
+    try:
+        fn()
+    finally:
+        event.remove(webapp.db.engine, "before_cursor_execute", listener)
+    return [s for s in seen if FACT_TABLE.search(" ".join(s.split()))]
+
+
+def timed(fn, n=5):
+    fn()
+    t0 = time.perf_counter()
+    for _ in range(n):
+        fn()
+    return (time.perf_counter() - t0) / n
+
+
+def main():
+    rng = random.Random(19)
+    client = webapp.app.test_client()
+    with webapp.app.app_context():
+        seed(rng)
+        t0 = time.perf_counter()
+        with webapp.db.engine.begin() as conn:
+            stats = webapp.ROLLUP.reconcile(conn)
+        print(f"backfilled {stats['fixed']} rollup rows from {QUOTES:,} quotes in {time.perf_counter() - t0:.1f}s")
+        assert drift() == 0
+
+        # ORM write paths
+        customer = webapp.find_or_create_customer("rollup.buyer@example.com", "Rollup Buyer")
+        quotes = [webapp.save_quote(customer, "Banner", {}, 50.0 + i, {}) for i in range(5)]
+        numbers = [q.quote_number for q in quotes]
+        order_id = webapp.Order.query.filter_by(status="confirmed").first().order_number
+        webapp.db.session.commit()
+    for url, data in ((f"/admin/quote/{numbers[0]}/update_status", {"status": "approved", "price_adjustment": "12.5"}),
+                      (f"/admin/quote/{numbers[1]}/convert_to_order", {"priority": "rush"}),
+                      (f"/admin/order/{order_id}/update_status", {"status": "completed"})):
+        assert client.post(url, data=data).status_code == 302, url
+    with webapp.app.app_context():
+        assert webapp.Order.query.filter_by(status="completed", order_number=order_id).count() == 1
+        converted = webapp.Quote.query.filter_by(quote_number=numbers[1]).one()
+        assert converted.status == "converted" and webapp.Order.query.filter_by(quote_id=converted.id).count() == 1
+        webapp.Customer.query.filter_by(email="rollup.buyer@example.com").one().customer_type = "partner"
+        webapp.db.session.commit()
+        quote = webapp.Quote.query.filter_by(quote_number=numbers[2]).one()
+        quote.category, quote.created_at = "Decals", quote.created_at - timedelta(days=3)
+        webapp.db.session.commit()
+        # A converted quote moves its order to the new category too
+        webapp.Quote.query.filter_by(quote_number=numbers[1]).one().category = "Apparel"
+        webapp.db.session.commit()
+        webapp.db.session.delete(webapp.Quote.query.filter_by(quote_number=numbers[3]).one())
+        webapp.db.session.commit()
+        # An expired quote edited without loading it first (old values unknown to the session)
+        quote = webapp.Quote.query.filter_by(quote_number=numbers[4]).one()
+        webapp.db.session.expire(quote)
+        quote.status = "declined"
+        webapp.db.session.commit()
+        assert drift() == 0, "an ORM write path left the rollup out of date"
+        print("new quote, status/price change, conversion, order status, customer type, "
+              "re-dating, re-categorizing, deletion and blind edits keep the rollup exact")
+
+        check_concurrent_flush(numbers[0])
+        assert drift() == 0, "a concurrent commit was counted twice"
+        print("an order committed by another session mid-flush is counted once")
+
+        # Writes behind the session's back are found and repaired
+        webapp.db.session.execute(text("UPDATE quote SET status = 'declined' WHERE id <= 50"))
+        webapp.db.session.commit()
+        found = drift()
+        assert found > 0
+        with webapp.db.engine.begin() as conn:
+            webapp.ROLLUP.reconcile(conn)
+        assert drift() == 0
+        print(f"raw SQL update: dry run found {found} drifted rows, reconcile repaired them")
+
+        # Charts read only the rollup
+        service = webapp.analytics_service
+        charts = {
+            "get_dashboard_stats": service.get_dashboard_stats,
+            "get_daily_stats": service.get_daily_stats,
+            "get_category_breakdown": service.get_category_breakdown,
+            "get_quote_status_summary": service.get_quote_status_summary,
+            "get_trend_analysis": service.get_trend_analysis,
+        }
+        for name, fn in charts.items():
+            assert not fact_statements(fn), f"{name} reads a fact table"
+        engine = webapp.db.engine
+        daily = service.get_daily_stats()
+        legacy = legacy_daily_stats()
+        assert daily["quotes"] == legacy["quotes"] and daily["orders"] == legacy["orders"]
+        assert all(d == l and abs(a - b) < 1e-6 for (d, a), (l, b) in zip(daily["revenue"], legacy["revenue"]))
+        t_legacy = timed(legacy_daily_stats)
+        t_rollup = timed(service.get_daily_stats)
+
+        # Maintenance cost per saved quote
+        customer = webapp.Customer.query.filter_by(email="rollup.buyer@example.com").one()
+        t_tracked = timed(lambda: webapp.save_quote(customer, "Banner", {}, 10.0, {}), n=100)
+        event.remove(webapp.db.session, "before_flush", webapp.ROLLUP._before_flush)
+        event.remove(webapp.db.session, "after_flush", webapp.ROLLUP._after_flush)
+        t_untracked = timed(lambda: webapp.save_quote(customer, "Banner", {}, 10.0, {}), n=100)
+        webapp.ROLLUP.listen(webapp.db.session)
+
+    seen = []
+    event.listen(engine, "before_cursor_execute", lambda *args: seen.append(args[2]))
+    assert client.get("/api/analytics/daily?days=30").status_code == 200
+    assert not [s for s in seen if FACT_TABLE.search(" ".join(s.split()))]
+    print("chart methods and /api/analytics/daily read no fact table")
+    print(f"30-day chart: {t_legacy * 1e3:.1f}ms from quote/order, {t_rollup * 1e3:.2f}ms from the rollup")
+    print(f"save_quote: {t_tracked * 1e3:.2f}ms with rollup maintenance, {t_untracked * 1e3:.2f}ms without")
+
+
+if __name__ == "__main__":
+    main()
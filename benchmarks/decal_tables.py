@@ -0,0 +1,89 @@
+"""
+Benchmark: decal CSV price lookups from the in-memory table registry and the
+pricing config snapshot vs. re-reading and re-parsing the files on every quote.
+
+Run from the project root:
+    python -m benchmarks.decal_tables
+"""
+
+import itertools
+import json
+import timeit
+
+from scripts.decal_pricing_2025 import (
+    PRICING_CONFIG, calculate_decal_price_2025, get_csv_price_lookup, load_csv_table, load_pricing_config,
+)
+from scripts.decal_tables import TABLE_REGISTRY
+
+
+def disk_unit_price(table_name, size_str, qty):
+    """Previous lookup: open + parse the CSV, then sort the qty keys, on every call"""
+    pricing_data = load_csv_table(table_name)
+    if size_str not in pricing_data:
+        return None
+    size_pricing = pricing_data[size_str]
+    available_qtys = sorted(size_pricing.keys())
+    selected_qty = None
+    for avail_qty in available_qtys:
+        if qty <= avail_qty:
+            selected_qty = avail_qty
+            break
+    if selected_qty is None:
+        selected_qty = max(available_qtys)
+    return size_pricing[selected_qty]
+
+
+def main():
+    TABLE_REGISTRY.refresh(force=True)
+
+    # Every row of every table at every qty tier boundary must agree with the disk parse
+    checked = 0
+    for table_name in TABLE_REGISTRY.table_names:
+        for size in load_csv_table(table_name):
+            for qty in (1, 10, 11, 25, 26, 50, 99, 100, 250, 499, 500, 501, 5000):
+                if disk_unit_price(table_name, size, qty) != TABLE_REGISTRY.unit_price(table_name, size, qty):
+                    raise AssertionError(f"{table_name} {size} qty {qty}: registry disagrees with CSV")
+                checked += 1
+    print(f"parity: {checked} table/size/qty lookups match the CSV files")
+    print()
+
+    quotes = list(itertools.product([(4, 4), (3, 3), (2, 3), (4, 11)], [10, 50, 250], ["kiss", "die"], [False, True]))
+    n = len(quotes)
+
+    def lookup_disk():
+        for (w, h), qty, cut, lam in quotes:
+            table = ("popular_squares" if w == h else "bumper" if (w, h) == (4, 11) else "popular_rectangles")
+            disk_unit_price(f"{table}_{cut}{'_lam' if lam else ''}", f"{w}x{h}", qty)
+
+    def lookup_registry():
+        for (w, h), qty, cut, lam in quotes:
+            get_csv_price_lookup(w, h, qty, cut, lam)
+
+    def full_quote():
+        for (w, h), qty, cut, lam in quotes:
+            calculate_decal_price_2025(w, h, qty, 'gloss', cut, 'gloss' if lam else None)
+
+    def config_disk():
+        for _ in quotes:
+            with open(PRICING_CONFIG.path) as f:
+                json.load(f)
+
+    def config_snapshot():
+        for _ in quotes:
+            load_pricing_config()
+
+    rows = [
+        ("csv lookup, disk per quote", lookup_disk),
+        ("csv lookup, registry", lookup_registry),
+        ("config, json.load per quote", config_disk),
+        ("config, snapshot", config_snapshot),
+        ("calculate_decal_price_2025", full_quote),
+    ]
+    print(f"{'path':<30} {'us/quote':>10}")
+    for label, fn in rows:
+        best = min(timeit.repeat(fn, number=50, repeat=5)) / (50 * n)
+        print(f"{label:<30} {best * 1e6:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
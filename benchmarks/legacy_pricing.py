@@ -0,0 +1,620 @@
+"""
+Frozen copies of every decal and banner pricing path as they were before the
+pricing/ engine replaced them. Benchmarks use them as the parity reference and
+the speed baseline; nothing in the app imports this module.
+"""
+
+import math
+
+from banner_pricing import BANNER_CONFIG
+from scripts.config_store import VersionedAmount, VersionedPrice
+from scripts.decal_pricing_2025 import load_pricing_config
+from scripts.decal_tables import TABLE_REGISTRY
+from scripts.pricers import RETAIL, BANNER_COSTS
+from scripts.tiers import TierTable, compile_buffer_tiers, compile_ladder
+
+BANNER_LADDER = compile_ladder(RETAIL["banners"]["ladder_per_sqft"], "banners.ladder_per_sqft")
+BANNER_WASTE = compile_buffer_tiers(RETAIL["waste_buffers"]["banners"], "waste_buffers.banners")
+WASTE_BUFFER = TierTable(
+    [(r["min_sqft"], r["max_sqft"], r["add_sqft"]) for r in BANNER_CONFIG["waste_buffer"]],
+    name="waste_buffer", shared_bounds=True, default=0.0
+)
+RATE_LADDER = TierTable(
+    [(b["qty_min"], b["qty_max"], b["rate"]) for b in BANNER_CONFIG["rate_per_sqft_by_qty"]],
+    name="rate_per_sqft_by_qty", default=BANNER_CONFIG["rate_per_sqft_by_qty"][-1]["rate"]
+)
+
+
+# ----- app.py / server.py (identical copies) -----
+def calculate_decal_retail_price(width_in, height_in, qty, material="gloss", laminate="none"):
+    """
+    New 2025 decal pricing system with 5-step structure:
+    1. Calculate total decal area (width × height × qty ÷ 144)
+    2. Apply material cost per sq ft (actual vinyl cost $0.90-$1.20/sq ft)
+    3. Add fixed overhead buffer ($3-5 per job)
+    4. Apply markup (30% minimum margin)
+    5. Enforce industry floor/ceiling ranges
+    """
+    # Step 1: Calculate total decal area
+    total_sqft = (width_in * height_in * qty) / 144
+    
+    # Step 2: Apply material cost per sq ft (corrected to industry standards)
+    if material == "matte":
+        material_cost_per_sqft = 2.80  # $2.80/sq ft for matte
+    else:
+        material_cost_per_sqft = 2.50  # $2.50/sq ft for gloss
+    
+    material_cost = total_sqft * material_cost_per_sqft
+    
+    # Add lamination cost if selected
+    if laminate != "none":
+        lamination_cost_per_sqft = 1.20  # $1.20/sq ft for lamination
+        material_cost += total_sqft * lamination_cost_per_sqft
+    
+    # Step 3: Add fixed overhead buffer (corrected)
+    overhead_cost = 0.00  # Overhead already included in material cost
+    
+    # Step 4: Calculate base price with 30% minimum margin
+    total_cost = material_cost + overhead_cost
+    base_price = total_cost / 0.70  # 30% margin = cost / (1 - 0.30)
+    
+    # Step 5: Enforce industry floor/ceiling ranges
+    unit_price = base_price / qty
+    
+    # Apply industry benchmarks for common sizes
+    if abs(width_in - 4) <= 0.1 and abs(height_in - 4) <= 0.1:  # 4x4
+        if qty == 25:
+            # 4×4 qty 25 → retail $30–40
+            target_total = max(30, min(40, base_price))
+            total_price = target_total
+        elif qty == 50:
+            # 4×4 qty 50 → retail $68–72
+            target_total = max(68, min(72, base_price))
+            total_price = target_total
+        else:
+            total_price = base_price
+    elif abs(width_in - 3) <= 0.1 and abs(height_in - 3) <= 0.1:  # 3x3
+        if qty == 50:
+            # 3×3 qty 50 → retail $35–50
+            target_total = max(35, min(50, base_price))
+            total_price = target_total
+        else:
+            total_price = base_price
+    else:
+        total_price = base_price
+    
+    unit_price = total_price / qty
+    margin_after = ((total_price - total_cost) / total_price) * 100
+    
+    return {
+        "unit_usd": round(unit_price, 2),
+        "total_usd": round(total_price, 2),
+        "auto_floored": False,
+        "margin_after": round(margin_after, 1)
+    }
+
+def calculate_decal_true_cost(width_in, height_in, qty, material="gloss", laminate="none"):
+    """
+    Calculate true cost for decals using actual material costs
+    """
+    # Calculate total decal area
+    total_sqft = (width_in * height_in * qty) / 144
+    
+    # Material cost per sq ft (corrected to industry standards)
+    if material == "matte":
+        material_cost_per_sqft = 2.80  # $2.80/sq ft for matte
+    else:
+        material_cost_per_sqft = 2.50  # $2.50/sq ft for gloss
+    
+    material_cost = total_sqft * material_cost_per_sqft
+    
+    # Add lamination cost if selected
+    if laminate != "none":
+        lamination_cost_per_sqft = 1.20  # $1.20/sq ft for lamination
+        material_cost += total_sqft * lamination_cost_per_sqft
+    
+    # Fixed overhead (overhead included in material cost)
+    overhead_cost = 0.00
+    
+    # Total true cost
+    total_cost = material_cost + overhead_cost
+    unit_cost = total_cost / qty
+    
+    # 30% margin floor for minimum sell price
+    floor_sell_total = total_cost / 0.70
+    floor_sell_unit = floor_sell_total / qty
+    
+    return {
+        "unit_cost_usd": round(unit_cost, 2),
+        "total_cost_usd": round(total_cost, 2),
+        "floor_sell_unit_usd": round(floor_sell_unit, 2),
+        "floor_sell_total_usd": round(floor_sell_total, 2)
+    }
+
+
+def calculator_banner_unit_price(width_in, height_in, qty, media_name, sides, rush):
+    """Retail unit price from the Banner branch inlined in app.calculate_area_pricing"""
+    width_ft = width_in / 12
+    height_ft = height_in / 12
+    area_sqft = width_ft * height_ft
+
+    # Add waste buffer
+    if area_sqft <= 15:
+        billable_area = area_sqft + 1.0
+    elif area_sqft <= 30:
+        billable_area = area_sqft + 1.5
+    else:
+        billable_area = area_sqft + 2.0
+
+    # Get quantity rate
+    if qty >= 100:
+        rate = 4.15
+    elif qty >= 50:
+        rate = 4.30
+    elif qty >= 25:
+        rate = 4.50
+    elif qty >= 10:
+        rate = 4.85
+    elif qty >= 5:
+        rate = 5.25
+    else:
+        rate = 5.75
+
+    # Calculate base price
+    unit_price = billable_area * rate
+
+    # Material addon
+    if media_name == 'jetflex':
+        unit_price += billable_area * 0.25  # +$0.25/sqft for JetFlex
+
+    # Double-sided
+    if sides == 2:
+        unit_price *= 1.8
+
+    # Rush
+    if rush:
+        unit_price *= 1.25
+
+    return unit_price
+
+
+# ----- scripts/pricers.py -----
+
+def _ladder_rate(ladder, qty: int) -> float:
+    """Rate for qty from a compiled ladder (last tier if qty is off the ladder)"""
+    return ladder.lookup(qty)
+
+
+def _waste_buffer(area, buffer_tiers):
+    """Apply waste buffer based on compiled area tiers"""
+    return area + buffer_tiers.lookup(area)
+
+
+def banner_price_retail(width_ft, height_ft, qty, material="alpha", 
+                       reinforced_corners=False, wind_slits=False, 
+                       pole_pockets_pairs=0, double_sided=False, rush=False,
+                       include_waste=True):
+    """
+    Retail banner pricing per Mitch specifications:
+    - Area with waste buffer applied
+    - Ladder rate + material adder
+    - Per-banner minimum bump if material requires it
+    - Job minimum applies to whole job
+    - Add-ons applied per banner, then multipliers
+    """
+    area_ft2 = width_ft * height_ft
+    billable_area = _waste_buffer(area_ft2, BANNER_WASTE) if include_waste else area_ft2
+    
+    # Base rate + material adder
+    base_rate = _ladder_rate(BANNER_LADDER, qty)
+    material_adder = RETAIL["banners"]["materials"][material]["adder_per_sqft"]
+    rate = base_rate + material_adder
+    
+    per_banner = billable_area * rate
+    
+    # Material-specific per-banner minimum (if any) - NOT tied to job minimum
+    # This is separate from job minimum which applies to total job only
+    
+    subtotal = per_banner * qty
+    
+    # Apply job minimum to whole job
+    subtotal = max(subtotal, RETAIL["job_minimums"]["banners"])
+    
+    # Add-ons per banner
+    addons = RETAIL["banners"]["addons"]
+    per_banner_addons = 0.0
+    if reinforced_corners:
+        per_banner_addons += addons["reinforced_corners"]
+    if wind_slits:
+        per_banner_addons += addons["wind_slits"]
+    if pole_pockets_pairs > 0:
+        per_banner_addons += addons["pole_pockets_pair"] * pole_pockets_pairs
+    
+    subtotal += per_banner_addons * qty
+    
+    # Multipliers
+    if double_sided:
+        subtotal *= addons["double_sided_mult"]
+    if rush:
+        subtotal *= (1.0 + addons["rush_pct"])
+    
+    return round(subtotal / qty, 2), round(subtotal, 2)
+
+
+def banner_cost_true(width_ft, height_ft, qty, material="alpha",
+                    reinforced_corners=False, wind_slits=False,
+                    pole_pockets_pairs=0, double_sided=False, rush=False):
+    """
+    True cost calculation for banners (employee only)
+    """
+    area_ft2 = width_ft * height_ft
+    
+    # Base costs per sqft 
+    material_cost = BANNER_COSTS["materials_cost_per_sqft"][material]
+    ink_cost = BANNER_COSTS["ink_cost_per_sqft"]
+    overhead_cost = BANNER_COSTS["machine_overhead_per_sqft"]
+    finishing_cost = BANNER_COSTS["finishing_cost_per_sqft"]
+    
+    per_banner_cost = area_ft2 * (material_cost + ink_cost + overhead_cost + finishing_cost)
+    
+    # Fixed finishing cost per banner
+    per_banner_cost += BANNER_COSTS["finishing_fixed_per_banner"]
+    
+    # Add-on costs
+    addons = BANNER_COSTS["addons_cost"]
+    if reinforced_corners:
+        per_banner_cost += addons["reinforced_corners"]
+    if wind_slits:
+        per_banner_cost += addons["wind_slits"]
+    if pole_pockets_pairs > 0:
+        per_banner_cost += addons["pole_pockets_pair"] * pole_pockets_pairs
+    
+    # Double-sided extra cost (ink + overhead + finishing for second side)
+    if double_sided:
+        per_banner_cost += area_ft2 * BANNER_COSTS.get("second_side_extra_per_sqft", 0.525)
+    
+    # Total for quantity
+    variable_total = per_banner_cost * qty
+    
+    # Fixed costs per job
+    fixed_total = BANNER_COSTS["setup_cost_per_job"] + BANNER_COSTS["packaging_cost_per_job"]
+    
+    total_cost = variable_total + fixed_total
+    return round(total_cost / qty, 2), round(total_cost, 2)
+
+
+def calculate_margin_guard(retail_total, cost_total, min_margin_pct=None, mode=None):
+    """
+    Margin guard system implementation
+    
+    Args:
+        retail_total: Total retail price
+        cost_total: True cost total
+        min_margin_pct: Minimum margin percentage (defaults to config)
+        mode: "AUTO_FLOOR" or "BLOCK" (defaults to config)
+    
+    Returns:
+        dict with guard results
+    """
+    if min_margin_pct is None:
+        min_margin_pct = RETAIL["min_margin_floor_pct"]
+    if mode is None:
+        mode = RETAIL["floor_mode"]
+    
+    # Calculate actual margin
+    actual_margin = (retail_total - cost_total) / retail_total if retail_total > 0 else 0.0
+    
+    # Check if margin is acceptable
+    is_acceptable = actual_margin >= min_margin_pct
+    
+    if is_acceptable:
+        return {
+            "approved": True,
+            "auto_floored": False,
+            "final_total": retail_total,
+            "actual_margin": actual_margin,
+            "cost_total": cost_total
+        }
+    
+    # Calculate floor price
+    floor_total = cost_total / (1.0 - min_margin_pct)
+    
+    if mode == "AUTO_FLOOR":
+        return {
+            "approved": True,
+            "auto_floored": True,
+            "final_total": round(floor_total, 2),
+            "actual_margin": min_margin_pct,
+            "cost_total": cost_total,
+            "original_retail": retail_total
+        }
+    
+    elif mode == "BLOCK":
+        return {
+            "approved": False,
+            "blocked": True,
+            "retail_total": retail_total,
+            "min_allowed_total": round(floor_total, 2),
+            "actual_margin": actual_margin,
+            "required_margin": min_margin_pct,
+            "cost_total": cost_total
+        }
+    
+    else:
+        raise ValueError(f"Invalid floor_mode: {mode}")
+
+
+def banner_quote_with_guard(width_ft, height_ft, qty, material="alpha", 
+                           reinforced_corners=False, wind_slits=False,
+                           pole_pockets_pairs=0, double_sided=False, rush=False,
+                           include_waste=True):
+    """Get banner retail quote with margin guard applied"""
+    # Calculate retail price
+    unit_retail, total_retail = banner_price_retail(width_ft, height_ft, qty, material,
+                                                   reinforced_corners, wind_slits, 
+                                                   pole_pockets_pairs, double_sided, rush,
+                                                   include_waste)
+    
+    # Calculate true cost (no rush in cost calculation)
+    unit_cost, total_cost = banner_cost_true(width_ft, height_ft, qty, material,
+                                           reinforced_corners, wind_slits,
+                                           pole_pockets_pairs, double_sided)
+    
+    # Apply margin guard
+    guard_result = calculate_margin_guard(total_retail, total_cost)
+    
+    # Build response
+    result = {
+        "unit_usd": round(guard_result["final_total"] / qty, 2),
+        "total_usd": guard_result["final_total"],
+        "auto_floored": guard_result.get("auto_floored", False),
+        "margin_after": guard_result["actual_margin"]
+    }
+    
+    if not guard_result["approved"]:
+        result.update({
+            "error": "Quote below minimum margin",
+            "retail_total_usd": guard_result["retail_total"],
+            "min_allowed_total_usd": guard_result["min_allowed_total"],
+            "margin_actual": guard_result["actual_margin"]
+        })
+    
+    return result
+
+
+# ----- banner_pricing.py -----
+
+def _waste_added(area):
+    """Calculate waste buffer based on area"""
+    return area + WASTE_BUFFER.lookup(area)
+
+
+def _rate_for_qty(qty):
+    """Get pricing rate based on quantity"""
+    return RATE_LADDER.lookup(qty)
+
+
+def calculate_banner_price(width_ft, height_ft, qty, material="alpha", include_waste=True, rounded=True,
+                          rush=False, reinforced_corners=False, wind_slits=False, pole_pockets_pairs=0, double_sided=False):
+    """
+    Professional banner pricing calculation
+    """
+    if material not in BANNER_CONFIG["materials"]:
+        raise ValueError(f"Media not found: {material}. Available materials: {list(BANNER_CONFIG['materials'].keys())}")
+    
+    mat = BANNER_CONFIG["materials"][material]
+    area = width_ft * height_ft
+    billable = _waste_added(area) if include_waste else area
+    base_rate = _rate_for_qty(qty)
+    rate = base_rate + mat["adder_per_sqft"]
+
+    price_each = billable * rate
+    price_each = max(price_each, BANNER_CONFIG["min_job_usd"])
+
+    # Add-on costs
+    addons = BANNER_CONFIG["addons"]
+    add_cost = 0.0
+    if reinforced_corners: 
+        add_cost += addons["reinforced_corners_usd"]
+    if wind_slits: 
+        add_cost += addons["wind_slits_usd"]
+    if pole_pockets_pairs and pole_pockets_pairs > 0:
+        add_cost += addons["pole_pockets_pair_usd"] * int(pole_pockets_pairs)
+    price_each += add_cost
+
+    # Apply multipliers
+    if double_sided:
+        price_each *= addons["double_sided_multiplier"]
+
+    if rush:
+        price_each *= (1.0 + addons["rush_pct"])
+
+    return math.floor(price_each + 0.5) if rounded else round(price_each, 2)
+
+
+# ----- scripts/decal_pricing_2025.py -----
+
+def get_csv_price_lookup(width, height, qty, cut_type, laminate):
+    """
+    Look up price in CSV tables for popular sizes.
+    Returns None if size/qty not found in tables.
+    """
+    # Determine size category and format
+    size_str = f"{int(width)}x{int(height)}"
+    area = width * height
+    
+    # Determine which table to use
+    table_name = None
+    
+    # Check if it's a bumper sticker (typically 3x11.5, 4x11, 4x12)
+    if (width == 3 and height == 11.5) or (width == 4 and height in [11, 12]):
+        if cut_type == 'kiss' and not laminate:
+            table_name = 'bumper_kiss'
+        elif cut_type == 'die' and not laminate:
+            table_name = 'bumper_die'
+        elif cut_type == 'kiss' and laminate:
+            table_name = 'bumper_kiss_lam'
+    
+    # Check if it's a square
+    elif width == height:
+        if cut_type == 'kiss' and not laminate:
+            table_name = 'popular_squares_kiss'
+        elif cut_type == 'die' and not laminate:
+            table_name = 'popular_squares_die'
+        elif cut_type == 'kiss' and laminate:
+            table_name = 'popular_squares_kiss_lam'
+    
+    # Check if it's a rectangle
+    else:
+        if cut_type == 'kiss' and not laminate:
+            table_name = 'popular_rectangles_kiss'
+        elif cut_type == 'die' and not laminate:
+            table_name = 'popular_rectangles_die'
+        elif cut_type == 'kiss' and laminate:
+            table_name = 'popular_rectangles_kiss_lam'
+    
+    if not table_name:
+        return None
+    
+    # Look up the in-memory table (smallest qty tier >= qty, else the highest tier)
+    unit_price = TABLE_REGISTRY.unit_price(table_name, size_str, qty)
+    if unit_price is None:
+        return None
+    
+    total_price = unit_price * qty
+    
+    return unit_price, total_price
+
+
+def calculate_decal_price_2025(width, height, qty, material='gloss', cut_type='kiss', laminate=None):
+    """
+    Calculate decal pricing using 2025 system.
+    First tries CSV lookup for popular sizes, falls back to configuration-based calculation.
+    
+    Args:
+        width (float): Width in inches
+        height (float): Height in inches  
+        qty (int): Quantity
+        material (str): 'gloss' or 'matte'
+        cut_type (str): 'kiss' or 'die'
+        laminate (str): None, 'gloss', or 'matte'
+    
+    Returns:
+        tuple: (unit_price, total_price), with .config_version set
+    """
+    config = load_pricing_config()
+    
+    # First try CSV lookup for popular sizes
+    has_laminate = laminate is not None and laminate != '' and laminate != 'none'
+    csv_result = get_csv_price_lookup(width, height, qty, cut_type, has_laminate)
+    
+    if csv_result:
+        unit_price, total_price = csv_result
+        
+        # Apply rounding rules from config
+        unit_price = round_to_increment(unit_price, config['rounding']['unit_to'])
+        total_price = round_to_increment(total_price, config['rounding']['total_to'])
+        
+        # Apply minimum job price
+        if total_price < config['retail_job_minimum']:
+            total_price = config['retail_job_minimum']
+            unit_price = total_price / qty
+        
+        return VersionedPrice(unit_price, total_price, config.version)
+    
+    # Fallback to configuration-based calculation
+    return calculate_decal_price_from_config(width, height, qty, material, cut_type, laminate, config)
+
+
+def calculate_decal_price_from_config(width, height, qty, material, cut_type, laminate, config):
+    """
+    Calculate decal pricing using JSON configuration for non-standard sizes.
+    """
+    area_sqft = (width * height) / 144.0  # Convert sq inches to sq feet
+    total_area = area_sqft * qty
+    
+    # Find the pricing tier based on total area
+    base_rate = None
+    for tier in config['tiers_by_tba_sqft']:
+        if total_area < tier['lt']:
+            base_rate = tier['rate_sqft']
+            break
+    
+    if base_rate is None:
+        # Use the last tier (highest quantity)
+        base_rate = config['tiers_by_tba_sqft'][-1]['rate_sqft']
+    
+    # Calculate base price per square foot
+    price_per_sqft = base_rate
+    
+    # Add cut type adder
+    if cut_type == 'die':
+        price_per_sqft += config['adders_sqft']['die_cut']
+    
+    # Add laminate adder
+    has_laminate = laminate is not None and laminate != '' and laminate != 'none'
+    if has_laminate:
+        price_per_sqft += config['adders_sqft']['laminate_gloss']
+    
+    # Calculate unit price
+    unit_price = price_per_sqft * area_sqft
+    
+    # Apply small piece fee
+    min_side = min(width, height)
+    for fee_rule in config['small_piece_fee_each']:
+        if min_side < fee_rule['min_side_in_lt']:
+            unit_price += fee_rule['fee']
+            break
+    
+    # Calculate total
+    total_price = unit_price * qty
+    
+    # Apply rounding rules
+    unit_price = round_to_increment(unit_price, config['rounding']['unit_to'])
+    total_price = round_to_increment(total_price, config['rounding']['total_to'])
+    
+    # Apply minimum job price
+    if total_price < config['retail_job_minimum']:
+        total_price = config['retail_job_minimum']
+        unit_price = total_price / qty
+    
+    return VersionedPrice(unit_price, total_price, getattr(config, 'version', None))
+
+
+def calculate_decal_true_cost_2025(width, height, qty, material='gloss', cut_type='kiss', laminate=None):
+    """
+    Calculate true cost using 2025 configuration.
+    
+    Returns:
+        float: Total true cost, with .config_version set
+    """
+    config = load_pricing_config()
+    true_cost_config = config['true_cost']
+    
+    area_sqft = (width * height) / 144.0
+    
+    # Base material cost
+    material_cost_sqft = true_cost_config['base_sqft'].get(material, true_cost_config['base_sqft']['gloss'])
+    material_cost = material_cost_sqft * area_sqft * qty
+    
+    # Cut cost
+    cut_cost_sqft = true_cost_config['cut_sqft'].get(cut_type, true_cost_config['cut_sqft']['kiss'])
+    cut_cost = cut_cost_sqft * area_sqft * qty
+    
+    # Laminate cost
+    laminate_cost = 0
+    has_laminate = laminate is not None and laminate != '' and laminate != 'none'
+    if has_laminate:
+        laminate_cost = true_cost_config['laminate_sqft'] * area_sqft * qty
+    
+    # Fixed per job cost
+    fixed_cost = true_cost_config['fixed_per_job']
+    
+    total_cost = material_cost + cut_cost + laminate_cost + fixed_cost
+    
+    return VersionedAmount(total_cost, config.version)
+
+
+def round_to_increment(value, increment):
+    """Round value to the nearest increment."""
+    return round(value / increment) * increment
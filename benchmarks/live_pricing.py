@@ -0,0 +1,166 @@
+"""
+Correctness check + benchmark: live pricing on the customer calculator.
+
+The calculator used to re-price by posting the whole form to / and
+re-rendering the page (catalog queries, analytics event, template).
+It now asks POST /api/price/<category> for just the price.
+
+1. For every category, the API price is what the pricing function returns
+   for the same fields. Costs are never in the response. Unfilled forms,
+   JSON nulls and half-typed numbers answer ready: false; a request that
+   can't be priced gives a 400 (without the exception text) or a 404.
+2. The API writes no analytics event. The full page still writes one.
+3. Latency, statements and response bytes per request, full page vs. API,
+   for a repeated price (quote cache hit) and for a "typing" sequence of
+   new quantities (cache misses).
+
+Run from the project root (SQLite by default, or any DATABASE_URL):
+    python -m benchmarks.live_pricing
+"""
+
+import os
+import tempfile
+import time
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///" + os.path.join(tempfile.mkdtemp(), "live_pricing.db"))
+os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+os.environ.setdefault("DB_AUTO_MIGRATE", "1")
+
+from sqlalchemy import event  # noqa: E402
+
+import app as webapp  # noqa: E402
+
+RUNS = 50
+TYPED_QTYS = [1, 12, 120, 1200, 2, 25, 250, 3, 30, 300]
+COST_KEYS = ("costs", "your_cost", "margin", "margin_pct")
+
+
+def sample_forms():
+    """category -> calculator form fields, from the seeded catalog"""
+    media = webapp.Material.query.filter_by(active=True).first()
+    garment = webapp.ApparelItem.query.filter_by(active=True).first()
+    sign = webapp.YardSignItem.query.filter_by(active=True).first()
+    area = {"width_in": "36", "height_in": "24", "qty": "5", "sides": "1", "hem_opt": "All Sides",
+            "grommets": "4", "rush": "Standard", "media_name": media.name if media else "jetflex"}
+    forms = {
+        "Banner": dict(area),
+        "Poster": dict(area),
+        "Decals": {"width_in": "4", "height_in": "4", "qty": "50", "vinyl_material": "gloss",
+                   "cut_type": "kiss", "laminate": "gloss", "media_name": media.name if media else "jetflex"},
+        "Apparel": {"rush": "Standard", "items-0-garment": garment.garment_name if garment else "T-Shirt",
+                    "items-0-size": "L", "items-0-qty": "24", "items-0-extras": "1"},
+    }
+    if sign:
+        forms["Yard Signs"] = {"per_unit_sku": sign.sku, "qty": "10", "add_stakes": "Yes"}
+    return forms
+
+
+def qty_field(category):
+    return "items-0-qty" if category == "Apparel" else "qty"
+
+
+def expected_price(category, fields):
+    with webapp.app.app_context():
+        form_data = webapp.retail_quote_form(category, {**fields, "category": category})
+        return webapp.price_retail_quote(category, form_data)["totals"]["quoted_price"]
+
+
+def counted(engine, fn):
+    """(seconds, statements, response bytes) for one fn() call"""
+    seen = []
+    listener = lambda *args: seen.append(args[2])  # noqa: E731
+    event.listen(engine, "before_cursor_execute", listener)
+    try:
+        t0 = time.perf_counter()
+        response = fn()
+        return time.perf_counter() - t0, len(seen), len(response.data)
+    finally:
+        event.remove(engine, "before_cursor_execute", listener)
+
+
+def per_request(engine, requests):
+    """Mean (ms, statements, bytes) over a list of zero-argument request callables"""
+    samples = [counted(engine, request) for request in requests]
+    return (sum(s[0] for s in samples) / len(samples) * 1e3,
+            sum(s[1] for s in samples) / len(samples),
+            sum(s[2] for s in samples) / len(samples))
+
+
+def report(label, page, api):
+    (page_ms, page_sql, page_bytes), (api_ms, api_sql, api_bytes) = page, api
+    print(f"{label:<24}{page_ms:>10.2f}{page_sql:>5.0f}{page_bytes:>8.0f}{api_ms:>10.2f}{api_sql:>5.0f}{api_bytes:>8.0f}")
+    assert api_sql <= page_sql and api_bytes < page_bytes, (label, page, api)
+
+
+def main():
+    client = webapp.app.test_client()
+    with webapp.app.app_context():
+        forms = sample_forms()
+        engine = webapp.db.engine
+    buffer = webapp.ANALYTICS
+
+    def page(category, fields):
+        response = client.post("/", data={**fields, "category": category})
+        assert response.status_code == 200, response.status_code
+        return response
+
+    def api(category, fields, status=200):
+        response = client.post(f"/api/price/{category}", data=fields)
+        assert response.status_code == status, (category, response.status_code, response.get_json())
+        return response
+
+    def api_json(category, fields, status=200):
+        return api(category, fields, status).get_json()
+
+    # 1. Same prices as the pricing functions, no costs, honest errors
+    for category, fields in forms.items():
+        body = api_json(category, fields)
+        assert body["ready"] and body["price"]["quoted_price"] == expected_price(category, fields), (category, body)
+        assert not any(key in body["price"] for key in COST_KEYS), body
+        json_body = client.post(f"/api/price/{category}", json=fields).get_json()
+        assert json_body == body, (json_body, body)
+        for qty in TYPED_QTYS[:3]:
+            typed = {**fields, qty_field(category): str(qty)}
+            assert api_json(category, typed)["price"]["quoted_price"] == expected_price(category, typed)
+    assert api_json("Banner", {"width_in": "36"}) == {"success": True, "ready": False, "price": None}
+    not_ready = {"success": True, "ready": False, "price": None}
+    for field, value in (("qty", "many"), ("qty", ""), ("width_in", ""), ("width_in", "3.")):
+        typed = {**forms["Banner"], field: value}
+        if value == "3.":
+            assert api_json("Banner", typed)["ready"], typed
+        else:
+            assert api_json("Banner", typed) == not_ready, typed
+    apparel_line = next(key for key in forms["Apparel"] if key.endswith("-qty"))
+    assert api_json("Apparel", {**forms["Apparel"], apparel_line: ""}) == not_ready
+    assert client.post("/api/price/Banner", json={**forms["Banner"], "media_name": None}).get_json() == not_ready
+    unknown = api_json("Yard Signs", {**forms["Yard Signs"], "per_unit_sku": "NO-SUCH-SKU"}, status=400)
+    assert not unknown["success"] and "NO-SUCH-SKU" not in unknown["error"], unknown
+    assert not api_json("Murals", forms["Banner"], status=404)["success"]
+    assert client.post("/api/price/Banner", json=[1, 2]).status_code == 400
+    print(f"{len(forms)} categories: API prices match the pricing functions; no costs in the response")
+
+    # 2. Analytics are written by the page, not the API
+    before = buffer.pending()
+    api_json("Banner", forms["Banner"])
+    assert buffer.pending() == before, "the price API recorded an analytics event"
+    page("Banner", forms["Banner"])
+    assert buffer.pending() == before + 1
+    print("the API records no analytics event; a full page POST still records one")
+
+    # 3. Cost per re-price
+    print(f"{'':<24}{'page ms':>10}{'SQL':>5}{'bytes':>8}{'API ms':>10}{'SQL':>5}{'bytes':>8}")
+    for category, fields in forms.items():
+        page(category, fields), api(category, fields)
+        field = qty_field(category)
+        hit = [(lambda: page(category, fields))] * RUNS, [(lambda: api(category, fields))] * RUNS
+        report(category + " (repeat)", per_request(engine, hit[0]), per_request(engine, hit[1]))
+
+        # Fresh quantities each pass, so neither path hits the quote cache
+        def typing(fn, offset):
+            return [lambda qty=qty: fn(category, {**fields, field: str(qty + offset)}) for qty in TYPED_QTYS]
+        report(category + " (typing)", per_request(engine, typing(page, 10_000)),
+               per_request(engine, typing(api, 20_000)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""
+Concurrency check + benchmark: block-reserved quote numbers vs. the old
+random-suffix-and-retry generator.
+
+Many processes draw numbers from one database at once; every number must be
+unique and well-formed. The parent reserves a block before forking, so the
+check also covers workers forked from a preloaded app. Legacy random numbers
+are seeded for the current month first, so the counter must start past them.
+
+Run from the project root (SQLite by default, or any DATABASE_URL):
+    python -m benchmarks.number_allocator
+    DATABASE_URL=postgresql://... python -m benchmarks.number_allocator
+"""
+
+import multiprocessing
+import os
+import random
+import re
+import tempfile
+import time
+from collections import Counter
+from datetime import datetime
+
+from sqlalchemy import Column, Integer, MetaData, String, Table, create_engine, insert, select
+
+from scripts.number_allocator import NumberAllocator
+
+PROCESSES = 16
+NUMBERS_PER_PROCESS = 500
+LEGACY_NUMBERS = 50
+
+metadata = MetaData()
+counters = Table("bench_document_counter", metadata,
+                 Column("name", String(20), primary_key=True),
+                 Column("next_value", Integer, nullable=False, default=0))
+quotes = Table("bench_quote", metadata,
+               Column("id", Integer, primary_key=True),
+               Column("quote_number", String(20), unique=True, nullable=False))
+
+_engine = None
+
+
+def engine():
+    global _engine
+    if _engine is None or _engine.pid != os.getpid():
+        url = os.environ["BENCH_DATABASE_URL"]
+        _engine = create_engine(url, connect_args={"timeout": 60} if url.startswith("sqlite") else {})
+        _engine.pid = os.getpid()
+    return _engine
+
+
+ALLOCATOR = NumberAllocator("Q", counters, quotes.c.quote_number, engine)
+
+
+def draw(n):
+    numbers = [ALLOCATOR.next_number() for _ in range(n)]
+    return numbers, ALLOCATOR.reservations
+
+
+def legacy_generate(conn, prefix):
+    """The old generator: random 4-digit suffix, one SELECT per attempt"""
+    queries = 1
+    number = f"{prefix}{random.randrange(10000):04d}"
+    while conn.execute(select(quotes.c.id).where(quotes.c.quote_number == number)).first():
+        queries += 1
+        number = f"{prefix}{random.randrange(10000):04d}"
+    return number, queries
+
+
+def main():
+    url = os.environ.get("DATABASE_URL") or "sqlite:///" + os.path.join(tempfile.mkdtemp(), "numbers.db")
+    os.environ["BENCH_DATABASE_URL"] = url
+    metadata.drop_all(engine())
+    metadata.create_all(engine())
+
+    prefix = f"Q{datetime.now():%Y%m}"
+    legacy = random.Random(3).sample(range(10000), LEGACY_NUMBERS)
+    with engine().begin() as conn:
+        conn.execute(insert(quotes), [{"quote_number": f"{prefix}{n:04d}"} for n in legacy])
+
+    # Reserve a block in the parent, then fork: children must not reuse it
+    parent_first = ALLOCATOR.next_number()
+    engine().dispose()
+
+    ctx = multiprocessing.get_context("fork")
+    start = time.perf_counter()
+    with ctx.Pool(PROCESSES) as pool:
+        results = pool.map(draw, [NUMBERS_PER_PROCESS] * PROCESSES)
+    elapsed = time.perf_counter() - start
+
+    issued = [parent_first] + [n for numbers, _ in results for n in numbers]
+    issued += [f"{prefix}{n:04d}" for n in legacy]
+    duplicates = [n for n, c in Counter(issued).items() if c > 1]
+    if duplicates:
+        raise AssertionError(f"{len(duplicates)} duplicate numbers, e.g. {duplicates[:5]}")
+    pattern = re.compile(rf"^{prefix}\d{{4,}}$")
+    malformed = [n for n in issued if not pattern.match(n)]
+    if malformed:
+        raise AssertionError(f"malformed numbers: {malformed[:5]}")
+
+    drawn = PROCESSES * NUMBERS_PER_PROCESS
+    reservations = sum(r for _, r in results)
+    print(f"{drawn} numbers from {PROCESSES} processes: no duplicates "
+          f"({reservations} block reservations, {drawn / reservations:.0f} numbers per round trip)")
+    print(f"counter started after the legacy numbers: first issued {parent_first} (legacy max {max(legacy):04d})")
+    print(f"allocator: {drawn / elapsed:,.0f} numbers/sec across processes")
+
+    # Old generator on a month that is already 90% full
+    metadata.drop_all(engine())
+    metadata.create_all(engine())
+    full = random.Random(5).sample(range(10000), 9000)
+    with engine().begin() as conn:
+        conn.execute(insert(quotes), [{"quote_number": f"{prefix}{n:04d}"} for n in full])
+        t0 = time.perf_counter()
+        queries = sum(legacy_generate(conn, prefix)[1] for _ in range(200))
+        t_legacy = (time.perf_counter() - t0) / 200
+    print(f"legacy generator at 90% full: {queries / 200:.1f} queries and {t_legacy * 1e6:.0f} us per number")
+    metadata.drop_all(engine())
+
+
+if __name__ == "__main__":
+    main()
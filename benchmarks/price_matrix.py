@@ -0,0 +1,79 @@
+"""
+Benchmark: memory-mapped decal/banner price matrices vs. the live engines.
+
+Builds both matrices, checks every grid point against the live engine, then
+times on-grid lookups and the off-grid fallback.
+
+Run from the project root:
+    python -m benchmarks.price_matrix
+"""
+
+import itertools
+import random
+import timeit
+
+from scripts import pricers
+from scripts.decal_pricing_2025 import calculate_decal_price_2025
+from scripts.price_matrix import (
+    BANNER_MATRIX, DECAL_MATRIX, banner_quote, build_matrix, decal_price, get_spec,
+)
+
+
+def grid_points(name):
+    spec = get_spec(name)
+    axes = [[tuple(v) if isinstance(v, list) else v for v in values] for _, values in spec.axes()]
+    return list(itertools.product(*axes))
+
+
+def main():
+    for name in ("decal", "banner"):
+        build_matrix(name)
+    DECAL_MATRIX.auto_rebuild = BANNER_MATRIX.auto_rebuild = False
+    DECAL_MATRIX.refresh(force=True)
+    BANNER_MATRIX.refresh(force=True)
+
+    decal_points = grid_points("decal")
+    for (w, h), qty, material, cut, lam in decal_points:
+        live = calculate_decal_price_2025(w, h, qty, material, cut, lam)
+        served = decal_price(w, h, qty, material, cut, lam)
+        if tuple(live) != tuple(served) or live.config_version != served.config_version:
+            raise AssertionError(f"decal {w}x{h} qty {qty} {material}/{cut}/{lam}: {served} != {live}")
+
+    banner_points = grid_points("banner")
+    for (w, h), *options in banner_points:
+        try:
+            live = pricers.banner_quote_with_guard(w, h, *options)
+        except Exception as e:
+            live = type(e)
+        try:
+            served = banner_quote(w, h, *options)
+        except Exception as e:
+            served = type(e)
+        if live != served:
+            raise AssertionError(f"banner {w}x{h} {options}: {served} != {live}")
+    print(f"parity: {len(decal_points)} decal and {len(banner_points)} banner grid points match the live engines")
+    print(f"matrix hits: decal {DECAL_MATRIX.hits}, banner {BANNER_MATRIX.hits}")
+    print()
+
+    rng = random.Random(7)
+    decal_sample = rng.sample(decal_points, 500)
+    banner_sample = rng.sample(banner_points, 500)
+    off_grid = [(w + 0.37, h, qty, m, c, l) for (w, h), qty, m, c, l in decal_sample]
+
+    cases = [
+        ("decal on-grid", lambda: [calculate_decal_price_2025(w, h, *o) for (w, h), *o in decal_sample],
+         lambda: [decal_price(w, h, *o) for (w, h), *o in decal_sample]),
+        ("decal off-grid", lambda: [calculate_decal_price_2025(*p) for p in off_grid],
+         lambda: [decal_price(*p) for p in off_grid]),
+        ("banner on-grid", lambda: [pricers.banner_quote_with_guard(w, h, *o) for (w, h), *o in banner_sample],
+         lambda: [banner_quote(w, h, *o) for (w, h), *o in banner_sample]),
+    ]
+    print(f"{'path':<16} {'live us':>9} {'matrix us':>10} {'speedup':>8}")
+    for label, live, served in cases:
+        t_live = min(timeit.repeat(live, number=20, repeat=5)) / (20 * 500) * 1e6
+        t_served = min(timeit.repeat(served, number=20, repeat=5)) / (20 * 500) * 1e6
+        print(f"{label:<16} {t_live:>9.2f} {t_served:>10.2f} {t_live / t_served:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
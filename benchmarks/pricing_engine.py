@@ -0,0 +1,123 @@
+"""
+Benchmark: compiled pricing/ engine pipelines vs. every legacy copy of the
+decal and banner pricing code (frozen in benchmarks/legacy_pricing.py).
+
+Checks each compiled function against its legacy copy on a randomized grid
+(and that it keeps the legacy signature, has a docstring and raises with a
+traceback into its source), then times both.
+
+Run from the project root:
+    python -m benchmarks.pricing_engine
+"""
+
+import inspect
+import os
+import random
+import timeit
+import traceback
+
+from benchmarks import legacy_pricing as legacy
+from pricing import banner, decal
+
+REPEAT = 15
+
+
+def banner_grid(rng, n):
+    widths = [0.5, 1, 2, 2.5, 3, 4, 5, 6, 8, 10, 12.5]
+    qtys = [1, 2, 4, 5, 9, 10, 24, 25, 49, 50, 99, 100, 250]
+    return [(rng.choice(widths), rng.choice(widths), rng.choice(qtys), rng.choice(["alpha", "jetflex"]),
+             rng.random() < 0.3, rng.random() < 0.3, rng.choice([0, 0, 1, 2]),
+             rng.random() < 0.3, rng.random() < 0.3, rng.random() < 0.8) for _ in range(n)]
+
+
+def decal_grid(rng, n):
+    sizes = [(2, 2), (3, 3), (4, 4), (4, 4.05), (5, 5), (2, 3), (3, 4), (4, 6), (3, 11.5), (4, 11),
+             (4, 12), (0.75, 3), (1.5, 2), (7.3, 2.2), (11, 17), (24, 24)]
+    qtys = [1, 5, 10, 25, 40, 50, 100, 250, 500, 1000]
+    return [(*rng.choice(sizes), rng.choice(qtys), rng.choice(["gloss", "matte"]), rng.choice(["kiss", "die"]),
+             rng.choice([None, "", "none", "gloss", "matte"])) for _ in range(n)]
+
+
+def calculator_banner_grid(rng, n):
+    return [(rng.choice([12, 24, 30, 36, 48, 72, 96, 120, 144]), rng.choice([12, 24, 36, 48, 60, 72]),
+             rng.choice([1, 3, 5, 10, 25, 50, 100, 150]), rng.choice(["", "alpha", "jetflex"]),
+             rng.choice([1, 2]), rng.random() < 0.3) for _ in range(n)]
+
+
+def check_signatures(cases):
+    """Each compiled function is documented and takes the legacy copy's parameters"""
+    for label, _, old, new in cases:
+        if not (new.__doc__ or "").strip():
+            raise AssertionError(f"{label}: {new.__qualname__} has no docstring")
+        if list(inspect.signature(new).parameters) != list(inspect.signature(old).parameters):
+            raise AssertionError(f"{label}: {inspect.signature(new)} != legacy {inspect.signature(old)}")
+
+
+def check_traceback():
+    """A bad argument fails on a real source line of the compiled function"""
+    try:
+        banner.banner_price_retail(2, 3, 1, "vinyl")
+    except KeyError as exc:
+        frame = traceback.extract_tb(exc.__traceback__)[-1]
+        if not (frame.filename.endswith(os.path.join("pricing", "banner.py")) and "material_adders" in frame.line):
+            raise AssertionError(f"unexpected traceback frame {frame}")
+    else:
+        raise AssertionError("unknown material was priced")
+
+
+def main():
+    rng = random.Random(11)
+    banners = banner_grid(rng, 2000)
+    decals = decal_grid(rng, 2000)
+    calc_banners = calculator_banner_grid(rng, 2000)
+    calc_decals = [(w, h, q, m, "none" if not lam else lam) for w, h, q, m, _, lam in decals]
+    each_banners = [(w, h, q, m, waste, True, rush, corners, slits, pairs, ds)
+                    for w, h, q, m, corners, slits, pairs, ds, rush, waste in banners]
+
+    banner_each = banner.compile_banner_each(legacy.BANNER_CONFIG)[0]
+
+    cases = [
+        ("banner retail", banners, legacy.banner_price_retail, banner.banner_price_retail),
+        ("banner cost", [b[:8] for b in banners], legacy.banner_cost_true, banner.banner_cost_true),
+        ("banner quote", banners, legacy.banner_quote_with_guard, banner.banner_quote),
+        ("banner each", each_banners, legacy.calculate_banner_price, banner_each),
+        ("banner calculator", calc_banners, legacy.calculator_banner_unit_price, banner.calculator_banner_unit_price),
+        ("decal calculator", calc_decals, legacy.calculate_decal_retail_price, decal.calculate_decal_retail_price),
+        ("decal calc cost", calc_decals, legacy.calculate_decal_true_cost, decal.calculate_decal_true_cost),
+        ("decal 2025", decals, legacy.calculate_decal_price_2025, decal.calculate_decal_price_2025),
+        ("decal 2025 cost", decals, legacy.calculate_decal_true_cost_2025, decal.calculate_decal_true_cost_2025),
+    ]
+
+    check_signatures(cases)
+    check_traceback()
+    for label, inputs, old, new in cases:
+        for args in inputs:
+            if tuple(_plain(old(*args))) != tuple(_plain(new(*args))):
+                raise AssertionError(f"{label} {args}: engine {new(*args)} != legacy {old(*args)}")
+    print(f"{len(cases)} compiled functions keep the legacy signatures and docstrings; errors trace to pricing/")
+    print(f"parity: {sum(len(c[1]) for c in cases)} quotes across {len(cases)} paths match the legacy copies")
+    print()
+
+    print(f"{'path':<18} {'legacy us':>10} {'engine us':>10} {'speedup':>8}")
+    for label, inputs, old, new in cases:
+        sample = inputs[:500]
+        # Rounds alternate between the two so machine noise hits both alike
+        t_old = t_new = float("inf")
+        for _ in range(REPEAT):
+            t_old = min(t_old, timeit.timeit(lambda: [old(*a) for a in sample], number=20))
+            t_new = min(t_new, timeit.timeit(lambda: [new(*a) for a in sample], number=20))
+        t_old, t_new = (t / (20 * len(sample)) * 1e6 for t in (t_old, t_new))
+        print(f"{label:<18} {t_old:>10.2f} {t_new:>10.2f} {t_old / t_new:>7.1f}x")
+
+
+def _plain(result):
+    """Comparable view of a price result (dicts by sorted items, scalars wrapped)"""
+    if isinstance(result, dict):
+        return sorted(result.items())
+    if isinstance(result, tuple):
+        return result
+    return (result,)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,336 @@
+"""
+Pricing benchmark suite with regression gates.
+
+Times every pricing entry point on inputs drawn from decals_price_samples.csv
+and seeded random grids, and reports per case:
+- ops_per_sec: calls/sec over a tight loop
+- p50_us / p99_us: per-call latency percentiles
+- alloc_bytes_per_call: mean tracemalloc high-water mark of one call
+
+Results are written as JSON. When a baseline file exists the run is compared
+against it and exits 1 if any case regressed by more than the threshold
+(throughput down, latency or allocations up).
+
+Run from the project root:
+    python -m benchmarks.pricing_suite                     # run + compare
+    python -m benchmarks.pricing_suite --update-baseline   # accept this run
+    python -m benchmarks.pricing_suite --only banner --threshold 0.10
+
+The calculate_area_pricing / calculate_apparel cases import app.py against a
+throwaway SQLite database (their .uncached functions, outside a request, so
+the settings/catalog version checks run on every call). They are skipped when
+the app's dependencies are not installed.
+"""
+
+import argparse
+import csv
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+from pricing.config import RETAIL
+from pricing.steps import margin_guard
+from scripts.decal_pricing_2025 import calculate_decal_price_2025
+from scripts.pricers import banner_price_retail, poster_price_retail
+
+SAMPLES_CSV = "decals_price_samples.csv"
+RESULTS_DIR = os.path.join("benchmarks", "results")
+OUTPUT_PATH = os.path.join(RESULTS_DIR, "pricing.json")
+BASELINE_PATH = os.path.join(RESULTS_DIR, "pricing_baseline.json")
+
+SEED = 2025
+GRID_SIZE = 500
+LATENCY_SAMPLES = 20000
+
+# Metric -> +1 when higher is better, -1 when lower is better
+GATED_METRICS = {
+    "ops_per_sec": 1,
+    "p50_us": -1,
+    "p99_us": -1,
+    "alloc_bytes_per_call": -1,
+}
+
+
+# ========== INPUTS ==========
+
+def decal_samples(path=SAMPLES_CSV):
+    """(width, height, qty, material, cut_type, laminate) rows from the samples CSV"""
+    with open(path, newline="") as f:
+        return [(float(r["width_in"]), float(r["height_in"]), int(r["qty"]),
+                 r["material"], r["cut"], r["laminate"]) for r in csv.DictReader(f)]
+
+
+def banner_grid(rng, n=GRID_SIZE):
+    sizes = [0.5, 1, 2, 2.5, 3, 4, 5, 6, 8, 10, 12.5]
+    qtys = [1, 2, 4, 5, 9, 10, 24, 25, 49, 50, 99, 100, 250]
+    return [(rng.choice(sizes), rng.choice(sizes), rng.choice(qtys), rng.choice(["alpha", "jetflex"]),
+             rng.random() < 0.3, rng.random() < 0.3, rng.choice([0, 0, 1, 2]),
+             rng.random() < 0.3, rng.random() < 0.3, rng.random() < 0.8) for _ in range(n)]
+
+
+def poster_grid(rng, n=GRID_SIZE):
+    materials = list(RETAIL["posters"]["materials"])
+    mountings = [None] + list(RETAIL["posters"]["mounting_per_sqft"])
+    return [(rng.choice([8, 11, 12, 18, 24, 36]), rng.choice([10, 12, 17, 24, 36, 48]),
+             rng.choice([1, 5, 10, 25, 50, 100]), rng.choice(materials),
+             rng.random() < 0.3, rng.choice(mountings), rng.random() < 0.2, rng.random() < 0.2)
+            for _ in range(n)]
+
+
+def decal_grid(rng, n=GRID_SIZE):
+    sizes = [(2, 2), (3, 3), (4, 4), (5, 5), (2, 3), (3, 4), (4, 6), (3, 11.5), (4, 11),
+             (0.75, 3), (1.5, 2), (7.3, 2.2), (11, 17)]
+    return [(*rng.choice(sizes), rng.choice([1, 10, 25, 40, 50, 100, 250, 1000]),
+             rng.choice(["gloss", "matte"]), rng.choice(["kiss", "die"]), rng.choice(["none", "gloss"]))
+            for _ in range(n)]
+
+
+def guard_grid(rng, n=GRID_SIZE):
+    return [(round(rng.uniform(10, 2000), 2), round(rng.uniform(5, 1500), 2)) for _ in range(n)]
+
+
+def area_forms(rng, media_names, n=GRID_SIZE):
+    forms = []
+    for w, h, qty, material, cut, lam in decal_grid(rng, n // 2):
+        forms.append({"category": "Decals", "width_in": str(w), "height_in": str(h), "qty": str(qty),
+                      "vinyl_material": material, "cut_type": cut, "laminate": lam,
+                      "customer_type": rng.choice(["retail", "partner", "employee"])})
+    for _ in range(n - len(forms)):
+        forms.append({"category": rng.choice(["Banner", "Banner", "Wide Format"]),
+                      "width_in": str(rng.choice([24, 36, 48, 72, 96])),
+                      "height_in": str(rng.choice([12, 24, 36, 48])),
+                      "qty": str(rng.choice([1, 3, 5, 10, 25, 50, 100])),
+                      "sides": str(rng.choice([1, 2])), "media_name": rng.choice(media_names),
+                      "hem_opt": rng.choice(["None", "All Sides", "Top&Bottom"]),
+                      "grommets": str(rng.choice([0, 4, 8])),
+                      "rush": rng.choice(["Standard", "Rush"]),
+                      "customer_type": rng.choice(["retail", "partner"])})
+    return forms
+
+
+def apparel_forms(rng, garments, n=GRID_SIZE):
+    forms = []
+    for _ in range(n):
+        form = {"rush": rng.choice(["Standard", "Rush"])}
+        for i in range(rng.randint(1, 4)):
+            form[f"items-{i}-garment"] = rng.choice(garments)
+            form[f"items-{i}-size"] = rng.choice(["S", "M", "L", "XL", "2XL", "3XL"])
+            form[f"items-{i}-qty"] = str(rng.choice([1, 6, 12, 24, 60, 120]))
+            form[f"items-{i}-extras"] = str(rng.choice([0, 0, 1, 2]))
+        forms.append(form)
+    return forms
+
+
+# ========== CASES ==========
+
+def core_cases(rng):
+    """name -> (fn, list of positional argument tuples)"""
+    min_margin, mode = RETAIL["min_margin_floor_pct"], RETAIL["floor_mode"]
+    return {
+        "banner_price_retail": (banner_price_retail, banner_grid(rng)),
+        "poster_price_retail": (poster_price_retail, poster_grid(rng)),
+        "calculate_decal_price_2025.samples": (calculate_decal_price_2025, decal_samples()),
+        "calculate_decal_price_2025.grid": (calculate_decal_price_2025, decal_grid(rng)),
+        "margin_guard": (lambda retail, cost: margin_guard(retail, cost, min_margin, mode), guard_grid(rng)),
+    }
+
+
+def app_cases(rng):
+    """
+    calculate_area_pricing / calculate_apparel cases plus the app context to
+    run them in, or (None, {}) when app.py cannot be imported here.
+    """
+    os.environ.setdefault("DATABASE_URL", "sqlite:///" + os.path.join(tempfile.mkdtemp(), "pricing_bench.db"))
+    os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+    os.environ.setdefault("DB_AUTO_MIGRATE", "1")
+    try:
+        import app as webapp
+    except ImportError as e:
+        print(f"skipping app cases: {e}", file=sys.stderr)
+        return None, {}
+
+    ctx = webapp.app.app_context()
+    ctx.push()
+    media = [m.name for m in webapp.Material.query.filter_by(active=True)] or ["jetflex"]
+    garments = [a.garment_name for a in webapp.ApparelItem.query.filter_by(active=True)] or ["T-Shirt"]
+    decal_forms = [{"category": "Decals", "width_in": str(w), "height_in": str(h), "qty": str(qty),
+                    "vinyl_material": material, "cut_type": cut, "laminate": lam}
+                   for w, h, qty, material, cut, lam in decal_samples()]
+    return ctx, {
+        "calculate_area_pricing": (webapp.calculate_area_pricing.uncached,
+                                   [(f,) for f in area_forms(rng, media)]),
+        "calculate_area_pricing.decal_samples": (webapp.calculate_area_pricing.uncached,
+                                                 [(f,) for f in decal_forms]),
+        "calculate_apparel": (webapp.calculate_apparel.uncached, [(f,) for f in apparel_forms(rng, garments)]),
+    }
+
+
+# ========== MEASUREMENT ==========
+
+def _percentile(sorted_values, pct):
+    index = min(len(sorted_values) - 1, max(0, round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def measure(fn, inputs, min_seconds=0.5, repeat=3):
+    """ops/sec, latency percentiles and allocation figures for fn over inputs"""
+    for args in inputs:
+        fn(*args)
+
+    # Throughput: best of `repeat` tight loops over the whole input list
+    loops = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(loops):
+            for args in inputs:
+                fn(*args)
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_seconds / repeat or loops >= 1 << 16:
+            break
+        loops *= 2
+    best = elapsed
+    for _ in range(repeat - 1):
+        start = time.perf_counter()
+        for _ in range(loops):
+            for args in inputs:
+                fn(*args)
+        best = min(best, time.perf_counter() - start)
+    calls = loops * len(inputs)
+
+    # Latency: every call timed on its own
+    clock = time.perf_counter_ns
+    samples = []
+    for _ in range(max(1, LATENCY_SAMPLES // len(inputs))):
+        for args in inputs:
+            t0 = clock()
+            fn(*args)
+            samples.append(clock() - t0)
+    samples.sort()
+
+    # Allocations: tracemalloc high-water mark of each call
+    tracemalloc.start()
+    try:
+        total = 0
+        for args in inputs:
+            tracemalloc.reset_peak()
+            before = tracemalloc.get_traced_memory()[0]
+            fn(*args)
+            total += tracemalloc.get_traced_memory()[1] - before
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "calls": calls,
+        "ops_per_sec": round(calls / best, 1),
+        "p50_us": round(_percentile(samples, 50) / 1000, 3),
+        "p99_us": round(_percentile(samples, 99) / 1000, 3),
+        "alloc_bytes_per_call": round(total / len(inputs), 1),
+    }
+
+
+def run(only=None, min_seconds=0.5):
+    rng = random.Random(SEED)
+    cases = core_cases(rng)
+    ctx, extra = app_cases(rng)
+    cases.update(extra)
+    if only:
+        cases = {name: case for name, case in cases.items() if any(o in name for o in only)}
+
+    results = {}
+    try:
+        for name, (fn, inputs) in cases.items():
+            results[name] = measure(fn, inputs, min_seconds=min_seconds)
+            r = results[name]
+            print(f"{name:<40} {r['ops_per_sec']:>12,.0f} {r['p50_us']:>9.2f} {r['p99_us']:>9.2f} "
+                  f"{r['alloc_bytes_per_call']:>10.0f}")
+    finally:
+        if ctx is not None:
+            ctx.pop()
+
+    return {
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "results": results,
+    }
+
+
+# ========== REGRESSION GATE ==========
+
+def compare(current, baseline, threshold, tail_threshold):
+    """
+    Regressions of current vs. baseline as human-readable lines. A metric
+    regresses when it is worse by more than its threshold (relative);
+    p99 uses tail_threshold since tail latency is noisier.
+    """
+    regressions = []
+    for name, now in current["results"].items():
+        before = baseline.get("results", {}).get(name)
+        if before is None:
+            continue
+        for metric, direction in GATED_METRICS.items():
+            old, new = before.get(metric), now.get(metric)
+            if not old or new is None:
+                continue
+            limit = tail_threshold if metric == "p99_us" else threshold
+            change = (new - old) / old
+            if change * direction < -limit:
+                regressions.append(f"{name}: {metric} {old:g} -> {new:g} ({change:+.1%}, limit {limit:.0%})")
+    return regressions
+
+
+def _write_json(path, data):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(data, f, indent=2, sort_keys=True)
+    os.replace(tmp, path)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Pricing benchmark suite with regression gates")
+    parser.add_argument("--output", default=OUTPUT_PATH, help="where to write this run's results")
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="results file to compare against")
+    parser.add_argument("--threshold", type=float, default=0.15,
+                        help="max relative regression for ops/sec, p50 and allocations (default 0.15)")
+    parser.add_argument("--tail-threshold", type=float, default=0.50,
+                        help="max relative regression for p99 latency (default 0.50)")
+    parser.add_argument("--only", action="append", help="run only cases whose name contains this (repeatable)")
+    parser.add_argument("--min-seconds", type=float, default=0.5, help="timed loop length per case")
+    parser.add_argument("--update-baseline", action="store_true", help="save this run as the new baseline")
+    args = parser.parse_args(argv)
+
+    print(f"{'case':<40} {'ops/sec':>12} {'p50 us':>9} {'p99 us':>9} {'alloc B':>10}")
+    current = run(only=args.only, min_seconds=args.min_seconds)
+    _write_json(args.output, current)
+    print(f"\nresults written to {args.output}")
+
+    if args.update_baseline:
+        _write_json(args.baseline, current)
+        print(f"baseline updated: {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"no baseline at {args.baseline}; run with --update-baseline to create one")
+        return 0
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    regressions = compare(current, baseline, args.threshold, args.tail_threshold)
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) vs. {args.baseline}:")
+        for line in regressions:
+            print(f"  {line}")
+        return 1
+    print(f"no regressions vs. {args.baseline}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
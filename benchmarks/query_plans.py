@@ -0,0 +1,198 @@
+"""
+EXPLAIN check + benchmark for the hot-query indexes (migration 3).
+
+Seeds a database shaped like a pre-migration one (no secondary indexes, no
+schema_migration table), then drives the admin quote/order lists, the live
+notifications endpoint, the analytics dashboard and an analytics flush while
+recording every SQL statement. Each statement that filters or sorts quote,
+order or business_analytics is EXPLAINed before and after upgrading: after
+the upgrade none may fall back to a full table scan.
+
+Run from the project root (SQLite by default, or any DATABASE_URL):
+    python -m benchmarks.query_plans
+"""
+
+import json
+import os
+import random
+import re
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///" + os.path.join(tempfile.mkdtemp(), "plans.db"))
+os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+os.environ.setdefault("DB_AUTO_MIGRATE", "1")
+
+from sqlalchemy import event, insert, inspect, text  # noqa: E402
+
+import app as webapp  # noqa: E402
+from scripts import migrations  # noqa: E402
+
+QUOTES = 20000
+ORDERS = 5000
+CUSTOMERS = 500
+HOT_TABLES = ("quote", "order", "business_analytics")
+LIST_ROWS = 500
+
+ROUTES = [
+    "/admin/quotes?status=pending",
+    "/admin/quotes?category=Banner",
+    "/admin/quotes?status=approved&category=Decals",
+    "/admin/quotes",
+    "/admin/orders?status=in_production",
+    "/admin/orders?priority=rush",
+    "/admin/orders",
+    "/api/notifications/live",
+    "/admin/analytics",
+]
+
+
+def legacy_schema():
+    """Drop what migrations 1-3 added beyond the old create_all schema"""
+    with webapp.db.engine.begin() as conn:
+        inspector = inspect(conn)
+        for table in HOT_TABLES:
+            for index in inspector.get_indexes(table):
+                if index["name"].startswith("ix_"):
+                    conn.execute(text(f'DROP INDEX {index["name"]}'))
+        conn.execute(text("DELETE FROM schema_migration WHERE version >= 3"))
+
+
+def seed():
+    rng = random.Random(14)
+    now = datetime.now()
+    db = webapp.db
+    db.session.execute(insert(webapp.Customer), [
+        {"name": f"Customer {i}", "email": f"customer{i}@example.com"} for i in range(CUSTOMERS)])
+    customer_ids = [cid for (cid,) in db.session.query(webapp.Customer.id)]
+    db.session.execute(insert(webapp.Quote), [
+        {"quote_number": f"QB{i:07d}", "customer_id": rng.choice(customer_ids),
+         "category": rng.choice(["Banner", "Decals", "Apparel", "Yard Signs", "Poster"]),
+         "calculated_price": rng.uniform(20, 900), "final_price": rng.uniform(20, 900),
+         "status": rng.choice(["pending"] * 2 + ["approved"] * 5 + ["declined", "converted"]),
+         "created_at": now - timedelta(minutes=rng.randrange(365 * 24 * 60))}
+        for i in range(QUOTES)])
+    db.session.execute(insert(webapp.Order), [
+        {"order_number": f"OB{i:07d}", "quote_id": i + 1, "customer_id": rng.choice(customer_ids),
+         "status": rng.choice(["confirmed", "in_production", "ready"] + ["completed"] * 7),
+         "priority": rng.choice(["standard"] * 9 + ["rush"]), "total_amount": rng.uniform(20, 900),
+         "created_at": now - timedelta(days=rng.randrange(365)),
+         "due_date": now + timedelta(days=rng.randrange(-30, 30))}
+        for i in range(ORDERS)])
+    db.session.execute(insert(webapp.BusinessAnalytics), [
+        {"date": (now - timedelta(days=d)).date(), "metric_name": metric, "category": category,
+         "metric_value": rng.randrange(100), "additional_data": {}}
+        for d in range(365) for metric in ("quotes_generated", "page_views")
+        for category in ("Banner", "Decals", "Apparel", None)])
+    db.session.commit()
+
+
+def drive():
+    """Hit every route once; returns {statement: params} and seconds per route"""
+    seen, timings = {}, {}
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if not executemany and statement.lstrip().upper().startswith("SELECT"):
+            seen.setdefault(statement, parameters)
+
+    event.listen(webapp.db.engine, "before_cursor_execute", record)
+    webapp.STATUS_SUMMARY.invalidate()  # its queries must be seen (and EXPLAINed) on every run
+    webapp.app.logger.disabled = True  # pages that fail to render still issue their queries
+    client = webapp.app.test_client()
+    for route in ROUTES:
+        t0 = time.perf_counter()
+        for _ in range(3):
+            client.get(route)
+        timings[route] = (time.perf_counter() - t0) / 3
+    webapp._flush_analytics(webapp.app, {(datetime.now().date(), "quotes_generated", "Banner"): (1, {"price": 1})})
+    event.remove(webapp.db.engine, "before_cursor_execute", record)
+    return seen, timings
+
+
+def touches_hot_table(statement):
+    sql = " ".join(statement.split()).lower()
+    if not re.search(r"\b(where|order by)\b", sql) or " like " in sql:
+        return False  # full reads and substring search can't use a b-tree index
+    return any(re.search(rf'\bfrom "?{t}"?\b|\bjoin "?{t}"?\b', sql) for t in HOT_TABLES)
+
+
+def plan(conn, statement, parameters):
+    """(full_table_scans, plan_text) for one statement"""
+    if conn.dialect.name == "sqlite":
+        rows = conn.exec_driver_sql("EXPLAIN QUERY PLAN " + statement, parameters).all()
+        details = [row[-1] for row in rows]
+        scans = [d for d in details
+                 if re.match(rf'SCAN "?({"|".join(HOT_TABLES)})"?$', d) or
+                 re.match(rf'SCAN "?({"|".join(HOT_TABLES)})"? (?!USING)', d)]
+        return scans, "; ".join(details)
+    if conn.dialect.name == "postgresql":
+        conn.exec_driver_sql("SET LOCAL enable_seqscan = off")
+        doc = conn.exec_driver_sql("EXPLAIN (FORMAT JSON) " + statement, parameters).scalar()
+        doc = json.loads(doc) if isinstance(doc, str) else doc
+        nodes, scans = [doc[0]["Plan"]], []
+        while nodes:
+            node = nodes.pop()
+            if node["Node Type"] == "Seq Scan" and node.get("Relation Name") in HOT_TABLES:
+                scans.append(f'Seq Scan on {node["Relation Name"]}')
+            nodes.extend(node.get("Plans", []))
+        return scans, json.dumps(doc[0]["Plan"])[:200]
+    raise SystemExit(f"no EXPLAIN support for {conn.dialect.name}")
+
+
+def explain_all(statements, repeat=5):
+    """
+    [(statement, scans, plan)] for the hot statements, plus seconds to run
+    once the ones returning fewer than LIST_ROWS rows (counts, sums, lookups)
+    and the ones returning more (dominated by row transfer)
+    """
+    results, selective, bulk = [], 0.0, 0.0
+    with webapp.db.engine.connect() as conn:
+        for statement, parameters in statements.items():
+            if touches_hot_table(statement):
+                t0 = time.perf_counter()
+                for _ in range(repeat):
+                    rows = conn.exec_driver_sql(statement, parameters).all()
+                elapsed = (time.perf_counter() - t0) / repeat
+                if len(rows) < LIST_ROWS:
+                    selective += elapsed
+                else:
+                    bulk += elapsed
+                scans, details = plan(conn, statement, parameters)
+                results.append((statement, scans, details))
+        conn.rollback()
+    return results, selective, bulk
+
+
+def main():
+    with webapp.app.app_context():
+        legacy_schema()
+        seed()
+        before_statements, before_times = drive()
+        before, sel_before, bulk_before = explain_all(before_statements)
+
+        applied = migrations.upgrade(webapp.db.engine, webapp.db.metadata)
+        assert applied[:1] == [3], applied
+        after_statements, after_times = drive()
+        after, sel_after, bulk_after = explain_all(after_statements)
+
+    scanned_before = sum(1 for _, scans, _ in before if scans)
+    print(f"{len(before)} hot statements; before migration 3: {scanned_before} do full table scans")
+    failures = [(s, scans, d) for s, scans, d in after if scans]
+    for statement, scans, details in failures:
+        print(f"  STILL SCANS {scans}: {' '.join(statement.split())[:160]}\n    {details}")
+    if failures:
+        raise AssertionError(f"{len(failures)} statements still scan after migration 3")
+    print(f"after migration 3: all {len(after)} use an index")
+    print(f"selective statements (< {LIST_ROWS} rows), one run each: "
+          f"{sel_before * 1e3:.1f} ms before, {sel_after * 1e3:.1f} ms after")
+    print(f"large result statements (>= {LIST_ROWS} rows), one run each: "
+          f"{bulk_before * 1e3:.1f} ms before, {bulk_after * 1e3:.1f} ms after")
+    print("whole requests (page rendering included):")
+    print(f"{'route':<48}{'before':>10}{'after':>10}")
+    for route in ROUTES:
+        print(f"{route:<48}{before_times[route] * 1e3:>8.1f}ms{after_times[route] * 1e3:>8.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
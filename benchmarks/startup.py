@@ -0,0 +1,161 @@
+"""
+Benchmark: worker boot cost of app.py.
+
+Each probe is a fresh interpreter, like a gunicorn worker: it imports app,
+then serves its first request (the quote calculator) through the test
+client. Reported per probe, median of RUNS:
+
+- import time, and SQL statements run during the import
+- time to first request
+- resident memory after the first request
+- which lazily built services, and which of openai / reportlab / Pillow,
+  are loaded by then (none should be)
+- what building each lazy service then costs its first request
+
+Then one `python -X importtime -c "import app"` per tree gives the
+cumulative import time of app and of its heavy dependencies.
+
+The database is migrated once up front, so probes see a deployed database.
+To compare with another checkout (e.g. a git worktree of an older commit):
+
+    python -m benchmarks.startup
+    STARTUP_BENCH_BASELINE=/path/to/old/checkout python -m benchmarks.startup
+"""
+
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+RUNS = int(os.environ.get("STARTUP_BENCH_RUNS", "5"))
+FIRST_ROUTE = "/"
+LAZY_SERVICES = ("get_openai_client", "get_pdf_generator", "get_file_handler")
+HEAVY_MODULES = ("openai", "reportlab", "PIL")
+# Cumulative -X importtime rows; pdf_generator covers reportlab and Pillow
+PROFILED_MODULES = ("app", "openai", "pdf_generator", "flask_sqlalchemy", "numpy")
+
+
+def rss_kb():
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    import resource
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def probe():
+    """Runs in the child: import app, serve one request, print a JSON report"""
+    sys.path.insert(0, os.getcwd())
+    from sqlalchemy import event
+    from sqlalchemy.engine import Engine
+
+    statements = []
+    event.listen(Engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+    t0 = time.perf_counter()
+    import app as webapp
+    t_import = time.perf_counter() - t0
+    at_import = len(statements)
+
+    client = webapp.app.test_client()
+    t0 = time.perf_counter()
+    status = client.get(FIRST_ROUTE).status_code
+    t_first = time.perf_counter() - t0
+    built = [name for name in LAZY_SERVICES
+             if not hasattr(webapp, name) or getattr(webapp, name).is_built()]
+    loaded = [name for name in HEAVY_MODULES if name in sys.modules]
+    rss = rss_kb()
+
+    first_use = {}
+    for name in LAZY_SERVICES:
+        if name not in built:
+            t0 = time.perf_counter()
+            getattr(webapp, name)()
+            first_use[name] = time.perf_counter() - t0
+    print(json.dumps({"import": t_import, "statements": at_import, "first_request": t_first,
+                      "status": status, "rss_kb": rss, "built": built, "loaded": loaded,
+                      "first_use": first_use}))
+
+
+def run_probes(tree, env):
+    reports = []
+    for _ in range(RUNS):
+        out = subprocess.run([sys.executable, os.path.abspath(__file__), "--probe"], cwd=tree, env=env,
+                             check=True, capture_output=True, text=True).stdout
+        reports.append(json.loads(out.strip().splitlines()[-1]))
+    assert all(r["status"] == 200 for r in reports), reports
+    return {
+        "import": statistics.median(r["import"] for r in reports),
+        "statements": statistics.median(r["statements"] for r in reports),
+        "first_request": statistics.median(r["first_request"] for r in reports),
+        "rss_kb": statistics.median(r["rss_kb"] for r in reports),
+        "built": reports[-1]["built"],
+        "loaded": reports[-1]["loaded"],
+        "first_use": {name: statistics.median(r["first_use"].get(name, 0) for r in reports)
+                      for name in LAZY_SERVICES},
+        "importtime": import_profile(tree, env),
+    }
+
+
+def import_profile(tree, env):
+    """{module: cumulative microseconds} from -X importtime, for PROFILED_MODULES that were imported"""
+    err = subprocess.run([sys.executable, "-X", "importtime", "-c", "import app"], cwd=tree, env=env,
+                         check=True, capture_output=True, text=True).stderr
+    profile = {}
+    for line in err.splitlines():
+        if line.startswith("import time:") and line.count("|") == 2:
+            _, cumulative, name = line.split("|")
+            if name.strip() in PROFILED_MODULES and cumulative.strip().isdigit():
+                profile.setdefault(name.strip(), int(cumulative))
+    return profile
+
+
+def main():
+    tree = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = dict(os.environ)
+    env.setdefault("DATABASE_URL", "sqlite:///" + os.path.join(tempfile.mkdtemp(), "startup.db"))
+    env.setdefault("OPENAI_API_KEY", "benchmark")
+    env.pop("DB_AUTO_MIGRATE", None)
+    subprocess.run([sys.executable, "-m", "scripts.migrations"], cwd=tree, env=env, check=True,
+                   capture_output=True)
+
+    columns = {"this tree": run_probes(tree, env)}
+    baseline = os.environ.get("STARTUP_BENCH_BASELINE")
+    if baseline:
+        columns = {"baseline": run_probes(baseline, env), **columns}
+
+    current = columns["this tree"]
+    assert current["statements"] == 0, "importing app ran SQL"
+    assert not current["built"], f"built at import or by {FIRST_ROUTE}: {current['built']}"
+    assert not current["loaded"], f"loaded at import or by {FIRST_ROUTE}: {current['loaded']}"
+
+    print(f"median of {RUNS} fresh interpreters")
+    print(f"{'':<30}" + "".join(f"{name:>20}" for name in columns))
+    rows = [
+        ("import app", lambda c: f"{c['import'] * 1e3:.0f}ms"),
+        ("SQL during import", lambda c: f"{c['statements']:.0f}"),
+        ("first request", lambda c: f"{c['first_request'] * 1e3:.0f}ms"),
+        ("import + first request", lambda c: f"{(c['import'] + c['first_request']) * 1e3:.0f}ms"),
+        ("resident memory", lambda c: f"{c['rss_kb'] / 1024:.1f}MB"),
+        ("services built", lambda c: str(len(c["built"]))),
+        ("openai/reportlab/PIL", lambda c: ", ".join(c["loaded"]) or "none"),
+    ]
+    rows += [(f"first use of {name.removeprefix('get_')}", lambda c, name=name: f"{c['first_use'][name] * 1e3:.0f}ms")
+             for name in LAZY_SERVICES]
+    rows += [(f"importtime {name}", lambda c, name=name: f"{c['importtime'][name] / 1e3:.0f}ms"
+              if name in c["importtime"] else "-") for name in PROFILED_MODULES]
+    for label, fmt in rows:
+        print(f"{label:<30}" + "".join(f"{fmt(c):>20}" for c in columns.values()))
+
+
+if __name__ == "__main__":
+    if "--probe" in sys.argv:
+        probe()
+    else:
+        main()
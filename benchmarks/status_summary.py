@@ -0,0 +1,161 @@
+"""
+Correctness check + benchmark: cached one-pass status summary for the admin
+quote/order pages and /api/notifications/live.
+
+1. The summary must match the old per-status count()/sum() queries exactly.
+2. Updating a quote's status, converting a quote and updating an order's
+   status must each show up on the very next page view (the routes bump the
+   'status_summary' version), not after the TTL.
+3. Summary-card cost per request: old queries vs. an uncached summary vs. a
+   cached one, plus statements per request for the three endpoints.
+
+Run from the project root (SQLite by default, or any DATABASE_URL):
+    python -m benchmarks.status_summary
+    SUMMARY_BENCH_QUOTES=100000 python -m benchmarks.status_summary
+"""
+
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///" + os.path.join(tempfile.mkdtemp(), "summary.db"))
+os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+os.environ.setdefault("DB_AUTO_MIGRATE", "1")
+
+from sqlalchemy import event, insert  # noqa: E402
+
+import app as webapp  # noqa: E402
+
+QUOTES = int(os.environ.get("SUMMARY_BENCH_QUOTES", "1000000"))
+ORDERS = 50_000
+CUSTOMERS = 2000
+QUOTE_STATUSES = ["pending", "approved", "declined", "converted"]
+ORDER_STATUSES = ["confirmed", "in_production", "ready", "completed"]
+
+
+def seed(rng):
+    db = webapp.db
+    now = datetime.now()
+    db.session.execute(insert(webapp.Customer), [
+        {"name": f"Customer {i}", "email": f"customer{i}@example.com"} for i in range(CUSTOMERS)])
+    for lo in range(0, QUOTES, 100_000):
+        db.session.execute(insert(webapp.Quote), [
+            {"quote_number": f"QS{i:08d}", "customer_id": rng.randrange(1, CUSTOMERS + 1),
+             "category": rng.choice(["Banner", "Decals", "Apparel"]), "status": rng.choice(QUOTE_STATUSES),
+             "calculated_price": round(rng.uniform(20, 900), 2),
+             "created_at": now - timedelta(minutes=rng.randrange(365 * 24 * 60))}
+            for i in range(lo, min(lo + 100_000, QUOTES))])
+        db.session.commit()
+    db.session.execute(insert(webapp.Order), [
+        {"order_number": f"OS{i:08d}", "quote_id": i + 1, "customer_id": rng.randrange(1, CUSTOMERS + 1),
+         "status": rng.choice(ORDER_STATUSES), "priority": "standard", "total_amount": round(rng.uniform(20, 900), 2),
+         "created_at": now - timedelta(days=rng.randrange(365)),
+         "due_date": now + timedelta(days=rng.randrange(-30, 30)) if rng.random() < 0.9 else None}
+        for i in range(ORDERS)])
+    db.session.commit()
+
+
+def legacy_summary():
+    """The queries the three endpoints used to run on every request"""
+    Quote, Order, db = webapp.Quote, webapp.Order, webapp.db
+    now = datetime.now()
+    return {
+        "total_quotes": Quote.query.count(),
+        "pending_quotes": Quote.query.filter_by(status="pending").count(),
+        "approved_quotes": Quote.query.filter_by(status="approved").count(),
+        "converted_quotes": Quote.query.filter_by(status="converted").count(),
+        "pending_value": db.session.query(db.func.sum(Quote.calculated_price)).filter_by(status="pending").scalar() or 0,
+        "total_orders": Order.query.count(),
+        "confirmed_orders": Order.query.filter_by(status="confirmed").count(),
+        "in_production": Order.query.filter_by(status="in_production").count(),
+        "ready_orders": Order.query.filter_by(status="ready").count(),
+        "completed_orders": Order.query.filter_by(status="completed").count(),
+        "total_value": db.session.query(db.func.sum(Order.total_amount)).scalar() or 0,
+        "new_quotes_24h": Quote.query.filter(Quote.created_at >= now - timedelta(hours=24)).count(),
+        "overdue_orders": Order.query.filter(
+            Order.due_date < now, Order.status.in_(["confirmed", "in_production"])).count(),
+    }
+
+
+def as_legacy(summary):
+    quotes, orders = summary.quotes, summary.orders
+    return {
+        "total_quotes": quotes.count(), "pending_quotes": quotes.count("pending"),
+        "approved_quotes": quotes.count("approved"), "converted_quotes": quotes.count("converted"),
+        "pending_value": quotes.value("pending"),
+        "total_orders": orders.count(), "confirmed_orders": orders.count("confirmed"),
+        "in_production": orders.count("in_production"), "ready_orders": orders.count("ready"),
+        "completed_orders": orders.count("completed"), "total_value": orders.value(),
+        "new_quotes_24h": summary.new_quotes_24h, "overdue_orders": summary.overdue_orders,
+    }
+
+
+def assert_same(expected, actual):
+    for key, value in expected.items():
+        assert abs(actual[key] - value) < 1e-6 * max(1, abs(value)), f"{key}: {actual[key]} != {value}"
+
+
+def statements_for(client, engine, url):
+    statements = []
+    listener = lambda *args: statements.append(args[2])  # noqa: E731
+    event.listen(engine, "before_cursor_execute", listener)
+    client.get(url)
+    event.remove(engine, "before_cursor_execute", listener)
+    return len(statements)
+
+
+def timed(fn, n=5):
+    fn()
+    t0 = time.perf_counter()
+    for _ in range(n):
+        fn()
+    return (time.perf_counter() - t0) / n
+
+
+def main():
+    rng = random.Random(17)
+    # Requests run outside any app context of ours, so each gets its own flask.g like in production
+    client = webapp.app.test_client()
+    with webapp.app.app_context():
+        t0 = time.perf_counter()
+        seed(rng)
+        print(f"seeded {QUOTES:,} quotes / {ORDERS:,} orders in {time.perf_counter() - t0:.0f}s")
+        assert_same(legacy_summary(), as_legacy(webapp.STATUS_SUMMARY.compute(webapp.db.session.connection())))
+        print("summary matches the per-status count()/sum() queries")
+        pending_quote = webapp.Quote.query.filter_by(status="pending").first().quote_number
+        approved_quote = webapp.Quote.query.filter_by(status="approved").order_by(webapp.Quote.id.desc()).first().quote_number
+        confirmed_order = webapp.Order.query.filter_by(status="confirmed").first().order_number
+
+    # Each admin write shows up on the next read, well inside the TTL
+    live = lambda: client.get("/api/notifications/live").get_json()  # noqa: E731
+    before = live()
+    client.post(f"/admin/quote/{pending_quote}/update_status", data={"status": "approved"})
+    client.post(f"/admin/quote/{approved_quote}/convert_to_order",
+                data={"due_date": (datetime.now() - timedelta(days=2)).strftime("%Y-%m-%d")})
+    after = live()
+    assert after["pending_orders"] == before["pending_orders"] + 1, (before, after)
+    assert after["overdue_orders"] == before["overdue_orders"] + 1, (before, after)
+    client.post(f"/admin/order/{confirmed_order}/update_status", data={"status": "completed"})
+    assert live()["pending_orders"] == after["pending_orders"] - 1
+    with webapp.app.app_context():
+        assert_same(legacy_summary(), as_legacy(webapp.get_status_summary()))
+    print("quote status, convert and order status changes show up on the next request")
+
+    with webapp.app.app_context():
+        t_legacy = timed(legacy_summary)
+        t_cold = timed(lambda: webapp.STATUS_SUMMARY.compute(webapp.db.session.connection()))
+        t_warm = timed(webapp.get_status_summary, n=1000)
+        engine = webapp.db.engine
+    print(f"summary cards for all three endpoints: {t_legacy * 1e3:.1f}ms old queries, "
+          f"{t_cold * 1e3:.1f}ms one pass, {t_warm * 1e6:.0f}us cached")
+
+    print(f"{'endpoint':<28}{'statements':>12}{'time':>10}")
+    for url in ("/admin/quotes", "/admin/orders", "/api/notifications/live"):
+        count = statements_for(client, engine, url)
+        print(f"{url:<28}{count:>12}{timed(lambda: client.get(url)) * 1e3:>8.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
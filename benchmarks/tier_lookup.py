@@ -0,0 +1,86 @@
+"""
+Micro-benchmark: compiled bisect tier lookups vs. the old linear scans over
+the JSON lists in config/retail_pricing.json and banner_pricing.BANNER_CONFIG.
+
+Run from the project root:
+    python -m benchmarks.tier_lookup
+"""
+
+import random
+import timeit
+
+import banner_pricing
+from scripts.pricers import RETAIL, BANNER_LADDER, POSTER_LADDER, BANNER_WASTE, _ladder_rate, _waste_buffer
+
+
+# ----- Previous linear-scan implementations, kept here as the reference -----
+
+def linear_ladder_rate(ladder, qty):
+    for lo, hi, rate in ladder:
+        if lo <= qty <= hi:
+            return rate
+    return ladder[-1][2]
+
+
+def linear_waste_buffer(area, buffer_tiers):
+    for tier in buffer_tiers:
+        if area >= tier["min"] and area <= tier["max"]:
+            return area + tier["add"]
+    return area
+
+
+def linear_waste_added(area):
+    for r in banner_pricing.BANNER_CONFIG["waste_buffer"]:
+        lo = r["min_sqft"]
+        hi_val = r["max_sqft"]
+        if (area >= lo) and (hi_val is None or area <= hi_val):
+            return area + r["add_sqft"]
+    return area
+
+
+def linear_rate_for_qty(qty):
+    for band in banner_pricing.BANNER_CONFIG["rate_per_sqft_by_qty"]:
+        lo, hi = band["qty_min"], band["qty_max"]
+        if (qty >= lo) and (hi is None or qty <= hi):
+            return band["rate"]
+    return banner_pricing.BANNER_CONFIG["rate_per_sqft_by_qty"][-1]["rate"]
+
+
+def main():
+    rng = random.Random(42)
+    qtys = [rng.choice([0, 1, 3, 5, 12, 30, 60, 150, 5000]) for _ in range(1000)]
+    areas = [rng.choice([0.0, 2.0, 14.9995, 15.0, 22.5, 30.0, 30.0005, 80.0]) for _ in range(1000)]
+
+    banner_ladder = RETAIL["banners"]["ladder_per_sqft"]
+    poster_ladder = RETAIL["posters"]["ladder_per_sqft"]
+    banner_tiers = RETAIL["waste_buffers"]["banners"]
+
+    cases = [
+        ("pricers banner ladder",
+         lambda: [linear_ladder_rate(banner_ladder, q) for q in qtys],
+         lambda: [_ladder_rate(BANNER_LADDER, q) for q in qtys]),
+        ("pricers poster ladder",
+         lambda: [linear_ladder_rate(poster_ladder, q) for q in qtys],
+         lambda: [_ladder_rate(POSTER_LADDER, q) for q in qtys]),
+        ("pricers banner waste",
+         lambda: [linear_waste_buffer(a, banner_tiers) for a in areas],
+         lambda: [_waste_buffer(a, BANNER_WASTE) for a in areas]),
+        ("banner_pricing rate",
+         lambda: [linear_rate_for_qty(q) for q in qtys],
+         lambda: [banner_pricing._rate_for_qty(q) for q in qtys]),
+        ("banner_pricing waste",
+         lambda: [linear_waste_added(a) for a in areas],
+         lambda: [banner_pricing._waste_added(a) for a in areas]),
+    ]
+
+    print(f"{'lookup':<24} {'linear ns':>10} {'bisect ns':>10} {'speedup':>8}")
+    for label, linear, compiled in cases:
+        if linear() != compiled():
+            raise AssertionError(f"{label}: compiled lookup disagrees with linear scan")
+        t_linear = min(timeit.repeat(linear, number=200, repeat=5)) / (200 * 1000) * 1e9
+        t_compiled = min(timeit.repeat(compiled, number=200, repeat=5)) / (200 * 1000) * 1e9
+        print(f"{label:<24} {t_linear:>10.0f} {t_compiled:>10.0f} {t_linear / t_compiled:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
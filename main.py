@@ -1,4 +1,7 @@
-from app import app
+from app import app, init_db
 
 if __name__ == '__main__':
+    # The dev server is a single process, so it can migrate on startup
+    with app.app_context():
+        init_db()
     app.run(host='0.0.0.0', port=5000, debug=True)
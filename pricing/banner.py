@@ -0,0 +1,204 @@
+"""
+DTF Designs Pricing Engine - Banners
+Banner retail, true cost and guarded quote functions compiled from
+config/retail_pricing.json and config/employee_true_cost_banners.json.
+
+Three retail variants share the same steps and differ only where the
+historical price lists did:
+- "job" (retail API, employee calculator): job minimum on the whole job,
+  add-ons per banner, rounded to cents
+- "each" (banner_pricing.py list): minimum per banner, rounded to dollars
+- "calculator" (customer/partner calculator): no minimum or add-ons,
+  material adder charged on the billable area, unrounded
+"""
+
+import math
+
+from pricing.config import BANNER_COSTS, RETAIL
+from pricing.steps import guarded_quote, margin_guard, round_job_cents
+from scripts.tiers import TierTable, compile_buffer_tiers, compile_ladder
+
+
+# ========== COMPILERS ==========
+
+def compile_banner_retail(retail):
+    """Retail API pricing: job minimum, per-banner add-ons, multipliers, cents"""
+    cfg = retail["banners"]
+    addons = cfg["addons"]
+    waste = compile_buffer_tiers(retail["waste_buffers"]["banners"], "waste_buffers.banners").lookup
+    ladder = compile_ladder(cfg["ladder_per_sqft"], "banners.ladder_per_sqft").lookup
+    material_adders = {name: m["adder_per_sqft"] for name, m in cfg["materials"].items()}
+    job_minimum = retail["job_minimums"]["banners"]
+    corners, slits, pocket_pair = addons["reinforced_corners"], addons["wind_slits"], addons["pole_pockets_pair"]
+    double_sided_mult, rush_mult = addons["double_sided_mult"], 1.0 + addons["rush_pct"]
+
+    def banner_price_retail(width_ft, height_ft, qty, material="alpha", reinforced_corners=False, wind_slits=False,
+                            pole_pockets_pairs=0, double_sided=False, rush=False, include_waste=True):
+        """Retail (unit, total) for a banner job"""
+        area = width_ft * height_ft
+        billable = area + waste(area) if include_waste else area
+        rate = ladder(qty) + material_adders[material]
+        subtotal = max(billable * rate * qty, job_minimum)
+
+        per_banner_addons = 0.0
+        if reinforced_corners:
+            per_banner_addons += corners
+        if wind_slits:
+            per_banner_addons += slits
+        if pole_pockets_pairs > 0:
+            per_banner_addons += pocket_pair * pole_pockets_pairs
+        subtotal += per_banner_addons * qty
+
+        if double_sided:
+            subtotal *= double_sided_mult
+        if rush:
+            subtotal *= rush_mult
+        return round_job_cents(subtotal, qty)
+
+    return banner_price_retail
+
+
+def compile_banner_cost(costs):
+    """Employee true cost: no waste, no minimum; setup and packaging once per job"""
+    per_sqft = {
+        material: material_cost + costs["ink_cost_per_sqft"] + costs["machine_overhead_per_sqft"]
+        + costs["finishing_cost_per_sqft"]
+        for material, material_cost in costs["materials_cost_per_sqft"].items()
+    }
+    fixed_per_banner = costs["finishing_fixed_per_banner"]
+    addons = costs["addons_cost"]
+    corners, slits, pocket_pair = addons["reinforced_corners"], addons["wind_slits"], addons["pole_pockets_pair"]
+    second_side = costs.get("second_side_extra_per_sqft", 0.525)
+    fixed_per_job = costs["setup_cost_per_job"] + costs["packaging_cost_per_job"]
+
+    def banner_cost_true(width_ft, height_ft, qty, material="alpha", reinforced_corners=False, wind_slits=False,
+                         pole_pockets_pairs=0, double_sided=False, rush=False):
+        """Employee true cost (unit, total) for a banner job; rush costs nothing extra"""
+        area = width_ft * height_ft
+        each = area * per_sqft[material]
+        each += fixed_per_banner
+        if reinforced_corners:
+            each += corners
+        if wind_slits:
+            each += slits
+        if pole_pockets_pairs > 0:
+            each += pocket_pair * pole_pockets_pairs
+        if double_sided:
+            each += area * second_side
+        return round_job_cents(each * qty + fixed_per_job, qty)
+
+    return banner_cost_true
+
+
+def compile_banner_quote(retail, retail_price, true_cost):
+    """Retail pricing + true cost + margin guard, as served by /quote/banner"""
+    min_margin_pct, mode = retail["min_margin_floor_pct"], retail["floor_mode"]
+
+    def banner_quote(width_ft, height_ft, qty, material="alpha", reinforced_corners=False, wind_slits=False,
+                     pole_pockets_pairs=0, double_sided=False, rush=False, include_waste=True):
+        """Retail banner quote with the margin guard applied"""
+        total = retail_price(width_ft, height_ft, qty, material, reinforced_corners, wind_slits,
+                             pole_pockets_pairs, double_sided, rush, include_waste)[1]
+        cost = true_cost(width_ft, height_ft, qty, material, reinforced_corners, wind_slits,
+                         pole_pockets_pairs, double_sided)[1]
+        return guarded_quote(margin_guard(total, cost, min_margin_pct, mode), qty)
+
+    return banner_quote
+
+
+def compile_banner_each(config):
+    """
+    banner_pricing.py list: per-banner minimum, add-ons, multipliers, whole
+    dollars. Returns the price function and its waste and rate tables.
+    """
+    materials = config["materials"]
+    addons = config["addons"]
+    waste_table = TierTable(
+        [(r["min_sqft"], r["max_sqft"], r["add_sqft"]) for r in config["waste_buffer"]],
+        name="waste_buffer", shared_bounds=True, default=0.0
+    )
+    ladder_table = TierTable(
+        [(b["qty_min"], b["qty_max"], b["rate"]) for b in config["rate_per_sqft_by_qty"]],
+        name="rate_per_sqft_by_qty", default=config["rate_per_sqft_by_qty"][-1]["rate"]
+    )
+    waste, ladder = waste_table.lookup, ladder_table.lookup
+    material_adders = {name: m["adder_per_sqft"] for name, m in materials.items()}
+    minimum = config["min_job_usd"]
+    corners, slits = addons["reinforced_corners_usd"], addons["wind_slits_usd"]
+    pocket_pair = addons["pole_pockets_pair_usd"]
+    double_sided_mult, rush_mult = addons["double_sided_multiplier"], 1.0 + addons["rush_pct"]
+
+    def calculate_banner_price(width_ft, height_ft, qty, material="alpha", include_waste=True, rounded=True,
+                               rush=False, reinforced_corners=False, wind_slits=False, pole_pockets_pairs=0,
+                               double_sided=False):
+        """Per-banner price (whole dollars unless rounded is off)"""
+        if material not in materials:
+            raise ValueError(f"Media not found: {material}. Available materials: {list(materials)}")
+        area = width_ft * height_ft
+        billable = area + waste(area) if include_waste else area
+        each = max(billable * (ladder(qty) + material_adders[material]), minimum)
+
+        add_cost = 0.0
+        if reinforced_corners:
+            add_cost += corners
+        if wind_slits:
+            add_cost += slits
+        if pole_pockets_pairs and pole_pockets_pairs > 0:
+            add_cost += pocket_pair * int(pole_pockets_pairs)
+        each += add_cost
+
+        if double_sided:
+            each *= double_sided_mult
+        if rush:
+            each *= rush_mult
+        return math.floor(each + 0.5) if rounded else round(each, 2)
+
+    return calculate_banner_price, waste_table, ladder_table
+
+
+def compile_banner_calculator(retail):
+    """
+    Calculator retail unit price from inches: same waste tiers and ladder as the
+    retail API, but open-ended at the bottom (anything below the first tier
+    prices like it) and without minimums or add-ons.
+    """
+    cfg = retail["banners"]
+    addons = cfg["addons"]
+    buffers = retail["waste_buffers"]["banners"]
+    waste = TierTable(
+        [(-math.inf if i == 0 else t["min"], t["max"], t["add"]) for i, t in enumerate(buffers)],
+        name="waste_buffers.banners", shared_bounds=True, default=buffers[-1]["add"]
+    ).lookup
+    rungs = cfg["ladder_per_sqft"]
+    ladder = TierTable(
+        [(-math.inf if i == 0 else lo, hi, rate) for i, (lo, hi, rate) in enumerate(rungs)],
+        name="banners.ladder_per_sqft", default=rungs[-1][2]
+    ).lookup
+    # Anything but JetFlex prices as alpha
+    jetflex_adder = cfg["materials"]["jetflex"]["adder_per_sqft"]
+    alpha_adder = cfg["materials"]["alpha"]["adder_per_sqft"]
+    double_sided_mult, rush_mult = addons["double_sided_mult"], 1.0 + addons["rush_pct"]
+
+    def calculator_banner_unit_price(width_in, height_in, qty, media_name, sides, rush):
+        """Customer/partner calculator retail unit price (before partner discount)"""
+        area = (width_in / 12) * (height_in / 12)
+        billable = area + waste(area)
+        each = billable * ladder(qty)
+        adder = jetflex_adder if media_name == "jetflex" else alpha_adder
+        if adder:
+            each += billable * adder
+        if sides == 2:
+            each *= double_sided_mult
+        if rush:
+            each *= rush_mult
+        return each
+
+    return calculator_banner_unit_price
+
+
+# ========== COMPILED FUNCTIONS (the public API) ==========
+
+banner_price_retail = compile_banner_retail(RETAIL)
+banner_cost_true = compile_banner_cost(BANNER_COSTS)
+banner_quote = compile_banner_quote(RETAIL, banner_price_retail, banner_cost_true)
+calculator_banner_unit_price = compile_banner_calculator(RETAIL)
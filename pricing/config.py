@@ -0,0 +1,84 @@
+"""
+DTF Designs Pricing Engine - Configs
+Loads the retail and employee true-cost JSON configs once per process, each
+stamped with the version hash of the exact bytes loaded.
+The decal 2025 config is served from a hot-reloadable snapshot instead.
+"""
+
+import json
+import os
+
+from scripts.config_store import ConfigStore, config_version
+
+# Configuration file paths
+RETAIL_PATH = os.environ.get("RETAIL_CONFIG", "./config/retail_pricing.json")
+DECAL_COST_PATH = os.environ.get("DECALS_COST_CONFIG", "./config/employee_true_cost_decals.json")
+BANNER_COST_PATH = os.environ.get("BANNERS_COST_CONFIG", "./config/employee_true_cost_banners.json")
+POSTER_COST_PATH = os.environ.get("POSTERS_COST_CONFIG", "./config/employee_true_cost_posters.json")
+
+
+def load_config(path):
+    """Parse a JSON config and return (config, version hash of the bytes loaded)"""
+    with open(path, 'rb') as f:
+        raw = f.read()
+    return json.loads(raw), config_version(raw)
+
+
+RETAIL, RETAIL_VERSION = load_config(RETAIL_PATH)
+BANNER_COSTS, BANNER_COSTS_VERSION = load_config(BANNER_COST_PATH)
+POSTER_COSTS, POSTER_COSTS_VERSION = load_config(POSTER_COST_PATH)
+
+
+# ========== DECAL 2025 CONFIG ==========
+
+DECAL_CONFIG_PATH = os.path.join('config', 'decal_pricing_2025.json')
+
+
+def _is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def validate_pricing_config(config):
+    """Reject a decal config that would misprice quotes (raises ValueError)."""
+    def require(path, check, message):
+        node = config
+        try:
+            for key in path.split('.'):
+                node = node[key]
+        except (KeyError, TypeError):
+            raise ValueError(f"decal config: missing {path}")
+        if not check(node):
+            raise ValueError(f"decal config: {path} {message}")
+        return node
+
+    tiers = require('tiers_by_tba_sqft', lambda v: isinstance(v, list) and v, "must be a non-empty list")
+    bounds = [t.get('lt') if isinstance(t, dict) else None for t in tiers]
+    if not all(_is_number(b) for b in bounds) or bounds != sorted(bounds):
+        raise ValueError("decal config: tiers_by_tba_sqft 'lt' bounds must be ascending numbers")
+    if not all(_is_number(t.get('rate_sqft')) and t['rate_sqft'] > 0 for t in tiers):
+        raise ValueError("decal config: tiers_by_tba_sqft rates must be positive numbers")
+
+    fees = require('small_piece_fee_each', lambda v: isinstance(v, list), "must be a list")
+    fee_bounds = [f.get('min_side_in_lt') if isinstance(f, dict) else None for f in fees]
+    if not all(_is_number(b) for b in fee_bounds) or fee_bounds != sorted(fee_bounds):
+        raise ValueError("decal config: small_piece_fee_each bounds must be ascending numbers")
+    if not all(_is_number(f.get('fee')) for f in fees):
+        raise ValueError("decal config: small_piece_fee_each fees must be numbers")
+
+    non_negative = lambda v: _is_number(v) and v >= 0
+    positive = lambda v: _is_number(v) and v > 0
+    for path in ('adders_sqft.die_cut', 'adders_sqft.laminate_gloss', 'retail_job_minimum',
+                 'true_cost.base_sqft.gloss', 'true_cost.cut_sqft.kiss',
+                 'true_cost.laminate_sqft', 'true_cost.fixed_per_job'):
+        require(path, non_negative, "must be a non-negative number")
+    for path in ('rounding.unit_to', 'rounding.total_to'):
+        require(path, positive, "must be a positive number")
+    require('partner_discount', lambda v: _is_number(v) and 0 <= v < 1, "must be between 0 and 1")
+
+
+# Parsed once; re-read only when the file changes on disk
+PRICING_CONFIG = ConfigStore(
+    DECAL_CONFIG_PATH,
+    validator=validate_pricing_config,
+    check_interval=float(os.environ.get("DECAL_CONFIG_CHECK_SECONDS", "2")),
+)
@@ -0,0 +1,257 @@
+"""
+DTF Designs Pricing Engine - Decals
+Two decal price lists, each compiled into retail and true cost functions:
+- calculator: the material-cost-plus-margin pricing behind the customer,
+  partner and employee calculators and /quote/decal
+- 2025: config/decal_pricing_2025.json tiers and adders, with the popular
+  size CSV tables taking priority; recompiled whenever the hot-reloadable
+  config snapshot changes version
+"""
+
+import threading
+from collections import namedtuple
+
+from pricing.config import PRICING_CONFIG
+from scripts.config_store import VersionedAmount, VersionedPrice
+from scripts.decal_tables import TABLE_REGISTRY
+
+
+# ========== CALCULATOR DECALS ==========
+
+# Material and lamination cost per sqft (overhead is included in material)
+CALCULATOR_DECAL = {
+    "material_cost_sqft": {"gloss": 2.50, "matte": 2.80},
+    "laminate_cost_sqft": 1.20,
+    "margin": 0.30,
+    # Industry benchmarks for common sizes: (width, height, qty, floor, ceiling) on the job total
+    "benchmarks": [
+        (4, 4, 25, 30, 40),
+        (4, 4, 50, 68, 72),
+        (3, 3, 50, 35, 50),
+    ],
+    "benchmark_size_tolerance_in": 0.1,
+}
+
+
+def compile_calculator_decal(config):
+    """Calculator decal retail quote and true cost functions"""
+    gloss, matte = config["material_cost_sqft"]["gloss"], config["material_cost_sqft"]["matte"]
+    laminate_sqft = config["laminate_cost_sqft"]
+    keep = 1 - config["margin"]
+    tolerance = config["benchmark_size_tolerance_in"]
+    # (width, height, {qty: (floor, ceiling)}); sizes are matched in config order
+    sizes = {}
+    for width, height, qty, floor, ceiling in config["benchmarks"]:
+        sizes.setdefault((width, height), {})[qty] = (floor, ceiling)
+    benchmarks = tuple((width, height, by_qty) for (width, height), by_qty in sizes.items())
+
+    def job_cost(width_in, height_in, qty, material, laminate):
+        area = (width_in * height_in * qty) / 144
+        cost = area * (matte if material == "matte" else gloss)
+        if laminate != "none":
+            cost += area * laminate_sqft
+        return cost
+
+    def calculate_decal_retail_price(width_in, height_in, qty, material="gloss", laminate="none"):
+        """
+        Calculator decal retail quote: material (+ lamination) cost per sqft over
+        the whole job, 30% margin, then industry floor/ceiling ranges for common sizes
+        """
+        cost = job_cost(width_in, height_in, qty, material, laminate)
+        total = cost / keep
+        for width, height, by_qty in benchmarks:
+            if abs(width_in - width) <= tolerance and abs(height_in - height) <= tolerance:
+                bounds = by_qty.get(qty)
+                if bounds is not None:
+                    total = max(bounds[0], min(bounds[1], total))
+                break
+        return {
+            "unit_usd": round(total / qty, 2),
+            "total_usd": round(total, 2),
+            "auto_floored": False,
+            "margin_after": round(((total - cost) / total) * 100, 1)
+        }
+
+    def calculate_decal_true_cost(width_in, height_in, qty, material="gloss", laminate="none"):
+        """Calculator decal true cost and 30% margin floor sell prices"""
+        cost = job_cost(width_in, height_in, qty, material, laminate)
+        floor_sell_total = cost / keep
+        return {
+            "unit_cost_usd": round(cost / qty, 2),
+            "total_cost_usd": round(cost, 2),
+            "floor_sell_unit_usd": round(floor_sell_total / qty, 2),
+            "floor_sell_total_usd": round(floor_sell_total, 2)
+        }
+
+    return calculate_decal_retail_price, calculate_decal_true_cost
+
+
+calculate_decal_retail_price, calculate_decal_true_cost = compile_calculator_decal(CALCULATOR_DECAL)
+
+
+# ========== 2025 DECALS ==========
+
+# Set lookup matches by numeric equality ((4, 11.0) is a bumper size too)
+BUMPER_SIZES = frozenset({(3, 11.5), (4, 11), (4, 12)})
+
+# (shape, cut_type, has_laminate) -> popular size CSV table
+CSV_TABLES = {
+    ("bumper", "kiss", False): "bumper_kiss",
+    ("bumper", "die", False): "bumper_die",
+    ("bumper", "kiss", True): "bumper_kiss_lam",
+    ("squares", "kiss", False): "popular_squares_kiss",
+    ("squares", "die", False): "popular_squares_die",
+    ("squares", "kiss", True): "popular_squares_kiss_lam",
+    ("rectangles", "kiss", False): "popular_rectangles_kiss",
+    ("rectangles", "die", False): "popular_rectangles_die",
+    ("rectangles", "kiss", True): "popular_rectangles_kiss_lam",
+}
+
+
+def csv_table_name(width, height, cut_type, laminate):
+    """Popular size table for the decal, or None (laminate is a bool here)"""
+    if (width, height) in BUMPER_SIZES:
+        shape = "bumper"
+    elif width == height:
+        shape = "squares"
+    else:
+        shape = "rectangles"
+    return CSV_TABLES.get((shape, cut_type, bool(laminate)))
+
+
+def get_csv_price_lookup(width, height, qty, cut_type, laminate):
+    """
+    Look up price in CSV tables for popular sizes.
+    Returns None if size/qty not found in tables.
+    """
+    table_name = csv_table_name(width, height, cut_type, laminate)
+    if not table_name:
+        return None
+
+    # Smallest qty tier >= qty, else the highest tier
+    unit_price = TABLE_REGISTRY.unit_price(table_name, f"{int(width)}x{int(height)}", qty)
+    if unit_price is None:
+        return None
+
+    return unit_price, unit_price * qty
+
+
+
+
+def has_laminate(laminate):
+    """True for any laminate but None, '' and 'none'"""
+    return laminate is not None and laminate != '' and laminate != 'none'
+
+
+Decal2025 = namedtuple("Decal2025", "price formula cost version")
+
+
+def compile_decal_2025(config, version=None):
+    """
+    2025 decal functions from one config snapshot: price (CSV tables, then the
+    config formula), formula only, and true cost
+    """
+    # First tier whose 'lt' bound exceeds the total billable area, else the last
+    tiers = config['tiers_by_tba_sqft']
+    tba_bounds = tuple((tier['lt'], tier['rate_sqft']) for tier in tiers[:-1])
+    last_rate = tiers[-1]['rate_sqft']
+    die_cut, laminate_gloss = config['adders_sqft']['die_cut'], config['adders_sqft']['laminate_gloss']
+    # Fee of the first rule whose bound exceeds the shortest side, if any
+    small_piece_fees = tuple((rule['min_side_in_lt'], rule['fee']) for rule in config['small_piece_fee_each'])
+    unit_to, total_to = config['rounding']['unit_to'], config['rounding']['total_to']
+    minimum = config['retail_job_minimum']
+    true_cost = config['true_cost']
+    base_sqft, cut_sqft = true_cost['base_sqft'], true_cost['cut_sqft']
+    base_default, cut_default = base_sqft['gloss'], cut_sqft['kiss']
+    laminate_sqft, fixed_per_job = true_cost['laminate_sqft'], true_cost['fixed_per_job']
+
+    def formula_price(width, height, qty, cut_type, laminated):
+        area = (width * height) / 144.0
+        tba = area * qty
+        rate = last_rate
+        for lt, tier_rate in tba_bounds:
+            if tba < lt:
+                rate = tier_rate
+                break
+        if cut_type == 'die':
+            rate += die_cut
+        if laminated:
+            rate += laminate_gloss
+
+        unit = rate * area
+        min_side = min(width, height)
+        for lt, fee in small_piece_fees:
+            if min_side < lt:
+                unit += fee
+                break
+        return unit, unit * qty
+
+    def finish(unit, total, qty):
+        # Round to the configured increments, then apply the job minimum
+        unit = round(unit / unit_to) * unit_to
+        total = round(total / total_to) * total_to
+        if total < minimum:
+            total = minimum
+            unit = minimum / qty
+        return VersionedPrice(unit, total, version)
+
+    def price(width, height, qty, material='gloss', cut_type='kiss', laminate=None):
+        """2025 decal (unit, total): popular size tables first, then the config formula"""
+        laminated = has_laminate(laminate)
+        priced = get_csv_price_lookup(width, height, qty, cut_type, laminated)
+        if not priced:
+            priced = formula_price(width, height, qty, cut_type, laminated)
+        return finish(*priced, qty)
+
+    def formula(width, height, qty, material='gloss', cut_type='kiss', laminate=None):
+        """2025 decal (unit, total) from the config formula alone"""
+        return finish(*formula_price(width, height, qty, cut_type, has_laminate(laminate)), qty)
+
+    def cost(width, height, qty, material='gloss', cut_type='kiss', laminate=None):
+        """2025 decal total true cost"""
+        area = (width * height) / 144.0
+        material_cost = base_sqft.get(material, base_default) * area * qty
+        cut_cost = cut_sqft.get(cut_type, cut_default) * area * qty
+        laminate_cost = laminate_sqft * area * qty if has_laminate(laminate) else 0
+        return VersionedAmount(material_cost + cut_cost + laminate_cost + fixed_per_job, version)
+
+    return Decal2025(price=price, formula=formula, cost=cost, version=version)
+
+
+_compiled_2025 = None
+_compile_lock = threading.Lock()
+
+
+def decal_2025_pipelines(config=None):
+    """
+    Compiled 2025 functions for a config snapshot (the current one by default).
+    Snapshots are compiled once per version; unversioned configs every call.
+    """
+    global _compiled_2025
+    if config is None:
+        config = PRICING_CONFIG.current()
+    version = getattr(config, 'version', None)
+    if version is None:
+        return compile_decal_2025(config)
+    compiled = _compiled_2025
+    if compiled is None or compiled.version != version:
+        with _compile_lock:
+            compiled = _compiled_2025
+            if compiled is None or compiled.version != version:
+                compiled = _compiled_2025 = compile_decal_2025(config, version)
+    return compiled
+
+
+def calculate_decal_price_2025(width, height, qty, material='gloss', cut_type='kiss', laminate=None):
+    """2025 decal (unit, total): popular size tables first, then the config formula"""
+    return decal_2025_pipelines().price(width, height, qty, material, cut_type, laminate)
+
+
+def calculate_decal_price_from_config(width, height, qty, material, cut_type, laminate, config):
+    """2025 decal (unit, total) from the config formula alone"""
+    return decal_2025_pipelines(config).formula(width, height, qty, material, cut_type, laminate)
+
+
+def calculate_decal_true_cost_2025(width, height, qty, material='gloss', cut_type='kiss', laminate=None):
+    """2025 decal total true cost"""
+    return decal_2025_pipelines().cost(width, height, qty, material, cut_type, laminate)
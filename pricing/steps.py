@@ -0,0 +1,97 @@
+"""
+DTF Designs Pricing Engine - Shared Steps
+Plain step functions used by more than one product's compiled pricing
+functions (see pricing/banner.py and pricing/decal.py).
+"""
+
+
+def round_job_cents(subtotal, qty):
+    """(unit, total) rounded to cents; the unit comes from the unrounded subtotal"""
+    return round(subtotal / qty, 2), round(subtotal, 2)
+
+
+def round_to_increment(value, increment):
+    """Round value to the nearest increment."""
+    return round(value / increment) * increment
+
+
+# ========== MARGIN GUARD ==========
+
+def margin_guard(retail_total, cost_total, min_margin_pct, mode):
+    """
+    Margin guard: approve, auto-floor or block a retail total against its true cost
+
+    Args:
+        retail_total: Total retail price
+        cost_total: True cost total
+        min_margin_pct: Minimum margin percentage
+        mode: "AUTO_FLOOR" or "BLOCK"
+
+    Returns:
+        dict with guard results
+    """
+    # Calculate actual margin
+    actual_margin = (retail_total - cost_total) / retail_total if retail_total > 0 else 0.0
+
+    # Check if margin is acceptable
+    is_acceptable = actual_margin >= min_margin_pct
+
+    if is_acceptable:
+        return {
+            "approved": True,
+            "auto_floored": False,
+            "final_total": retail_total,
+            "actual_margin": actual_margin,
+            "cost_total": cost_total
+        }
+
+    # Calculate floor price
+    floor_total = cost_total / (1.0 - min_margin_pct)
+
+    if mode == "AUTO_FLOOR":
+        return {
+            "approved": True,
+            "auto_floored": True,
+            "final_total": round(floor_total, 2),
+            "actual_margin": min_margin_pct,
+            "cost_total": cost_total,
+            "original_retail": retail_total
+        }
+
+    elif mode == "BLOCK":
+        return {
+            "approved": False,
+            "blocked": True,
+            "retail_total": retail_total,
+            "min_allowed_total": round(floor_total, 2),
+            "actual_margin": actual_margin,
+            "required_margin": min_margin_pct,
+            "cost_total": cost_total
+        }
+
+    else:
+        raise ValueError(f"Invalid floor_mode: {mode}")
+
+
+def guarded_quote(guard, qty):
+    """
+    Retail quote response for a margin guard result. A blocked quote keeps
+    the retail unit and total it was blocked at, plus the error fields.
+    """
+    final_total = guard["final_total"] if guard["approved"] else guard["retail_total"]
+    result = {
+        "unit_usd": round(final_total / qty, 2),
+        "total_usd": final_total,
+        "auto_floored": guard.get("auto_floored", False),
+        "margin_after": guard["actual_margin"]
+    }
+
+    if not guard["approved"]:
+        result.update({
+            "error": "Quote below minimum margin",
+            "retail_total_usd": guard["retail_total"],
+            "min_allowed_total_usd": guard["min_allowed_total"],
+            "margin_actual": guard["actual_margin"]
+        })
+
+    return result
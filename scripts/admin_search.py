@@ -0,0 +1,247 @@
+"""
+DTF Designs - Admin Quote/Order Search
+Indexed substring search over document numbers and customer name, email and
+company for the admin lists, replacing LIKE '%term%' across a join.
+
+Backends, picked per database:
+    pg_trgm  PostgreSQL with the pg_trgm extension: GIN trigram indexes serve
+             ILIKE '%term%', similarity() ranks
+    fts5     SQLite with FTS5: trigram-tokenized shadow tables kept in sync by
+             triggers, bm25() ranks
+    like     anything else (or terms shorter than 3 characters): the old
+             unindexed LIKE scan, bounded by the result limits
+
+Matches are ranked in tiers: exact document number, then number substrings,
+then quotes/orders of matching customers by customer relevance; newest first
+within a tier. The indexes are installed by schema migration 5.
+"""
+
+import logging
+import os
+import threading
+from collections import namedtuple
+
+from sqlalchemy import func, or_, select, text
+
+SEARCH_MAX_RESULTS = int(os.environ.get("ADMIN_SEARCH_MAX_RESULTS", "500"))
+SEARCH_MAX_CUSTOMERS = int(os.environ.get("ADMIN_SEARCH_MAX_CUSTOMERS", "500"))
+MIN_INDEXED_TERM = 3  # trigram indexes can't help below three characters
+
+CUSTOMER_FIELDS = ("name", "email", "company")
+
+log = logging.getLogger(__name__)
+
+# Searchable document kind: table plus its number, customer and date columns
+Document = namedtuple("Document", ["table", "number", "customer_id", "created_at"])
+
+
+def _like_pattern(term):
+    escaped = term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+
+def _fts_phrase(term):
+    return '"' + term.replace('"', '""') + '"'
+
+
+class AdminSearch:
+    """
+    Args:
+        customer: customer Table (id plus CUSTOMER_FIELDS)
+        documents: {kind: Document}, e.g. {"quote": Document(quote, quote.c.quote_number, ...)}
+    """
+
+    def __init__(self, customer, documents):
+        self.customer = customer
+        self.documents = documents
+        self._backends = {}
+        self._lock = threading.Lock()
+
+    # ---- installation (migration 5) ----
+
+    def install(self, conn):
+        """Create the backend's indexes/shadow tables and index existing rows"""
+        if conn.dialect.name == "postgresql":
+            try:
+                with conn.begin_nested():
+                    conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+            except Exception as exc:  # needs a superuser or a trusted extension
+                log.warning("pg_trgm unavailable, admin search stays unindexed: %s", exc)
+                return
+            columns = [(self.customer, self.customer.c[f]) for f in CUSTOMER_FIELDS]
+            columns += [(doc.table, doc.number) for doc in self.documents.values()]
+            for table, column in columns:
+                conn.execute(text(
+                    f'CREATE INDEX IF NOT EXISTS ix_{table.name}_{column.name}_trgm '
+                    f'ON "{table.name}" USING gin ({column.name} gin_trgm_ops)'
+                ))
+        elif conn.dialect.name == "sqlite":
+            if not self._sqlite_has_trigram(conn):
+                log.warning("SQLite lacks FTS5 trigram support, admin search stays unindexed")
+                return
+            self._install_fts(conn, self.customer, CUSTOMER_FIELDS)
+            for doc in self.documents.values():
+                self._install_fts(conn, doc.table, (doc.number.name,))
+        with self._lock:
+            self._backends.clear()
+
+    @staticmethod
+    def _sqlite_has_trigram(conn):
+        try:
+            conn.exec_driver_sql("CREATE VIRTUAL TABLE temp._trigram_probe USING fts5(x, tokenize='trigram')")
+            conn.exec_driver_sql("DROP TABLE temp._trigram_probe")
+            return True
+        except Exception:
+            return False
+
+    @staticmethod
+    def _install_fts(conn, table, fields):
+        fts = f"{table.name}_fts"
+        cols = ", ".join(fields)
+        new = ", ".join(f"new.{f}" for f in fields)
+        old = ", ".join(f"old.{f}" for f in fields)
+        conn.exec_driver_sql(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5({cols}, "
+            f"content='{table.name}', content_rowid='id', tokenize='trigram')"
+        )
+        conn.exec_driver_sql(
+            f'CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON "{table.name}" BEGIN '
+            f"INSERT INTO {fts}(rowid, {cols}) VALUES (new.id, {new}); END"
+        )
+        conn.exec_driver_sql(
+            f'CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON "{table.name}" BEGIN '
+            f"INSERT INTO {fts}({fts}, rowid, {cols}) VALUES ('delete', old.id, {old}); END"
+        )
+        conn.exec_driver_sql(
+            f'CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE OF {cols} ON "{table.name}" BEGIN '
+            f"INSERT INTO {fts}({fts}, rowid, {cols}) VALUES ('delete', old.id, {old}); "
+            f"INSERT INTO {fts}(rowid, {cols}) VALUES (new.id, {new}); END"
+        )
+        conn.exec_driver_sql(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')")
+
+    # ---- querying ----
+
+    def backend(self, conn):
+        """'pg_trgm', 'fts5' or 'like' for this connection's database (cached per engine)"""
+        key = conn.engine.url
+        with self._lock:
+            found = self._backends.get(key)
+        if found is None:
+            found = "like"
+            if conn.dialect.name == "postgresql":
+                if conn.execute(text("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")).first():
+                    found = "pg_trgm"
+            elif conn.dialect.name == "sqlite":
+                if conn.exec_driver_sql(
+                    f"SELECT 1 FROM sqlite_master WHERE name = '{self.customer.name}_fts'"
+                ).first():
+                    found = "fts5"
+            with self._lock:
+                self._backends[key] = found
+        return found
+
+    def matching_customers(self, conn, term, limit=SEARCH_MAX_CUSTOMERS):
+        """Customer ids whose name, email or company contains term, best match first"""
+        backend = self.backend(conn) if len(term) >= MIN_INDEXED_TERM else "like"
+        c = self.customer.c
+        if backend == "fts5":
+            fts = f"{self.customer.name}_fts"
+            rows = conn.exec_driver_sql(
+                f"SELECT rowid FROM {fts} WHERE {fts} MATCH ? ORDER BY rank LIMIT ?",
+                (_fts_phrase(term), limit),
+            )
+            return [row[0] for row in rows]
+        pattern = _like_pattern(term)
+        if backend == "pg_trgm":
+            matches = or_(*(c[f].ilike(pattern, escape="\\") for f in CUSTOMER_FIELDS))
+            score = func.greatest(*(func.similarity(func.coalesce(c[f], ""), term) for f in CUSTOMER_FIELDS))
+            stmt = select(c.id).where(matches).order_by(score.desc(), c.id.desc())
+        else:
+            matches = or_(*(c[f].contains(term, autoescape=True) for f in CUSTOMER_FIELDS))
+            stmt = select(c.id).where(matches).order_by(c.id.desc())
+        return list(conn.execute(stmt.limit(limit)).scalars())
+
+    def matching_numbers(self, conn, kind, term, limit=SEARCH_MAX_RESULTS):
+        """Ids of documents whose number contains term (just the one for an exact number)"""
+        doc = self.documents[kind]
+        # A complete number is answered by the unique index; no substring can beat it
+        exact = conn.execute(select(doc.table.c.id).where(doc.number == term.upper())).scalar()
+        if exact is not None:
+            return [exact]
+        backend = self.backend(conn) if len(term) >= MIN_INDEXED_TERM else "like"
+        if backend == "fts5":
+            fts = f"{doc.table.name}_fts"
+            rows = conn.exec_driver_sql(
+                f"SELECT rowid FROM {fts} WHERE {fts} MATCH ? ORDER BY rank LIMIT ?",
+                (_fts_phrase(term), limit),
+            )
+            ids = [row[0] for row in rows]
+        elif backend == "pg_trgm":
+            ids = list(conn.execute(
+                select(doc.table.c.id).where(doc.number.ilike(_like_pattern(term), escape="\\"))
+                .order_by(func.similarity(doc.number, term).desc()).limit(limit)
+            ).scalars())
+        else:
+            ids = list(conn.execute(
+                select(doc.table.c.id).where(doc.number.contains(term, autoescape=True)).limit(limit)
+            ).scalars())
+        return ids
+
+    def ranked_ids(self, conn, kind, term, criteria=(), limit=SEARCH_MAX_RESULTS):
+        """
+        Ranked document ids matching term and every extra criterion (status,
+        category, ... on the document table), at most `limit` of them.
+
+        Returns:
+            (ids, capped) - capped is True when matches may have been cut off
+            (too many numbers, customers or rows to rank them all)
+        """
+        term = term.strip()
+        if not term:
+            return [], False
+        doc = self.documents[kind]
+        id_col = doc.table.c.id
+        number_ids = self.matching_numbers(conn, kind, term, limit + 1)
+        customer_ids = self.matching_customers(conn, term)
+        customer_rank = {cid: i for i, cid in enumerate(customer_ids)}
+
+        rows, capped = [], len(number_ids) > limit or len(customer_ids) >= SEARCH_MAX_CUSTOMERS
+        if number_ids:
+            rows += conn.execute(
+                select(id_col, doc.number, doc.customer_id, doc.created_at)
+                .where(id_col.in_(number_ids), *criteria)
+            ).all()
+        if customer_ids:
+            scan_limit = limit * 4
+            by_customer = conn.execute(
+                select(id_col, doc.number, doc.customer_id, doc.created_at)
+                .where(doc.customer_id.in_(customer_ids), *criteria)
+                .limit(scan_limit + 1)
+            ).all()
+            capped = capped or len(by_customer) > scan_limit
+            rows += by_customer[:scan_limit]
+
+        folded = term.lower()
+        best = {}
+        for row in rows:
+            number = (row[1] or "").lower()
+            if number == folded:
+                tier = (0, 0)
+            elif folded in number:
+                tier = (1, 0)
+            else:
+                tier = (2, customer_rank.get(row[2], len(customer_rank)))
+            key = (tier, -(row[3].timestamp() if row[3] else 0), -row[0])
+            if row[0] not in best or key < best[row[0]]:
+                best[row[0]] = key
+        ranked = sorted(best, key=best.get)
+        return ranked[:limit], capped or len(ranked) > limit
+
+
+def for_tables(tables):
+    """AdminSearch over the app's customer, quote and order tables"""
+    quote, order = tables["quote"], tables["order"]
+    return AdminSearch(tables["customer"], {
+        "quote": Document(quote, quote.c.quote_number, quote.c.customer_id, quote.c.created_at),
+        "order": Document(order, order.c.order_number, order.c.customer_id, order.c.created_at),
+    })
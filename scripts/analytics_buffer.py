@@ -0,0 +1,107 @@
+"""
+DTF Designs - Write-Behind Analytics Buffer
+Collects analytics counter increments and JSON payload merges in memory and
+hands them to a flush function in one batch every few seconds, when the
+buffer grows large, and at interpreter shutdown.
+"""
+
+import atexit
+import logging
+import os
+import threading
+
+FLUSH_SECONDS = float(os.environ.get("ANALYTICS_FLUSH_SECONDS", "5"))
+MAX_PENDING = int(os.environ.get("ANALYTICS_MAX_PENDING", "500"))
+
+log = logging.getLogger(__name__)
+
+
+class AnalyticsBuffer:
+    """
+    Thread-safe (key -> [value, payload]) accumulator with a background flusher.
+
+    Increments for the same key are summed and payloads merged (later keys
+    win), so a flush writes each key at most once. If the flush function
+    raises, the batch is merged back and retried on the next flush.
+
+    The flusher thread starts on first use in each process, so workers forked
+    from a preloaded app each get their own; anything buffered before a fork
+    stays with the parent.
+
+    Args:
+        flush: callable taking {key: (value, payload)}
+        interval: seconds between background flushes
+        max_pending: flush early once this many keys are buffered
+    """
+
+    def __init__(self, flush, interval=FLUSH_SECONDS, max_pending=MAX_PENDING):
+        self._flush = flush
+        self.interval = interval
+        self.max_pending = max_pending
+        self._reset()
+        if hasattr(os, "register_at_fork"):
+            os.register_at_fork(after_in_child=self._reset)
+        atexit.register(self.flush)
+
+    def _reset(self):
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._pending = {}
+        self._wake = threading.Event()
+        self._thread = None
+        self.flushes = 0
+        self.failures = 0
+
+    def add(self, key, value, payload=None):
+        """Buffer an increment (and optional payload merge) for key"""
+        with self._lock:
+            entry = self._pending.get(key)
+            if entry is None:
+                self._pending[key] = [value, dict(payload) if payload else {}]
+            else:
+                entry[0] += value
+                if payload:
+                    entry[1].update(payload)
+            pending = len(self._pending)
+            if self._thread is None:
+                self._start()
+        if pending >= self.max_pending:
+            self._wake.set()
+
+    def pending(self):
+        with self._lock:
+            return len(self._pending)
+
+    def _start(self):
+        self._thread = threading.Thread(target=self._run, name="analytics-flush", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while True:
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            self.flush()
+
+    def flush(self):
+        """Write everything buffered so far; returns the number of keys flushed"""
+        with self._flush_lock:
+            with self._lock:
+                batch, self._pending = self._pending, {}
+            if not batch:
+                return 0
+            try:
+                self._flush({key: (value, payload) for key, (value, payload) in batch.items()})
+            except Exception:
+                self.failures += 1
+                log.exception("analytics flush failed; %d keys kept for retry", len(batch))
+                with self._lock:
+                    for key, (value, payload) in batch.items():
+                        entry = self._pending.get(key)
+                        if entry is None:
+                            self._pending[key] = [value, payload]
+                        else:
+                            entry[0] += value
+                            entry[1] = {**payload, **entry[1]}
+                return 0
+            self.flushes += 1
+            return len(batch)
@@ -0,0 +1,229 @@
+"""
+DTF Designs Batch Banner Pricing
+Vectorized retail + true cost + margin guard for multi-line banner packages.
+Mirrors banner_quote_with_guard in scripts/pricers.py to the cent.
+"""
+
+import math
+
+import numpy as np
+
+from scripts.pricers import RETAIL, BANNER_COSTS, BANNER_LADDER, BANNER_WASTE
+
+# Largest package accepted by one batch call
+BATCH_MAX_LINES = 10000
+
+# ========== LINE PARSING ==========
+
+LINE_FIELDS = ("width_ft", "height_ft", "qty", "material", "include_waste",
+               "reinforced_corners", "wind_slits", "pole_pockets_pairs",
+               "double_sided", "rush")
+
+def _parse_line(d):
+    """Normalize one line spec to a tuple ordered like LINE_FIELDS"""
+    if not isinstance(d, dict):
+        raise ValueError("Line must be an object")
+
+    addons_data = d.get("addons") or d
+    if not isinstance(addons_data, dict):
+        raise ValueError("addons must be an object")
+
+    try:
+        width_ft = float(d["width_ft"])
+        height_ft = float(d["height_ft"])
+        qty = int(d["qty"])
+        pole_pockets_pairs = int(addons_data.get("pole_pockets_pairs", 0))
+    except KeyError as e:
+        raise ValueError(f"Missing field: {e.args[0]}")
+    except (AttributeError, TypeError, ValueError) as e:
+        raise ValueError(f"Invalid value: {str(e)}")
+
+    if not (math.isfinite(width_ft) and math.isfinite(height_ft)):
+        raise ValueError("Width and height must be finite numbers")
+    if qty < 1:
+        raise ValueError("Quantity must be at least 1")
+
+    material = d.get("material", "alpha")
+    if not isinstance(material, str) or material not in RETAIL["banners"]["materials"] or material not in BANNER_COSTS["materials_cost_per_sqft"]:
+        raise ValueError(f"Unknown material: {material}")
+
+    return (width_ft, height_ft, qty, material,
+            bool(d.get("include_waste", True)),
+            bool(addons_data.get("reinforced_corners", False)),
+            bool(addons_data.get("wind_slits", False)),
+            pole_pockets_pairs,
+            bool(addons_data.get("double_sided", False)),
+            bool(addons_data.get("rush", False)))
+
+def parse_banner_line(d):
+    """
+    Normalize one banner line spec (same shape as the /quote/banner body).
+    Supports both flat add-on flags and an "addons" dict.
+    Returns keyword arguments for banner_quote_with_guard.
+    Raises ValueError for lines the scalar pricer cannot price.
+    """
+    return dict(zip(LINE_FIELDS, _parse_line(d)))
+
+# ========== VECTORIZED HELPERS ==========
+
+def _round_cents(values):
+    """
+    Round an array to cents exactly like Python's round(x, 2).
+    np.rint on x * 100 agrees with the builtin everywhere except values that sit
+    within float error of a half cent; those few go through the builtin.
+    """
+    scaled = values * 100.0
+    rounded = np.rint(scaled) / 100.0
+    near_half = np.abs(scaled - np.floor(scaled) - 0.5) <= 1e-9 * np.maximum(1.0, np.abs(scaled))
+    for idx in np.flatnonzero(near_half).tolist():
+        rounded[idx] = round(float(values[idx]), 2)
+    return rounded
+
+def _tier_lookup(table, x):
+    """
+    Vectorized TierTable.lookup via searchsorted on the compiled boundaries.
+    Entries outside every tier get the table default.
+    """
+    his = np.asarray(table.his, dtype=np.float64)
+    idx = np.searchsorted(his, x, side="left")
+    clipped = np.minimum(idx, len(his) - 1)
+    matched = (idx < len(his)) & (np.asarray(table.los, dtype=np.float64)[clipped] <= x)
+    return np.where(matched, np.asarray(table.values, dtype=np.float64)[clipped], table.default)
+
+# ========== BATCH KERNEL ==========
+
+def banner_quote_batch(lines):
+    """
+    Price a list of banner line specs in one vectorized pass.
+
+    Args:
+        lines: list of line dicts (see parse_banner_line)
+
+    Returns:
+        list of per-line results in input order. Priced and blocked lines carry
+        the same fields as banner_quote_with_guard (blocked ones add "error");
+        invalid lines carry just "line" and "error".
+    """
+    results = [None] * len(lines)
+    rows = []
+    positions = []
+
+    for i, d in enumerate(lines):
+        try:
+            rows.append(_parse_line(d))
+            positions.append(i)
+        except ValueError as e:
+            results[i] = {"line": i, "error": str(e)}
+
+    if not rows:
+        return results
+
+    (width_ft, height_ft, qty, materials, include_waste, reinforced_corners,
+     wind_slits, pole_pockets_pairs, double_sided, rush) = zip(*rows)
+
+    width_ft = np.array(width_ft, dtype=np.float64)
+    height_ft = np.array(height_ft, dtype=np.float64)
+    qty = np.array(qty, dtype=np.float64)
+    include_waste = np.array(include_waste, dtype=bool)
+    reinforced_corners = np.array(reinforced_corners, dtype=bool)
+    wind_slits = np.array(wind_slits, dtype=bool)
+    pole_pockets_pairs = np.array(pole_pockets_pairs, dtype=np.float64)
+    double_sided = np.array(double_sided, dtype=bool)
+    rush = np.array(rush, dtype=bool)
+
+    area_ft2 = width_ft * height_ft
+
+    # ----- Retail (banner_price_retail) -----
+    banners = RETAIL["banners"]
+    addons = banners["addons"]
+
+    waste_add = _tier_lookup(BANNER_WASTE, area_ft2)
+    billable_area = np.where(include_waste, area_ft2 + waste_add, area_ft2)
+    base_rate = _tier_lookup(BANNER_LADDER, qty)
+    material_adder = np.array([banners["materials"][m]["adder_per_sqft"] for m in materials], dtype=np.float64)
+    rate = base_rate + material_adder
+
+    subtotal = billable_area * rate * qty
+    subtotal = np.maximum(subtotal, RETAIL["job_minimums"]["banners"])
+
+    per_banner_addons = np.zeros(qty.shape)
+    per_banner_addons = np.where(reinforced_corners, per_banner_addons + addons["reinforced_corners"], per_banner_addons)
+    per_banner_addons = np.where(wind_slits, per_banner_addons + addons["wind_slits"], per_banner_addons)
+    per_banner_addons = np.where(pole_pockets_pairs > 0,
+                                 per_banner_addons + addons["pole_pockets_pair"] * pole_pockets_pairs,
+                                 per_banner_addons)
+
+    subtotal = subtotal + per_banner_addons * qty
+    subtotal = np.where(double_sided, subtotal * addons["double_sided_mult"], subtotal)
+    subtotal = np.where(rush, subtotal * (1.0 + addons["rush_pct"]), subtotal)
+
+    total_retail = _round_cents(subtotal)
+
+    # ----- True cost (banner_cost_true, no rush) -----
+    cost_addons = BANNER_COSTS["addons_cost"]
+    per_sqft_cost = {
+        m: BANNER_COSTS["materials_cost_per_sqft"][m] + BANNER_COSTS["ink_cost_per_sqft"]
+           + BANNER_COSTS["machine_overhead_per_sqft"] + BANNER_COSTS["finishing_cost_per_sqft"]
+        for m in set(materials)
+    }
+
+    per_banner_cost = area_ft2 * np.array([per_sqft_cost[m] for m in materials], dtype=np.float64)
+    per_banner_cost = per_banner_cost + BANNER_COSTS["finishing_fixed_per_banner"]
+    per_banner_cost = np.where(reinforced_corners, per_banner_cost + cost_addons["reinforced_corners"], per_banner_cost)
+    per_banner_cost = np.where(wind_slits, per_banner_cost + cost_addons["wind_slits"], per_banner_cost)
+    per_banner_cost = np.where(pole_pockets_pairs > 0,
+                               per_banner_cost + cost_addons["pole_pockets_pair"] * pole_pockets_pairs,
+                               per_banner_cost)
+    per_banner_cost = np.where(double_sided,
+                               per_banner_cost + area_ft2 * BANNER_COSTS.get("second_side_extra_per_sqft", 0.525),
+                               per_banner_cost)
+
+    fixed_total = BANNER_COSTS["setup_cost_per_job"] + BANNER_COSTS["packaging_cost_per_job"]
+    total_cost = _round_cents(per_banner_cost * qty + fixed_total)
+
+    # ----- Margin guard (calculate_margin_guard) -----
+    min_margin_pct = RETAIL["min_margin_floor_pct"]
+    mode = RETAIL["floor_mode"]
+    if mode not in ("AUTO_FLOOR", "BLOCK"):
+        raise ValueError(f"Invalid floor_mode: {mode}")
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        actual_margin = np.where(total_retail > 0, (total_retail - total_cost) / total_retail, 0.0)
+    is_acceptable = actual_margin >= min_margin_pct
+    floor_total = _round_cents(total_cost / (1.0 - min_margin_pct))
+
+    if mode == "AUTO_FLOOR":
+        final_total = np.where(is_acceptable, total_retail, floor_total)
+        margin_after = np.where(is_acceptable, actual_margin, min_margin_pct)
+    else:
+        final_total = total_retail
+        margin_after = actual_margin
+
+    unit_usd = _round_cents(final_total / qty)
+
+    # ----- Assemble results in input order -----
+    final_total = final_total.tolist()
+    unit_usd = unit_usd.tolist()
+    margin_after = margin_after.tolist()
+    is_acceptable = is_acceptable.tolist()
+    total_retail = total_retail.tolist()
+    floor_total = floor_total.tolist()
+
+    for j, i in enumerate(positions):
+        # Blocked lines keep the retail unit/total they were blocked at
+        results[i] = {
+            "line": i,
+            "unit_usd": unit_usd[j],
+            "total_usd": final_total[j],
+            "auto_floored": mode == "AUTO_FLOOR" and not is_acceptable[j],
+            "margin_after": margin_after[j]
+        }
+        if mode == "BLOCK" and not is_acceptable[j]:
+            results[i].update({
+                "error": "Quote below minimum margin",
+                "retail_total_usd": total_retail[j],
+                "min_allowed_total_usd": floor_total[j],
+                "margin_actual": margin_after[j]
+            })
+
+    return results
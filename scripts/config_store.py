@@ -0,0 +1,146 @@
+"""
+DTF Designs - Versioned Config Snapshots
+Parses a JSON pricing config once into an immutable snapshot stamped with a
+content hash, and swaps in a new snapshot when the file changes on disk.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from types import MappingProxyType
+
+# Default seconds between change checks (one os.stat per check)
+CHECK_SECONDS = float(os.environ.get("CONFIG_CHECK_SECONDS", "2"))
+
+
+def freeze(value):
+    """Recursively convert parsed JSON into read-only mappings and tuples"""
+    if isinstance(value, dict):
+        return MappingProxyType({k: freeze(v) for k, v in value.items()})
+    if isinstance(value, list):
+        return tuple(freeze(v) for v in value)
+    return value
+
+
+def config_version(raw_bytes):
+    """Short content hash used to stamp quotes priced with a config"""
+    return hashlib.sha256(raw_bytes).hexdigest()[:12]
+
+
+class ConfigSnapshot:
+    """
+    One parsed, validated, read-only version of a config file.
+    Supports config["key"] and config.get("key") like the plain dict it replaces.
+    """
+
+    __slots__ = ("data", "version", "path", "loaded_at")
+
+    def __init__(self, data, version, path):
+        self.data = freeze(data)
+        self.version = version
+        self.path = path
+        self.loaded_at = time.time()
+
+    def __getitem__(self, key):
+        return self.data[key]
+
+    def __contains__(self, key):
+        return key in self.data
+
+    def get(self, key, default=None):
+        return self.data.get(key, default)
+
+    def __repr__(self):
+        return f"ConfigSnapshot({self.path!r}, version={self.version!r})"
+
+
+class ConfigStore:
+    """
+    Holds the current ConfigSnapshot for one JSON file.
+
+    current() costs nothing between checks; at most once per check_interval it
+    stats the file, and only re-reads it when (mtime, size) moved. A file whose
+    bytes hash to the current version is not re-parsed. A new snapshot replaces
+    the old one with a single reference assignment, so a caller always prices a
+    whole quote against one consistent version.
+
+    A config that fails to parse or validate on reload is logged and ignored;
+    the last good snapshot stays in service. The first load raises.
+    """
+
+    def __init__(self, path, validator=None, check_interval=CHECK_SECONDS):
+        self.path = path
+        self.validator = validator
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._snapshot = None
+        self._stat_key = None
+        self._next_check = 0.0
+
+    def _read_snapshot(self):
+        with open(self.path, 'rb') as f:
+            raw = f.read()
+        version = config_version(raw)
+        if self._snapshot is not None and version == self._snapshot.version:
+            return self._snapshot
+        data = json.loads(raw)
+        if self.validator:
+            self.validator(data)
+        return ConfigSnapshot(data, version, self.path)
+
+    def refresh(self, force=False):
+        """Check the file for changes (rate-limited unless force=True)"""
+        now = time.monotonic()
+        if not force and self._snapshot is not None and now < self._next_check:
+            return self._snapshot
+
+        with self._lock:
+            if not force and self._snapshot is not None and now < self._next_check:
+                return self._snapshot
+            self._next_check = now + self.check_interval
+
+            try:
+                st = os.stat(self.path)
+                stat_key = (st.st_mtime_ns, st.st_size)
+                if self._snapshot is None or force or stat_key != self._stat_key:
+                    # Recorded first so a bad file is reported once, not on every check
+                    self._stat_key = stat_key
+                    self._snapshot = self._read_snapshot()
+            except (OSError, ValueError) as e:
+                if self._snapshot is None:
+                    raise
+                logging.error(f"Keeping config {self._snapshot.version} for {self.path}: {str(e)}")
+
+            return self._snapshot
+
+    def current(self):
+        """The snapshot to price with"""
+        snapshot = self._snapshot
+        if snapshot is not None and time.monotonic() < self._next_check:
+            return snapshot
+        return self.refresh()
+
+    @property
+    def version(self):
+        return self.current().version
+
+
+class VersionedPrice(tuple):
+    """(unit_price, total_price) that also records the config version it was priced with"""
+
+    def __new__(cls, unit_price, total_price, config_version=None):
+        result = super().__new__(cls, (unit_price, total_price))
+        result.config_version = config_version
+        return result
+
+
+class VersionedAmount(float):
+    """A money amount that also records the config version it was priced with"""
+
+    def __new__(cls, value, config_version=None):
+        result = super().__new__(cls, value)
+        result.config_version = config_version
+        return result
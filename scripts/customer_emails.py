@@ -0,0 +1,146 @@
+"""
+DTF Designs - Customer Email Normalization & Dedup Migration
+Customers are keyed by normalized email (trimmed, lowercased) with a unique
+index, so saving a quote can upsert its customer in one statement.
+
+Databases created before the index existed may hold the same customer several
+times (different case/whitespace, or two quotes saved at once). The migration
+normalizes every email, merges each group of duplicates into its oldest row
+(quotes and orders are re-pointed, totals summed, blank contact fields filled
+from the newer rows) and then creates the index. It runs as schema migration
+2 (scripts/migrations.py); it is idempotent and can also be run by hand:
+
+    python -m scripts.customer_emails            # migrate DATABASE_URL
+    python -m scripts.customer_emails --dry-run  # report duplicates only
+"""
+
+import logging
+import os
+
+from sqlalchemy import Index, bindparam, delete, func, inspect, select, text, update
+
+INDEX_NAME = "ix_customer_email"
+MIGRATION_LOCK_KEY = 0x44544643  # "DTFC"
+CONTACT_FIELDS = ("phone", "company", "address")
+
+log = logging.getLogger(__name__)
+
+
+def normalize_email(email):
+    """Canonical form customers are matched on"""
+    return (email or "").strip().lower()
+
+
+def email_index(customer_table):
+    """The unique index on customer.email (the model's own, or a new one for a reflected table)"""
+    for index in customer_table.indexes:
+        if index.name == INDEX_NAME:
+            return index
+    return Index(INDEX_NAME, customer_table.c.email, unique=True)
+
+
+def has_email_index(conn, customer_table):
+    return any(ix["name"] == INDEX_NAME for ix in inspect(conn).get_indexes(customer_table.name))
+
+
+def dedupe_customers(conn, customer, referencing):
+    """
+    Normalize emails and merge duplicate customers into the oldest row.
+
+    Args:
+        conn: connection inside a transaction
+        customer: customer Table
+        referencing: columns holding customer ids (quote.customer_id, order.customer_id)
+
+    Returns:
+        {"normalized": rows rewritten, "merged": rows removed}
+    """
+    c = customer.c
+    normalized = func.lower(func.trim(c.email))
+    stats = {"normalized": conn.execute(
+        update(customer).where(c.email != normalized).values(email=normalized)
+    ).rowcount, "merged": 0}
+
+    dup_emails = select(c.email).group_by(c.email).having(func.count() > 1)
+    rows = conn.execute(select(customer).where(c.email.in_(dup_emails)).order_by(c.email, c.id)).all()
+    groups = {}
+    for row in rows:
+        groups.setdefault(row.email, []).append(row)
+
+    moves, survivors, doomed = [], [], []
+    for keep, *dups in groups.values():
+        merged = {"keep_id": keep.id,
+                  "total_orders": (keep.total_orders or 0) + sum(d.total_orders or 0 for d in dups),
+                  "total_spent": (keep.total_spent or 0.0) + sum(d.total_spent or 0.0 for d in dups)}
+        for field in CONTACT_FIELDS:
+            values = [getattr(r, field) for r in [keep] + dups[::-1]]
+            merged[field] = next((v for v in values if v), getattr(keep, field))
+        survivors.append(merged)
+        moves.extend({"keep_id": keep.id, "dup_id": d.id} for d in dups)
+        doomed.extend(d.id for d in dups)
+    if not doomed:
+        return stats
+
+    for col in referencing:
+        conn.execute(
+            update(col.table).where(col == bindparam("dup_id")).values({col.name: bindparam("keep_id")}),
+            moves,
+        )
+    conn.execute(
+        update(customer).where(c.id == bindparam("keep_id")).values(
+            {name: bindparam(name) for name in ("total_orders", "total_spent") + CONTACT_FIELDS}
+        ),
+        survivors,
+    )
+    conn.execute(delete(customer).where(c.id.in_(doomed)))
+    stats["merged"] = len(doomed)
+    return stats
+
+
+def migrate(engine, customer, referencing, dry_run=False):
+    """
+    Dedupe customers and create the unique email index if it is missing.
+    Concurrent workers are serialized on PostgreSQL by an advisory lock.
+    """
+    with engine.begin() as conn:
+        if conn.dialect.name == "postgresql":
+            conn.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": MIGRATION_LOCK_KEY})
+        if has_email_index(conn, customer):
+            return None
+        stats = dedupe_customers(conn, customer, referencing)
+        if dry_run:
+            conn.rollback()
+            return stats
+        email_index(customer).create(conn, checkfirst=True)
+    log.info("customer email index created (%d emails normalized, %d duplicate customers merged)",
+             stats["normalized"], stats["merged"])
+    return stats
+
+
+def main():
+    import argparse
+
+    from sqlalchemy import MetaData, create_engine
+
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--database-url", default=os.environ.get("DATABASE_URL"))
+    parser.add_argument("--dry-run", action="store_true", help="report what would change and roll back")
+    args = parser.parse_args()
+    if not args.database_url:
+        parser.error("set DATABASE_URL or pass --database-url")
+
+    engine = create_engine(args.database_url)
+    metadata = MetaData()
+    metadata.reflect(engine, only=["customer", "quote", "order"])
+    customer = metadata.tables["customer"]
+    referencing = [metadata.tables[name].c.customer_id for name in ("quote", "order")]
+    stats = migrate(engine, customer, referencing, dry_run=args.dry_run)
+    if stats is None:
+        print(f"{INDEX_NAME} already exists; nothing to do")
+    else:
+        verb = "would be" if args.dry_run else "were"
+        print(f"{stats['normalized']} emails {verb} normalized, {stats['merged']} duplicate customers {verb} merged")
+
+
+if __name__ == "__main__":
+    main()
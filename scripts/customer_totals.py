@@ -0,0 +1,118 @@
+"""
+DTF Designs - Customer Order Totals
+Customer.total_orders and total_spent count a customer's orders and sum their
+totals. Converting a quote bumps both with a single UPDATE ... SET x = x + n,
+so two conversions for the same customer can't overwrite each other, and the
+index on total_spent serves the top-customer leaderboard as one index scan
+instead of a GROUP BY over every quote.
+
+Orders loaded or edited outside the app (and counters from before the
+increments were atomic) are repaired by recomputing them from the order
+table:
+
+    python -m scripts.customer_totals             # repair every customer
+    python -m scripts.customer_totals --dry-run   # only report drift
+"""
+
+from sqlalchemy import bindparam, false, func, select, text, update
+
+INDEX_NAME = "ix_customer_total_spent"
+SPENT_TOLERANCE = 0.005  # half a cent
+
+
+class CustomerTotals:
+    """
+    Args:
+        customer: customer Table (total_orders, total_spent)
+        order: order Table (customer_id, total_amount)
+    """
+
+    def __init__(self, customer, order):
+        self.customer = customer
+        self.order = order
+
+    def increments(self, amount, orders=1):
+        """UPDATE values adding `orders` orders worth `amount` to a customer's totals"""
+        c = self.customer.c
+        return {
+            c.total_orders: func.coalesce(c.total_orders, 0) + orders,
+            c.total_spent: func.coalesce(c.total_spent, 0) + (amount or 0),
+        }
+
+    def record_order(self, conn, customer_id, amount):
+        """Count one more order worth `amount` for customer_id"""
+        c = self.customer.c
+        conn.execute(update(self.customer).where(c.id == customer_id).values(self.increments(amount)))
+
+    def top(self, conn, limit=10):
+        """Customers with the most spent (> 0), best first (ties: newest customer first)"""
+        c = self.customer.c
+        return conn.execute(
+            select(c.id, c.name, c.email, c.total_orders, c.total_spent)
+            .where(c.total_spent > 0)
+            .order_by(c.total_spent.desc(), c.id.desc())
+            .limit(limit)
+        ).all()
+
+    def _lock_orders(self, conn):
+        """Hold off conversions until this transaction ends"""
+        if conn.dialect.name == "postgresql":
+            conn.execute(text(f'LOCK TABLE "{self.order.name}" IN SHARE ROW EXCLUSIVE MODE'))
+        elif conn.dialect.name == "sqlite":
+            # A no-op write takes the database write lock before the orders are read
+            conn.execute(update(self.customer).where(false()).values(total_orders=self.customer.c.total_orders))
+
+    def repair(self, conn, dry_run=False):
+        """
+        Recompute every customer's totals from the order table and rewrite
+        the ones that drifted.
+
+        Returns:
+            {"customers": customers checked, "fixed": customers rewritten}
+        """
+        c, o = self.customer.c, self.order.c
+        self._lock_orders(conn)
+        expected = {
+            customer_id: (count, spent or 0)
+            for customer_id, count, spent in conn.execute(
+                select(o.customer_id, func.count(), func.sum(o.total_amount)).group_by(o.customer_id)
+            )
+        }
+        checked, fixes = 0, []
+        for customer_id, total_orders, total_spent in conn.execute(select(c.id, c.total_orders, c.total_spent)):
+            checked += 1
+            count, spent = expected.get(customer_id, (0, 0.0))
+            if total_orders != count or total_spent is None or abs(total_spent - spent) > SPENT_TOLERANCE:
+                fixes.append({"customer_id": customer_id, "total_orders": count, "total_spent": round(spent, 2)})
+        if fixes and not dry_run:
+            conn.execute(
+                update(self.customer).where(c.id == bindparam("customer_id"))
+                .values(total_orders=bindparam("total_orders"), total_spent=bindparam("total_spent")),
+                fixes,
+            )
+        return {"customers": checked, "fixed": len(fixes)}
+
+
+def for_tables(tables):
+    """CustomerTotals over the app's customer and order tables"""
+    return CustomerTotals(tables["customer"], tables["order"])
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Recompute customer order counts and totals from the order table")
+    parser.add_argument("--dry-run", action="store_true", help="report drift without fixing it")
+    args = parser.parse_args()
+
+    from app import app, db
+
+    with app.app_context():
+        with db.engine.begin() as conn:
+            stats = for_tables(db.metadata.tables).repair(conn, dry_run=args.dry_run)
+    verb = "would fix" if args.dry_run else "fixed"
+    print(f"{stats['customers']} customers checked; {verb} {stats['fixed']}")
+
+
+if __name__ == "__main__":
+    main()
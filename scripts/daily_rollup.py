@@ -0,0 +1,378 @@
+"""
+DTF Designs - Daily Quote/Order Rollup
+Per-day quote and order counts and values keyed by (day, category, status,
+customer_type), so the analytics charts read a few hundred rollup rows
+instead of re-aggregating the quote and order tables on every request.
+
+Quote measures are keyed by the quote's creation day and status. Order
+measures are keyed by the order's creation day and its own status, with the
+category of its quote. A quote's value is its final price, or its calculated
+price when there is no (or a zero) final price.
+
+The rollup is kept current from the ORM session: every flush that adds,
+deletes or changes a quote, an order or a customer's type applies, in the
+same transaction, the difference between the flushed rows' old values (from
+the session's attribute history) and their new ones. The delta never comes
+from re-reading the fact tables, so a transaction that commits between this
+flush's statements is not counted twice. Rows that move only because their
+quote's category or their customer's type changed are read once, when that
+change is flushed; a concurrent write to one of those rows can still leave
+its old key off by that row.
+
+Writes that bypass the session (bulk inserts, raw SQL) and that last race
+are repaired by the reconcile job, which recomputes a range of days from
+the fact tables. Run it nightly, e.g. from cron:
+
+    python -m scripts.daily_rollup --days 7      # repair the last week
+    python -m scripts.daily_rollup               # rebuild everything
+    python -m scripts.daily_rollup --dry-run     # only report drift
+"""
+
+import threading
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import bindparam, delete, event, false, func, inspect, insert, select, text, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm.base import NO_VALUE
+
+KEY = ("day", "category", "status", "customer_type")
+MEASURES = ("quote_count", "quote_value", "order_count", "order_value")
+VALUE_TOLERANCE = 1e-6  # float sums drift a little under incremental updates
+
+# Columns whose change moves a row to another key or changes its value
+QUOTE_FIELDS = ("status", "category", "final_price", "calculated_price", "created_at", "customer_id")
+ORDER_FIELDS = ("status", "total_amount", "created_at", "quote_id", "customer_id")
+CUSTOMER_FIELDS = ("customer_type",)
+SAME = object()  # a tracked field the flush didn't modify
+
+
+def _day(value):
+    """date(created_at) as returned by the database (date or 'YYYY-MM-DD'), or a created_at datetime -> date"""
+    if isinstance(value, str):
+        return date.fromisoformat(value[:10])
+    if isinstance(value, datetime):
+        return value.date()
+    return value
+
+
+class Rollup:
+    """
+    Args:
+        rollup: daily_rollup Table (KEY columns as its primary key, MEASURES)
+        quote, order, customer: the fact Tables it summarizes
+    """
+
+    def __init__(self, rollup, quote, order, customer):
+        self.rollup = rollup
+        self.quote = quote
+        self.order = order
+        self.customer = customer
+        self._fields = {quote: QUOTE_FIELDS, order: ORDER_FIELDS, customer: CUSTOMER_FIELDS}
+        self._installed = {}  # engine url -> True
+        self._lock = threading.Lock()
+
+    # ---- aggregation ----
+
+    def quote_value(self):
+        q = self.quote.c
+        return func.coalesce(func.nullif(q.final_price, 0), q.calculated_price, 0)
+
+    def aggregate(self, conn, quote_filter=None, order_filter=None):
+        """
+        {key: [quote_count, quote_value, order_count, order_value]} for the
+        quotes matching quote_filter and the orders matching order_filter
+        (None aggregates everything; false() skips the table).
+        """
+        q, o, c = self.quote.c, self.order.c, self.customer.c
+        customer_type = func.coalesce(c.customer_type, "retail")
+        totals = {}
+
+        quote_day, quote_status = func.date(q.created_at), func.coalesce(q.status, "pending")
+        stmt = (
+            select(quote_day, q.category, quote_status, customer_type, func.count(), func.sum(self.quote_value()))
+            .select_from(self.quote.join(self.customer, c.id == q.customer_id))
+            .where(q.created_at.is_not(None))
+            .group_by(quote_day, q.category, quote_status, customer_type)
+        )
+        if quote_filter is not None:
+            stmt = stmt.where(quote_filter)
+        for day, category, status, ctype, count, value in conn.execute(stmt):
+            totals[(_day(day), category, status, ctype)] = [count, value or 0, 0, 0]
+
+        order_day, order_status = func.date(o.created_at), func.coalesce(o.status, "confirmed")
+        stmt = (
+            select(order_day, q.category, order_status, customer_type, func.count(),
+                   func.sum(func.coalesce(o.total_amount, 0)))
+            .select_from(self.order.join(self.quote, q.id == o.quote_id).join(self.customer, c.id == o.customer_id))
+            .where(o.created_at.is_not(None))
+            .group_by(order_day, q.category, order_status, customer_type)
+        )
+        if order_filter is not None:
+            stmt = stmt.where(order_filter)
+        for day, category, status, ctype, count, value in conn.execute(stmt):
+            row = totals.setdefault((_day(day), category, status, ctype), [0, 0, 0, 0])
+            row[2], row[3] = count, value or 0
+        return totals
+
+    # ---- writing ----
+
+    def apply(self, conn, deltas):
+        """Add {key: [quote_count, quote_value, order_count, order_value]} to the rollup"""
+        rows = [dict(zip(KEY + MEASURES, key + tuple(values))) for key, values in deltas.items()
+                if any(values)]
+        if not rows:
+            return
+        t = self.rollup
+        if conn.dialect.name in ("postgresql", "sqlite"):
+            stmt = (postgresql.insert if conn.dialect.name == "postgresql" else sqlite.insert)(t)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[t.c[k] for k in KEY],
+                set_={m: t.c[m] + stmt.excluded[m] for m in MEASURES},
+            )
+            conn.execute(stmt, rows)
+            return
+        for row in rows:
+            found = conn.execute(
+                update(t).where(*(t.c[k] == row[k] for k in KEY))
+                .values({m: t.c[m] + row[m] for m in MEASURES})
+            ).rowcount
+            if not found:
+                conn.execute(insert(t).values(row))
+
+    def _lock_rollup(self, conn):
+        """Hold off incremental updates until this transaction ends"""
+        if conn.dialect.name == "postgresql":
+            conn.execute(text(f'LOCK TABLE "{self.rollup.name}" IN SHARE ROW EXCLUSIVE MODE'))
+        elif conn.dialect.name == "sqlite":
+            # A no-op write takes the database write lock before the fact tables are read
+            conn.execute(update(self.rollup).where(false()).values(quote_count=self.rollup.c.quote_count))
+
+    def reconcile(self, conn, since=None, dry_run=False):
+        """
+        Recompute the rollup from the fact tables for days >= since (all days
+        when None) and rewrite the rows that drifted.
+
+        Returns:
+            {"rows": rows expected, "fixed": rows rewritten or added,
+             "removed": rows with nothing behind them, "empty": all-zero
+             rows dropped}
+        """
+        t, q, o = self.rollup, self.quote.c, self.order.c
+        self._lock_rollup(conn)
+        if since is None:
+            expected = self.aggregate(conn)
+            current = conn.execute(select(t))
+        else:
+            start = datetime.combine(since, datetime.min.time())
+            expected = self.aggregate(conn, q.created_at >= start, o.created_at >= start)
+            current = conn.execute(select(t).where(t.c.day >= since))
+        actual = {tuple(row[k] for k in KEY): [row[m] for m in MEASURES] for row in current.mappings()}
+
+        def drifted(values, stored):
+            return stored is None or any(abs(a - b) > VALUE_TOLERANCE * max(1, abs(a))
+                                         for a, b in zip(values, stored))
+
+        fixed = {key: values for key, values in expected.items() if drifted(values, actual.get(key))}
+        orphans = [key for key in actual if key not in expected]
+        # Rows emptied by incremental updates (everything moved to another key) are not drift
+        empty = [key for key in orphans if not any(actual[key])]
+        if not dry_run:
+            stale = [key for key in fixed if key in actual] + orphans
+            if stale:
+                conn.execute(delete(t).where(*(t.c[k] == bindparam(f"k_{k}") for k in KEY)),
+                             [{f"k_{k}": v for k, v in zip(KEY, key)} for key in stale])
+            if fixed:
+                conn.execute(insert(t), [dict(zip(KEY + MEASURES, key + tuple(values)))
+                                         for key, values in fixed.items()])
+        return {"rows": len(expected), "fixed": len(fixed), "removed": len(orphans) - len(empty),
+                "empty": len(empty)}
+
+    # ---- keeping current from the ORM ----
+
+    def installed(self, conn):
+        """True once the rollup table exists (remembered per engine once it does)"""
+        key = conn.engine.url
+        with self._lock:
+            if key in self._installed:
+                return True
+        if not inspect(conn).has_table(self.rollup.name):
+            return False
+        with self._lock:
+            self._installed[key] = True
+        return True
+
+    def listen(self, session):
+        """Maintain the rollup from every flush of session (a Session, sessionmaker or scoped_session)"""
+        event.listen(session, "before_flush", self._before_flush)
+        event.listen(session, "after_flush", self._after_flush)
+
+    def _flushed(self, obj):
+        """(table, id, fields) for a quote, order or customer object, else None"""
+        state = inspect(obj)
+        table = state.mapper.local_table
+        if table not in self._fields:
+            return None
+        return table, state.identity[0] if state.identity else obj.id, self._fields[table]
+
+    def _before_flush(self, session, flush_context, instances):
+        conn = session.connection()
+        if not self.installed(conn):
+            return
+        # Tracked fields of the changed and deleted rows as they were before this flush, from
+        # the attribute history (SAME: not modified, read back after the flush). Only a row
+        # whose old value was never loaded is read here.
+        old = {table: {} for table in self._fields}
+        unknown = {table: set() for table in self._fields}
+        deleted = session.deleted
+        for obj in list(session.dirty) + list(deleted):
+            flushed = self._flushed(obj)
+            state = inspect(obj)
+            if flushed is None or state.key is None:
+                continue
+            table, row_id, fields = flushed
+            if obj in deleted:
+                row = {f: state.dict.get(f, NO_VALUE) for f in fields}
+            elif any(f in state.committed_state for f in fields):
+                row = {f: state.committed_state.get(f, SAME) for f in fields}
+            else:
+                continue
+            if NO_VALUE in row.values():
+                unknown[table].add(row_id)
+            old[table][row_id] = row
+        for table, ids in unknown.items():
+            if ids:
+                columns = [table.c[f] for f in self._fields[table]]
+                for row in conn.execute(select(table.c.id, *columns).where(table.c.id.in_(sorted(ids)))).mappings():
+                    old[table][row["id"]] = {f: row[f] for f in self._fields[table]}
+        session.info["daily_rollup"] = old
+
+    def _after_flush(self, session, flush_context):
+        old = session.info.pop("daily_rollup", None)
+        if old is None:
+            return
+        new = {table: {} for table in self._fields}
+        for obj in list(session.new) + [obj for obj in session.dirty if obj not in session.deleted]:
+            flushed = self._flushed(obj)
+            if flushed is not None:
+                table, row_id, fields = flushed
+                if obj in session.new or row_id in old[table]:
+                    new[table][row_id] = {f: getattr(obj, f) for f in fields}
+
+        def versions(table):
+            """{id: (old row, new row)} of the flushed rows whose tracked fields changed"""
+            rows = {}
+            for row_id in old[table].keys() | new[table].keys():
+                before, after = old[table].get(row_id), new[table].get(row_id)
+                if before and after:
+                    before = {f: after[f] if value is SAME else value for f, value in before.items()}
+                if before != after:
+                    rows[row_id] = (before, after)
+            return rows
+
+        quotes, orders, customers = versions(self.quote), versions(self.order), versions(self.customer)
+        if not (quotes or orders or customers):
+            return
+        conn = session.connection()
+        q, o, c = self.quote.c, self.order.c, self.customer.c
+
+        # Rows that didn't change but move with their quote's category or customer's type
+        retyped = sorted(cid for cid, (before, after) in customers.items()
+                         if before and (after is None or before["customer_type"] != after["customer_type"]))
+        recategorized = sorted(qid for qid, (before, after) in quotes.items()
+                               if before and (after is None or before["category"] != after["category"]))
+        if retyped:
+            columns = [q[f] for f in QUOTE_FIELDS]
+            for row in conn.execute(select(q.id, *columns).where(q.customer_id.in_(retyped))).mappings():
+                if row["id"] not in quotes:
+                    quotes[row["id"]] = (dict(row), dict(row))
+        if retyped or recategorized:
+            columns = [o[f] for f in ORDER_FIELDS]
+            stmt = select(o.id, *columns).where(o.quote_id.in_(recategorized) | o.customer_id.in_(retyped))
+            for row in conn.execute(stmt).mappings():
+                if row["id"] not in orders:
+                    orders[row["id"]] = (dict(row), dict(row))
+
+        # Categories and customer types of the other quotes and customers the rows point at
+        quote_ids = {row["quote_id"] for pair in orders.values() for row in pair if row} - quotes.keys()
+        categories = dict(conn.execute(select(q.id, q.category).where(q.id.in_(sorted(quote_ids)))).all()) \
+            if quote_ids else {}
+        customer_ids = {row["customer_id"] for pairs in (quotes, orders) for pair in pairs.values()
+                        for row in pair if row} - customers.keys()
+        customer_types = {cid: ctype or "retail" for cid, ctype in conn.execute(
+            select(c.id, c.customer_type).where(c.id.in_(sorted(customer_ids))))} if customer_ids else {}
+
+        def customer_type(customer_id, side):
+            if customer_id in customers:
+                row = customers[customer_id][side]
+                return row and (row["customer_type"] or "retail")
+            return customer_types.get(customer_id)
+
+        def category(quote_id, side):
+            if quote_id in quotes:
+                row = quotes[quote_id][side]
+                return row and row["category"]
+            return categories.get(quote_id)
+
+        def entry(table, row, side):
+            """(key, measures) the row counts for on one side of the flush (0 before, 1 after)"""
+            if row is None:
+                return None
+            if table is self.quote:
+                return self._quote_entry(row, customer_type(row["customer_id"], side))
+            return self._order_entry(row, category(row["quote_id"], side), customer_type(row["customer_id"], side))
+
+        deltas = {}
+        for table, rows in ((self.quote, quotes), (self.order, orders)):
+            for before, after in rows.values():
+                for sign, counted in ((-1, entry(table, before, 0)), (1, entry(table, after, 1))):
+                    if counted is not None:
+                        key, values = counted
+                        totals = deltas.setdefault(key, [0, 0, 0, 0])
+                        for i, value in enumerate(values):
+                            totals[i] += sign * value
+        self.apply(conn, deltas)
+
+    @staticmethod
+    def _quote_entry(row, customer_type):
+        """(key, measures) a quote row counts for, or None when aggregate() would skip it"""
+        if row["created_at"] is None or customer_type is None:
+            return None
+        status = "pending" if row["status"] is None else row["status"]
+        value = row["final_price"] or row["calculated_price"] or 0
+        return (_day(row["created_at"]), row["category"], status, customer_type), (1, value, 0, 0)
+
+    @staticmethod
+    def _order_entry(row, category, customer_type):
+        """(key, measures) an order row counts for, or None when aggregate() would skip it"""
+        if row["created_at"] is None or category is None or customer_type is None:
+            return None
+        status = "confirmed" if row["status"] is None else row["status"]
+        return (_day(row["created_at"]), category, status, customer_type), (0, 0, 1, row["total_amount"] or 0)
+
+
+def for_tables(tables):
+    """Rollup over the app's daily_rollup, quote, order and customer tables"""
+    return Rollup(tables["daily_rollup"], tables["quote"], tables["order"], tables["customer"])
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Recompute the daily rollup from the quote and order tables")
+    parser.add_argument("--days", type=int, help="only the last N days (default: everything)")
+    parser.add_argument("--dry-run", action="store_true", help="report drift without fixing it")
+    args = parser.parse_args()
+
+    from app import app, db
+
+    since = date.today() - timedelta(days=args.days - 1) if args.days else None
+    with app.app_context():
+        with db.engine.begin() as conn:
+            stats = for_tables(db.metadata.tables).reconcile(conn, since, dry_run=args.dry_run)
+    verb = "would fix" if args.dry_run else "fixed"
+    print(f"{stats['rows']} rollup rows checked; {verb} {stats['fixed']}, "
+          f"{'would remove' if args.dry_run else 'removed'} {stats['removed']} (+{stats['empty']} empty)")
+
+
+if __name__ == "__main__":
+    main()
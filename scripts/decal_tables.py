@@ -0,0 +1,138 @@
+"""
+DTF Designs - Decal CSV Price Table Registry
+Loads every tables/*.csv once into an in-memory index keyed by (table, size)
+with presorted qty tiers, and reloads a table only when its file changes.
+"""
+
+import csv
+import os
+import threading
+import time
+from bisect import bisect_left
+
+TABLES_DIR = os.environ.get("DECAL_TABLES_DIR", "tables")
+
+TABLE_NAMES = (
+    "bumper_kiss", "bumper_die", "bumper_kiss_lam",
+    "popular_squares_kiss", "popular_squares_die", "popular_squares_kiss_lam",
+    "popular_rectangles_kiss", "popular_rectangles_die", "popular_rectangles_kiss_lam",
+)
+
+# Qty tier columns in every table
+QTY_COLUMNS = ("10", "25", "50", "100", "250", "500")
+
+# Seconds between mtime checks; quotes inside the window touch no disk at all
+RELOAD_CHECK_SECONDS = float(os.environ.get("DECAL_TABLES_CHECK_SECONDS", "5"))
+
+
+def _table_path(tables_dir, table_name):
+    return os.path.join(tables_dir, f"{table_name}.csv")
+
+
+def read_csv_table(table_path):
+    """Parse a CSV pricing table into {size: {qty: unit_price}} ({} if the file is missing)"""
+    pricing_data = {}
+
+    if not os.path.exists(table_path):
+        return pricing_data
+
+    with open(table_path, 'r') as f:
+        reader = csv.DictReader(f)
+        for row in reader:
+            size = row['size']
+            pricing_data[size] = {}
+            for qty_str in QTY_COLUMNS:
+                if qty_str in row:
+                    pricing_data[size][int(qty_str)] = float(row[qty_str])
+
+    return pricing_data
+
+
+def _file_mtime(path):
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+class DecalTableRegistry:
+    """
+    In-memory index of the decal CSV tables.
+
+    Each (table, size) maps to a pair of tuples (qty_tiers, unit_prices) with
+    qty_tiers sorted ascending, so a lookup is one dict hit plus one bisect.
+    The index is rebuilt off to the side and swapped in whole, so readers never
+    see a half-loaded table.
+    """
+
+    def __init__(self, tables_dir=TABLES_DIR, table_names=TABLE_NAMES, check_interval=RELOAD_CHECK_SECONDS):
+        self.tables_dir = tables_dir
+        self.table_names = tuple(table_names)
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._mtimes = {}
+        self._tables = {}
+        self._index = {}
+        self._next_check = 0.0
+
+    def _load_table(self, table_name):
+        """Parse one CSV into {size: (qty_tiers, unit_prices)}"""
+        rows = {}
+        for size, size_pricing in read_csv_table(_table_path(self.tables_dir, table_name)).items():
+            if not size_pricing:
+                continue
+            qtys = tuple(sorted(size_pricing))
+            rows[size] = (qtys, tuple(size_pricing[q] for q in qtys))
+        return rows
+
+    def refresh(self, force=False):
+        """Reload any table whose mtime changed (rate-limited unless force=True)"""
+        now = time.monotonic()
+        if not force and now < self._next_check:
+            return
+
+        with self._lock:
+            if not force and now < self._next_check:
+                return
+
+            tables = dict(self._tables)
+            changed = False
+            for table_name in self.table_names:
+                mtime = _file_mtime(_table_path(self.tables_dir, table_name))
+                if table_name in tables and mtime == self._mtimes.get(table_name):
+                    continue
+                tables[table_name] = self._load_table(table_name) if mtime is not None else {}
+                self._mtimes[table_name] = mtime
+                changed = True
+
+            if changed:
+                self._tables = tables
+                self._index = {
+                    (table_name, size): entry
+                    for table_name, rows in tables.items()
+                    for size, entry in rows.items()
+                }
+            self._next_check = time.monotonic() + self.check_interval
+
+    def lookup(self, table_name, size):
+        """(qty_tiers, unit_prices) for a table row, or None if the size is not listed"""
+        self.refresh()
+        return self._index.get((table_name, size))
+
+    def unit_price(self, table_name, size, qty):
+        """
+        Unit price for the smallest qty tier >= qty (highest tier if qty exceeds them all).
+        Returns None when the table has no row for this size.
+        """
+        entry = self.lookup(table_name, size)
+        if entry is None:
+            return None
+        qtys, prices = entry
+        i = bisect_left(qtys, qty)
+        if i == len(qtys):
+            i -= 1
+        return prices[i]
+
+
+# Shared registry used by the decal pricing functions
+TABLE_REGISTRY = DecalTableRegistry()
@@ -0,0 +1,125 @@
+"""
+DTF Designs - Template Fragment Cache
+A {% cache %} tag for Jinja that keeps the rendered HTML of a template block
+in a bounded in-process LRU, so the calculator pages stop re-rendering their
+option lists and form sections on every request:
+
+    {% cache "yard-signs", form_data|form_fields('per_unit_sku', 'qty') %}
+        ... {% for it in yard_items %} ... {% endfor %} ...
+    {% endcache %}
+
+A fragment's key is the template, the fragment name, the cache's version
+(the catalog version in app.py, so an admin edit makes every older fragment
+unreachable) and the values after the name. Those values must cover
+everything else the block reads: the selected category, the submitted
+fields it echoes back (form_fields picks them out of form_data), the
+request's script root for url_for.
+"""
+
+import threading
+from collections import OrderedDict
+
+from jinja2 import nodes
+from jinja2.ext import Extension
+
+
+def form_fields(form_data, *names):
+    """Values of the named fields (None when not submitted), as a hashable key"""
+    return tuple(form_data.get(name) for name in names)
+
+
+class FragmentCache:
+    """
+    Thread-safe LRU of rendered fragments.
+
+    Args:
+        version: zero-argument callable mixed into every key, or None; when
+            it returns None the block is rendered and not cached
+        maxsize: fragments kept; 0 renders every block every time
+    """
+
+    def __init__(self, version=None, maxsize=512):
+        self.version = version
+        self.maxsize = maxsize
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get_or_render(self, key, render):
+        """The cached fragment for key, or render(), store and return it"""
+        if self.maxsize <= 0:
+            return render()
+        if self.version is not None:
+            version = self.version()
+            if version is None:
+                return render()
+            key = (version, key)
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return value
+            self.misses += 1
+        # Rendered outside the lock; two threads missing at once both render it
+        value = render()
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'maxsize': self.maxsize,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+class FragmentCacheExtension(Extension):
+    """{% cache name, vary... %}...{% endcache %}, stored in environment.fragment_cache"""
+
+    tags = {"cache"}
+
+    def __init__(self, environment):
+        super().__init__(environment)
+        environment.extend(fragment_cache=None)
+        environment.filters["form_fields"] = form_fields
+
+    def parse(self, parser):
+        lineno = next(parser.stream).lineno
+        key = [nodes.Const(parser.name), parser.parse_expression()]
+        while parser.stream.skip_if("comma"):
+            key.append(parser.parse_expression())
+        body = parser.parse_statements(("name:endcache",), drop_needle=True)
+        call = self.call_method("_render", [nodes.Tuple(key, "load")])
+        return nodes.CallBlock(call, [], [], body).set_lineno(lineno)
+
+    def _render(self, key, caller):
+        cache = self.environment.fragment_cache
+        if cache is None:
+            return caller()
+        return cache.get_or_render(key, caller)
+
+
+def init_app(app, version=None, maxsize=512):
+    """Enable {% cache %} in app's templates; the cache is app.extensions['fragment_cache']"""
+    cache = FragmentCache(version, maxsize)
+    app.jinja_env.add_extension(FragmentCacheExtension)
+    app.jinja_env.fragment_cache = cache
+    app.extensions['fragment_cache'] = cache
+    return cache
@@ -0,0 +1,44 @@
+"""
+DTF Designs - Conditional GETs for Read-Only JSON
+A JsonDocument is serialized once per version of the data behind it, and its
+strong ETag is a hash of those exact bytes. conditional_json() answers a
+request whose If-None-Match already names the ETag with a bodyless 304, so a
+repeat fetch costs a header comparison instead of queries and serialization.
+"""
+
+import hashlib
+import json
+from collections import namedtuple
+from collections.abc import Mapping
+
+from flask import Response, request
+
+JsonDocument = namedtuple('JsonDocument', 'body etag')
+
+
+def _mapping(value):
+    # Read-only config snapshots (MappingProxyType) serialize as objects
+    if isinstance(value, Mapping):
+        return dict(value)
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def json_document(data):
+    """Serialize data (sorted keys, compact) into a JsonDocument"""
+    body = json.dumps(data, sort_keys=True, separators=(",", ":"), default=_mapping).encode()
+    return JsonDocument(body, hashlib.sha256(body).hexdigest()[:32])
+
+
+def conditional_json(document, max_age):
+    """
+    200 with document's body, or 304 when If-None-Match matches its ETag
+    (or is *). Both carry the ETag and Cache-Control: public, max-age.
+    """
+    if request.if_none_match.contains_weak(document.etag):
+        response = Response(status=304)
+    else:
+        response = Response(document.body, mimetype='application/json')
+    response.set_etag(document.etag)
+    response.cache_control.public = True
+    response.cache_control.max_age = max_age
+    return response
@@ -0,0 +1,153 @@
+"""
+DTF Designs - Keyset Pagination
+Pages through an ordered query with an opaque (sort value, id) cursor instead
+of OFFSET, so fetching any page is an index range scan of page_size + 1 rows
+no matter how deep it is or how large the table grows.
+"""
+
+import base64
+import json
+import os
+from collections import namedtuple
+from datetime import date, datetime
+
+from sqlalchemy import Date, DateTime, String, bindparam, tuple_, type_coerce
+
+PAGE_SIZE = int(os.environ.get("ADMIN_PAGE_SIZE", "50"))
+MAX_PAGE_SIZE = 200
+
+# next_cursor / prev_cursor are None when there is nothing further that way
+Page = namedtuple("Page", ["items", "next_cursor", "prev_cursor", "page_size"])
+
+
+def page_size_arg(value, default=PAGE_SIZE):
+    """Clamp a ?per_page= value to 1..MAX_PAGE_SIZE"""
+    try:
+        return max(1, min(int(value), MAX_PAGE_SIZE))
+    except (TypeError, ValueError):
+        return default
+
+
+def _dump(value):
+    return value.isoformat() if isinstance(value, (date, datetime)) else value
+
+
+def _load(value, column):
+    python_type = column.type.python_type
+    if value is not None and python_type in (date, datetime):
+        return python_type.fromisoformat(value)
+    return value
+
+
+def _stored_as_text(query, sort_column):
+    """
+    SQLite keeps dates as text and sorts them as text, and the text depends on
+    how the row was written: CURRENT_TIMESTAMP stores '2025-06-01 10:00:00',
+    SQLAlchemy stores '2025-06-01 10:00:00.000000'. A cursor rebuilt from the
+    parsed datetime would compare against the wrong string, so for these
+    columns it keeps the stored text and is compared as text, like ORDER BY.
+    """
+    return (isinstance(sort_column.type, (Date, DateTime))
+            and query.session.get_bind().dialect.name == "sqlite")
+
+
+def encode_cursor(value, row_id, direction):
+    raw = json.dumps({"k": [_dump(value), row_id], "d": direction}, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(token, sort_column, as_text=False):
+    """(sort value, id, direction), or None for a missing or mangled cursor"""
+    if not token:
+        return None
+    try:
+        data = json.loads(base64.urlsafe_b64decode(token + "=" * (-len(token) % 4)))
+        (value, row_id), direction = data["k"], data["d"]
+        if direction not in ("next", "prev") or not isinstance(row_id, int):
+            return None
+        if as_text:
+            if not isinstance(value, str):
+                return None
+            return value, row_id, direction
+        return _load(value, sort_column), row_id, direction
+    except (ValueError, TypeError, KeyError):
+        return None
+
+
+def paginate(query, sort_column, id_column, descending=True, cursor=None, page_size=PAGE_SIZE):
+    """
+    One page of query ordered by (sort_column, id_column).
+
+    Args:
+        query: filtered ORM query (joins and loader options already applied)
+        sort_column, id_column: mapped columns; the pair must be unique and
+            non-null, and an index on sort_column keeps every page cheap
+        descending: newest/highest first
+        cursor: token from a previous Page, or None for the first page
+        page_size: rows per page
+
+    Returns:
+        Page(items, next_cursor, prev_cursor, page_size)
+    """
+    as_text = _stored_as_text(query, sort_column)
+    position = decode_cursor(cursor, sort_column, as_text)
+    direction = position[2] if position else "next"
+    # Walking backwards flips the comparison and the order; the rows are re-reversed below
+    forward = descending if direction == "next" else not descending
+    sort_key = type_coerce(sort_column, String) if as_text else sort_column
+    key = tuple_(sort_key, id_column)
+    if position:
+        value = bindparam(None, position[0], type_=String) if as_text else position[0]
+        bound = tuple_(value, position[1])
+        query = query.filter(key < bound if forward else key > bound)
+    order = (sort_column.desc(), id_column.desc()) if forward else (sort_column.asc(), id_column.asc())
+    # The sort value comes back with each row, as stored when as_text
+    rows = query.add_columns(sort_key).order_by(*order).limit(page_size + 1).all()
+
+    more = len(rows) > page_size
+    rows = rows[:page_size]
+    if direction == "prev":
+        rows.reverse()
+    if not rows:
+        return Page([], None, None, page_size)
+
+    has_next = more if direction == "next" else True
+    has_prev = position is not None if direction == "next" else more
+    first, last = rows[0], rows[-1]
+    return Page(
+        [row[0] for row in rows],
+        encode_cursor(last[1], getattr(last[0], id_column.key), "next") if has_next else None,
+        encode_cursor(first[1], getattr(first[0], id_column.key), "prev") if has_prev else None,
+        page_size,
+    )
+
+
+def paginate_ranked(ids, load, cursor=None, page_size=PAGE_SIZE):
+    """
+    One page of a precomputed, bounded ranking (search results). The cursor is
+    a position in the list, which is safe here because the list is capped.
+
+    Args:
+        ids: ranked primary keys
+        load: callable taking a list of ids and returning their rows in any order
+    """
+    offset = 0
+    if cursor:
+        try:
+            offset = max(0, int(json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))["o"]))
+        except (ValueError, TypeError, KeyError):
+            offset = 0
+    page_ids = ids[offset:offset + page_size]
+    by_id = {row.id: row for row in load(page_ids)} if page_ids else {}
+    rows = [by_id[i] for i in page_ids if i in by_id]
+
+    def token(position):
+        raw = json.dumps({"o": position}, separators=(",", ":")).encode()
+        return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+    return Page(
+        rows,
+        token(offset + page_size) if offset + page_size < len(ids) else None,
+        token(max(0, offset - page_size)) if offset > 0 else None,
+        page_size,
+    )
@@ -0,0 +1,304 @@
+"""
+DTF Designs - Versioned Schema Migrations
+Ordered, numbered schema changes recorded in a schema_migration table, so each
+one runs exactly once per database. Replaces the bare db.create_all() the app
+used to run at import, which never touched tables that already existed (new
+indexes on old databases were silently skipped).
+
+Migrations receive a connection inside their own transaction and the model
+tables by name. The baseline is frozen DDL (the tables as they stood at
+version 1), so it never changes with the models; every later change,
+including the model-declared indexes, is created by the migration that
+introduced it, with checkfirst.
+
+Workers don't migrate at startup; upgrade once per deploy, before they start
+(DB_AUTO_MIGRATE=1 makes create_app() do it, for a single-process dev setup):
+
+    flask --app app init-db                   # upgrade and seed defaults
+    python -m scripts.migrations              # the same
+    python -m scripts.migrations --status     # list versions
+"""
+
+import logging
+import os
+from datetime import datetime
+
+from sqlalchemy import (
+    JSON, Boolean, Column, Date, DateTime, Float, ForeignKey, Integer, MetaData, String, Table, Text, false, insert,
+    select, text, update,
+)
+
+from scripts import admin_search, customer_emails, customer_totals, daily_rollup
+
+AUTO_MIGRATE = os.environ.get("DB_AUTO_MIGRATE", "0") == "1"
+MIGRATION_LOCK_KEY = 0x4454464D  # "DTFM"
+
+log = logging.getLogger(__name__)
+
+schema_migration = Table(
+    "schema_migration", MetaData(),
+    Column("version", Integer, primary_key=True),
+    Column("name", String(100), nullable=False),
+    Column("applied_at", DateTime, nullable=False),
+)
+
+MIGRATIONS = []
+
+
+def migration(version, name):
+    """Register fn(conn, tables) as schema version `version`"""
+    def register(fn):
+        if MIGRATIONS and version <= MIGRATIONS[-1][0]:
+            raise ValueError(f"migration {version} registered out of order")
+        MIGRATIONS.append((version, name, fn))
+        return fn
+    return register
+
+
+def create_indexes(conn, table, names):
+    """Create the model-declared indexes `names` on table if they are missing"""
+    declared = {index.name: index for index in table.indexes}
+    for name in names:
+        declared[name].create(conn, checkfirst=True)
+
+
+def _baseline_tables():
+    """The schema at version 1, without indexes; do not edit, add a migration instead"""
+    metadata = MetaData()
+    Table(
+        "material", metadata,
+        Column("id", Integer, primary_key=True),
+        Column("name", String(100), nullable=False),
+        Column("material_type", String(50), nullable=False),
+        Column("width_inches", Float, nullable=False),
+        Column("length_feet", Float, nullable=False),
+        Column("total_cost", Float, nullable=False),
+        Column("cost_per_sqft", Float, nullable=False),
+        Column("active", Boolean),
+    )
+    Table(
+        "pricing_settings", metadata,
+        Column("id", Integer, primary_key=True),
+        Column("setting_name", String(50), nullable=False, unique=True),
+        Column("value", Float, nullable=False),
+        Column("description", String(200)),
+    )
+    Table(
+        "cache_version", metadata,
+        Column("name", String(50), primary_key=True),
+        Column("version", Integer, nullable=False),
+    )
+    Table(
+        "document_counter", metadata,
+        Column("name", String(20), primary_key=True),
+        Column("next_value", Integer, nullable=False),
+    )
+    Table(
+        "apparel_item", metadata,
+        Column("id", Integer, primary_key=True),
+        Column("garment_name", String(50), nullable=False),
+        *[Column(tier, Float, nullable=False)
+          for tier in ("tier_1_5", "tier_6_10", "tier_11_20", "tier_21_50", "tier_51_100", "tier_101_plus")],
+        Column("active", Boolean),
+    )
+    Table(
+        "yard_sign_item", metadata,
+        Column("id", Integer, primary_key=True),
+        Column("name", String(100), nullable=False),
+        Column("sku", String(50), nullable=False),
+        Column("blank_cost", Float, nullable=False),
+        Column("print_cost", Float, nullable=False),
+        Column("stake_cost", Float, nullable=False),
+        Column("retail_price", Float, nullable=False),
+        Column("active", Boolean),
+    )
+    Table(
+        "partner_category_settings", metadata,
+        Column("id", Integer, primary_key=True),
+        Column("category_name", String(50), nullable=False, unique=True),
+        Column("enabled_for_partners", Boolean),
+        Column("description", String(200)),
+    )
+    Table(
+        "customer", metadata,
+        Column("id", Integer, primary_key=True),
+        Column("name", String(100), nullable=False),
+        Column("email", String(120), nullable=False),
+        Column("phone", String(20)),
+        Column("company", String(100)),
+        Column("address", Text),
+        Column("customer_type", String(20)),
+        Column("created_at", DateTime),
+        Column("total_orders", Integer),
+        Column("total_spent", Float),
+    )
+    Table(
+        "quote", metadata,
+        Column("id", Integer, primary_key=True),
+        Column("quote_number", String(20), nullable=False, unique=True),
+        Column("customer_id", Integer, ForeignKey("customer.id"), nullable=False),
+        Column("category", String(50), nullable=False),
+        Column("product_details", JSON),
+        Column("calculated_price", Float, nullable=False),
+        Column("cost_breakdown", JSON),
+        Column("status", String(20)),
+        Column("created_at", DateTime),
+        Column("expires_at", DateTime),
+        Column("notes", Text),
+        Column("admin_adjustments", Float),
+        Column("final_price", Float),
+        Column("email_sent", Boolean),
+        Column("pdf_generated", Boolean),
+    )
+    Table(
+        "quote_file", metadata,
+        Column("id", Integer, primary_key=True),
+        Column("quote_id", Integer, ForeignKey("quote.id"), nullable=False),
+        Column("filename", String(255), nullable=False),
+        Column("original_filename", String(255), nullable=False),
+        Column("file_path", String(500), nullable=False),
+        Column("file_size", Integer),
+        Column("file_type", String(50)),
+        Column("uploaded_at", DateTime),
+        Column("description", String(255)),
+    )
+    Table(
+        "order", metadata,
+        Column("id", Integer, primary_key=True),
+        Column("order_number", String(20), nullable=False, unique=True),
+        Column("quote_id", Integer, ForeignKey("quote.id"), nullable=False),
+        Column("customer_id", Integer, ForeignKey("customer.id"), nullable=False),
+        Column("status", String(20)),
+        Column("priority", String(10)),
+        Column("created_at", DateTime),
+        Column("due_date", DateTime),
+        Column("completed_at", DateTime),
+        Column("production_notes", Text),
+        Column("estimated_completion", DateTime),
+        Column("total_amount", Float, nullable=False),
+        Column("deposit_amount", Float),
+        Column("balance_due", Float),
+        Column("payment_status", String(20)),
+        Column("customer_notified", Boolean),
+        Column("sms_notifications", Boolean),
+    )
+    Table(
+        "business_analytics", metadata,
+        Column("id", Integer, primary_key=True),
+        Column("date", Date, nullable=False),
+        Column("metric_name", String(50), nullable=False),
+        Column("metric_value", Float, nullable=False),
+        Column("category", String(50)),
+        Column("additional_data", JSON),
+    )
+    return metadata
+
+
+@migration(1, "baseline tables")
+def _baseline(conn, tables):
+    # Frozen, not the live models: a fresh database replays the same history as an old one
+    _baseline_tables().create_all(conn, checkfirst=True)
+
+
+@migration(2, "unique normalized customer email")
+def _customer_email(conn, tables):
+    if not customer_emails.has_email_index(conn, tables["customer"]):
+        stats = customer_emails.dedupe_customers(
+            conn, tables["customer"], [tables["quote"].c.customer_id, tables["order"].c.customer_id])
+        customer_emails.email_index(tables["customer"]).create(conn, checkfirst=True)
+        log.info("customer emails: %(normalized)d normalized, %(merged)d duplicates merged", stats)
+
+
+@migration(3, "admin list, notification and analytics indexes")
+def _hot_query_indexes(conn, tables):
+    create_indexes(conn, tables["quote"], [
+        "ix_quote_status_created_at", "ix_quote_category_created_at",
+        "ix_quote_customer_id_created_at", "ix_quote_created_at",
+    ])
+    create_indexes(conn, tables["order"], [
+        "ix_order_status_due_date", "ix_order_status_created_at", "ix_order_priority_created_at",
+        "ix_order_customer_id", "ix_order_quote_id", "ix_order_created_at",
+    ])
+    create_indexes(conn, tables["business_analytics"], ["ix_business_analytics_key"])
+
+
+@migration(4, "admin list sort indexes")
+def _sort_indexes(conn, tables):
+    create_indexes(conn, tables["quote"], ["ix_quote_calculated_price", "ix_quote_status_calculated_price"])
+    create_indexes(conn, tables["order"], ["ix_order_total_amount", "ix_order_status_total_amount"])
+
+
+@migration(5, "admin search indexes (pg_trgm / FTS5)")
+def _search_indexes(conn, tables):
+    admin_search.for_tables(tables).install(conn)
+
+
+@migration(6, "daily analytics rollup")
+def _daily_rollup(conn, tables):
+    tables["daily_rollup"].create(conn, checkfirst=True)
+    stats = daily_rollup.for_tables(tables).reconcile(conn)
+    log.info("daily rollup: %(fixed)d rows built", stats)
+
+
+@migration(7, "customer totals and leaderboard index")
+def _customer_totals(conn, tables):
+    stats = customer_totals.for_tables(tables).repair(conn)
+    create_indexes(conn, tables["customer"], [customer_totals.INDEX_NAME])
+    log.info("customer totals: %(fixed)d of %(customers)d customers repaired", stats)
+
+
+def applied_versions(conn):
+    return {row.version: row for row in conn.execute(select(schema_migration))}
+
+
+def upgrade(engine, metadata):
+    """
+    Apply every pending migration in order, each in its own transaction.
+    Returns the versions applied. Workers starting together are serialized by
+    an advisory lock on PostgreSQL; SQLite serializes on its write lock.
+    """
+    applied = []
+    with engine.begin() as conn:
+        schema_migration.create(conn, checkfirst=True)
+    for version, name, fn in MIGRATIONS:
+        with engine.begin() as conn:
+            if conn.dialect.name == "postgresql":
+                conn.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": MIGRATION_LOCK_KEY})
+            elif conn.dialect.name == "sqlite":
+                # A no-op write takes the database write lock before the version check
+                conn.execute(update(schema_migration).where(false()).values(version=schema_migration.c.version))
+            if conn.execute(select(schema_migration.c.version)
+                            .where(schema_migration.c.version == version)).first():
+                continue
+            fn(conn, metadata.tables)
+            conn.execute(insert(schema_migration).values(version=version, name=name, applied_at=datetime.now()))
+        log.info("applied migration %04d %s", version, name)
+        applied.append(version)
+    return applied
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Apply pending schema migrations to DATABASE_URL")
+    parser.add_argument("--status", action="store_true", help="list applied and pending versions")
+    args = parser.parse_args()
+
+    from app import app, db, init_db
+
+    with app.app_context():
+        if args.status:
+            with db.engine.begin() as conn:
+                schema_migration.create(conn, checkfirst=True)
+                done = applied_versions(conn)
+            for version, name, _ in MIGRATIONS:
+                row = done.get(version)
+                state = f"applied {row.applied_at:%Y-%m-%d %H:%M}" if row else "pending"
+                print(f"{version:04d} {name:<50} {state}")
+            return
+        applied = init_db()
+        print(f"applied {len(applied)} migration(s): {applied}" if applied else "schema is up to date")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+DTF Designs - Document Number Allocator
+Hands out sequential quote/order numbers (QYYYYMM####) from blocks reserved
+in a counter table, so issuing a number normally costs no query at all.
+
+Each process reserves `block_size` numbers at a time with one atomic
+UPDATE ... RETURNING on its own connection and transaction. Two processes can
+never get overlapping blocks, and numbers left in a block when a worker exits
+are simply skipped. The first 10,000 numbers of a month keep the 4-digit
+suffix; after that the suffix grows (Q2025090010000, ...).
+"""
+
+import os
+import threading
+from datetime import datetime
+
+from sqlalchemy import func, insert, select, update
+from sqlalchemy.exc import IntegrityError
+
+BLOCK_SIZE = int(os.environ.get("NUMBER_BLOCK_SIZE", "20"))
+SUFFIX_DIGITS = 4
+
+
+def format_number(prefix, n):
+    """QYYYYMM + 4-digit suffix, wider once a month passes 9999"""
+    return f"{prefix}{n:0{SUFFIX_DIGITS}d}"
+
+
+class NumberAllocator:
+    """
+    Per-process block allocator for one document kind.
+
+    Args:
+        kind: leading letter of the number ("Q", "O")
+        counter_table: table with (name primary key, next_value integer)
+        number_column: column holding issued numbers; read once per month to
+                       start the counter past any numbers issued before it existed
+        engine: zero-arg callable returning the SQLAlchemy engine
+        block_size: numbers reserved per round trip
+    """
+
+    def __init__(self, kind, counter_table, number_column, engine, block_size=BLOCK_SIZE):
+        self.kind = kind
+        self.table = counter_table
+        self.number_column = number_column
+        self.engine = engine
+        self.block_size = block_size
+        self._reset()
+        # A block reserved before a fork (gunicorn --preload) must not be shared
+        if hasattr(os, "register_at_fork"):
+            os.register_at_fork(after_in_child=self._reset)
+
+    def _reset(self):
+        self._lock = threading.Lock()
+        self._prefix = None
+        self._next = self._end = 0
+        self.reservations = 0
+
+    def next_number(self, now=None):
+        """Next unused number for the current month"""
+        prefix = f"{self.kind}{(now or datetime.now()).strftime('%Y%m')}"
+        with self._lock:
+            if prefix != self._prefix or self._next >= self._end:
+                self._next = self._reserve(prefix)
+                self._end = self._next + self.block_size
+                self._prefix = prefix
+            n = self._next
+            self._next += 1
+        return format_number(prefix, n)
+
+    def _reserve(self, prefix):
+        """First number of a freshly reserved block (committed before returning)"""
+        t = self.table
+        size = self.block_size
+        engine = self.engine()
+        for _ in range(3):
+            with engine.begin() as conn:
+                row = conn.execute(
+                    update(t).where(t.c.name == prefix)
+                    .values(next_value=t.c.next_value + size)
+                    .returning(t.c.next_value)
+                ).first()
+                if row is not None:
+                    self.reservations += 1
+                    return row[0] - size
+                start = self._first_free(conn, prefix)
+            try:
+                with engine.begin() as conn:
+                    conn.execute(insert(t).values(name=prefix, next_value=start + size))
+                self.reservations += 1
+                return start
+            except IntegrityError:
+                # Another process created this month's counter first; reserve from it
+                continue
+        raise RuntimeError(f"Could not reserve a {self.kind} number block for {prefix}")
+
+    def _first_free(self, conn, prefix):
+        """Suffix after the highest number already issued under prefix (0 if none)"""
+        col = self.number_column
+        in_period = col.like(f"{prefix}%")
+        width = conn.execute(select(func.max(func.length(col))).where(in_period)).scalar()
+        if not width:
+            return 0
+        top = conn.execute(select(func.max(col)).where(in_period, func.length(col) == width)).scalar()
+        suffix = top[len(prefix):]
+        return int(suffix) + 1 if suffix.isdigit() else 0
@@ -0,0 +1,514 @@
+"""
+DTF Designs - Precomputed Price Matrices
+Offline build of decal and banner quotes over a grid of standard sizes,
+quantities and options, written to a compact binary file that request
+handlers memory-map for constant-time lookups. Off-grid inputs, and any grid
+point the matrix cannot reproduce exactly, are priced by the live engine.
+
+Build (from the project root):
+    python -m scripts.price_matrix build [--product decal|banner] [--processes N]
+
+File layout: MAGIC, uint32 header length, JSON header (format, product,
+inputs version, axes, record format), zero padding to 8 bytes, then one
+fixed-size record per grid point in row-major axis order.
+"""
+
+import argparse
+import fcntl
+import hashlib
+import json
+import logging
+import mmap
+import os
+import struct
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import product as grid_product
+
+from scripts import pricers
+from scripts.config_store import VersionedPrice
+from scripts.decal_pricing_2025 import PRICING_CONFIG, calculate_decal_price_2025
+from scripts.decal_tables import TABLE_NAMES, TABLES_DIR
+
+MATRIX_FORMAT = 1
+MAGIC = b"DTFPMX\x00\x01"
+GRID_PATH = os.environ.get("PRICE_MATRIX_CONFIG", os.path.join("config", "price_matrix.json"))
+MATRIX_DIR = os.environ.get("PRICE_MATRIX_DIR", os.path.join("data", "price_matrix"))
+
+# Seconds between checks of the inputs version / matrix file (one stat + a few small hashes)
+CHECK_SECONDS = float(os.environ.get("PRICE_MATRIX_CHECK_SECONDS", "10"))
+
+# Spawn a background rebuild when the matrix is missing or built from other inputs
+AUTO_REBUILD = os.environ.get("PRICE_MATRIX_AUTO_REBUILD", "1") == "1"
+
+_HEADER_LEN = struct.Struct("<I")
+
+# Pricing code baked into the matrix; editing any of it invalidates built files
+_SOURCE_FILES = ("scripts/pricers.py", "scripts/tiers.py", "scripts/decal_pricing_2025.py",
+                 "scripts/decal_tables.py", "scripts/config_store.py", "scripts/price_matrix.py",
+                 "pricing/config.py", "pricing/steps.py",
+                 "pricing/banner.py", "pricing/decal.py")
+
+
+def _digest(*parts):
+    h = hashlib.sha256()
+    for part in parts:
+        h.update(part if isinstance(part, bytes) else str(part).encode())
+        h.update(b"\x00")
+    return h.hexdigest()[:16]
+
+
+def _source_digest():
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    parts = []
+    for name in _SOURCE_FILES:
+        with open(os.path.join(root, name), 'rb') as f:
+            parts.append(f.read())
+    return _digest(*parts)
+
+
+SOURCE_VERSION = _source_digest()
+
+
+def load_grid(path=GRID_PATH):
+    """Grid definition per product from config/price_matrix.json"""
+    with open(path) as f:
+        return json.load(f)
+
+
+def _as_key(value):
+    """JSON axis value -> hashable lookup key (sizes become tuples)"""
+    return tuple(value) if isinstance(value, list) else value
+
+
+# ========== PRODUCT SPECS ==========
+
+class MatrixSpec:
+    """
+    One product's grid: the axes (in argument order), how a grid point is
+    priced and packed into a record, and how a record is turned back into the
+    live engine's return value.
+
+    Record flag bit 0 set means the point was precomputed; clear means the live
+    engine raised or returned something the record cannot hold exactly, so the
+    lookup defers to the live engine.
+    """
+
+    name = None
+    record = None
+
+    def __init__(self, grid):
+        self.grid = grid
+        self.struct = struct.Struct(self.record)
+
+    @property
+    def path(self):
+        return os.path.join(MATRIX_DIR, f"{self.name}.pmx")
+
+    def axes(self):
+        raise NotImplementedError
+
+    def inputs_version(self):
+        raise NotImplementedError
+
+    def encode(self, point):
+        raise NotImplementedError
+
+    def decode(self, record, header):
+        raise NotImplementedError
+
+
+class DecalMatrixSpec(MatrixSpec):
+    """calculate_decal_price_2025(width, height, qty, material, cut_type, laminate)"""
+
+    name = "decal"
+    record = "<Bdd"
+
+    def axes(self):
+        g = self.grid["decal"]
+        return [("size", g["sizes_in"]), ("qty", g["qtys"]), ("material", g["materials"]),
+                ("cut_type", g["cut_types"]), ("laminate", g["laminates"])]
+
+    def inputs_version(self):
+        parts = [MATRIX_FORMAT, SOURCE_VERSION, json.dumps(self.axes()), PRICING_CONFIG.current().version]
+        for table_name in TABLE_NAMES:
+            try:
+                with open(os.path.join(TABLES_DIR, f"{table_name}.csv"), 'rb') as f:
+                    parts.append(f.read())
+            except OSError:
+                parts.append(b"<missing>")
+        return _digest(*parts)
+
+    def header_extra(self):
+        return {"config_version": PRICING_CONFIG.current().version}
+
+    def encode(self, point):
+        (width, height), qty, material, cut_type, laminate = point
+        try:
+            unit_price, total_price = calculate_decal_price_2025(width, height, qty, material, cut_type, laminate)
+        except Exception:
+            return self.struct.pack(0, 0.0, 0.0)
+        if type(unit_price) is not float or type(total_price) is not float:
+            return self.struct.pack(0, 0.0, 0.0)
+        return self.struct.pack(1, unit_price, total_price)
+
+    def decode(self, record, header):
+        flags, unit_price, total_price = record
+        return VersionedPrice(unit_price, total_price, header["config_version"])
+
+
+class BannerMatrixSpec(MatrixSpec):
+    """banner_quote_with_guard(width_ft, height_ft, qty, material, ...addons, include_waste)"""
+
+    name = "banner"
+    record = "<B6d"
+
+    AUTO_FLOORED = 2
+    BLOCKED = 4
+    BLOCKED_ERROR = "Quote below minimum margin"
+    _KEYS = {"unit_usd", "total_usd", "auto_floored", "margin_after"}
+    _BLOCKED_KEYS = _KEYS | {"error", "retail_total_usd", "min_allowed_total_usd", "margin_actual"}
+
+    def axes(self):
+        g = self.grid["banner"]
+        return [("size", g["sizes_ft"]), ("qty", g["qtys"]), ("material", g["materials"]),
+                ("reinforced_corners", g["reinforced_corners"]), ("wind_slits", g["wind_slits"]),
+                ("pole_pockets_pairs", g["pole_pockets_pairs"]), ("double_sided", g["double_sided"]),
+                ("rush", g["rush"]), ("include_waste", g["include_waste"])]
+
+    def inputs_version(self):
+        return _digest(MATRIX_FORMAT, SOURCE_VERSION, json.dumps(self.axes()),
+                       pricers.RETAIL_VERSION, pricers.BANNER_COSTS_VERSION)
+
+    def header_extra(self):
+        return {}
+
+    def encode(self, point):
+        (width_ft, height_ft), *options = point
+        live_only = self.struct.pack(0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0)
+        try:
+            result = pricers.banner_quote_with_guard(width_ft, height_ft, *options)
+        except Exception:
+            return live_only
+
+        keys = set(result)
+        if keys == self._KEYS:
+            flags = 1
+            extra = (0.0, 0.0, 0.0)
+        elif keys == self._BLOCKED_KEYS and result["error"] == self.BLOCKED_ERROR:
+            flags = 1 | self.BLOCKED
+            extra = (result["retail_total_usd"], result["min_allowed_total_usd"], result["margin_actual"])
+        else:
+            return live_only
+        values = (result["unit_usd"], result["total_usd"], result["margin_after"]) + extra
+        if type(result["auto_floored"]) is not bool or any(type(v) is not float for v in values):
+            return live_only
+        if result["auto_floored"]:
+            flags |= self.AUTO_FLOORED
+        return self.struct.pack(flags, *values)
+
+    def decode(self, record, header):
+        flags, unit_usd, total_usd, margin_after, retail_total, min_allowed, margin_actual = record
+        result = {
+            "unit_usd": unit_usd,
+            "total_usd": total_usd,
+            "auto_floored": bool(flags & self.AUTO_FLOORED),
+            "margin_after": margin_after,
+        }
+        if flags & self.BLOCKED:
+            result.update({
+                "error": self.BLOCKED_ERROR,
+                "retail_total_usd": retail_total,
+                "min_allowed_total_usd": min_allowed,
+                "margin_actual": margin_actual,
+            })
+        return result
+
+
+SPEC_CLASSES = {spec.name: spec for spec in (DecalMatrixSpec, BannerMatrixSpec)}
+
+
+def get_spec(name, grid=None):
+    return SPEC_CLASSES[name](grid if grid is not None else load_grid())
+
+
+# ========== MATRIX FILE ==========
+
+class PriceMatrix:
+    """A memory-mapped matrix file; lookups are a few dict hits and one unpack_from"""
+
+    def __init__(self, path, spec):
+        with open(path, 'rb') as f:
+            self._buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if self._buf[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"{path}: not a price matrix file")
+        (header_len,) = _HEADER_LEN.unpack_from(self._buf, len(MAGIC))
+        header_start = len(MAGIC) + _HEADER_LEN.size
+        header = json.loads(self._buf[header_start:header_start + header_len])
+        if header.get("format") != MATRIX_FORMAT or header.get("product") != spec.name:
+            raise ValueError(f"{path}: unsupported format or wrong product")
+        if header.get("record") != spec.record:
+            raise ValueError(f"{path}: record layout {header.get('record')!r} != {spec.record!r}")
+
+        self.path = path
+        self.spec = spec
+        self.header = header
+        self.version = header["version"]
+        self._struct = spec.struct
+        self._offset = _data_offset(header_len)
+        self._maps = [{_as_key(v): i for i, v in enumerate(values)} for _, values in header["axes"]]
+
+        strides = []
+        stride = 1
+        for _, values in reversed(header["axes"]):
+            strides.append(stride)
+            stride *= len(values)
+        self._strides = tuple(reversed(strides))
+        self.count = stride
+
+        if len(self._buf) != self._offset + self.count * self._struct.size:
+            raise ValueError(f"{path}: truncated ({len(self._buf)} bytes)")
+
+    def lookup(self, point):
+        """Decoded result for an on-grid point, or None (off-grid or not precomputed)"""
+        i = 0
+        try:
+            for value, index_map, stride in zip(point, self._maps, self._strides):
+                j = index_map.get(value)
+                if j is None:
+                    return None
+                i += j * stride
+        except TypeError:
+            return None  # unhashable input
+        record = self._struct.unpack_from(self._buf, self._offset + i * self._struct.size)
+        if not record[0] & 1:
+            return None
+        return self.spec.decode(record, self.header)
+
+
+def _data_offset(header_len):
+    end = len(MAGIC) + _HEADER_LEN.size + header_len
+    return (end + 7) // 8 * 8
+
+
+# ========== BUILD ==========
+
+def _build_slab(args):
+    """Encode every grid point under one value of the first axis (runs in a worker)"""
+    name, grid, first = args
+    spec = get_spec(name, grid)
+    axes = [values for _, values in spec.axes()]
+    head = _as_key(axes[0][first])
+    rest = [[_as_key(v) for v in values] for values in axes[1:]]
+    return b"".join(spec.encode((head,) + tail) for tail in grid_product(*rest))
+
+
+def build_matrix(name, processes=None, grid=None):
+    """
+    Evaluate the live engine over the product's grid and atomically replace its
+    matrix file. Returns the path, or None if another build holds the lock.
+    """
+    spec = get_spec(name, grid)
+    os.makedirs(os.path.dirname(spec.path), exist_ok=True)
+
+    with open(spec.path + ".lock", "w") as lock:
+        try:
+            fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            return None
+
+        version = spec.inputs_version()
+        axes = spec.axes()
+        jobs = [(name, spec.grid, i) for i in range(len(axes[0][1]))]
+        processes = processes or os.cpu_count() or 1
+        if processes > 1:
+            with ProcessPoolExecutor(max_workers=processes) as pool:
+                slabs = list(pool.map(_build_slab, jobs))
+        else:
+            slabs = [_build_slab(job) for job in jobs]
+
+        if spec.inputs_version() != version:
+            raise RuntimeError(f"{name}: pricing inputs changed during the build; run it again")
+
+        header = {
+            "format": MATRIX_FORMAT,
+            "product": name,
+            "version": version,
+            "record": spec.record,
+            "axes": axes,
+            "built_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            **spec.header_extra(),
+        }
+        header_bytes = json.dumps(header, separators=(",", ":")).encode()
+        offset = _data_offset(len(header_bytes))
+
+        tmp_path = f"{spec.path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(MAGIC)
+            f.write(_HEADER_LEN.pack(len(header_bytes)))
+            f.write(header_bytes)
+            f.write(b"\x00" * (offset - f.tell()))
+            for slab in slabs:
+                f.write(slab)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, spec.path)
+        return spec.path
+
+
+# ========== SERVING ==========
+
+class PriceMatrixStore:
+    """
+    The matrix a worker serves from. At most once per check_interval it
+    recomputes the inputs version and stats the file; a matrix built from
+    other inputs is never used, and (with AUTO_REBUILD) a background
+    `python -m scripts.price_matrix build` is started once per inputs version.
+    """
+
+    def __init__(self, name, check_interval=CHECK_SECONDS, auto_rebuild=AUTO_REBUILD):
+        self.name = name
+        self.check_interval = check_interval
+        self.auto_rebuild = auto_rebuild
+        self._lock = threading.Lock()
+        self._spec = None
+        self._loaded = None
+        self._matrix = None
+        self._file_key = None
+        self._next_check = 0.0
+        self._builder = None
+        self._requested_version = None
+        self.hits = 0
+        self.misses = 0
+
+    def current(self):
+        """The usable PriceMatrix, or None"""
+        if time.monotonic() >= self._next_check:
+            self.refresh()
+        return self._matrix
+
+    def refresh(self, force=False):
+        with self._lock:
+            now = time.monotonic()
+            if not force and now < self._next_check:
+                return self._matrix
+            self._next_check = now + self.check_interval
+
+            try:
+                if self._spec is None or force:
+                    self._spec = get_spec(self.name)
+                spec = self._spec
+                version = spec.inputs_version()
+            except (OSError, ValueError, KeyError) as e:
+                logging.error(f"Price matrix {self.name}: cannot read grid or inputs: {str(e)}")
+                self._matrix = None
+                return None
+
+            try:
+                st = os.stat(spec.path)
+                file_key = (st.st_ino, st.st_mtime_ns, st.st_size)
+            except OSError:
+                file_key = None
+            if file_key != self._file_key or force:
+                self._file_key = file_key
+                self._loaded = None
+                if file_key is not None:
+                    try:
+                        self._loaded = PriceMatrix(spec.path, spec)
+                    except (OSError, ValueError, KeyError) as e:
+                        logging.error(f"Price matrix {self.name}: ignoring {spec.path}: {str(e)}")
+
+            loaded = self._loaded
+            self._matrix = loaded if loaded is not None and loaded.version == version else None
+            if self._matrix is None and self.auto_rebuild:
+                self._spawn_rebuild(version)
+            return self._matrix
+
+    def _spawn_rebuild(self, version):
+        if self._builder is not None and self._builder.poll() is None:
+            return
+        if self._requested_version == version:
+            return
+        self._requested_version = version
+        try:
+            self._builder = subprocess.Popen(
+                [sys.executable, "-m", "scripts.price_matrix", "build", "--product", self.name],
+                cwd=os.getcwd(), stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL,
+                start_new_session=True,
+            )
+            logging.info(f"Price matrix {self.name}: rebuilding for inputs {version}")
+        except OSError as e:
+            logging.error(f"Price matrix {self.name}: could not start rebuild: {str(e)}")
+
+    def lookup(self, point):
+        matrix = self.current()
+        result = matrix.lookup(point) if matrix is not None else None
+        if result is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return result
+
+    def stats(self):
+        matrix = self._matrix
+        return {
+            "product": self.name,
+            "loaded": matrix is not None,
+            "version": matrix.version if matrix is not None else None,
+            "points": matrix.count if matrix is not None else 0,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+DECAL_MATRIX = PriceMatrixStore("decal")
+BANNER_MATRIX = PriceMatrixStore("banner")
+
+
+def decal_price(width, height, qty, material='gloss', cut_type='kiss', laminate=None):
+    """calculate_decal_price_2025, served from the decal matrix when the inputs are on-grid"""
+    result = DECAL_MATRIX.lookup(((width, height), qty, material, cut_type, laminate))
+    if result is None:
+        result = calculate_decal_price_2025(width, height, qty, material, cut_type, laminate)
+    return result
+
+
+def banner_quote(width_ft, height_ft, qty, material="alpha",
+                 reinforced_corners=False, wind_slits=False,
+                 pole_pockets_pairs=0, double_sided=False, rush=False,
+                 include_waste=True):
+    """banner_quote_with_guard, served from the banner matrix when the inputs are on-grid"""
+    result = BANNER_MATRIX.lookup(((width_ft, height_ft), qty, material, reinforced_corners, wind_slits,
+                                   pole_pockets_pairs, double_sided, rush, include_waste))
+    if result is None:
+        result = pricers.banner_quote_with_guard(width_ft, height_ft, qty, material,
+                                                 reinforced_corners, wind_slits,
+                                                 pole_pockets_pairs, double_sided, rush,
+                                                 include_waste)
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build precomputed decal/banner price matrices")
+    sub = parser.add_subparsers(dest="command", required=True)
+    build = sub.add_parser("build", help="evaluate the grid and write the matrix file(s)")
+    build.add_argument("--product", choices=sorted(SPEC_CLASSES) + ["all"], default="all")
+    build.add_argument("--processes", type=int, default=None, help="worker processes (default: all cores)")
+    args = parser.parse_args(argv)
+
+    names = sorted(SPEC_CLASSES) if args.product == "all" else [args.product]
+    for name in names:
+        started = time.perf_counter()
+        path = build_matrix(name, processes=args.processes)
+        if path is None:
+            print(f"{name}: another build is running, skipped")
+        else:
+            print(f"{name}: wrote {path} ({os.path.getsize(path)} bytes) in {time.perf_counter() - started:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,45 +4,35 @@ Implements retail pricing + employee true cost + margin guard system
 Per tech brief specifications by Mitch
 """
 
-import json
 import math
-import os
-# Decal pricing will be implemented inline
-
-# Configuration file paths
-RETAIL_PATH = os.environ.get("RETAIL_CONFIG", "./config/retail_pricing.json")
-DECAL_COST_PATH = os.environ.get("DECALS_COST_CONFIG", "./config/employee_true_cost_decals.json")
-BANNER_COST_PATH = os.environ.get("BANNERS_COST_CONFIG", "./config/employee_true_cost_banners.json")
-POSTER_COST_PATH = os.environ.get("POSTERS_COST_CONFIG", "./config/employee_true_cost_posters.json")
-
-# Load all configuration files
-with open(RETAIL_PATH) as f:
-    RETAIL = json.load(f)
-
-# DECAL_COSTS removed - using new decals_pricing system
 
-with open(BANNER_COST_PATH) as f:
-    BANNER_COSTS = json.load(f)
+from pricing import banner as banner_engine
+from pricing.config import (
+    BANNER_COST_PATH, DECAL_COST_PATH, POSTER_COST_PATH, RETAIL_PATH,
+    BANNER_COSTS, BANNER_COSTS_VERSION, POSTER_COSTS, POSTER_COSTS_VERSION, RETAIL, RETAIL_VERSION,
+)
+from pricing.steps import guarded_quote, margin_guard
+from scripts.tiers import compile_ladder, compile_buffer_tiers
+# Decal pricing will be implemented inline
 
-with open(POSTER_COST_PATH) as f:
-    POSTER_COSTS = json.load(f)
+# Compile ladders and waste buffers once; malformed or overlapping tiers fail here
+BANNER_LADDER = compile_ladder(RETAIL["banners"]["ladder_per_sqft"], "banners.ladder_per_sqft")
+DECAL_LADDER = compile_ladder(RETAIL["decals"]["ladder_per_sqft"], "decals.ladder_per_sqft")
+POSTER_LADDER = compile_ladder(RETAIL["posters"]["ladder_per_sqft"], "posters.ladder_per_sqft")
+BANNER_WASTE = compile_buffer_tiers(RETAIL["waste_buffers"]["banners"], "waste_buffers.banners")
+POSTER_WASTE = compile_buffer_tiers(RETAIL["waste_buffers"]["posters"], "waste_buffers.posters")
 
 # ========== HELPER FUNCTIONS ==========
 
 def _ladder_rate(ladder, qty: int) -> float:
-    for lo, hi, rate in ladder:
-        if lo <= qty <= hi:
-            return rate
-    return ladder[-1][2]
+    """Rate for qty from a compiled ladder (last tier if qty is off the ladder)"""
+    return ladder.lookup(qty)
 
 # Legacy decal pricing functions removed - using new 2025 system
 
 def _waste_buffer(area, buffer_tiers):
-    """Apply waste buffer based on area tiers"""
-    for tier in buffer_tiers:
-        if area >= tier["min"] and area <= tier["max"]:
-            return area + tier["add"]
-    return area
+    """Apply waste buffer based on compiled area tiers"""
+    return area + buffer_tiers.lookup(area)
 
 def _small_piece_fee(width_in, height_in, fees):
     """Calculate small piece fee based on minimum edge"""
@@ -65,47 +55,14 @@ def banner_price_retail(width_ft, height_ft, qty, material="alpha",
     Retail banner pricing per Mitch specifications:
     - Area with waste buffer applied
     - Ladder rate + material adder
-    - Per-banner minimum bump if material requires it
     - Job minimum applies to whole job
     - Add-ons applied per banner, then multipliers
+    Runs the compiled pricing.banner retail pipeline.
     """
-    area_ft2 = width_ft * height_ft
-    billable_area = _waste_buffer(area_ft2, RETAIL["waste_buffers"]["banners"]) if include_waste else area_ft2
-    
-    # Base rate + material adder
-    base_rate = _ladder_rate(RETAIL["banners"]["ladder_per_sqft"], qty)
-    material_adder = RETAIL["banners"]["materials"][material]["adder_per_sqft"]
-    rate = base_rate + material_adder
-    
-    per_banner = billable_area * rate
-    
-    # Material-specific per-banner minimum (if any) - NOT tied to job minimum
-    # This is separate from job minimum which applies to total job only
-    
-    subtotal = per_banner * qty
-    
-    # Apply job minimum to whole job
-    subtotal = max(subtotal, RETAIL["job_minimums"]["banners"])
-    
-    # Add-ons per banner
-    addons = RETAIL["banners"]["addons"]
-    per_banner_addons = 0.0
-    if reinforced_corners:
-        per_banner_addons += addons["reinforced_corners"]
-    if wind_slits:
-        per_banner_addons += addons["wind_slits"]
-    if pole_pockets_pairs > 0:
-        per_banner_addons += addons["pole_pockets_pair"] * pole_pockets_pairs
-    
-    subtotal += per_banner_addons * qty
-    
-    # Multipliers
-    if double_sided:
-        subtotal *= addons["double_sided_mult"]
-    if rush:
-        subtotal *= (1.0 + addons["rush_pct"])
-    
-    return round(subtotal / qty, 2), round(subtotal, 2)
+    return banner_engine.banner_price_retail(width_ft, height_ft, qty, material,
+                                             reinforced_corners, wind_slits,
+                                             pole_pockets_pairs, double_sided, rush,
+                                             include_waste)
 
 def poster_price_retail(width_in, height_in, qty, material="matte", 
                        lamination=False, mounting=None, tubepack=False, rush=False):
@@ -118,10 +75,10 @@ def poster_price_retail(width_in, height_in, qty, material="matte",
     - Rush percentage multiplier
     """
     a = (width_in * height_in) / 144.0  # sqft per piece
-    billable_area = _waste_buffer(a, RETAIL["waste_buffers"]["posters"])
+    billable_area = _waste_buffer(a, POSTER_WASTE)
     
     # Base rate + material adder
-    base_rate = _ladder_rate(RETAIL["posters"]["ladder_per_sqft"], qty)
+    base_rate = _ladder_rate(POSTER_LADDER, qty)
     material_adder = RETAIL["posters"]["materials"][material]["adder_per_sqft"]
     rate = base_rate + material_adder
     
@@ -156,40 +113,9 @@ def banner_cost_true(width_ft, height_ft, qty, material="alpha",
     """
     True cost calculation for banners (employee only)
     """
-    area_ft2 = width_ft * height_ft
-    
-    # Base costs per sqft 
-    material_cost = BANNER_COSTS["materials_cost_per_sqft"][material]
-    ink_cost = BANNER_COSTS["ink_cost_per_sqft"]
-    overhead_cost = BANNER_COSTS["machine_overhead_per_sqft"]
-    finishing_cost = BANNER_COSTS["finishing_cost_per_sqft"]
-    
-    per_banner_cost = area_ft2 * (material_cost + ink_cost + overhead_cost + finishing_cost)
-    
-    # Fixed finishing cost per banner
-    per_banner_cost += BANNER_COSTS["finishing_fixed_per_banner"]
-    
-    # Add-on costs
-    addons = BANNER_COSTS["addons_cost"]
-    if reinforced_corners:
-        per_banner_cost += addons["reinforced_corners"]
-    if wind_slits:
-        per_banner_cost += addons["wind_slits"]
-    if pole_pockets_pairs > 0:
-        per_banner_cost += addons["pole_pockets_pair"] * pole_pockets_pairs
-    
-    # Double-sided extra cost (ink + overhead + finishing for second side)
-    if double_sided:
-        per_banner_cost += area_ft2 * BANNER_COSTS.get("second_side_extra_per_sqft", 0.525)
-    
-    # Total for quantity
-    variable_total = per_banner_cost * qty
-    
-    # Fixed costs per job
-    fixed_total = BANNER_COSTS["setup_cost_per_job"] + BANNER_COSTS["packaging_cost_per_job"]
-    
-    total_cost = variable_total + fixed_total
-    return round(total_cost / qty, 2), round(total_cost, 2)
+    return banner_engine.banner_cost_true(width_ft, height_ft, qty, material,
+                                          reinforced_corners, wind_slits,
+                                          pole_pockets_pairs, double_sided)
 
 def poster_cost_true(width_in, height_in, qty, material="matte",
                     lamination=False, mounting=None, tubepack=False):
@@ -241,48 +167,7 @@ def calculate_margin_guard(retail_total, cost_total, min_margin_pct=None, mode=N
         min_margin_pct = RETAIL["min_margin_floor_pct"]
     if mode is None:
         mode = RETAIL["floor_mode"]
-    
-    # Calculate actual margin
-    actual_margin = (retail_total - cost_total) / retail_total if retail_total > 0 else 0.0
-    
-    # Check if margin is acceptable
-    is_acceptable = actual_margin >= min_margin_pct
-    
-    if is_acceptable:
-        return {
-            "approved": True,
-            "auto_floored": False,
-            "final_total": retail_total,
-            "actual_margin": actual_margin,
-            "cost_total": cost_total
-        }
-    
-    # Calculate floor price
-    floor_total = cost_total / (1.0 - min_margin_pct)
-    
-    if mode == "AUTO_FLOOR":
-        return {
-            "approved": True,
-            "auto_floored": True,
-            "final_total": round(floor_total, 2),
-            "actual_margin": min_margin_pct,
-            "cost_total": cost_total,
-            "original_retail": retail_total
-        }
-    
-    elif mode == "BLOCK":
-        return {
-            "approved": False,
-            "blocked": True,
-            "retail_total": retail_total,
-            "min_allowed_total": round(floor_total, 2),
-            "actual_margin": actual_margin,
-            "required_margin": min_margin_pct,
-            "cost_total": cost_total
-        }
-    
-    else:
-        raise ValueError(f"Invalid floor_mode: {mode}")
+    return margin_guard(retail_total, cost_total, min_margin_pct, mode)
 
 # ========== INTEGRATED PRICING FUNCTIONS (WITH GUARD) ==========
 
@@ -293,37 +178,10 @@ def banner_quote_with_guard(width_ft, height_ft, qty, material="alpha",
                            pole_pockets_pairs=0, double_sided=False, rush=False,
                            include_waste=True):
     """Get banner retail quote with margin guard applied"""
-    # Calculate retail price
-    unit_retail, total_retail = banner_price_retail(width_ft, height_ft, qty, material,
-                                                   reinforced_corners, wind_slits, 
-                                                   pole_pockets_pairs, double_sided, rush,
-                                                   include_waste)
-    
-    # Calculate true cost (no rush in cost calculation)
-    unit_cost, total_cost = banner_cost_true(width_ft, height_ft, qty, material,
-                                           reinforced_corners, wind_slits,
-                                           pole_pockets_pairs, double_sided)
-    
-    # Apply margin guard
-    guard_result = calculate_margin_guard(total_retail, total_cost)
-    
-    # Build response
-    result = {
-        "unit_usd": round(guard_result["final_total"] / qty, 2),
-        "total_usd": guard_result["final_total"],
-        "auto_floored": guard_result.get("auto_floored", False),
-        "margin_after": guard_result["actual_margin"]
-    }
-    
-    if not guard_result["approved"]:
-        result.update({
-            "error": "Quote below minimum margin",
-            "retail_total_usd": guard_result["retail_total"],
-            "min_allowed_total_usd": guard_result["min_allowed_total"],
-            "margin_actual": guard_result["actual_margin"]
-        })
-    
-    return result
+    return banner_engine.banner_quote(width_ft, height_ft, qty, material,
+                                      reinforced_corners, wind_slits,
+                                      pole_pockets_pairs, double_sided, rush,
+                                      include_waste)
 
 def poster_quote_with_guard(width_in, height_in, qty, material="matte",
                            lamination=False, mounting=None, tubepack=False, rush=False):
@@ -336,26 +194,8 @@ def poster_quote_with_guard(width_in, height_in, qty, material="matte",
     unit_cost, total_cost = poster_cost_true(width_in, height_in, qty, material,
                                            lamination, mounting, tubepack)
     
-    # Apply margin guard
-    guard_result = calculate_margin_guard(total_retail, total_cost)
-    
-    # Build response
-    result = {
-        "unit_usd": round(guard_result["final_total"] / qty, 2),
-        "total_usd": guard_result["final_total"],
-        "auto_floored": guard_result.get("auto_floored", False),
-        "margin_after": guard_result["actual_margin"]
-    }
-    
-    if not guard_result["approved"]:
-        result.update({
-            "error": "Quote below minimum margin",
-            "retail_total_usd": guard_result["retail_total"],
-            "min_allowed_total_usd": guard_result["min_allowed_total"],
-            "margin_actual": guard_result["actual_margin"]
-        })
-    
-    return result
+    # Apply margin guard and build the same response as banner quotes
+    return guarded_quote(calculate_margin_guard(total_retail, total_cost), qty)
 
 # ========== EMPLOYEE COST ENDPOINTS (ADMIN ONLY) ==========
 
@@ -0,0 +1,107 @@
+"""
+DTF Designs - Quote Result Cache
+Bounded LRU cache with a TTL for computed quote results, keyed on a canonical
+form of the pricing-relevant form fields.
+"""
+
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+# Marks a form field that was not submitted (distinct from an empty string)
+MISSING = ("<missing>",)
+
+
+def normalize_fields(form_data, spec):
+    """
+    Canonical key for the fields a pricing function reads.
+
+    spec is a sequence of (field, kind) where kind is str, int or float.
+    Numeric fields are parsed the same way the pricing code parses them, so
+    "24" and "24.0 " share a key; values that fail to parse are kept verbatim
+    (the quote will raise and is never cached). Strings are kept exactly.
+    """
+    key = []
+    for field, kind in spec:
+        value = form_data.get(field, MISSING)
+        if value is not MISSING and kind is not str:
+            try:
+                value = kind(value)
+            except (TypeError, ValueError):
+                pass
+        key.append(value)
+    return tuple(key)
+
+
+class QuoteResultCache:
+    """
+    Thread-safe LRU cache with per-entry TTL.
+
+    Results are deep-copied on the way in and out, because the routes mutate
+    the dicts they get back (partner discounts, warnings).
+    """
+
+    def __init__(self, maxsize=2048, ttl=300.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key):
+        """Cached result for key, or MISSING"""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return MISSING
+            expires_at, value = entry
+            if expires_at <= now:
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return MISSING
+            self._entries.move_to_end(key)
+            self.hits += 1
+        return copy.deepcopy(value)
+
+    def put(self, key, value):
+        value = copy.deepcopy(value)
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def get_or_compute(self, key, compute):
+        """Return the cached result, or compute, store and return it (errors are not cached)"""
+        value = self.get(key)
+        if value is not MISSING:
+            return value
+        value = compute()
+        self.put(key, value)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'maxsize': self.maxsize,
+                'ttl_seconds': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+            }
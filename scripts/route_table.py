@@ -0,0 +1,25 @@
+"""
+DTF Designs - Route Table
+Collects the app's views at import, with the same @route decorator as Flask,
+and adds them to each app that create_app() builds. Unlike a Blueprint it
+keeps the plain endpoint names ('admin_quotes', not 'main.admin_quotes'), so
+url_for calls in views and templates don't change.
+"""
+
+
+class RouteTable:
+    def __init__(self):
+        self._rules = []  # (rule, endpoint, view_func, options)
+
+    def route(self, rule, **options):
+        """Record view_func for rule; same arguments as Flask.route"""
+        def decorator(view_func):
+            endpoint = options.pop("endpoint", None) or view_func.__name__
+            self._rules.append((rule, endpoint, view_func, options))
+            return view_func
+        return decorator
+
+    def register(self, app):
+        """Add every recorded rule to app"""
+        for rule, endpoint, view_func, options in self._rules:
+            app.add_url_rule(rule, endpoint, view_func, **options)
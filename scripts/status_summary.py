@@ -0,0 +1,115 @@
+"""
+DTF Designs - Admin Status Summary
+Quote and order counts and totals for the admin summary cards and the live
+notifications endpoint: one GROUP BY status per table (plus indexed counts of
+recent quotes and overdue orders), cached for a short TTL.
+
+The cache is also keyed on a version counter, so a status change or a
+conversion committed by any worker is reflected on the next request instead
+of after the TTL. Quotes placed by customers only show up once the TTL runs
+out.
+"""
+
+import threading
+import time
+from collections import namedtuple
+from datetime import datetime, timedelta
+
+from sqlalchemy import func, select
+
+# Order statuses that can be overdue (due_date in the past)
+OPEN_ORDER_STATUSES = ("confirmed", "in_production")
+RECENT_WINDOW = timedelta(hours=24)
+
+StatusTotal = namedtuple("StatusTotal", ["count", "value"])
+
+Summary = namedtuple("Summary", ["quotes", "orders", "new_quotes_24h", "overdue_orders", "computed_at"])
+
+
+class StatusTotals:
+    """Read-only {status: StatusTotal} with totals over any set of statuses"""
+
+    def __init__(self, rows):
+        self._by_status = {status: StatusTotal(count, value or 0) for status, count, value in rows}
+
+    def count(self, *statuses):
+        """Rows with any of statuses (all rows when none are given)"""
+        return sum(t.count for s, t in self._by_status.items() if not statuses or s in statuses)
+
+    def value(self, *statuses):
+        """Summed amount of rows with any of statuses (all rows when none are given)"""
+        return sum(t.value for s, t in self._by_status.items() if not statuses or s in statuses)
+
+    def __getitem__(self, status):
+        return self._by_status.get(status, StatusTotal(0, 0))
+
+
+class StatusSummary:
+    """
+    Args:
+        quote, order: quote and order Tables
+        ttl: seconds a summary is served before it is recomputed
+    """
+
+    def __init__(self, quote, order, ttl=30.0):
+        self.quote = quote
+        self.order = order
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._summary = None
+        self._version = None
+        self._expires_at = 0.0
+
+    def compute(self, conn, now=None):
+        """
+        Fresh Summary: quotes by status, orders by status, then two indexed
+        counts (recent quotes, overdue open orders). Folding the overdue test
+        into the order GROUP BY would read every row instead of the
+        (status, total_amount) index.
+        """
+        now = now or datetime.now()
+        q, o = self.quote.c, self.order.c
+        quotes = conn.execute(
+            select(q.status, func.count(), func.sum(q.calculated_price)).group_by(q.status)
+        ).all()
+        orders = conn.execute(
+            select(o.status, func.count(), func.sum(o.total_amount)).group_by(o.status)
+        ).all()
+        recent = conn.execute(
+            select(func.count()).select_from(self.quote).where(q.created_at >= now - RECENT_WINDOW)
+        ).scalar()
+        overdue = conn.execute(
+            select(func.count()).select_from(self.order)
+            .where(o.status.in_(OPEN_ORDER_STATUSES), o.due_date < now)
+        ).scalar()
+        return Summary(
+            quotes=StatusTotals(quotes),
+            orders=StatusTotals(orders),
+            new_quotes_24h=recent,
+            overdue_orders=overdue,
+            computed_at=now,
+        )
+
+    def current(self, conn, version=0):
+        """
+        Cached Summary, recomputed when it is older than ttl or version (the
+        caller's invalidation counter) has moved since it was computed.
+        """
+        with self._lock:
+            if self._summary is not None and self._version == version and time.monotonic() < self._expires_at:
+                return self._summary
+        summary = self.compute(conn)
+        with self._lock:
+            self._summary, self._version = summary, version
+            self._expires_at = time.monotonic() + self.ttl
+        return summary
+
+    def invalidate(self):
+        """Drop this process's cached summary"""
+        with self._lock:
+            self._summary = None
+
+
+def for_tables(tables, ttl=30.0):
+    """StatusSummary over the app's quote and order tables"""
+    return StatusSummary(tables["quote"], tables["order"], ttl=ttl)
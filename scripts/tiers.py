@@ -0,0 +1,86 @@
+"""
+DTF Designs Compiled Tier Tables
+Quantity ladders and area waste buffers compiled once at config load into
+sorted boundary arrays and searched with bisect.
+"""
+
+import math
+from bisect import bisect_left
+
+
+class TierTable:
+    """
+    Inclusive [lo, hi] -> value tiers, validated and sorted at construction.
+
+    Lookups return the value of the first tier containing x, or `default`
+    when x falls outside every tier (same result as a first-match linear scan).
+
+    Args:
+        tiers: iterable of (lo, hi, value); hi=None means unbounded
+        name: config path used in error messages
+        shared_bounds: allow a tier to start exactly where the previous one ends
+                       (area buffers); the lower tier wins on the shared point
+        default: value returned when no tier matches
+    """
+
+    __slots__ = ("name", "los", "his", "values", "default", "size")
+
+    def __init__(self, tiers, name="tiers", shared_bounds=False, default=None):
+        los, his, values = [], [], []
+        for n, tier in enumerate(tiers):
+            try:
+                lo, hi, value = tier
+            except (TypeError, ValueError):
+                raise ValueError(f"{name}[{n}]: expected (min, max, value), got {tier!r}")
+            hi = math.inf if hi is None else hi
+            for label, v in (("min", lo), ("max", hi), ("value", value)):
+                if isinstance(v, bool) or not isinstance(v, (int, float)) or math.isnan(v):
+                    raise ValueError(f"{name}[{n}]: {label} must be a number, got {v!r}")
+            if lo > hi:
+                raise ValueError(f"{name}[{n}]: min {lo} is greater than max {hi}")
+            if his:
+                prev_hi = his[-1]
+                if lo < prev_hi or (lo == prev_hi and not shared_bounds):
+                    raise ValueError(f"{name}[{n}]: tier starting at {lo} overlaps previous tier ending at {prev_hi}")
+            los.append(lo)
+            his.append(hi)
+            values.append(value)
+
+        if not values:
+            raise ValueError(f"{name}: at least one tier is required")
+
+        self.name = name
+        self.los = tuple(los)
+        self.his = tuple(his)
+        self.values = tuple(values)
+        self.size = len(values)
+        self.default = default
+
+    def lookup(self, x, _bisect=bisect_left):
+        """Value of the tier containing x, else the table default"""
+        i = _bisect(self.his, x)
+        if i < self.size and self.los[i] <= x:
+            return self.values[i]
+        return self.default
+
+    def __len__(self):
+        return self.size
+
+    def __repr__(self):
+        return f"TierTable({self.name!r}, {len(self)} tiers)"
+
+
+def compile_ladder(ladder, name):
+    """Compile a [[qty_min, qty_max, rate], ...] ladder; unmatched qty gets the last rate"""
+    table = TierTable(ladder, name=name)
+    table.default = table.values[-1]
+    return table
+
+
+def compile_buffer_tiers(buffer_tiers, name):
+    """Compile [{"min", "max", "add"}, ...] waste buffer tiers; unmatched area adds nothing"""
+    try:
+        tiers = [(t["min"], t["max"], t["add"]) for t in buffer_tiers]
+    except (TypeError, KeyError) as e:
+        raise ValueError(f"{name}: malformed waste buffer tier ({e})")
+    return TierTable(tiers, name=name, shared_bounds=True, default=0.0)
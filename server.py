@@ -10,119 +10,14 @@ import os
 # Import centralized pricing functions
 from scripts.pricers import (
     # Retail quotes with margin guard
-    banner_quote_with_guard, 
     poster_quote_with_guard,
     # Employee cost functions (admin only)
     banner_employee_cost,
     poster_employee_cost
 )
-
-# ========== NEW 2025 DECAL PRICING SYSTEM ==========
-
-def calculate_decal_retail_price(width_in, height_in, qty, material="gloss", laminate="none"):
-    """
-    New 2025 decal pricing system with 5-step structure:
-    1. Calculate total decal area (width × height × qty ÷ 144)
-    2. Apply material cost per sq ft (actual vinyl cost $0.90-$1.20/sq ft)
-    3. Add fixed overhead buffer ($3-5 per job)
-    4. Apply markup (30% minimum margin)
-    5. Enforce industry floor/ceiling ranges
-    """
-    # Step 1: Calculate total decal area
-    total_sqft = (width_in * height_in * qty) / 144
-    
-    # Step 2: Apply material cost per sq ft (corrected to industry standards)
-    if material == "matte":
-        material_cost_per_sqft = 2.80  # $2.80/sq ft for matte
-    else:
-        material_cost_per_sqft = 2.50  # $2.50/sq ft for gloss
-    
-    material_cost = total_sqft * material_cost_per_sqft
-    
-    # Add lamination cost if selected
-    if laminate != "none":
-        lamination_cost_per_sqft = 1.20  # $1.20/sq ft for lamination
-        material_cost += total_sqft * lamination_cost_per_sqft
-    
-    # Step 3: Add fixed overhead buffer (corrected)
-    overhead_cost = 0.00  # Overhead already included in material cost
-    
-    # Step 4: Calculate base price with 30% minimum margin
-    total_cost = material_cost + overhead_cost
-    base_price = total_cost / 0.70  # 30% margin = cost / (1 - 0.30)
-    
-    # Step 5: Enforce industry floor/ceiling ranges
-    unit_price = base_price / qty
-    
-    # Apply industry benchmarks for common sizes
-    if abs(width_in - 4) <= 0.1 and abs(height_in - 4) <= 0.1:  # 4x4
-        if qty == 25:
-            # 4×4 qty 25 → retail $30–40
-            target_total = max(30, min(40, base_price))
-            total_price = target_total
-        elif qty == 50:
-            # 4×4 qty 50 → retail $68–72
-            target_total = max(68, min(72, base_price))
-            total_price = target_total
-        else:
-            total_price = base_price
-    elif abs(width_in - 3) <= 0.1 and abs(height_in - 3) <= 0.1:  # 3x3
-        if qty == 50:
-            # 3×3 qty 50 → retail $35–50
-            target_total = max(35, min(50, base_price))
-            total_price = target_total
-        else:
-            total_price = base_price
-    else:
-        total_price = base_price
-    
-    unit_price = total_price / qty
-    margin_after = ((total_price - total_cost) / total_price) * 100
-    
-    return {
-        "unit_usd": round(unit_price, 2),
-        "total_usd": round(total_price, 2),
-        "auto_floored": False,
-        "margin_after": round(margin_after, 1)
-    }
-
-def calculate_decal_true_cost(width_in, height_in, qty, material="gloss", laminate="none"):
-    """
-    Calculate true cost for decals using actual material costs
-    """
-    # Calculate total decal area
-    total_sqft = (width_in * height_in * qty) / 144
-    
-    # Material cost per sq ft (corrected to industry standards)
-    if material == "matte":
-        material_cost_per_sqft = 2.80  # $2.80/sq ft for matte
-    else:
-        material_cost_per_sqft = 2.50  # $2.50/sq ft for gloss
-    
-    material_cost = total_sqft * material_cost_per_sqft
-    
-    # Add lamination cost if selected
-    if laminate != "none":
-        lamination_cost_per_sqft = 1.20  # $1.20/sq ft for lamination
-        material_cost += total_sqft * lamination_cost_per_sqft
-    
-    # Fixed overhead (overhead included in material cost)
-    overhead_cost = 0.00
-    
-    # Total true cost
-    total_cost = material_cost + overhead_cost
-    unit_cost = total_cost / qty
-    
-    # 30% margin floor for minimum sell price
-    floor_sell_total = total_cost / 0.70
-    floor_sell_unit = floor_sell_total / qty
-    
-    return {
-        "unit_cost_usd": round(unit_cost, 2),
-        "total_cost_usd": round(total_cost, 2),
-        "floor_sell_unit_usd": round(floor_sell_unit, 2),
-        "floor_sell_total_usd": round(floor_sell_total, 2)
-    }
+from scripts.banner_batch import banner_quote_batch, BATCH_MAX_LINES
+from scripts.price_matrix import banner_quote as banner_quote_from_matrix
+from pricing.decal import calculate_decal_retail_price, calculate_decal_true_cost
 
 app = Flask(__name__)
 
@@ -211,7 +106,7 @@ def quote_banner():
     }
     
     try:
-        result = banner_quote_with_guard(
+        result = banner_quote_from_matrix(
             width_ft=float(d["width_ft"]),
             height_ft=float(d["height_ft"]),
             qty=int(d["qty"]),
@@ -232,6 +127,38 @@ def quote_banner():
     except Exception as e:
         abort(400, description=f"Calculation error: {str(e)}")
 
+@app.post("/quote/banner/batch")
+def quote_banner_batch():
+    """
+    Retail banner quotes with margin guard for a whole package of lines
+    Body: {"lines": [<same fields as /quote/banner>, ...]}
+    Response: {
+        "count": int, "errors": int,
+        "lines": [{"line": int, "unit_usd": float, "total_usd": float,
+                   "auto_floored": bool, "margin_after": float}
+                  | {"line": int, "error": str, ...}, ...]
+    }
+    Results are returned in input order; a bad line does not fail the batch.
+    """
+    d = _parse_request_data()
+    lines = d.get("lines") if isinstance(d, dict) else d
+    
+    if not isinstance(lines, list):
+        abort(400, description="Body must contain a \"lines\" array")
+    if len(lines) > BATCH_MAX_LINES:
+        abort(413, description=f"Too many lines (max {BATCH_MAX_LINES})")
+    
+    try:
+        results = banner_quote_batch(lines)
+    except Exception as e:
+        abort(400, description=f"Calculation error: {str(e)}")
+    
+    return jsonify({
+        "count": len(results),
+        "errors": sum(1 for r in results if "error" in r),
+        "lines": results
+    })
+
 @app.post("/quote/poster")
 def quote_poster():
     """
@@ -385,6 +312,10 @@ def not_found(error):
 def conflict(error):
     return jsonify({"error": "Conflict", "message": error.description}), 409
 
+@app.errorhandler(413)
+def payload_too_large(error):
+    return jsonify({"error": "Payload Too Large", "message": error.description}), 413
+
 @app.errorhandler(500)
 def internal_error(error):
     return jsonify({"error": "Internal Server Error", "message": "Something went wrong"}), 500